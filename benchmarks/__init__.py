@@ -0,0 +1,9 @@
+"""
+Benchmarks of the hotel reservation system.
+
+Modules:
+- data_generator: Generates seeded, synthetic hotel data.
+- serializers: Measures the serializers of the data files.
+- operations: Times the public operations of Hotel, Customer and
+Reservation.
+"""
@@ -0,0 +1,92 @@
+"""
+Module for generating synthetic hotel data for the benchmarks.
+
+The data has the layout written by the Hotel, Customer and Reservation
+classes, and the same seed always generates the same data.
+
+Libraries:
+- datetime: Provides the dates of the reservations.
+- random: Provides the seeded random number generator.
+
+Functions:
+- generate_hotels: Generates a list of hotels with customers and
+reservations.
+- add_arguments: Adds the size and seed options to a command line parser.
+"""
+import datetime
+import random
+
+# Room types of the generated hotels
+ROOM_TYPES = ('single', 'double', 'suite')
+# First check-in date of the generated reservations
+FIRST_DATE = datetime.date(2024, 1, 1)
+# Most days a reservation is booked before its check-in
+MAX_LEAD_DAYS = 90
+
+
+def generate_hotels(hotels: int = 100, customers: int = 50,
+                    reservations: int = 50, seed: int = 0):
+    """
+    Generates a list of hotels with customers and reservations.
+
+    Half of the reservations have a check-out date; the others only have
+    a reservation date, like the reservations of earlier versions. Every
+    reservation is booked up to MAX_LEAD_DAYS days before its check-in.
+
+    Parameters:
+    - hotels: The number of hotels.
+    - customers: The number of customers of each hotel.
+    - reservations: The number of reservations of each hotel.
+    - seed: The seed of the random number generator.
+
+    Returns:
+    The list of hotels.
+    """
+    generator = random.Random(seed)
+    hotels_data = []
+    for hotel_number in range(1, hotels + 1):
+        hotel = {'hotel_id': hotel_number,
+                 'name': f'Hotel {hotel_number}',
+                 'location': f'City {generator.randrange(hotels // 10 + 1)}',
+                 'rooms': {room_type: generator.randint(reservations,
+                                                        2 * reservations)
+                           for room_type in ROOM_TYPES},
+                 'reservations': [],
+                 'customers': [{'customer_id': (hotel_number - 1)
+                                * customers + number,
+                                'customer_name': f'Guest {hotel_number}-'
+                                                 f'{number}'}
+                               for number in range(1, customers + 1)]}
+        for number in range(1, reservations + 1):
+            customer = generator.choice(hotel['customers'] or [
+                {'customer_id': 0, 'customer_name': 'Guest'}])
+            check_in = FIRST_DATE + datetime.timedelta(
+                days=generator.randrange(365))
+            reservation = {'id': (hotel_number - 1) * reservations + number,
+                           'customer_id': customer['customer_id'],
+                           'customer_name': customer['customer_name'],
+                           'room_type': generator.choice(ROOM_TYPES),
+                           'date': check_in.isoformat(),
+                           'booked': (check_in - datetime.timedelta(
+                               days=generator.randint(
+                                   0, MAX_LEAD_DAYS))).isoformat()}
+            if number % 2:
+                reservation['check_out'] = (check_in + datetime.timedelta(
+                    days=generator.randint(1, 7))).isoformat()
+            hotel['reservations'].append(reservation)
+        hotels_data.append(hotel)
+    return hotels_data
+
+
+def add_arguments(parser):
+    """
+    Adds the options sizing and seeding the generated data to a command line
+    parser.
+
+    Parameters:
+    - parser: The argparse.ArgumentParser of the benchmark.
+    """
+    parser.add_argument('--hotels', type=int, default=100)
+    parser.add_argument('--customers', type=int, default=50)
+    parser.add_argument('--reservations', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
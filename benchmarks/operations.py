@@ -0,0 +1,500 @@
+"""
+Benchmark of the public operations of Hotel, Customer and Reservation.
+
+Every scenario times one method, or a mix of reads and writes, against a
+data file filled with generated hotel data. Each scenario runs with a cold
+cache, dropped before every call so each call reads the file, and with a
+warm cache, loaded once before the timed calls. The data file is restored
+before each run, and the arguments of the calls are drawn from a seeded
+generator, so two runs with the same options make the same calls. Run it
+with:
+
+    python -m benchmarks.operations --hotels 1000 --output run.json
+
+and compare a later run against a stored one with --baseline run.json; the
+command exits with status 1 if a scenario got slower than the tolerance
+allows.
+
+Libraries:
+- argparse: Provides the command line options.
+- copy: Provides the copies of the generated data restored before runs.
+- datetime: Provides the dates of the stays.
+- json: Provides the JSON reports.
+- os: Provides the path of the data file.
+- platform: Provides the Python version recorded in the reports.
+- random: Provides the seeded random number generator.
+- sys: Provides the error stream and the exit status.
+- tempfile: Provides the directory holding the data file.
+- time: Provides the clock timing the calls.
+- benchmarks.data_generator: Provides the generated hotel data and its
+options.
+- categories: Provides the Hotel, Customer and Reservation classes.
+
+Classes:
+- Workload: Draws the arguments of the calls from the generated data.
+
+Functions:
+- measure: Times the calls of one scenario.
+- run: Times every selected scenario with cold and warm caches.
+- compare: Returns the scenarios slower than in a baseline report.
+- main: Runs the benchmark from the command line.
+"""
+import argparse
+import copy
+import datetime
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from benchmarks.data_generator import (FIRST_DATE, ROOM_TYPES, add_arguments,
+                                       generate_hotels)
+from categories.customer import Customer
+from categories.hotel import Hotel
+from categories.reservation import Reservation
+
+# Extension of the data file of each backend
+EXTENSIONS = {'json': '.json', 'sqlite': '.db', 'sharded': '.shards'}
+# Number of items of the batch scenarios
+BATCH_SIZE = 10
+# Cache states the scenarios run with
+CACHES = ('cold', 'warm')
+
+
+class Workload:
+    """
+    A class to draw the arguments of the calls from the generated data.
+
+    Removals draw each hotel, customer or reservation once, so every call
+    removes something for as long as the data lasts.
+
+    Attributes:
+    - random (Random): The seeded random number generator.
+    - hotel (Hotel): The Hotel object of the data file.
+    - customer (Customer): The Customer object of the data file.
+    - reservation (Reservation): The Reservation object of the data file.
+
+    Methods:
+    - hotel_name: Returns the name of a random hotel.
+    - customer_name: Returns a random (hotel, customer) pair.
+    - reservation_id: Returns the ID of a random reservation.
+    - pop_hotel / pop_customer / pop_reservation / pop_reservation_id:
+    Return a hotel, customer or reservation not drawn before.
+    - new_name: Returns a name not used before.
+    - stay: Returns random check-in and check-out dates.
+    """
+    def __init__(self, filename: str, backend: str, data: list, seed: int):
+        """
+        Initializes a Workload object for a data file.
+
+        Parameters:
+        - filename: The filename of the data file.
+        - backend: The name of the storage backend.
+        - data: The hotel data stored in the file.
+        - seed: The seed of the random number generator.
+        """
+        self.random = random.Random(seed)
+        self.hotel = Hotel(filename, backend)
+        self.customer = Customer(filename, backend)
+        self.reservation = Reservation(filename, backend)
+        # Hotels, customers and reservations of the data, by kind
+        self._items = {
+            'hotels': [hotel['name'] for hotel in data],
+            'customers': [(hotel['name'], customer['customer_name'])
+                          for hotel in data
+                          for customer in hotel['customers']],
+            'reservations': [(hotel['name'], reservation['customer_name'])
+                             for hotel in data
+                             for reservation in hotel['reservations']],
+            'reservation_ids': [reservation['id'] for hotel in data
+                                for reservation in hotel['reservations']]}
+        # Items not drawn yet by the removals, in random order
+        self._unused = {kind: self.random.sample(items, len(items))
+                        for kind, items in self._items.items()}
+        self._names = 0
+
+    def hotel_name(self):
+        """
+        Returns the name of a random hotel.
+
+        Returns:
+        The hotel name.
+        """
+        return self.random.choice(self._items['hotels'])
+
+    def customer_name(self):
+        """
+        Returns a random customer of a random hotel.
+
+        Returns:
+        A (hotel_name, customer_name) tuple.
+        """
+        return self.random.choice(self._items['customers'])
+
+    def reservation_id(self):
+        """
+        Returns the ID of a random reservation.
+
+        Returns:
+        The reservation ID, 0 if there are no reservations.
+        """
+        return self.random.choice(self._items['reservation_ids'] or [0])
+
+    def _pop(self, kind: str, fallback):
+        """
+        Returns an item not drawn before, or a fallback once every item was
+        drawn.
+
+        Parameters:
+        - kind: The kind of item, 'hotels', 'customers', 'reservations' or
+        'reservation_ids'.
+        - fallback: The function returning the fallback item.
+
+        Returns:
+        The item.
+        """
+        unused = self._unused[kind]
+        return unused.pop() if unused else fallback()
+
+    def pop_hotel(self):
+        """
+        Returns the name of a hotel not drawn before.
+
+        Returns:
+        The hotel name.
+        """
+        return self._pop('hotels', self.hotel_name)
+
+    def pop_customer(self):
+        """
+        Returns a customer not drawn before.
+
+        Returns:
+        A (hotel_name, customer_name) tuple.
+        """
+        return self._pop('customers', self.customer_name)
+
+    def pop_reservation(self):
+        """
+        Returns a reservation not drawn before.
+
+        Returns:
+        A (hotel_name, customer_name) tuple.
+        """
+        return self._pop('reservations', self.customer_name)
+
+    def pop_reservation_id(self):
+        """
+        Returns the ID of a reservation not drawn before.
+
+        Returns:
+        The reservation ID.
+        """
+        return self._pop('reservation_ids', self.reservation_id)
+
+    def new_name(self, prefix: str):
+        """
+        Returns a name not used before.
+
+        Parameters:
+        - prefix: The prefix of the name.
+
+        Returns:
+        The name.
+        """
+        self._names += 1
+        return f'{prefix} {self._names}'
+
+    def stay(self):
+        """
+        Returns the dates and room type of a random stay.
+
+        Returns:
+        A (check_in, check_out, room_type) tuple.
+        """
+        check_in = FIRST_DATE + datetime.timedelta(
+            days=self.random.randrange(365))
+        check_out = check_in + datetime.timedelta(
+            days=self.random.randint(1, 7))
+        return (check_in.isoformat(), check_out.isoformat(),
+                self.random.choice(ROOM_TYPES))
+
+
+def _reserve(workload: Workload):
+    """
+    Reserves a stay for a random customer through Hotel.reserve_room.
+
+    Parameters:
+    - workload: The workload drawing the arguments.
+
+    Returns:
+    The result of the call.
+    """
+    hotel_name, customer_name = workload.customer_name()
+    check_in, check_out, room_type = workload.stay()
+    return workload.hotel.reserve_room(hotel_name, customer_name, check_in,
+                                       room_type, check_out)
+
+
+def _create_reservation(workload: Workload):
+    """
+    Creates a stay for a random customer through Reservation.
+
+    Parameters:
+    - workload: The workload drawing the arguments.
+
+    Returns:
+    The result of the call.
+    """
+    hotel_name, customer_name = workload.customer_name()
+    check_in, check_out, room_type = workload.stay()
+    return workload.reservation.create_reservation(
+        hotel_name, customer_name, check_in, room_type, check_out)
+
+
+def _mix(reads: float):
+    """
+    Returns a scenario mixing hotel displays and reservations.
+
+    Parameters:
+    - reads: The share of the calls that are displays.
+
+    Returns:
+    The scenario function.
+    """
+    def scenario(workload: Workload):
+        if workload.random.random() < reads:
+            return workload.hotel.display_hotel_info(workload.hotel_name())
+        return _reserve(workload)
+    return scenario
+
+
+# Scenarios by name: whether they write, and the function making one call
+SCENARIOS = {
+    'hotel.create_hotel': ('write', lambda workload: workload.hotel
+                           .create_hotel(workload.new_name('New Hotel'),
+                                         'City 0', {'single': 10})),
+    'hotel.get_customer_id': ('read', lambda workload: workload.hotel
+                              .get_customer_id(*workload.customer_name())),
+    'hotel.delete_hotel': ('write', lambda workload: workload.hotel
+                           .delete_hotel(workload.pop_hotel())),
+    'hotel.display_hotel_info': ('read', lambda workload: workload.hotel
+                                 .display_hotel_info(workload.hotel_name())),
+    'hotel.modify_hotel_info': ('write', lambda workload: workload.hotel
+                                .modify_hotel_info(
+                                    workload.hotel_name(),
+                                    new_location=workload.new_name('City'))),
+    'hotel.reserve_room': ('write', _reserve),
+    'hotel.cancel_reservation': ('write', lambda workload: workload.hotel
+                                 .cancel_reservation(
+                                     *workload.pop_reservation())),
+    'hotel.room_availability': ('read', lambda workload: workload.hotel
+                                .room_availability(workload.hotel_name(),
+                                                   *workload.stay())),
+    'hotel.search_availability': ('read', lambda workload: workload.hotel
+                                  .search_availability(*workload.stay())),
+    'customer.create_customer': ('write', lambda workload: workload.customer
+                                 .create_customer(workload.hotel_name(),
+                                                  workload.new_name('Guest'))),
+    'customer.delete_customer': ('write', lambda workload: workload.customer
+                                 .delete_customer(*workload.pop_customer())),
+    'customer.display_customer_info': ('read', lambda workload: workload
+                                       .customer.display_customer_info(
+                                           *workload.customer_name())),
+    'customer.modify_customer_info': ('write', lambda workload: workload
+                                      .customer.modify_customer_info(
+                                          *workload.pop_customer(),
+                                          workload.new_name('Guest'))),
+    'customer.create_customers': ('write', lambda workload: workload.customer
+                                  .create_customers(
+                                      [(workload.hotel_name(),
+                                        workload.new_name('Guest'))
+                                       for _ in range(BATCH_SIZE)])),
+    'reservation.create_reservation': ('write', _create_reservation),
+    'reservation.cancel_reservation': ('write', lambda workload: workload
+                                       .reservation.cancel_reservation(
+                                           *workload.pop_reservation())),
+    'reservation.get_reservation': ('read', lambda workload: workload
+                                    .reservation.get_reservation(
+                                        workload.reservation_id())),
+    'reservation.cancel_reservation_by_id': ('write', lambda workload:
+                                             workload.reservation
+                                             .cancel_reservation_by_id(
+                                                 workload
+                                                 .pop_reservation_id())),
+    'reservation.create_reservations': ('write', lambda workload: workload
+                                        .reservation.create_reservations(
+                                            [workload.customer_name()
+                                             + (workload.stay()[0],)
+                                             for _ in range(BATCH_SIZE)])),
+    'reservation.cancel_reservations': ('write', lambda workload: workload
+                                        .reservation.cancel_reservations(
+                                            [workload.pop_reservation()
+                                             for _ in range(BATCH_SIZE)])),
+    'mix.read_heavy': ('mix', _mix(0.9)),
+    'mix.write_heavy': ('mix', _mix(0.5)),
+}
+
+
+def measure(workload: Workload, scenario: str, cache: str, calls: int):
+    """
+    Times the calls of one scenario.
+
+    Parameters:
+    - workload: The workload of a freshly restored data file.
+    - scenario: The name of the scenario, one of SCENARIOS.
+    - cache: 'cold' to drop the cache before every call, 'warm' to load it
+    once before the timed calls.
+    - calls: The number of timed calls.
+
+    Returns:
+    A dictionary with the scenario, its kind, the cache state, the number
+    of calls and their mean, median, 95th percentile and slowest times in
+    microseconds.
+    """
+    kind, call = SCENARIOS[scenario]
+    store = workload.hotel.store
+    store.load()
+    times = []
+    for _ in range(calls):
+        if cache == 'cold':
+            store.invalidate()
+        start = time.perf_counter()
+        call(workload)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return {'scenario': scenario, 'kind': kind, 'cache': cache,
+            'calls': calls,
+            'mean_us': round(sum(times) / calls * 1e6, 1),
+            'p50_us': round(times[calls // 2] * 1e6, 1),
+            'p95_us': round(times[min(calls - 1, calls * 95 // 100)] * 1e6,
+                            1),
+            'max_us': round(times[-1] * 1e6, 1)}
+
+
+def run(data: list, *, scenarios: list = None, caches: tuple = CACHES,
+        calls: int = 50, backend: str = 'json', seed: int = 0):
+    # pylint: disable=too-many-arguments
+    """
+    Times every selected scenario with the selected cache states.
+
+    Parameters:
+    - data: The hotel data to store before each run.
+    - scenarios: The names of the scenarios, defaults to every scenario.
+    - caches: The cache states, 'cold' and/or 'warm'.
+    - calls: The number of timed calls of each run.
+    - backend: The name of the storage backend.
+    - seed: The seed drawing the arguments of the calls.
+
+    Returns:
+    The list of measurements, in scenario order.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'hotels' + EXTENSIONS[backend])
+        hotel = Hotel(filename, backend)
+        for scenario in scenarios or SCENARIOS:
+            for cache in caches:
+                hotel.save_data(copy.deepcopy(data))
+                results.append(measure(Workload(filename, backend, data,
+                                                seed),
+                                       scenario, cache, calls))
+        hotel.store.invalidate()
+    return results
+
+
+def compare(results: list, baseline: list, tolerance: float = 0.25):
+    """
+    Returns the scenarios slower than in a baseline report.
+
+    Parameters:
+    - results: The measurements of the current run.
+    - baseline: The measurements of the baseline run.
+    - tolerance: The share by which a mean time may exceed the baseline.
+
+    Returns:
+    A list of dictionaries with the scenario, the cache state, the baseline
+    and current mean times and their ratio, for every regression.
+    """
+    expected = {(result['scenario'], result['cache']): result['mean_us']
+                for result in baseline}
+    regressions = []
+    for result in results:
+        reference = expected.get((result['scenario'], result['cache']))
+        if reference and result['mean_us'] > reference * (1 + tolerance):
+            regressions.append({'scenario': result['scenario'],
+                                'cache': result['cache'],
+                                'baseline_us': reference,
+                                'mean_us': result['mean_us'],
+                                'ratio': round(result['mean_us'] / reference,
+                                               2)})
+    return regressions
+
+
+def main(arguments: list = None):
+    """
+    Runs the benchmark from the command line and prints the results.
+
+    Parameters:
+    - arguments: The command line arguments, defaults to sys.argv.
+
+    Returns:
+    The exit status, 1 if a scenario regressed against the baseline.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    add_arguments(parser)
+    parser.add_argument('--calls', type=int, default=50)
+    parser.add_argument('--backend', choices=EXTENSIONS, default='json')
+    parser.add_argument('--cache', choices=CACHES + ('both',),
+                        default='both')
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS,
+                        help='run this scenario, may be repeated')
+    parser.add_argument('--output', help='write the JSON report to a file')
+    parser.add_argument('--baseline', help='compare with a JSON report')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--json', action='store_true',
+                        help='print the report as JSON')
+    options = parser.parse_args(arguments)
+    data = generate_hotels(options.hotels, options.customers,
+                           options.reservations, options.seed)
+    parameters = {key: getattr(options, key)
+                  for key in ('hotels', 'customers', 'reservations', 'seed',
+                              'calls', 'backend')}
+    parameters['python'] = platform.python_version()
+    report = {'parameters': parameters,
+              'results': run(data, scenarios=options.scenario,
+                             caches=CACHES if options.cache == 'both'
+                             else (options.cache,),
+                             calls=options.calls, backend=options.backend,
+                             seed=options.seed)}
+    if options.baseline:
+        with open(options.baseline, 'r', encoding='UTF-8') as file:
+            baseline = json.load(file)
+        if baseline['parameters'] != parameters:
+            print('The baseline was run with other parameters',
+                  file=sys.stderr)
+        report['regressions'] = compare(report['results'],
+                                        baseline['results'],
+                                        options.tolerance)
+    if options.output:
+        with open(options.output, 'w', encoding='UTF-8') as file:
+            json.dump(report, file, indent=4)
+    if options.json:
+        print(json.dumps(report, indent=4))
+    else:
+        print(f'{"scenario":<34} {"cache":<6} {"mean us":>10} '
+              f'{"p95 us":>10}')
+        for result in report['results']:
+            print(f'{result["scenario"]:<34} {result["cache"]:<6} '
+                  f'{result["mean_us"]:>10.1f} {result["p95_us"]:>10.1f}')
+        for regression in report.get('regressions', ()):
+            print(f'REGRESSION {regression["scenario"]} '
+                  f'({regression["cache"]}): {regression["ratio"]}x the '
+                  f'baseline', file=sys.stderr)
+    return 1 if report.get('regressions') else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Benchmark of the serializers of the data files.
+
+Encodes and decodes the same generated hotel data with every available
+serializer and reports the best dump time, the best parse time and the
+encoded size of each. Run it with:
+
+    python -m benchmarks.serializers --hotels 1000
+
+Libraries:
+- argparse: Provides the command line options.
+- json: Provides the JSON output of the results.
+- time: Provides the clock timing the serializers.
+- benchmarks.data_generator: Provides the generated hotel data and its
+options.
+- utilities.serializers: Provides the serializers to measure.
+
+Functions:
+- measure: Measures one serializer.
+- run: Measures every available serializer.
+- main: Runs the benchmark from the command line.
+"""
+import argparse
+import json
+import time
+from benchmarks.data_generator import add_arguments, generate_hotels
+from utilities.serializers import SERIALIZERS, get_serializer
+
+
+def measure(serializer, data: list, repeat: int = 5):
+    """
+    Measures the dump time, parse time and encoded size of a serializer.
+
+    Parameters:
+    - serializer: The Serializer object to measure.
+    - data: The hotel data to encode.
+    - repeat: The number of runs, the best one is kept.
+
+    Returns:
+    A dictionary with the name of the serializer, its best dump and parse
+    times in milliseconds and the encoded size in bytes.
+    """
+    dump_times = []
+    parse_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        contents = serializer.dumps(data)
+        dump_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        serializer.loads(contents)
+        parse_times.append(time.perf_counter() - start)
+    return {'serializer': serializer.name,
+            'dump_ms': round(min(dump_times) * 1000, 3),
+            'parse_ms': round(min(parse_times) * 1000, 3),
+            'bytes': len(contents)}
+
+
+def run(data: list, repeat: int = 5):
+    """
+    Measures every serializer whose library is installed.
+
+    Parameters:
+    - data: The hotel data to encode.
+    - repeat: The number of runs of each serializer.
+
+    Returns:
+    The list of measurements, in the order of SERIALIZERS.
+    """
+    results = []
+    for name in SERIALIZERS:
+        try:
+            serializer = get_serializer(name)
+        except ValueError:
+            # Skip the serializers whose library is missing
+            continue
+        results.append(measure(serializer, data, repeat))
+    return results
+
+
+def main(arguments: list = None):
+    """
+    Runs the benchmark from the command line and prints the results.
+
+    Parameters:
+    - arguments: The command line arguments, defaults to sys.argv.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    add_arguments(parser)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', action='store_true',
+                        help='print the results as JSON')
+    options = parser.parse_args(arguments)
+    data = generate_hotels(options.hotels, options.customers,
+                           options.reservations, options.seed)
+    results = run(data, options.repeat)
+    if options.json:
+        print(json.dumps(results, indent=4))
+        return
+    print(f'{"serializer":<12} {"dump ms":>10} {"parse ms":>10} '
+          f'{"bytes":>12}')
+    for result in results:
+        print(f'{result["serializer"]:<12} {result["dump_ms"]:>10.3f} '
+              f'{result["parse_ms"]:>10.3f} {result["bytes"]:>12}')
+
+
+if __name__ == '__main__':
+    main()
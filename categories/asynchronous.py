@@ -0,0 +1,239 @@
+"""
+Module for calling the hotel, customer and reservation operations from
+asyncio code.
+
+AsyncHotel, AsyncCustomer and AsyncReservation wrap Hotel, Customer and
+Reservation with coroutine versions of their methods. Every call runs in a
+bounded thread pool, so file I/O and JSON parsing never block the event loop,
+and the calls on the same file are serialized by the lock of its DataStore as
+the calls of threads are.
+
+Read-only operations started while nothing is cached first await a load of
+the whole file shared by every read pending on it, so a burst of readers
+parses the file once and holds one worker of the pool instead of one each.
+
+Libraries:
+- asyncio: Provides the event loop running the calls in the pool.
+- concurrent.futures: Provides the thread pool running the blocking calls.
+- functools: Provides the wrapping of the synchronous methods.
+- os: Provides the environment setting the size of the pool.
+- threading: Provides the lock guarding the creation of the pool.
+- categories.customer: Provides the Customer class.
+- categories.hotel: Provides the Hotel class.
+- categories.reservation: Provides the Reservation class.
+- utilities.json_data_handler: Provides the JSONDataHandler storage
+interface.
+
+Classes:
+- AsyncHotel: Coroutine versions of the Hotel methods.
+- AsyncCustomer: Coroutine versions of the Customer methods.
+- AsyncReservation: Coroutine versions of the Reservation methods.
+
+Functions:
+- default_executor: Returns the thread pool shared by the async objects.
+"""
+import asyncio
+import concurrent.futures
+import functools
+import os
+import threading
+from categories.customer import Customer
+from categories.hotel import Hotel
+from categories.reservation import Reservation
+from utilities.json_data_handler import JSONDataHandler
+
+# Environment variable setting the number of workers of the default pool
+WORKERS_VARIABLE = 'HOTELS_ASYNC_WORKERS'
+# Number of workers of the default pool without the environment variable
+DEFAULT_WORKERS = 4
+
+# Thread pool shared by the async objects, created on first use
+_EXECUTOR = None
+# Lock guarding the creation of the pool
+_EXECUTOR_LOCK = threading.Lock()
+# Loads in flight, keyed by event loop and data store
+_LOADS = {}
+
+
+def default_executor():
+    """
+    Returns the thread pool shared by the async objects created without an
+    executor, creating it on first use.
+
+    The pool has HOTELS_ASYNC_WORKERS workers, 4 by default.
+
+    Returns:
+    The shared ThreadPoolExecutor.
+    """
+    global _EXECUTOR  # pylint: disable=global-statement
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            workers = int(os.environ.get(WORKERS_VARIABLE, DEFAULT_WORKERS))
+            _EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix='hotels')
+        return _EXECUTOR
+
+
+def _coroutine(method, reads: bool = False):
+    """
+    Returns a coroutine version of a method of the wrapped object, running
+    it in the pool of the async object.
+
+    Parameters:
+    - method: The synchronous method.
+    - reads: Whether the method is read-only, so its load can be shared
+    with the other pending reads.
+
+    Returns:
+    The coroutine function, with the name, signature and docstring of the
+    method.
+    """
+    name = method.__name__
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        if reads:
+            await self.warm()
+        return await self.run(getattr(self.handler, name), *args, **kwargs)
+    return wrapper
+
+
+class AsyncHandler:
+    """
+    A class for calling the methods of a JSONDataHandler from asyncio code.
+
+    Attributes:
+    - handler (JSONDataHandler): The wrapped synchronous object.
+    - filename (str): The filename of the hotel data.
+    - store (DataStore): The store shared by every object using the file.
+    - executor (Executor): The pool running the blocking calls.
+
+    Methods:
+    - run: Runs a blocking callable in the pool.
+    - warm: Loads the data of a cold store, once for every pending read.
+    - load_data / save_data / run_batch: Coroutine versions of the
+    JSONDataHandler methods. Transactions hold thread locks and cannot span
+    awaits; run_batch groups calls into one unit of work instead.
+    """
+    # The synchronous class wrapped
+    handler_class = JSONDataHandler
+
+    def __init__(self, filename: str = 'hotels.json', backend: str = None,
+                 serializer: str = None, executor=None):
+        """
+        Initializes an async object wrapping a new synchronous object.
+
+        Parameters:
+        - filename: The filename of the hotel data. Defaults to
+        'hotels.json'.
+        - backend: The name of the storage backend, as for the synchronous
+        class.
+        - serializer: The name of the serializer, as for the synchronous
+        class.
+        - executor: The pool running the blocking calls. Defaults to the
+        shared pool of default_executor.
+        """
+        self.handler = self.handler_class(filename, backend, serializer)
+        self.filename = self.handler.filename
+        self.store = self.handler.store
+        self.executor = executor or default_executor()
+
+    async def run(self, function, *args, **kwargs):
+        """
+        Runs a blocking callable in the pool.
+
+        Parameters:
+        - function: The callable.
+        - args: Its positional arguments.
+        - kwargs: Its keyword arguments.
+
+        Returns:
+        The result of the callable.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(function, *args, **kwargs))
+
+    async def warm(self):
+        """
+        Loads the data of the store if nothing is cached. Concurrent calls
+        on the same store and event loop await the same load.
+        """
+        # A cached store is validated by the call itself
+        if self.store.data is not None:
+            return
+        loop = asyncio.get_running_loop()
+        key = (loop, self.store)
+        load = _LOADS.get(key)
+        if load is None:
+            load = loop.run_in_executor(
+                self.executor,
+                functools.partial(self.store.load, missing_ok=True))
+            _LOADS[key] = load
+            load.add_done_callback(lambda _: _LOADS.pop(key, None))
+        # A cancelled reader must not cancel the load of the others
+        await asyncio.shield(load)
+
+    load_data = _coroutine(JSONDataHandler.load_data)
+    save_data = _coroutine(JSONDataHandler.save_data)
+    run_batch = _coroutine(JSONDataHandler.run_batch)
+
+
+class AsyncHotel(AsyncHandler):
+    """
+    A class with coroutine versions of the Hotel methods.
+
+    Methods:
+    - create_hotel / get_customer_id / delete_hotel / display_hotel_info /
+    modify_hotel_info / reserve_room / cancel_reservation /
+    room_availability / search_availability: See Hotel.
+    """
+    handler_class = Hotel
+
+    create_hotel = _coroutine(Hotel.create_hotel)
+    get_customer_id = _coroutine(Hotel.get_customer_id)
+    delete_hotel = _coroutine(Hotel.delete_hotel)
+    display_hotel_info = _coroutine(Hotel.display_hotel_info, reads=True)
+    modify_hotel_info = _coroutine(Hotel.modify_hotel_info)
+    reserve_room = _coroutine(Hotel.reserve_room)
+    cancel_reservation = _coroutine(Hotel.cancel_reservation)
+    room_availability = _coroutine(Hotel.room_availability, reads=True)
+    search_availability = _coroutine(Hotel.search_availability, reads=True)
+
+
+class AsyncCustomer(AsyncHandler):
+    """
+    A class with coroutine versions of the Customer methods.
+
+    Methods:
+    - create_customer / delete_customer / display_customer_info /
+    modify_customer_info / create_customers: See Customer.
+    """
+    handler_class = Customer
+
+    create_customer = _coroutine(Customer.create_customer)
+    delete_customer = _coroutine(Customer.delete_customer)
+    display_customer_info = _coroutine(Customer.display_customer_info,
+                                       reads=True)
+    modify_customer_info = _coroutine(Customer.modify_customer_info)
+    create_customers = _coroutine(Customer.create_customers)
+
+
+class AsyncReservation(AsyncHandler):
+    """
+    A class with coroutine versions of the Reservation methods.
+
+    Methods:
+    - create_reservation / cancel_reservation / get_reservation /
+    cancel_reservation_by_id / create_reservations / cancel_reservations:
+    See Reservation.
+    """
+    handler_class = Reservation
+
+    create_reservation = _coroutine(Reservation.create_reservation)
+    cancel_reservation = _coroutine(Reservation.cancel_reservation)
+    get_reservation = _coroutine(Reservation.get_reservation, reads=True)
+    cancel_reservation_by_id = _coroutine(
+        Reservation.cancel_reservation_by_id)
+    create_reservations = _coroutine(Reservation.create_reservations)
+    cancel_reservations = _coroutine(Reservation.cancel_reservations)
@@ -0,0 +1,517 @@
+"""
+Module for the streaming bulk import and export of a data file.
+
+Creating thousands of hotels with create_hotel, create_customer and
+reserve_room loads and writes the data file once per row. Bulk reads the
+rows of a CSV or JSON Lines file in chunks, validates each one and applies
+the valid ones through the mutation methods of the DataStore, so its index,
+tables and aggregates stay in sync:
+- with an incremental backend (SQLite, sharded or journal mode) each chunk
+is committed as one write of its operations;
+- otherwise the whole import is one transaction, with one load and one
+rewrite of the data file.
+Either way the I/O grows linearly with the rows, and only one chunk of the
+input is held in memory. The export writes the rows of each hotel as it
+goes, without building them first.
+
+A file holds one kind of row:
+- hotels: hotel_id (optional), name, location and rooms, an object from
+each room type to its free rooms (JSON text in a CSV file);
+- customers: hotel, customer_id and customer_name;
+- reservations: hotel, id, customer_id, customer_name, room_type, date,
+booked (optional) and check_out (optional).
+
+The store allocates the IDs of the imported customers and reservations, so
+the customer_id and id fields are only exported. Reservations are linked
+to the customers of their hotel by name, and a missing customer is created,
+as reserve_room does. Reservations are imported as recorded: they are not
+checked against availability and leave the room counts of the hotel rows,
+the free rooms as stored, unchanged. A row that fails validation is skipped
+and reported with its line number. Run it with:
+
+    python -m categories.bulk import hotels hotels.csv hotels.json
+    python -m categories.bulk export reservations reservations.jsonl \\
+        hotels.json
+
+Libraries:
+- argparse: Provides the command line options.
+- contextlib: Provides the empty context of the chunked imports.
+- csv: Provides the CSV files.
+- datetime: Provides the validation of the dates.
+- itertools: Provides the chunks of rows.
+- json: Provides the JSON Lines files and the rooms of the CSV files.
+- utilities.data_store: Provides the transactional decorator running each
+export as one unit of work.
+- utilities.instrumentation: Provides the opt-in recording of the calls.
+- utilities.inventory: Provides the validation of the stays.
+- utilities.json_data_handler: Provides the JSONDataHandler storage
+interface.
+
+Classes:
+- Bulk: The bulk import and export of a data file.
+
+Functions:
+- read_rows: Yields the rows of a CSV or JSON Lines file.
+- main: Imports or exports a file from the command line.
+"""
+import argparse
+import contextlib
+import csv
+import datetime
+import itertools
+import json
+from utilities.data_store import transactional
+from utilities.instrumentation import instrument
+from utilities.inventory import stay_nights
+from utilities.json_data_handler import JSONDataHandler
+
+# Fields of each kind of row, in file order
+FIELDS = {'hotels': ('hotel_id', 'name', 'location', 'rooms'),
+          'customers': ('hotel', 'customer_id', 'customer_name'),
+          'reservations': ('hotel', 'id', 'customer_id', 'customer_name',
+                           'room_type', 'date', 'booked', 'check_out')}
+# Extensions of the CSV and JSON Lines files
+FORMATS = ('.csv', '.jsonl')
+# Rows applied per chunk by default
+CHUNK_SIZE = 1000
+# Errors reported at most by an import
+MAX_ERRORS = 100
+
+
+def _format(filename: str):
+    """
+    Returns the format of a file from its extension.
+
+    Parameters:
+    - filename: The name of the file.
+
+    Returns:
+    '.csv' or '.jsonl'.
+
+    Raises:
+    ValueError: If the extension is not .csv or .jsonl.
+    """
+    for extension in FORMATS:
+        if filename.endswith(extension):
+            return extension
+    raise ValueError(f'Cannot import or export {filename}')
+
+
+def _check_kind(kind: str):
+    """
+    Checks the kind of rows of a file.
+
+    Parameters:
+    - kind: The kind of rows.
+
+    Raises:
+    ValueError: If the kind is not one of FIELDS.
+    """
+    if kind not in FIELDS:
+        raise ValueError(f'Unknown kind of rows {kind}')
+
+
+def read_rows(file, extension: str):
+    """
+    Yields the rows of a CSV or JSON Lines file one at a time.
+
+    The empty cells of a CSV file are left out of its rows, and a JSON line
+    that cannot be decoded is yielded as None.
+
+    Parameters:
+    - file: The file, opened in text mode with newline=''.
+    - extension: The format of the file, '.csv' or '.jsonl'.
+
+    Returns:
+    A generator of (line number, row) tuples.
+    """
+    if extension == '.csv':
+        reader = csv.DictReader(file)
+        for row in reader:
+            yield reader.line_num, {field: value for field, value
+                                    in row.items()
+                                    if field is not None and value}
+        return
+    for number, line in enumerate(file, 1):
+        if line.strip():
+            try:
+                yield number, json.loads(line)
+            except ValueError:
+                yield number, None
+
+
+def _row_writer(file, extension: str, fields: tuple):
+    """
+    Returns a function writing a row to a CSV or JSON Lines file, after
+    writing the header of a CSV file.
+
+    Parameters:
+    - file: The file, opened in text mode with newline=''.
+    - extension: The format of the file, '.csv' or '.jsonl'.
+    - fields: The fields of the rows.
+
+    Returns:
+    A function taking a row, a dictionary with some of the fields.
+    """
+    if extension == '.jsonl':
+        return lambda row: file.write(json.dumps(row) + '\n')
+    writer = csv.DictWriter(file, fieldnames=fields)
+    writer.writeheader()
+    return lambda row: writer.writerow({
+        field: json.dumps(value) if isinstance(value, dict) else value
+        for field, value in row.items()})
+
+
+def _export_rows(data: list, kind: str):
+    """
+    Yields the rows of a kind for every hotel, in file order.
+
+    Parameters:
+    - data: The hotel data.
+    - kind: The kind of rows, one of FIELDS.
+
+    Returns:
+    A generator of rows, dictionaries without the missing fields.
+    """
+    fields = FIELDS[kind]
+    for hotel in data:
+        if kind == 'hotels':
+            records = (hotel,)
+        else:
+            records = hotel[kind]
+        for record in records:
+            row = {field: record.get(field) for field in fields}
+            if kind != 'hotels':
+                row['hotel'] = hotel['name']
+            yield {field: value for field, value in row.items()
+                   if value is not None}
+
+
+def _text(row: dict, field: str):
+    """
+    Returns a required text field of a row.
+
+    Parameters:
+    - row: The row.
+    - field: The name of the field.
+
+    Returns:
+    The text.
+
+    Raises:
+    ValueError: If the field is missing or blank.
+    """
+    value = row.get(field)
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f'Missing {field}')
+    return value
+
+
+def _date(row: dict, field: str):
+    """
+    Returns an optional date field of a row.
+
+    Parameters:
+    - row: The row.
+    - field: The name of the field.
+
+    Returns:
+    The date (YYYY-MM-DD), None if the field is missing.
+
+    Raises:
+    ValueError: If the field is not a date.
+    """
+    value = row.get(field)
+    if value is not None:
+        try:
+            datetime.date.fromisoformat(value)
+        except (TypeError, ValueError) as error:
+            raise ValueError(f'Invalid {field}') from error
+    return value
+
+
+def _is_count(value):
+    """
+    Tells whether a value is a count, a non-negative integer.
+
+    Parameters:
+    - value: The value.
+
+    Returns:
+    True if the value is a count, otherwise False.
+    """
+    return isinstance(value, int) and not isinstance(value, bool) \
+        and value >= 0
+
+
+def _rooms(row: dict):
+    """
+    Returns the rooms of a hotel row.
+
+    Parameters:
+    - row: The row.
+
+    Returns:
+    A dictionary from each room type to its free rooms.
+
+    Raises:
+    ValueError: If the rooms are not counts of rooms per room type.
+    """
+    rooms = row.get('rooms')
+    if isinstance(rooms, str):
+        with contextlib.suppress(ValueError):
+            rooms = json.loads(rooms)
+    if not isinstance(rooms, dict) or not all(
+            _is_count(count) for count in rooms.values()):
+        raise ValueError('Invalid rooms')
+    return rooms
+
+
+@instrument
+class Bulk(JSONDataHandler):
+    """
+    A class to import and export the hotels, customers and reservations of
+    a data file in bulk.
+
+    Attributes:
+    - filename (str): The filename for storing hotel data.
+    - store (DataStore): The store shared by every object using the file.
+
+    Methods:
+    - import_file: Imports the rows of a CSV or JSON Lines file.
+    - export_file: Exports the rows of a kind to a CSV or JSON Lines file.
+    """
+    def import_file(self, kind: str, filename: str,
+                    chunk_size: int = CHUNK_SIZE):
+        """
+        Imports the rows of a CSV or JSON Lines file, reading and applying
+        them a chunk at a time.
+
+        Parameters:
+        - kind: The kind of rows, 'hotels', 'customers' or 'reservations'.
+        - filename: The name of the file, ending with .csv or .jsonl.
+        - chunk_size: The number of rows read and applied at a time.
+
+        Returns:
+        A dictionary with the number of rows imported and rejected and the
+        first MAX_ERRORS errors, each a (line number, message) tuple, or a
+        message if customers or reservations are imported without a data
+        file.
+
+        Raises:
+        ValueError: If the kind or the extension is unknown.
+        """
+        _check_kind(kind)
+        importer = getattr(self, '_import_' + kind.rstrip('s'))
+        result = {'imported': 0, 'rejected': 0, 'errors': []}
+        # An incremental backend writes each chunk as its operations,
+        # others rewrite the whole file once
+        whole = (contextlib.nullcontext() if self.store.backend.incremental
+                 else self.store.transaction())
+        extension = _format(filename)
+        with open(filename, 'r', encoding='UTF-8', newline='') as file:
+            rows = read_rows(file, extension)
+            with whole:
+                while chunk := list(itertools.islice(rows, chunk_size)):
+                    with self.store.transaction():
+                        data = self.store.load(missing_ok=True,
+                                               create=kind == 'hotels')
+                        if data is None:
+                            return ('Hotel information not found, please '
+                                    'verify')
+                        for number, row in chunk:
+                            self._import_row(importer, number, row, result)
+                        self.store.save(data)
+        return result
+
+    @staticmethod
+    def _import_row(importer, number: int, row, result: dict):
+        """
+        Imports a row, or records why it was rejected.
+
+        Parameters:
+        - importer: The method validating and adding a row of the kind.
+        - number: The line number of the row.
+        - row: The decoded row, None if it could not be decoded.
+        - result: The counts and errors of the import, updated in place.
+        """
+        try:
+            if not isinstance(row, dict):
+                raise ValueError('Invalid row')
+            importer(row)
+        except ValueError as error:
+            result['rejected'] += 1
+            if len(result['errors']) < MAX_ERRORS:
+                result['errors'].append((number, str(error)))
+        else:
+            result['imported'] += 1
+
+    def _hotel(self, row: dict):
+        """
+        Returns the hotel a customer or reservation row belongs to.
+
+        Parameters:
+        - row: The row.
+
+        Returns:
+        The hotel.
+
+        Raises:
+        ValueError: If the hotel is missing or not found.
+        """
+        hotel_name = _text(row, 'hotel')
+        hotel = self.store.find_hotel(hotel_name)
+        if hotel is None:
+            raise ValueError(f'Hotel {hotel_name} not found')
+        return hotel
+
+    def _import_hotel(self, row: dict):
+        """
+        Validates a hotel row and adds the hotel.
+
+        Parameters:
+        - row: The row.
+
+        Raises:
+        ValueError: If the row is not valid or the hotel already exists.
+        """
+        name, location = _text(row, 'name'), _text(row, 'location')
+        rooms = _rooms(row)
+        # Number the hotels as create_hotel does
+        hotel_id = row.get('hotel_id', len(self.store.data) + 1)
+        if isinstance(hotel_id, str) and hotel_id.isdigit():
+            hotel_id = int(hotel_id)
+        if not _is_count(hotel_id):
+            raise ValueError('Invalid hotel_id')
+        if self.store.find_hotel(name) is not None:
+            raise ValueError(f'Hotel {name} already exists')
+        self.store.add_hotel({'hotel_id': hotel_id, 'name': name,
+                              'location': location, 'rooms': rooms,
+                              'reservations': [], 'customers': []})
+
+    def _import_customer(self, row: dict):
+        """
+        Validates a customer row and adds the customer to its hotel.
+
+        Parameters:
+        - row: The row.
+
+        Raises:
+        ValueError: If the row is not valid or the customer already exists.
+        """
+        hotel = self._hotel(row)
+        customer_name = _text(row, 'customer_name')
+        if self.store.find_customer(hotel, customer_name) is not None:
+            raise ValueError(f'Customer {customer_name} already exists')
+        self.store.add_customer(hotel, {
+            'customer_id': self.store.allocate_id('customer'),
+            'customer_name': customer_name})
+
+    def _import_reservation(self, row: dict):
+        """
+        Validates a reservation row and adds the reservation to its hotel,
+        creating its customer if needed.
+
+        Parameters:
+        - row: The row.
+
+        Raises:
+        ValueError: If the row is not valid.
+        """
+        hotel = self._hotel(row)
+        customer_name = _text(row, 'customer_name')
+        room_type = _text(row, 'room_type')
+        if room_type not in hotel['rooms']:
+            raise ValueError(f'{room_type} room type not found')
+        date, booked = _date(row, 'date'), _date(row, 'booked')
+        check_out = row.get('check_out')
+        if date is None:
+            raise ValueError('Missing date')
+        if check_out is not None:
+            try:
+                stay_nights(date, check_out)
+            except (TypeError, ValueError) as error:
+                raise ValueError('Invalid reservation dates') from error
+        customer = self.store.find_customer(hotel, customer_name)
+        if customer is None:
+            customer = {'customer_id': self.store.allocate_id('customer'),
+                        'customer_name': customer_name}
+            self.store.add_customer(hotel, customer)
+        reservation = {'id': self.store.allocate_id('reservation'),
+                       'customer_id': customer['customer_id'],
+                       'customer_name': customer_name,
+                       'room_type': room_type, 'date': date,
+                       'booked': booked, 'check_out': check_out}
+        self.store.add_reservation(hotel, {
+            key: value for key, value in reservation.items()
+            if value is not None})
+
+    @transactional(shared=True)
+    def export_file(self, kind: str, filename: str):
+        """
+        Exports the rows of a kind to a CSV or JSON Lines file, writing the
+        rows of each hotel as it goes.
+
+        Parameters:
+        - kind: The kind of rows, 'hotels', 'customers' or 'reservations'.
+        - filename: The name of the file, ending with .csv or .jsonl.
+
+        Returns:
+        The number of rows exported, or a message if the data file was not
+        found.
+
+        Raises:
+        ValueError: If the kind or the extension is unknown.
+        """
+        _check_kind(kind)
+        extension = _format(filename)
+        data = self.store.load(missing_ok=True)
+        if data is None:
+            return 'Hotel information not found, please verify'
+        count = 0
+        with open(filename, 'w', encoding='UTF-8', newline='') as file:
+            write = _row_writer(file, extension, FIELDS[kind])
+            for row in _export_rows(data, kind):
+                write(row)
+                count += 1
+        return count
+
+
+def main(arguments: list = None):
+    """
+    Imports or exports a CSV or JSON Lines file from the command line.
+
+    Parameters:
+    - arguments: The command line arguments, defaults to sys.argv.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('action', choices=('import', 'export'))
+    parser.add_argument('kind', choices=tuple(FIELDS))
+    parser.add_argument('file', help='CSV or JSON Lines file')
+    parser.add_argument('filename', nargs='?', default='hotels.json')
+    parser.add_argument('--backend')
+    parser.add_argument('--serializer')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    options = parser.parse_args(arguments)
+    try:
+        _format(options.file)
+    except ValueError as error:
+        parser.error(str(error))
+    bulk = Bulk(options.filename, options.backend, options.serializer)
+    if options.action == 'export':
+        result = bulk.export_file(options.kind, options.file)
+        if isinstance(result, str):
+            parser.exit(1, result + '\n')
+        print(f'{result} {options.kind} exported')
+        return
+    result = bulk.import_file(options.kind, options.file, options.chunk_size)
+    if isinstance(result, str):
+        parser.exit(1, result + '\n')
+    for number, message in result['errors']:
+        print(f'Line {number}: {message}')
+    print(f"{result['imported']} {options.kind} imported, "
+          f"{result['rejected']} rejected")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,23 +1,35 @@
 """
 Module for managing customer information within hotels.
 
-Uses JSON file for data storage.
+Uses JSON file for data storage, shared in memory with the Hotel class.
 
 Libraries:
-- json: Provides functions for reading and writing JSON data.
 - Hotel: Class for managing hotel information and reservations.
+- transactional: Decorator running each operation as one unit of work.
+- instrument: Class decorator recording the calls while instrumentation is
+enabled.
+- JSONDataHandler: The storage interface shared with the Hotel class.
+- as_dict: Returns the dictionary view of a slotted record.
 """
-import json
 from categories.hotel import Hotel
+from utilities.data_store import transactional
+from utilities.instrumentation import instrument
+from utilities.json_data_handler import JSONDataHandler
+from utilities.records import as_dict
 
 
-class Customer:
+@instrument
+class Customer(JSONDataHandler):
     """
     A class to represent a customer and manage customer-related operations
     within hotels.
 
     Attributes:
     - hotel_filename (str): The filename for storing hotel data in JSON format.
+    - hotel (Hotel): The Hotel object sharing the data store of the file.
+    - backend (str): The name of the storage backend.
+    - serializer (str): The name of the serializer of the data file.
+    - store (DataStore): The store shared by every object using the file.
 
     Methods:
     - create_customer: Creates a new customer for a specified hotel.
@@ -26,17 +38,29 @@ class Customer:
     in a specified hotel.
     - modify_customer_info: Modifies the name of a specified customer in a
     specified hotel.
+    - create_customers: Creates a batch of customers.
     """
-    def __init__(self, hotel_filename: str = 'hotels.json'):
+    def __init__(self, hotel_filename: str = 'hotels.json',
+                 backend: str = None, serializer: str = None):
         """
         Initializes a Customer object with the specified hotel data filename.
 
         Parameters:
         - hotel_filename: The filename for storing hotel data in JSON format.
                           Defaults to 'hotels.json'.
+        - backend: The name of the storage backend, 'json', 'sqlite' or
+                   'sharded'. Defaults to the backend matching the file
+                   extension.
+        - serializer: The name of the serializer of the data file.
+                      Defaults to the serializer matching the file
+                      extension.
         """
         self.hotel_filename = hotel_filename
+        # Create the Hotel object once and reuse its data store
+        self.hotel = Hotel(hotel_filename, backend, serializer)
+        super().__init__(self.hotel.filename, backend, serializer)
 
+    @transactional
     def create_customer(self, hotel_name: str, customer_name: str):
         """
         Creates a new customer for a specified hotel.
@@ -49,28 +73,22 @@ class Customer:
         A string indicating the success of the operation or a message if the
         hotel or customer was not found.
         """
-        # Create a Hotel object
-        hotel = Hotel(self.hotel_filename)
-        # Open the hotel data file
-        with open(hotel.filename, 'r', encoding='UTF-8') as file:
-            hotels_data = json.load(file)
-
-        # Iterate through each hotel in the data
-        for hotel_data in hotels_data:
-            # Check if the hotel name matches the specified hotel
-            if hotel_data['name'] == hotel_name:
-                # If the hotel is found, retrieve the list of customers
-                customers = hotel_data['customers']
-                # Create a new customer ID
-                customer_id = len(customers) + 1
-                # Append the new customer to the list of customers
-                customers.append({'customer_id': customer_id,
-                                  'customer_name': customer_name})
-                # Write the updated hotel data to the file
-                with open(hotel.filename, 'w', encoding='UTF-8') as file:
-                    json.dump(hotels_data, file, indent=4)
-                # Return a success message
-                return f'Customer {customer_name} created for {hotel_name}'
+        # Load the hotel data
+        hotels_data = self.store.load()
+
+        # Look up the hotel by name
+        hotel_data = self.store.find_hotel(hotel_name)
+        if hotel_data is not None:
+            # Allocate a new customer ID
+            customer_id = self.store.allocate_id('customer')
+            # Append the new customer to the list of customers
+            self.store.add_customer(hotel_data, {
+                'customer_id': customer_id,
+                'customer_name': customer_name})
+            # Write the updated hotel data to the file
+            self.store.save(hotels_data)
+            # Return a success message
+            return f'Customer {customer_name} created for {hotel_name}'
 
         # If the specified hotel is not found, return an error message
         return (
@@ -78,6 +96,22 @@ class Customer:
             'not found'
             )
 
+    def _find_customer(self, hotel_name: str, customer_name: str):
+        """
+        Looks up a customer by name in every hotel with the specified name.
+
+        Parameters:
+        - hotel_name: The name of the hotel.
+        - customer_name: The name of the customer.
+
+        Returns:
+        A (hotel, customer) tuple, with None in place of the customer if
+        the hotel or customer was not found.
+        """
+        # Search the hotels with the name in file order
+        return self.store.find_hotel_customer(hotel_name, customer_name)
+
+    @transactional
     def delete_customer(self, hotel_name: str, customer_name: str):
         """
         Deletes a customer from a specified hotel.
@@ -90,34 +124,22 @@ class Customer:
         A string indicating the success of the operation or a message if the
         hotel or customer was not found.
         """
-        # Create a Hotel object
-        hotel = Hotel(self.hotel_filename)
-
-        # Open the hotel data file
-        with open(hotel.filename, 'r', encoding='UTF-8') as file:
-            hotels_data = json.load(file)
-
-        # Iterate through each hotel in the data
-        for hotel_data in hotels_data:
-            # Check if the current hotel matches the specified hotel name
-            if hotel_data['name'] == hotel_name:
-                # If the hotel is found, retrieve the list of customers
-                customers = hotel_data['customers']
-                # Iterate through each customer in the list
-                for customer in customers:
-                    # Check if the current customer matches the specified
-                    if customer['customer_name'] == customer_name:
-                        # If the customer is found, remove it from the list
-                        customers.remove(customer)
-                        # Write the updated hotel data to the file
-                        with open(hotel.filename, 'w',
-                                  encoding='UTF-8') as file:
-                            json.dump(hotels_data, file, indent=4)
-                        # Return a success message
-                        return f'Customer {customer_name} deleted'
+        # Load the hotel data
+        hotels_data = self.store.load()
+
+        # Look up the hotel and the customer
+        hotel_data, customer = self._find_customer(hotel_name, customer_name)
+        if customer is not None:
+            # If the customer is found, remove it from the list
+            self.store.remove_customer(hotel_data, customer)
+            # Write the updated hotel data to the file
+            self.store.save(hotels_data)
+            # Return a success message
+            return f'Customer {customer_name} deleted'
         # If the specified hotel or customer is not found, return an error
         return f'Customer {customer_name} not found in {hotel_name}'
 
+    @transactional(shared=True)
     def display_customer_info(self, hotel_name: str, customer_name: str):
         """
         Displays information about a specified customer in a specified hotel.
@@ -130,27 +152,17 @@ class Customer:
         The information of the customer if found, otherwise a message
         indicating the customer was not found in the specified hotel.
         """
-        # Create a Hotel object
-        hotel = Hotel(self.hotel_filename)
-        # Open the hotel data file
-        with open(hotel.filename, 'r', encoding='UTF-8') as file:
-            hotels_data = json.load(file)
-
-        # Iterate through each hotel in the data
-        for hotel_data in hotels_data:
-            # Check if the current hotel matches the specified hotel name
-            if hotel_data['name'] == hotel_name:
-                # If the hotel is found, retrieve the list of customers
-                customers = hotel_data['customers']
-                # Iterate through each customer in the list
-                for customer in customers:
-                    # Check if the current customer matches the specified
-                    if customer['customer_name'] == customer_name:
-                        # If the customer is found, return the customer info
-                        return customer
+        # Read the customer, streaming its hotel from the file if nothing is
+        # cached
+        customer = self.store.read_customer(hotel_name, customer_name)
+        if customer is not None:
+            # If the customer is found, return the customer info as a
+            # dictionary
+            return as_dict(customer)
         # If the specified hotel or customer is not found, return an error
         return f'Customer {customer_name} not found in {hotel_name}'
 
+    @transactional
     def modify_customer_info(self, hotel_name: str,
                              customer_name: str, new_customer_name: str):
         """
@@ -165,31 +177,33 @@ class Customer:
         A string indicating the success of the operation or a message if the
         hotel or customer was not found.
         """
-        # Create a Hotel object
-        hotel = Hotel(self.hotel_filename)
-        # Open the hotel data file
-        with open(hotel.filename, 'r', encoding='UTF-8') as file:
-            hotels_data = json.load(file)
-
-        # Iterate through each hotel in the data
-        for hotel_data in hotels_data:
-            # Check if the current hotel matches the specified hotel name
-            if hotel_data['name'] == hotel_name:
-                # If the hotel is found, retrieve the list of customers
-                customers = hotel_data['customers']
-                # Iterate through each customer in the list
-                for customer in customers:
-                    # Check if the current customer matches the specified
-                    if customer['customer_name'] == customer_name:
-                        # If the customer is found, update the customer name
-                        customer['customer_name'] = new_customer_name
-                        # Write the updated hotel data to the file
-                        with open(hotel.filename,
-                                  'w', encoding='UTF-8') as file:
-                            json.dump(hotels_data, file, indent=4)
-                        # Return a success message
-                        return (
-                            f'Customer name updated from {customer_name} to '
-                            f'{new_customer_name}')
+        # Load the hotel data
+        hotels_data = self.store.load()
+
+        # Look up the hotel and the customer
+        hotel_data, customer = self._find_customer(hotel_name, customer_name)
+        if customer is not None:
+            # If the customer is found, update the customer name
+            self.store.rename_customer(hotel_data, customer,
+                                       new_customer_name)
+            # Write the updated hotel data to the file
+            self.store.save(hotels_data)
+            # Return a success message
+            return (
+                f'Customer name updated from {customer_name} to '
+                f'{new_customer_name}')
         # If the specified hotel or customer is not found, return an error
         return f'Customer {customer_name} not found in {hotel_name}'
+
+    def create_customers(self, customers):
+        """
+        Creates a batch of customers with one load and one save.
+
+        Parameters:
+        - customers: The customers to create, each a (hotel_name,
+                     customer_name) tuple or a dictionary of them.
+
+        Returns:
+        A list with the create_customer result of each customer.
+        """
+        return self.run_batch(self.create_customer, customers)
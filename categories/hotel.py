@@ -1,25 +1,40 @@
 """
 Module for managing hotel information and reservations.
 
-Uses JSON file for data storage.
+Uses JSON file for data storage, an SQLite database or a directory of
+per-hotel JSON files, cached in memory by a shared DataStore.
 
 Libraries:
-- json: Provides functions for reading and writing JSON data.
-- os: Provides functions for interacting with the operating system.
+- datetime: Provides the booking date of the reservations.
+- utilities.data_store: Provides the transactional decorator running each
+operation as one unit of work.
+- utilities.json_data_handler: Provides the JSONDataHandler storage
+interface.
+- utilities.instrumentation: Provides the opt-in recording of the calls.
+- utilities.inventory: Provides the conversion of stays to night ordinals.
+- utilities.records: Provides the dictionary view of the slotted records.
+- utilities.storage_backends: Provides the recognized data file extensions.
 """
 
-import json
-import os
+import datetime
+from utilities.data_store import transactional
+from utilities.instrumentation import instrument
+from utilities.inventory import stay_nights
+from utilities.json_data_handler import JSONDataHandler
+from utilities.records import as_dict
+from utilities.storage_backends import STORAGE_EXTENSIONS
 
 
-class Hotel:
+@instrument
+class Hotel(JSONDataHandler):
     """
     A class to represent a hotel and manage its information and reservations.
 
     Attributes:
-    - reservation_counter (int): A class attribute to keep track of the
-    reservation count.
     - filename (str): The filename for storing hotel data in JSON format.
+    - backend (str): The name of the storage backend.
+    - serializer (str): The name of the serializer of the data file.
+    - store (DataStore): The store shared by every object using the file.
 
     Methods:
     - create_hotel: Creates a new hotel entry in the JSON file.
@@ -31,17 +46,21 @@ class Hotel:
     - reserve_room: Reserves a room in a specific hotel for a customer.
     - cancel_reservation: Cancels a reservation for a customer in a specific
     hotel.
+    - room_availability: Returns the rooms free for every night of a stay.
+    - search_availability: Returns the names of the hotels with rooms free
+    for every night of a stay.
     """
-    # Class attribute to keep track of the reservation count
-    reservation_counter = 0
-
-    def __init__(self, filename: str = 'hotels.json'):
+    def __init__(self, filename: str = 'hotels.json', backend: str = None,
+                 serializer: str = None):
         # Initializes a Hotel object with the specified hotel data filename
-        self.filename = filename
-        # Check if the filename has a JSON extension
-        if not self.filename.endswith('.json'):
-            self.filename += '.json'
-
+        # Check if the filename has a JSON, binary, database or shard
+        # directory extension
+        if not filename.endswith(STORAGE_EXTENSIONS):
+            filename += '.json'
+        # Share the parsed data with every object using the same file
+        super().__init__(filename, backend, serializer)
+
+    @transactional
     def create_hotel(self, name: str, location: str, rooms: dict):
         """
         Creates a new hotel entry in the JSON file.
@@ -54,14 +73,8 @@ class Hotel:
         Returns:
         A string indicating the success of the operation.
         """
-        # Check if the file exists
-        if os.path.exists(self.filename):
-            # Open the hotel data file
-            with open(self.filename, 'r', encoding='UTF-8') as file:
-                hotels_data = json.load(file)
-        else:
-            # Create a new file if it doesn't exist
-            hotels_data = []
+        # Load the hotel data, starting a new list if the file doesn't exist
+        hotels_data = self.store.load(create=True)
 
         # Create a new hotel ID
         hotel_id = len(hotels_data) + 1
@@ -69,15 +82,15 @@ class Hotel:
         hotel_info = {'hotel_id': hotel_id, 'name': name, 'location': location,
                       'rooms': rooms, 'reservations': [], 'customers': []}
         # Append the new hotel to the list of hotels
-        hotels_data.append(hotel_info)
+        self.store.add_hotel(hotel_info)
 
         # Write the updated hotel data to the file
-        with open(self.filename, 'w', encoding='UTF-8') as file:
-            json.dump(hotels_data, file, indent=4)
+        self.store.save(hotels_data)
 
         # Return a success message
         return 'Hotel created'
 
+    @transactional
     def get_customer_id(self, hotel_name: str, customer_name: str):
         """
         Retrieves the ID of a customer from the hotel's customer list.
@@ -89,36 +102,32 @@ class Hotel:
         Returns:
         The ID of the customer if found, otherwise None.
         """
+        # Load the hotel data
+        hotels_data = self.store.load(missing_ok=True)
         # Check if the file exists
-        if os.path.exists(self.filename):
-            # Open the hotel data file
-            with open(self.filename, 'r', encoding='UTF-8') as file:
-                hotels_data = json.load(file)
-                # Iterate through each hotel in the data
-                for hotel in hotels_data:
-                    # Check if the hotel name matches the specified hotel
-                    if hotel['name'] == hotel_name:
-                        customers = hotel['customers']
-                        # Iterate through each customer in the hotel
-                        for customer in customers:
-                            # Check if the customer name matches the specified
-                            if customer['customer_name'] == customer_name:
-                                # Return the customer ID
-                                return customer['customer_id']
-                        # If the customer is not found, create a new customer
-                        customer_id = len(customers) + 1
-                        # Append the new customer to the list of customers
-                        customers.append({'customer_id': customer_id,
-                                          'customer_name': customer_name})
-                        # Write the updated hotel data to the file
-                        with open(self.filename, 'w',
-                                  encoding='UTF-8') as file:
-                            json.dump(hotels_data, file, indent=4)
-                        # Return the new customer ID
-                        return customer_id
-                return None
+        if hotels_data is not None:
+            # Look up the hotel by name
+            hotel = self.store.find_hotel(hotel_name)
+            if hotel is not None:
+                # Look up the customer by name
+                customer = self.store.find_customer(hotel, customer_name)
+                if customer is not None:
+                    # Return the customer ID
+                    return customer['customer_id']
+                # If the customer is not found, create a new customer
+                customer_id = self.store.allocate_id('customer')
+                # Append the new customer to the list of customers
+                self.store.add_customer(hotel, {
+                    'customer_id': customer_id,
+                    'customer_name': customer_name})
+                # Write the updated hotel data to the file
+                self.store.save(hotels_data)
+                # Return the new customer ID
+                return customer_id
+            return None
         return None
 
+    @transactional
     def delete_hotel(self, hotel_name: str):
         """
         Deletes a hotel entry from the JSON file.
@@ -129,27 +138,24 @@ class Hotel:
         Returns:
         A string indicating the success of the operation.
         """
+        # Load the hotel data
+        hotels_data = self.store.load(missing_ok=True)
         # Check if the file exists
-        if os.path.exists(self.filename):
-            # Open the hotel data file
-            with open(self.filename, 'r', encoding='UTF-8') as file:
-                hotels_data = json.load(file)
-                # Iterate through each hotel in the data
-                for hotel in hotels_data:
-                    # Check if the hotel name matches the specified hotel
-                    if hotel['name'] == hotel_name:
-                        hotels_data.remove(hotel)
-                        # Write the updated hotel data to the file
-                        with open(self.filename, 'w',
-                                  encoding='UTF-8') as file:
-                            json.dump(hotels_data, file, indent=4)
-                        # Return a success message
-                        return 'Hotel deleted'
-                # If the specified hotel is not found, return an error message
-                return 'Hotel not found'
+        if hotels_data is not None:
+            # Look up the hotel by name
+            hotel = self.store.find_hotel(hotel_name)
+            if hotel is not None:
+                self.store.remove_hotel(hotel)
+                # Write the updated hotel data to the file
+                self.store.save(hotels_data)
+                # Return a success message
+                return 'Hotel deleted'
+            # If the specified hotel is not found, return an error message
+            return 'Hotel not found'
         # If the file does not exist, return an error message
         return 'Hotel information not found'
 
+    @transactional(shared=True)
     def display_hotel_info(self, hotel_name: str):
         """
         Displays information about a specific hotel.
@@ -161,21 +167,19 @@ class Hotel:
         The information of the hotel if found, otherwise a message indicating
         the hotel was not found.
         """
-        # Check if the file exists
-        if os.path.exists(self.filename):
-            # Open the hotel data file
-            with open(self.filename, 'r', encoding='UTF-8') as file:
-                hotels_data = json.load(file)
-                # Iterate through each hotel in the data
-                for hotel in hotels_data:
-                    if hotel['name'] == hotel_name:
-                        # Return the hotel information
-                        return hotel
-            # If the specified hotel is not found, return an error message
-            return 'Hotel not found'
-        # If the file does not exist, return an error message
-        return 'Hotel information file not found, please verify'
-
+        # Read the hotel, streaming it from the file if nothing is cached
+        try:
+            hotel = self.store.read_hotel(hotel_name)
+        except FileNotFoundError:
+            # If the file does not exist, return an error message
+            return 'Hotel information file not found, please verify'
+        if hotel is not None:
+            # Return the hotel information as a dictionary
+            return as_dict(hotel)
+        # If the specified hotel is not found, return an error message
+        return 'Hotel not found'
+
+    @transactional
     def modify_hotel_info(self, hotel_name: str, new_name: str = '',
                           new_location: str = ''):
         """
@@ -190,33 +194,17 @@ class Hotel:
         A string indicating the success of the operation or a message if the
         hotel was not found.
         """
+        # Load the hotel data
+        hotels_data = self.store.load(missing_ok=True)
         # Check if the file exists
-        if os.path.exists(self.filename):
-            # Open the hotel data file
-            with open(self.filename, 'r', encoding='UTF-8') as file:
-                hotels_data = json.load(file)
-
-            # Iterate through each hotel in the data
-            hotel_found = False
-            # Check if the hotel name matches the specified hotel
-            for hotel in hotels_data:
-                # Check if the hotel name matches the specified hotel
-                if hotel['name'] == hotel_name:
-                    # If the hotel is found, modify the hotel information
-                    if new_name:
-                        hotel['name'] = new_name
-                    # If the hotel is found, modify the hotel information
-                    if new_location:
-                        hotel['location'] = new_location
-                    # Set the hotel_found flag to True
-                    hotel_found = True
-                    break
-
-            # If the hotel is found, write the updated hotel data to the file
-            if hotel_found:
+        if hotels_data is not None:
+            # Look up the hotel by name
+            hotel = self.store.find_hotel(hotel_name)
+            # If the hotel is found, modify the hotel information
+            if hotel is not None:
+                self.store.modify_hotel(hotel, new_name, new_location)
                 # Write the updated hotel data to the file
-                with open(self.filename, 'w', encoding='UTF-8') as file:
-                    json.dump(hotels_data, file, indent=4)
+                self.store.save(hotels_data)
                 # Return a success message
                 return 'Hotel information modified'
             # If the specified hotel is not found, return an error message
@@ -224,78 +212,86 @@ class Hotel:
         # If the file does not exist, return an error message
         return 'Hotel information not found, please verify the file name'
 
+    @transactional
     def reserve_room(self, hotel_name: int, customer_name: str,
-                     reservation_date: str, room_type: str = 'single'):
+                     reservation_date: str, room_type: str = 'single',
+                     check_out: str = None):
+        # pylint: disable=too-many-return-statements
         """
         Reserves a room in a specific hotel for a customer.
 
+        Without a check-out date the room is held for every night; with one,
+        it is only held from the reservation date to the night before
+        check-out.
+
         Parameters:
         - hotel_name: The name of the hotel to reserve a room in.
         - customer_name: The name of the customer making the reservation.
-        - reservation_date: The date of the reservation.
+        - reservation_date: The date of the reservation, the check-in date
+        of a stay (YYYY-MM-DD).
         - room_type: The type of room to reserve (default is 'single').
+        - check_out: The check-out date of the stay (optional).
 
         Returns:
         A string indicating the success of the reservation or a message if the
         room type or hotel was not found.
         """
+        # Load the hotel data
+        hotels_data = self.store.load(missing_ok=True)
         # Check if the file exists
-        if os.path.exists(self.filename):
-            # Open the hotel data file
-            with open(self.filename, 'r', encoding='UTF-8') as file:
-                hotels_data = json.load(file)
-
-            # Iterate through each hotel in the data
-            hotel_found = False
-            # Check if the hotel name matches the specified hotel
-            for hotel in hotels_data:
-                # Check if the hotel name matches the specified hotel
-                if hotel['name'] == hotel_name:
-                    # If the hotel is found, retrieve the list of customers
-                    customer_id = self.get_customer_id(hotel_name,
-                                                       customer_name)
-                    # If the customer is not found, return an error message
-                    if customer_id is None:
-                        # If the customer is not found, return an error message
-                        return 'Customer not found or could not be created'
-                    # If the customer is found, check if the room type exists
-                    if room_type in hotel['rooms']:
-                        # If the room type exists, check if there are available
-                        if hotel['rooms'][room_type] > 0:
-                            # If there are available rooms, create a new
-                            self.__class__.reservation_counter += 1
-                            # reservation and update the hotel data
-                            reservation_id = self.__class__.reservation_counter
-                            # Create a new reservation
-                            hotel['rooms'][room_type] -= 1
-                            # Append the new reservation to the list of
-                            # reservations
-                            hotel['reservations'].append({
-                                'id': reservation_id,
-                                'customer_id': customer_id,
-                                'customer_name': customer_name,
-                                'room_type': room_type,
-                                'date': reservation_date})
-                            # Set the hotel_found flag to True
-                            hotel_found = True
-                            break
-                        # If there are no available rooms of the specified type
-                        # return no rooms available message
-                        return f'No {room_type} rooms available'
-                    # If the room type does not exist, return an error message
-                    return f'{room_type} room type not found.'
-            # If the specified hotel is not found, return an error message
-            if hotel_found:
-                # Write the updated hotel data to the file
-                with open(self.filename, 'w', encoding='UTF-8') as file:
-                    json.dump(hotels_data, file, indent=4)
-                # Return a success message
-                return f'{room_type} room reserved for {customer_name}'
+        if hotels_data is not None:
+            # Look up the hotel by name
+            hotel = self.store.find_hotel(hotel_name)
             # If the specified hotel is not found, return an error message
-            return f'{hotel_name} not found'
+            if hotel is None:
+                return f'{hotel_name} not found'
+            # Convert the stay to night ordinals
+            nights = None
+            if check_out is not None:
+                try:
+                    nights = stay_nights(reservation_date, check_out)
+                except ValueError:
+                    return 'Invalid reservation dates'
+            # If the hotel is found, retrieve the customer ID
+            customer_id = self.get_customer_id(hotel_name, customer_name)
+            # If the customer is not found, return an error message
+            if customer_id is None:
+                return 'Customer not found or could not be created'
+            # If the room type does not exist, return an error message
+            if room_type not in hotel['rooms']:
+                return f'{room_type} room type not found.'
+            # Count the rooms free for the whole stay
+            if nights is None:
+                available = hotel['rooms'][room_type]
+            else:
+                available = self.store.available_rooms(hotel, room_type,
+                                                       *nights)
+            # If there are no available rooms of the specified type
+            # return no rooms available message
+            if available <= 0:
+                return f'No {room_type} rooms available'
+            # If there are available rooms, create a new reservation
+            reservation_id = self.store.allocate_id('reservation')
+            reservation = {'id': reservation_id, 'customer_id': customer_id,
+                           'customer_name': customer_name,
+                           'room_type': room_type, 'date': reservation_date,
+                           'booked': datetime.date.today().isoformat()}
+            # Stays hold their nights in the calendar, other reservations
+            # take a room from the room count
+            if nights is None:
+                self.store.adjust_rooms(hotel, room_type, -1)
+            else:
+                reservation['check_out'] = check_out
+            # Append the new reservation to the list of reservations
+            self.store.add_reservation(hotel, reservation)
+            # Write the updated hotel data to the file
+            self.store.save(hotels_data)
+            # Return a success message
+            return f'{room_type} room reserved for {customer_name}'
         # If the file does not exist, return an error message
         return 'Hotel information not found, please verify'
 
+    @transactional
     def cancel_reservation(self, hotel_name: str, customer_name: str):
         """
         Cancels a reservation for a customer in a specific hotel.
@@ -309,38 +305,99 @@ class Hotel:
         A string indicating the success of the operation or a message if the
         reservation or hotel was not found.
         """
+        # Load the hotel data
+        hotels_data = self.store.load(missing_ok=True)
+        # Check if the file exists
+        if hotels_data is not None:
+            # Look up the hotel by name
+            hotel = self.store.find_hotel(hotel_name)
+            # If the specified hotel is not found, return an error message
+            if hotel is None:
+                return f'Hotel {hotel_name} not found'
+            # Look up the reservation by customer name
+            reservation = self.store.find_reservation(hotel, customer_name)
+            # If the specified reservation is not found, return an error
+            if reservation is None:
+                return f'No reservation found for {customer_name}'
+            # Give back the room of a reservation without check-out date
+            if reservation.get('check_out') is None:
+                self.store.adjust_rooms(hotel, reservation['room_type'], 1)
+            # Remove the reservation from the list of reservations
+            self.store.remove_reservation(hotel, reservation)
+            # Write the updated hotel data to the file
+            self.store.save(hotels_data)
+            # Return a success message
+            return f'Reservation canceled for {customer_name}'
+        # If the file does not exist, return an error message
+        return 'Hotel information not found, please verify'
+
+    @transactional(shared=True)
+    def room_availability(self, hotel_name: str, check_in: str,
+                          check_out: str, room_type: str = 'single'):
+        """
+        Returns the number of rooms of a type free for every night of a
+        stay.
+
+        Parameters:
+        - hotel_name: The name of the hotel.
+        - check_in: The check-in date (YYYY-MM-DD).
+        - check_out: The check-out date (YYYY-MM-DD).
+        - room_type: The type of room (default is 'single').
+
+        Returns:
+        The number of free rooms, or a message if the dates are not valid
+        or the room type or hotel was not found.
+        """
+        # Load the hotel data
+        hotels_data = self.store.load(missing_ok=True)
         # Check if the file exists
-        if os.path.exists(self.filename):
-            # Open the hotel data file
-            with open(self.filename, 'r', encoding='UTF-8') as file:
-                hotels_data = json.load(file)
-
-            # Iterate through each hotel in the data
-            for hotel in hotels_data:
-                # Check if the hotel name matches the specified hotel
-                if hotel['name'] == hotel_name:
-                    # If the hotel is found, retrieve the list of reservations
-                    for reservation in hotel['reservations']:
-                        # Check if the customer name matches the specified
-                        if reservation['customer_name'] == customer_name:
-                            # If the reservation is found, update the hotel
-                            # data
-                            room_type = reservation['room_type']
-                            # Update the room count for the specified room type
-                            hotel['rooms'][room_type] += 1
-                            # Remove the reservation from the list of
-                            # reservations
-                            hotel['reservations'].remove(reservation)
-                            # Write the updated hotel data to the file
-                            with open(self.filename, 'w',
-                                      encoding='UTF-8') as file:
-                                json.dump(hotels_data, file, indent=4)
-                            # Return a success message
-                            return f'Reservation canceled for {customer_name}'
-                    # If the specified reservation is not found, return an
-                    # error
-                    return f'No reservation found for {customer_name}'
+        if hotels_data is not None:
+            # Look up the hotel by name
+            hotel = self.store.find_hotel(hotel_name)
             # If the specified hotel is not found, return an error message
-            return f'Hotel {hotel_name} not found'
+            if hotel is None:
+                return f'{hotel_name} not found'
+            # If the room type does not exist, return an error message
+            if room_type not in hotel['rooms']:
+                return f'{room_type} room type not found.'
+            # Convert the stay to night ordinals
+            try:
+                nights = stay_nights(check_in, check_out)
+            except ValueError:
+                return 'Invalid reservation dates'
+            # Return the rooms free for every night of the stay
+            return self.store.available_rooms(hotel, room_type, *nights)
+        # If the file does not exist, return an error message
+        return 'Hotel information not found, please verify'
+
+    @transactional(shared=True)
+    def search_availability(self, check_in: str, check_out: str,
+                            room_type: str = 'single', rooms: int = 1):
+        """
+        Returns the names of the hotels with rooms of a type free for every
+        night of a stay.
+
+        Parameters:
+        - check_in: The check-in date (YYYY-MM-DD).
+        - check_out: The check-out date (YYYY-MM-DD).
+        - room_type: The type of room (default is 'single').
+        - rooms: The number of rooms needed (default is 1).
+
+        Returns:
+        The list of hotel names in file order, or a message if the dates are
+        not valid or the file was not found.
+        """
+        # Load the hotel data
+        hotels_data = self.store.load(missing_ok=True)
+        # Check if the file exists
+        if hotels_data is not None:
+            # Convert the stay to night ordinals
+            try:
+                nights = stay_nights(check_in, check_out)
+            except ValueError:
+                return 'Invalid reservation dates'
+            # Search every hotel at once
+            return [hotel['name'] for hotel in self.store.search_availability(
+                room_type, *nights, rooms)]
         # If the file does not exist, return an error message
         return 'Hotel information not found, please verify'
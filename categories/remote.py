@@ -0,0 +1,193 @@
+"""
+Module for calling the operations of a running HotelService.
+
+RemoteHotel, RemoteCustomer and RemoteReservation have the methods of Hotel,
+Customer and Reservation, with the same signatures and return values, but
+every call is sent to the service of categories.service, which keeps the
+data file loaded. An exception raised by an operation in the service is
+raised again by the client, as the built-in exception of the same type, or
+as a RuntimeError for the other types. The clients send the token of the
+service, which defaults to the HOTELS_SERVICE_TOKEN environment variable.
+
+Libraries:
+- builtins: Provides the exception types raised again.
+- functools: Provides the wrapping of the synchronous methods.
+- http.client: Provides the HTTP connections to the service.
+- json: Provides the encoding of the requests and replies.
+- os: Provides the token from the environment.
+- categories.customer: Provides the Customer class.
+- categories.hotel: Provides the Hotel class.
+- categories.reservation: Provides the Reservation class.
+- categories.service: Provides the default address and the token variable
+of the service.
+
+Classes:
+- RemoteHotel: Calls the Hotel methods on the service.
+- RemoteCustomer: Calls the Customer methods on the service.
+- RemoteReservation: Calls the Reservation methods on the service.
+"""
+import builtins
+import functools
+import http.client
+import json
+import os
+from categories.customer import Customer
+from categories.hotel import Hotel
+from categories.reservation import Reservation
+from categories.service import DEFAULT_HOST, DEFAULT_PORT, TOKEN_VARIABLE
+
+
+def _error(reply: dict):
+    """
+    Returns the exception to raise for an error reply.
+
+    Parameters:
+    - reply: The reply of the service.
+
+    Returns:
+    The built-in exception named by the reply, or a RuntimeError.
+    """
+    error = getattr(builtins, reply['error'], None)
+    if isinstance(error, type) and issubclass(error, Exception):
+        return error(reply['message'])
+    return RuntimeError(f"{reply['error']}: {reply['message']}")
+
+
+def _method(method):
+    """
+    Returns a method calling the service in place of a synchronous method.
+
+    Parameters:
+    - method: The synchronous method.
+
+    Returns:
+    The method, with the name, signature and docstring of the synchronous
+    one.
+    """
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        return self.call(name, *args, **kwargs)
+    return wrapper
+
+
+class RemoteHandler:  # pylint: disable=too-few-public-methods
+    """
+    A class for calling the methods of a class served by a HotelService.
+
+    Attributes:
+    - host (str): The host of the service.
+    - port (int): The port of the service.
+    - timeout (float): The number of seconds to wait for a reply.
+    - token (str): The token sent to the service, None to send none.
+
+    Methods:
+    - call: Calls a method on the service.
+    """
+    # The name of the class served
+    service = None
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 timeout: float = 30.0, token: str = None):
+        """
+        Initializes a client of the service at the specified address.
+
+        Parameters:
+        - host: The host of the service. Defaults to the loopback interface.
+        - port: The port of the service. Defaults to 8765.
+        - timeout: The number of seconds to wait for a reply.
+        - token: The token of the service. Defaults to the
+        HOTELS_SERVICE_TOKEN environment variable.
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.token = token or os.environ.get(TOKEN_VARIABLE) or None
+
+    def call(self, method: str, *args, **kwargs):
+        """
+        Calls a method on the service.
+
+        Parameters:
+        - method: The name of the method.
+        - args: The positional arguments of the call.
+        - kwargs: The keyword arguments of the call.
+
+        Returns:
+        The result of the method.
+        """
+        body = json.dumps({'args': args, 'kwargs': kwargs})
+        headers = {'Content-Type': 'application/json'}
+        if self.token is not None:
+            headers['Authorization'] = f'Bearer {self.token}'
+        connection = http.client.HTTPConnection(self.host, self.port,
+                                                timeout=self.timeout)
+        try:
+            connection.request('POST', f'/{self.service}/{method}', body,
+                               headers)
+            reply = json.loads(connection.getresponse().read())
+        finally:
+            connection.close()
+        if 'error' in reply:
+            raise _error(reply)
+        return reply['result']
+
+
+class RemoteHotel(RemoteHandler):  # pylint: disable=too-few-public-methods
+    """
+    A class calling the Hotel methods on the service.
+
+    Methods:
+    - create_hotel / get_customer_id / delete_hotel / display_hotel_info /
+    modify_hotel_info / reserve_room / cancel_reservation /
+    room_availability / search_availability: See Hotel.
+    """
+    service = 'Hotel'
+
+    create_hotel = _method(Hotel.create_hotel)
+    get_customer_id = _method(Hotel.get_customer_id)
+    delete_hotel = _method(Hotel.delete_hotel)
+    display_hotel_info = _method(Hotel.display_hotel_info)
+    modify_hotel_info = _method(Hotel.modify_hotel_info)
+    reserve_room = _method(Hotel.reserve_room)
+    cancel_reservation = _method(Hotel.cancel_reservation)
+    room_availability = _method(Hotel.room_availability)
+    search_availability = _method(Hotel.search_availability)
+
+
+class RemoteCustomer(RemoteHandler):  # pylint: disable=too-few-public-methods
+    """
+    A class calling the Customer methods on the service.
+
+    Methods:
+    - create_customer / delete_customer / display_customer_info /
+    modify_customer_info / create_customers: See Customer.
+    """
+    service = 'Customer'
+
+    create_customer = _method(Customer.create_customer)
+    delete_customer = _method(Customer.delete_customer)
+    display_customer_info = _method(Customer.display_customer_info)
+    modify_customer_info = _method(Customer.modify_customer_info)
+    create_customers = _method(Customer.create_customers)
+
+
+class RemoteReservation(RemoteHandler):
+    # pylint: disable=too-few-public-methods
+    """
+    A class calling the Reservation methods on the service.
+
+    Methods:
+    - create_reservation / cancel_reservation / get_reservation /
+    cancel_reservation_by_id / create_reservations / cancel_reservations:
+    See Reservation.
+    """
+    service = 'Reservation'
+
+    create_reservation = _method(Reservation.create_reservation)
+    cancel_reservation = _method(Reservation.cancel_reservation)
+    get_reservation = _method(Reservation.get_reservation)
+    cancel_reservation_by_id = _method(Reservation.cancel_reservation_by_id)
+    create_reservations = _method(Reservation.create_reservations)
+    cancel_reservations = _method(Reservation.cancel_reservations)
@@ -0,0 +1,704 @@
+"""
+Module for the occupancy and booking pace reports of a data file.
+
+Reports aggregates every hotel at once from the columnar ReservationTable of
+the DataStore, with vectorized NumPy operations when NumPy is installed and
+plain loops otherwise, instead of counting the reservations of each hotel
+returned by display_hotel_info:
+- occupancy: the rooms occupied and the occupancy rate per hotel, room type
+and night, against the room counts of the hotels;
+- pickup: the reservations and room nights booked per booking date;
+- room_type_mix: the share of the reservations held by each room type.
+
+The counters polled by dashboards (the hotels, the customers per hotel,
+the free rooms per hotel and room type and the reservations per hotel, room
+type and check-in date) are read by count from the aggregates of the
+DataStore, kept up to date on every write, without loading any hotel.
+
+A reservation without a check-out date took its room from the room count of
+its hotel and holds it for every night, so it counts as occupied on every
+night and as part of the capacity. The rows of the reports are
+dictionaries, written to CSV or JSON files by export. Run it with:
+
+    python -m categories.reports occupancy hotels.json \\
+        --first 2024-01-01 --last 2025-01-01 --by hotel room_type \\
+        --output occupancy.csv
+
+Libraries:
+- argparse: Provides the command line options.
+- csv: Provides the CSV export.
+- datetime: Provides the conversion of day ordinals to dates.
+- itertools: Provides the running sums of the pure-Python fallback.
+- json: Provides the JSON export.
+- sys: Provides the standard output of the command line.
+- numpy: Optional, provides the vectorized aggregations.
+- utilities.data_store: Provides the transactional decorator running each
+report as one unit of work.
+- utilities.instrumentation: Provides the opt-in recording of the calls.
+- utilities.inventory: Provides the conversion of dates to night ordinals.
+- utilities.json_data_handler: Provides the JSONDataHandler storage
+interface.
+
+Classes:
+- Reports: The reports over every hotel of a data file.
+
+Functions:
+- write_csv: Writes report rows to a CSV file.
+- write_json: Writes report rows to a JSON file.
+- export: Writes report rows to a file in the format of its extension.
+- main: Prints or exports a report from the command line.
+"""
+import argparse
+import csv
+import datetime
+import itertools
+import json
+import sys
+from utilities.data_store import transactional
+from utilities.instrumentation import instrument
+from utilities.inventory import stay_nights
+from utilities.json_data_handler import JSONDataHandler
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Fields each report can group its rows by
+OCCUPANCY_GROUPS = ('hotel', 'room_type', 'date')
+PICKUP_GROUPS = ('hotel', 'room_type')
+
+
+def _check_groups(by, groups: tuple):
+    """
+    Checks the fields a report is grouped by.
+
+    Parameters:
+    - by: The fields to group by.
+    - groups: The fields the report can group by.
+
+    Raises:
+    ValueError: If a field cannot be grouped by.
+    """
+    for field in by:
+        if field not in groups:
+            raise ValueError(f'Cannot group the report by {field}')
+
+
+def _window(first: str, last: str):
+    """
+    Converts the optional bounds of the check-in dates to day ordinals.
+
+    Parameters:
+    - first: The first check-in date (YYYY-MM-DD), None for no lower bound.
+    - last: The day after the last check-in date (YYYY-MM-DD), None for no
+    upper bound.
+
+    Returns:
+    A (first, last) tuple of day ordinals or None.
+
+    Raises:
+    ValueError: If a date is not valid.
+    """
+    return tuple(None if date is None
+                 else datetime.date.fromisoformat(date).toordinal()
+                 for date in (first, last))
+
+
+def _add(total, values):
+    """
+    Adds the nightly counts or the totals of a group to the running total.
+
+    Parameters:
+    - total: The running total, a NumPy array, a list or a number.
+    - values: The values to add, of the same kind.
+
+    Returns:
+    The new running total.
+    """
+    if isinstance(total, list):
+        return [left + right for left, right in zip(total, values)]
+    return total + values
+
+
+def _occupied_nights(columns: dict, types: int, first: int, last: int):
+    """
+    Counts the rooms of a hotel held per room type and night.
+
+    The stays are clipped to the nights of the report and each one adds 1
+    to the night it starts and -1 to the night it ends, so the running sum
+    of these changes along the nights counts the stays in progress.
+
+    Parameters:
+    - columns: The columns of the hotel in the ReservationTable.
+    - types: The number of room type codes of the table.
+    - first: The ordinal of the first night of the report.
+    - last: The ordinal of the day after the last night of the report.
+
+    Returns:
+    A (stays, undated) tuple: the rooms held by stays per room type code and
+    night, as a NumPy array or a list of lists, and the list of the number
+    of reservations without a check-out date per room type code.
+    """
+    width = last - first
+    if np is None:
+        return _occupied_nights_loop(columns, types, first, last)
+    codes = columns['room_type'].astype(np.int64)
+    nights = columns['nights']
+    dated = nights > 0
+    dates = columns['date'][dated].astype(np.int64)
+    # Offset of the changes of each stay in the flattened (type, night) grid
+    offsets = codes[dated] * (width + 1)
+    size = types * (width + 1)
+    changes = (np.bincount(offsets + np.clip(dates, first, last) - first,
+                           minlength=size)
+               - np.bincount(offsets + np.clip(dates + nights[dated], first,
+                                               last) - first,
+                             minlength=size))
+    return (changes.reshape(types, width + 1)[:, :width].cumsum(axis=1),
+            np.bincount(codes[~dated], minlength=types).tolist())
+
+
+def _occupied_nights_loop(columns: dict, types: int, first: int, last: int):
+    """
+    Counts the rooms of a hotel held per room type and night, without NumPy.
+
+    Parameters:
+    - columns: The columns of the hotel in the ReservationTable.
+    - types: The number of room type codes of the table.
+    - first: The ordinal of the first night of the report.
+    - last: The ordinal of the day after the last night of the report.
+
+    Returns:
+    The (stays, undated) tuple of _occupied_nights, with lists.
+    """
+    undated = [0] * types
+    changes = [[0] * (last - first + 1) for _ in range(types)]
+    for code, date, nights in zip(columns['room_type'], columns['date'],
+                                  columns['nights']):
+        if not nights:
+            undated[code] += 1
+            continue
+        changes[code][min(max(date, first), last) - first] += 1
+        changes[code][min(max(date + nights, first), last) - first] -= 1
+    return ([list(itertools.accumulate(row[:-1])) for row in changes],
+            undated)
+
+
+def _bookings(columns: dict, room_types, first, last):
+    """
+    Counts the reservations and room nights of a hotel per booking date.
+
+    Parameters:
+    - columns: The columns of the hotel in the ReservationTable.
+    - room_types: The room types of the table, indexed by code, to count
+    each room type apart, None to count them together.
+    - first: The ordinal of the first check-in date, None for no lower
+    bound.
+    - last: The ordinal of the day after the last check-in date, None for
+    no upper bound.
+
+    Returns:
+    A list of (booked, room_type, reservations, room_nights) tuples, with
+    the ordinal of the booking date, 0 if it is missing, and the room type,
+    None if the room types are counted together.
+    """
+    types = None if room_types is None else len(room_types)
+    if np is None:
+        entries = _bookings_loop(columns, types, first, last)
+    else:
+        entries = _booking_counts(columns, types, first, last)
+    if types is None:
+        return [(key, None, count, nights) for key, count, nights in entries]
+    return [(key // types, room_types[key % types], count, nights)
+            for key, count, nights in entries]
+
+
+def _booking_counts(columns: dict, types, first, last):
+    """
+    Counts the reservations and room nights of a hotel per booking date,
+    with NumPy.
+
+    Parameters:
+    - columns: The columns of the hotel in the ReservationTable.
+    - types: The number of room type codes of the table to count each room
+    type apart, None to count them together.
+    - first: The ordinal of the first check-in date, None for no lower
+    bound.
+    - last: The ordinal of the day after the last check-in date, None for
+    no upper bound.
+
+    Returns:
+    A list of (key, reservations, room_nights) tuples, the key being the
+    ordinal of the booking date, times the number of room type codes plus
+    the room type code when they are counted apart.
+    """
+    mask = np.ones(len(columns['id']), dtype=bool)
+    if first is not None:
+        mask &= columns['date'] >= first
+    if last is not None:
+        mask &= columns['date'] < last
+    keys = columns['booked'][mask].astype(np.int64)
+    if types is not None:
+        keys = keys * types + columns['room_type'][mask]
+    keys, inverse, counts = np.unique(keys, return_inverse=True,
+                                      return_counts=True)
+    nights = np.bincount(inverse, weights=columns['nights'][mask],
+                         minlength=len(keys)).astype(np.int64)
+    return list(zip(keys.tolist(), counts.tolist(), nights.tolist()))
+
+
+def _bookings_loop(columns: dict, types, first, last):
+    """
+    Counts the reservations and room nights of a hotel per booking date,
+    without NumPy.
+
+    Parameters:
+    - columns: The columns of the hotel in the ReservationTable.
+    - types: The number of room type codes of the table to count each room
+    type apart, None to count them together.
+    - first: The ordinal of the first check-in date, None for no lower
+    bound.
+    - last: The ordinal of the day after the last check-in date, None for
+    no upper bound.
+
+    Returns:
+    The list of (key, reservations, room_nights) tuples of _booking_counts.
+    """
+    totals = {}
+    for date, booked, code, nights in zip(columns['date'], columns['booked'],
+                                          columns['room_type'],
+                                          columns['nights']):
+        if (first is None or date >= first) and (last is None or date < last):
+            key = booked if types is None else booked * types + code
+            count, room_nights = totals.get(key, (0, 0))
+            totals[key] = (count + 1, room_nights + nights)
+    return [(key, count, room_nights)
+            for key, (count, room_nights) in totals.items()]
+
+
+def _labels(by, hotel_name: str, room_type: str):
+    """
+    Returns the fields a report row is grouped by.
+
+    Parameters:
+    - by: The fields to group by.
+    - hotel_name: The name of the hotel of the row.
+    - room_type: The room type of the row.
+
+    Returns:
+    A dictionary holding the hotel and room type if grouped by them.
+    """
+    labels = {}
+    if 'hotel' in by:
+        labels['hotel'] = hotel_name
+    if 'room_type' in by:
+        labels['room_type'] = room_type
+    return labels
+
+
+def _rate(occupied: int, capacity: int):
+    """
+    Returns the occupancy fields of a report row.
+
+    Parameters:
+    - occupied: The rooms or room nights occupied.
+    - capacity: The rooms or room nights of the hotels.
+
+    Returns:
+    A dictionary with the capacity, the occupied rooms and the occupancy
+    rate, None without capacity.
+    """
+    return {'capacity': capacity, 'occupied': occupied,
+            'occupancy': round(occupied / capacity, 4) if capacity else None}
+
+
+@instrument
+class Reports(JSONDataHandler):
+    """
+    A class to compute reports over every hotel of a data file.
+
+    Attributes:
+    - hotel_filename (str): The filename for storing hotel data in JSON format.
+    - store (DataStore): The store shared by every object using the file.
+
+    Methods:
+    - occupancy: Returns the occupancy per hotel, room type and/or night.
+    - pickup: Returns the reservations booked per booking date.
+    - room_type_mix: Returns the share of the reservations of each room
+    type.
+    - summary: Returns the three reports over the same nights.
+    - count: Returns a counter without loading the data.
+    """
+    @transactional(shared=True)
+    def occupancy(self, first: str, last: str,
+                  by: tuple = ('hotel', 'room_type')):
+        """
+        Returns the occupied rooms and the occupancy rate of the hotels.
+
+        Grouped by date, a row counts the rooms occupied on a night out of
+        the rooms of the hotels; otherwise it counts the room nights
+        occupied out of the room nights of the hotels over the report.
+
+        Parameters:
+        - first: The first night of the report (YYYY-MM-DD).
+        - last: The day after the last night of the report (YYYY-MM-DD).
+        - by: The fields to group by, among 'hotel', 'room_type' and 'date'
+        (default is per hotel and room type).
+
+        Returns:
+        The list of rows, holding the fields grouped by, the capacity, the
+        occupied rooms and the occupancy rate, or a message if the dates are
+        not valid or the file was not found.
+
+        Raises:
+        ValueError: If a field cannot be grouped by.
+        """
+        _check_groups(by, OCCUPANCY_GROUPS)
+        if self.store.load(missing_ok=True) is None:
+            return 'Hotel information not found, please verify'
+        try:
+            first, last = stay_nights(first, last)
+        except ValueError:
+            return 'Invalid report dates'
+        totals = self._occupancy_totals(by, first, last)
+        dates = [datetime.date.fromordinal(night).isoformat()
+                 for night in range(first, last)]
+        rows = []
+        for (hotel_name, room_type), (occupied, capacity) in totals.items():
+            labels = _labels(by, hotel_name, room_type)
+            if 'date' in by:
+                if not isinstance(occupied, list):
+                    occupied = occupied.tolist()
+                rows.extend({**labels, 'date': date, **_rate(count, capacity)}
+                            for date, count in zip(dates, occupied))
+            else:
+                rows.append({**labels, **_rate(occupied, capacity)})
+        return rows
+
+    def _occupancy_totals(self, by, first: int, last: int):
+        """
+        Adds up the occupancy of the hotels per group.
+
+        Parameters:
+        - by: The fields to group by.
+        - first: The ordinal of the first night of the report.
+        - last: The ordinal of the day after the last night of the report.
+
+        Returns:
+        A dictionary from the (hotel name, room type) of each group, None
+        for the fields not grouped by, to an (occupied, capacity) tuple:
+        the rooms occupied on each night and the rooms of the group, or
+        without grouping by date the room nights occupied and the room
+        nights of the group.
+        """
+        table = self.store.reservation_table()
+        totals = {}
+        for hotel, columns in table.hotel_columns():
+            for room_type, (occupied, capacity) in self._hotel_occupancy(
+                    table, hotel, columns, first, last).items():
+                if 'date' not in by:
+                    occupied = int(sum(occupied) if isinstance(
+                        occupied, list) else occupied.sum())
+                    capacity *= last - first
+                key = (hotel['name'] if 'hotel' in by else None,
+                       room_type if 'room_type' in by else None)
+                if key in totals:
+                    occupied = _add(totals[key][0], occupied)
+                    capacity += totals[key][1]
+                totals[key] = (occupied, capacity)
+        return totals
+
+    @staticmethod
+    def _hotel_occupancy(table, hotel: dict, columns: dict, first: int,
+                         last: int):
+        # pylint: disable=too-many-arguments
+        """
+        Returns the rooms of a hotel occupied per room type and night.
+
+        Parameters:
+        - table: The ReservationTable.
+        - hotel: The hotel.
+        - columns: The columns of the hotel in the table.
+        - first: The ordinal of the first night of the report.
+        - last: The ordinal of the day after the last night of the report.
+
+        Returns:
+        A dictionary from each room type of the hotel, then each other room
+        type of its reservations, to an (occupied, capacity) tuple: the
+        rooms occupied on each night, as a NumPy array or a list, and the
+        rooms of the type.
+        """
+        rooms = hotel['rooms']
+        values = table.room_types.values
+        stays, undated = _occupied_nights(columns, len(values), first, last)
+        # Room types of the hotel, then the other room types booked in it
+        codes = {room_type: table.room_types.find(room_type)
+                 for room_type in rooms}
+        codes.update((room_type, code) for code, room_type in enumerate(values)
+                     if room_type not in rooms
+                     and (undated[code] or any(stays[code])))
+        return {room_type: ([0] * (last - first), rooms[room_type])
+                if code is None else
+                (_add(stays[code], [undated[code]] * (last - first)),
+                 rooms.get(room_type, 0) + undated[code])
+                for room_type, code in codes.items()}
+
+    @transactional(shared=True)
+    def pickup(self, first: str = None, last: str = None, by: tuple = ()):
+        """
+        Returns the reservations booked per booking date, the booking pace
+        of the check-ins of a span of dates.
+
+        Parameters:
+        - first: The first check-in date (YYYY-MM-DD), None for no lower
+        bound.
+        - last: The day after the last check-in date (YYYY-MM-DD), None for
+        no upper bound.
+        - by: The fields to group by besides the booking date, among
+        'hotel' and 'room_type' (default is none).
+
+        Returns:
+        The list of rows in booking date order within each group, holding
+        the fields grouped by, the booking date (None for the reservations
+        without one), the reservations and room nights booked on it and the
+        reservations booked up to it, or a message if the dates are not
+        valid or the file was not found.
+
+        Raises:
+        ValueError: If a field cannot be grouped by.
+        """
+        _check_groups(by, PICKUP_GROUPS)
+        if self.store.load(missing_ok=True) is None:
+            return 'Hotel information not found, please verify'
+        try:
+            first, last = _window(first, last)
+        except ValueError:
+            return 'Invalid report dates'
+        rows = []
+        for (hotel_name, room_type), dates in self._pickup_totals(
+                by, first, last).items():
+            labels = _labels(by, hotel_name, room_type)
+            cumulative = 0
+            for booked in sorted(dates):
+                reservations, room_nights = dates[booked]
+                cumulative += reservations
+                rows.append({**labels, 'booked': datetime.date.fromordinal(
+                    booked).isoformat() if booked else None,
+                    'reservations': reservations,
+                    'room_nights': room_nights, 'cumulative': cumulative})
+        return rows
+
+    def _pickup_totals(self, by, first, last):
+        """
+        Adds up the bookings of the hotels per group and booking date.
+
+        Parameters:
+        - by: The fields to group by besides the booking date.
+        - first: The ordinal of the first check-in date, None for no lower
+        bound.
+        - last: The ordinal of the day after the last check-in date, None
+        for no upper bound.
+
+        Returns:
+        A dictionary from the (hotel name, room type) of each group, None
+        for the fields not grouped by, to a dictionary from the ordinal of
+        each booking date to a (reservations, room_nights) tuple.
+        """
+        table = self.store.reservation_table()
+        room_types = table.room_types.values if 'room_type' in by else None
+        totals = {}
+        for hotel, columns in table.hotel_columns():
+            for booked, room_type, count, nights in _bookings(
+                    columns, room_types, first, last):
+                dates = totals.setdefault(
+                    (hotel['name'] if 'hotel' in by else None, room_type), {})
+                total = dates.get(booked, (0, 0))
+                dates[booked] = (total[0] + count, total[1] + nights)
+        return totals
+
+    @transactional(shared=True)
+    def room_type_mix(self, first: str = None, last: str = None,
+                      by_hotel: bool = False):
+        """
+        Returns the number and share of the reservations of each room type.
+
+        Parameters:
+        - first: The first check-in date (YYYY-MM-DD), None for no lower
+        bound.
+        - last: The day after the last check-in date (YYYY-MM-DD), None for
+        no upper bound.
+        - by_hotel: Whether to compute the mix of each hotel apart (default
+        is the mix of every hotel together).
+
+        Returns:
+        The list of rows, holding the hotel if grouped by hotel, the room
+        type, its reservations and their share of the reservations, or a
+        message if the dates are not valid or the file was not found.
+        """
+        if self.store.load(missing_ok=True) is None:
+            return 'Hotel information not found, please verify'
+        try:
+            first, last = _window(first, last)
+        except ValueError:
+            return 'Invalid report dates'
+        table = self.store.reservation_table()
+        if by_hotel:
+            groups = [({'hotel': hotel['name']}, table.group_count(
+                'room_type', hotel, first=first, last=last))
+                for hotel, _ in table.hotel_columns()]
+        else:
+            groups = [({}, table.group_count('room_type', first=first,
+                                             last=last))]
+        rows = []
+        for labels, counts in groups:
+            total = sum(counts.values())
+            rows.extend({**labels, 'room_type': room_type,
+                         'reservations': count,
+                         'share': round(count / total, 4)}
+                        for room_type, count in counts.items())
+        return rows
+
+    @transactional(shared=True)
+    def summary(self, first: str, last: str):
+        """
+        Returns the occupancy per hotel and room type, and the pickup and
+        room type mix of the check-ins, over the same nights in one unit of
+        work.
+
+        Parameters:
+        - first: The first night of the report (YYYY-MM-DD).
+        - last: The day after the last night of the report (YYYY-MM-DD).
+
+        Returns:
+        A dictionary from 'occupancy', 'pickup' and 'room_type_mix' to the
+        rows of each report, or a message if the dates are not valid or the
+        file was not found.
+        """
+        occupancy = self.occupancy(first, last)
+        if isinstance(occupancy, str):
+            return occupancy
+        return {'occupancy': occupancy, 'pickup': self.pickup(first, last),
+                'room_type_mix': self.room_type_mix(first, last)}
+
+    def count(self, name: str, hotel_name: str = None, room_type: str = None,
+              date: str = None):
+        """
+        Returns a counter of the data, read from the aggregates of the store
+        without loading any hotel. The aggregates are switched on for the
+        store if they are not yet.
+
+        Parameters:
+        - name: The counter: 'hotels', 'customers' (per hotel), 'free_rooms'
+        (per hotel and room type) or 'reservations' (per hotel, room type
+        and check-in date).
+        - hotel_name: The name of the hotel, None for every hotel.
+        - room_type: The room type, None for every room type.
+        - date: The check-in date (YYYY-MM-DD), None for every date.
+
+        Returns:
+        The value of the counter, or a message if the file was not found.
+
+        Raises:
+        ValueError: If the counter is unknown or has no such field.
+        """
+        if self.store.aggregates is None:
+            self.store.use_aggregates()
+        try:
+            return self.store.aggregate(name, hotel_name, room_type, date)
+        except FileNotFoundError:
+            return 'Hotel information not found, please verify'
+
+
+def write_csv(rows: list, file):
+    """
+    Writes report rows to a CSV file, with a header holding their fields.
+
+    Parameters:
+    - rows: The rows, dictionaries holding the same fields.
+    - file: The file, opened in text mode with newline=''.
+    """
+    if rows:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_json(rows, file):
+    """
+    Writes report rows to a JSON file.
+
+    Parameters:
+    - rows: The rows, or the dictionary of reports returned by summary.
+    - file: The file, opened in text mode.
+    """
+    json.dump(rows, file, indent=2)
+    file.write('\n')
+
+
+def export(rows, filename: str):
+    """
+    Writes report rows to a file in the format of its extension.
+
+    Parameters:
+    - rows: The rows, or for a JSON file the dictionary of reports returned
+    by summary.
+    - filename: The name of the file, ending with .csv or .json.
+
+    Raises:
+    ValueError: If the extension is not .csv or .json.
+    """
+    if filename.endswith('.csv'):
+        writer = write_csv
+    elif filename.endswith('.json'):
+        writer = write_json
+    else:
+        raise ValueError(f'Cannot export a report to {filename}')
+    with open(filename, 'w', encoding='UTF-8', newline='') as file:
+        writer(rows, file)
+
+
+def main(arguments: list = None):
+    """
+    Prints a report as CSV, or exports it to a file, from the command line.
+
+    Parameters:
+    - arguments: The command line arguments, defaults to sys.argv.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('report', choices=('occupancy', 'pickup',
+                                           'room_type_mix', 'summary'))
+    parser.add_argument('filename', nargs='?', default='hotels.json')
+    parser.add_argument('--first', help='first night or check-in date')
+    parser.add_argument('--last', help='day after the last one')
+    parser.add_argument('--by', nargs='*', default=None,
+                        help='fields to group by')
+    parser.add_argument('--backend')
+    parser.add_argument('--serializer')
+    parser.add_argument('--output', help='CSV or JSON file to write')
+    options = parser.parse_args(arguments)
+    reports = Reports(options.filename, options.backend, options.serializer)
+    if options.report in ('occupancy', 'summary') and None in (
+            options.first, options.last):
+        parser.error(f'{options.report} needs --first and --last')
+    if options.report == 'summary':
+        rows = reports.summary(options.first, options.last)
+    elif options.report == 'room_type_mix':
+        rows = reports.room_type_mix(options.first, options.last,
+                                     by_hotel='hotel' in (options.by or ()))
+    else:
+        report = getattr(reports, options.report)
+        rows = report(options.first, options.last, **(
+            {} if options.by is None else {'by': tuple(options.by)}))
+    if isinstance(rows, str):
+        parser.exit(1, rows + '\n')
+    if options.output:
+        export(rows, options.output)
+    elif options.report == 'summary':
+        write_json(rows, sys.stdout)
+    else:
+        write_csv(rows, sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,19 +4,31 @@ Module for managing hotel reservations.
 Uses JSON file for data storage.
 
 Libraries:
+- datetime: Provides the booking date of the reservations.
 - categories.customer: Provides the Customer class for managing customer
 information.
+- utilities.data_store: Provides the transactional decorator running each
+operation as one unit of work.
+- utilities.instrumentation: Provides the opt-in recording of the calls.
+- utilities.inventory: Provides the conversion of stays to night ordinals.
 - utilities.json_data_handler: Provides the JSONDataHandler class for handling
 JSON data.
+- utilities.records: Provides the dictionary view of the slotted records.
 
 Classes:
 - Reservation: A class to represent hotel reservations and manage
 reservation-related operations.
 """
+import datetime
 from categories.customer import Customer
+from utilities.data_store import transactional
+from utilities.instrumentation import instrument
+from utilities.inventory import stay_nights
 from utilities.json_data_handler import JSONDataHandler
+from utilities.records import as_dict
 
 
+@instrument
 class Reservation(JSONDataHandler):
     """
     A class to represent hotel reservations and manage reservation-related
@@ -32,8 +44,13 @@ class Reservation(JSONDataHandler):
     specified hotel.
     - cancel_reservation: Cancels a reservation for a customer in a specified
     hotel.
+    - get_reservation: Returns the reservation with a specified ID.
+    - cancel_reservation_by_id: Cancels the reservation with a specified ID.
+    - create_reservations: Creates a batch of reservations.
+    - cancel_reservations: Cancels a batch of reservations.
     """
-    def __init__(self, hotel_filename='hotels.json'):
+    def __init__(self, hotel_filename='hotels.json', backend=None,
+                 serializer=None):
         """
         Initializes a Reservation object with the specified hotel data
         filename.
@@ -41,21 +58,32 @@ class Reservation(JSONDataHandler):
         Parameters:
         - hotel_filename (str): The filename for storing hotel data in JSON
         format. Defaults to 'hotels.json'.
+        - backend (str, optional): The name of the storage backend, 'json',
+        'sqlite' or 'sharded'. Defaults to the backend matching the file
+        extension.
+        - serializer (str, optional): The name of the serializer of the data
+        file. Defaults to the serializer matching the file extension.
         """
-        super().__init__(hotel_filename)
-        self.customer = Customer(hotel_filename)
+        super().__init__(hotel_filename, backend, serializer)
+        self.customer = Customer(hotel_filename, backend, serializer)
 
+    @transactional
     def create_reservation(self, hotel_name: str, customer_name: str,
-                           reservation_date: str, room_type: str = 'single'):
+                           reservation_date: str, room_type: str = 'single',
+                           check_out: str = None):
+        # pylint: disable=too-many-return-statements
         """
         Creates a new reservation for a customer in a specified hotel.
 
         Parameters:
         - hotel_name (str): The name of the hotel.
         - customer_name (str): The name of the customer making the reservation.
-        - reservation_date (str): The date of the reservation.
+        - reservation_date (str): The date of the reservation, the check-in
+        date of a stay (YYYY-MM-DD).
         - room_type (str, optional): The type of room to reserve. Defaults to
         'single'.
+        - check_out (str, optional): The check-out date of the stay. Without
+        it the room is held for every night.
 
         Returns:
         A string indicating the success of the reservation or a message if the
@@ -82,46 +110,56 @@ class Reservation(JSONDataHandler):
             return customer_info
 
         # Load hotel data
-        hotels_data = self.load_data()
-        # Iterate through each hotel in the data
-        for hotel_data in hotels_data:
-            # Check if the hotel name matches the specified hotel
-            if hotel_data['name'] == hotel_name:
-                # Check if the room type is available
-                if room_type in hotel_data['rooms']:
-                    # Check if there are available rooms
-                    if hotel_data['rooms'][room_type] > 0:
-                        # Create the reservation
-                        reservation_id = hotel_data.get('reservation_counter',
-                                                        0) + 1
-                        # Update the reservation counter
-                        hotel_data['reservation_counter'] = reservation_id
-                        # Decrement the number of available rooms
-                        hotel_data['rooms'][room_type] -= 1
-                        # Create the reservation
-                        reservation = {
-                            'id': reservation_id,
-                            'customer_id': customer_id,
-                            'customer_name': customer_name,
-                            'room_type': room_type,
-                            'date': reservation_date
-                        }
-                        # Add the reservation to the list of reservations
-                        hotel_data['reservations'].append(reservation)
-                        # Save the updated hotel data
-                        self.save_data(hotels_data)
-                        # Return a success message
-                        return (
-                            f'Reservation for {customer_name} created at '
-                            f'{hotel_name}'
-                        )
-                    # If no rooms are available, return an error message
-                    return f'No {room_type} rooms available'
-                # If the room type is not found, return an error message
-                return f'{room_type} room type not found in {hotel_name}'
+        hotels_data = self.store.load()
+        # Look up the hotel by name
+        hotel_data = self.store.find_hotel(hotel_name)
         # If the hotel is not found, return an error message
-        return f'Hotel {hotel_name} not found'
+        if hotel_data is None:
+            return f'Hotel {hotel_name} not found'
+        # If the room type is not found, return an error message
+        if room_type not in hotel_data['rooms']:
+            return f'{room_type} room type not found in {hotel_name}'
+        # Count the rooms free for the whole stay
+        if check_out is None:
+            available = hotel_data['rooms'][room_type]
+        else:
+            try:
+                nights = stay_nights(reservation_date, check_out)
+            except ValueError:
+                return 'Invalid reservation dates'
+            available = self.store.available_rooms(hotel_data, room_type,
+                                                   *nights)
+        # If no rooms are available, return an error message
+        if available <= 0:
+            return f'No {room_type} rooms available'
+        # Allocate a new reservation ID
+        reservation_id = self.store.allocate_id('reservation')
+        # Create the reservation
+        reservation = {
+            'id': reservation_id,
+            'customer_id': customer_id,
+            'customer_name': customer_name,
+            'room_type': room_type,
+            'date': reservation_date,
+            'booked': datetime.date.today().isoformat()
+        }
+        # Stays hold their nights in the calendar, other reservations take
+        # a room from the room count
+        if check_out is None:
+            self.store.adjust_rooms(hotel_data, room_type, -1)
+        else:
+            reservation['check_out'] = check_out
+        # Add the reservation to the list of reservations
+        self.store.add_reservation(hotel_data, reservation)
+        # Save the updated hotel data
+        self.store.save(hotels_data)
+        # Return a success message
+        return (
+            f'Reservation for {customer_name} created at '
+            f'{hotel_name}'
+        )
 
+    @transactional
     def cancel_reservation(self, hotel_name: str, customer_name: str):
         """
         Cancels a reservation for a customer in a specified hotel.
@@ -136,32 +174,109 @@ class Reservation(JSONDataHandler):
         the reservation, hotel, or customer was not found.
         """
         # Load hotel data
-        hotels_data = self.load_data()
-
-        # Iterate through each hotel in the data
-        for hotel_data in hotels_data:
-            if hotel_data['name'] == hotel_name:
-                # Check if the hotel is found, retrieve the list of customers
-                for reservation in hotel_data['reservations']:
-                    # Check if the customer name matches the specified customer
-                    if reservation['customer_name'] == customer_name:
-                        # If the customer is found, increment the number of
-                        # available rooms and remove the reservation
-                        room_type = reservation['room_type']
-                        # Increment the number of available rooms
-                        hotel_data['rooms'][room_type] += 1
-                        # Remove the reservation from the list of reservations
-                        hotel_data['reservations'].remove(reservation)
-                        # Save the updated hotel data
-                        self.save_data(hotels_data)
-                        # Return a success message
-                        return (
-                            f'Reservation for {customer_name} cancelled at '
-                            f'{hotel_name}'
-                            )
-                # If the reservation is not found, return an error message
-                return (
-                    f'No reservation found for {customer_name} in {hotel_name}'
-                    )
+        hotels_data = self.store.load()
+
+        # Look up the hotel by name
+        hotel_data = self.store.find_hotel(hotel_name)
         # If the hotel is not found, return an error message
-        return f'Hotel {hotel_name} not found'
+        if hotel_data is None:
+            return f'Hotel {hotel_name} not found'
+        # Look up the reservation by customer name
+        reservation = self.store.find_reservation(hotel_data, customer_name)
+        # If the reservation is not found, return an error message
+        if reservation is None:
+            return (
+                f'No reservation found for {customer_name} in {hotel_name}'
+                )
+        # Give back the room of a reservation without check-out date
+        if reservation.get('check_out') is None:
+            self.store.adjust_rooms(hotel_data, reservation['room_type'], 1)
+        # Remove the reservation from the list of reservations
+        self.store.remove_reservation(hotel_data, reservation)
+        # Save the updated hotel data
+        self.store.save(hotels_data)
+        # Return a success message
+        return (
+            f'Reservation for {customer_name} cancelled at '
+            f'{hotel_name}'
+            )
+
+    @transactional(shared=True)
+    def get_reservation(self, reservation_id: int):
+        """
+        Returns the reservation with the specified ID.
+
+        Parameters:
+        - reservation_id (int): The ID of the reservation.
+
+        Returns:
+        The reservation if found, otherwise None.
+        """
+        # Load hotel data, nothing is found if the file does not exist
+        if self.store.load(missing_ok=True) is None:
+            return None
+        # Look up the reservation by ID, returned as a dictionary
+        return as_dict(self.store.find_reservation_by_id(reservation_id)[1])
+
+    @transactional
+    def cancel_reservation_by_id(self, reservation_id: int):
+        """
+        Cancels the reservation with the specified ID, in whichever hotel it
+        was made.
+
+        Parameters:
+        - reservation_id (int): The ID of the reservation to cancel.
+
+        Returns:
+        A string indicating the success of the cancellation or a message if
+        the reservation was not found.
+        """
+        # Load hotel data
+        hotels_data = self.store.load()
+        # Look up the reservation and its hotel by ID
+        hotel_data, reservation = self.store.find_reservation_by_id(
+            reservation_id)
+        # If the reservation is not found, return an error message
+        if reservation is None:
+            return f'Reservation {reservation_id} not found'
+        # Give back the room of a reservation without check-out date
+        if reservation.get('check_out') is None:
+            self.store.adjust_rooms(hotel_data, reservation['room_type'], 1)
+        # Remove the reservation from the list of reservations
+        self.store.remove_reservation(hotel_data, reservation)
+        # Save the updated hotel data
+        self.store.save(hotels_data)
+        # Return a success message
+        return (
+            f'Reservation {reservation_id} cancelled at '
+            f"{hotel_data['name']}"
+            )
+
+    def create_reservations(self, reservations):
+        """
+        Creates a batch of reservations with one load and one save.
+
+        Parameters:
+        - reservations (iterable): The reservations to create, each a tuple of
+        the create_reservation arguments (hotel_name, customer_name,
+        reservation_date, and optionally room_type and check_out) or a
+        dictionary of them.
+
+        Returns:
+        A list with the create_reservation result of each reservation.
+        """
+        return self.run_batch(self.create_reservation, reservations)
+
+    def cancel_reservations(self, reservations):
+        """
+        Cancels a batch of reservations with one load and one save.
+
+        Parameters:
+        - reservations (iterable): The reservations to cancel, each a tuple of
+        the cancel_reservation arguments (hotel_name and customer_name) or a
+        dictionary of them.
+
+        Returns:
+        A list with the cancel_reservation result of each reservation.
+        """
+        return self.run_batch(self.cancel_reservation, reservations)
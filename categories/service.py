@@ -0,0 +1,323 @@
+"""
+Module for serving the hotel, customer and reservation operations from a
+long-running process.
+
+HotelService loads a data file once and keeps it, with its indexes, in the
+memory of the process, so each call skips the interpreter startup and the
+parse of the file that a new script pays. It answers JSON requests over HTTP
+on the loopback interface, with a bounded pool of worker threads, and every
+change is persisted through the DataStore of the file as it is by the
+classes themselves. Each request is a POST to /<class>/<method> with a JSON
+body holding the 'args' list and the 'kwargs' dictionary of the call, and
+the reply holds its 'result', or the 'error' type and 'message' of the
+exception it raised. Only the operations listed in OPERATIONS are served,
+not the raw loads and saves of the data file. categories.remote provides
+the client. Run it with:
+
+    python -m categories.service hotels.json --port 8765
+
+Listening on another interface requires a shared token, taken from the
+--token option or the HOTELS_SERVICE_TOKEN environment variable, which every
+request must then send in its Authorization header as 'Bearer <token>'.
+
+Libraries:
+- argparse: Provides the command line options.
+- concurrent.futures: Provides the pool of worker threads.
+- hmac: Provides the constant-time comparison of the tokens.
+- http.server: Provides the HTTP server and request handler.
+- ipaddress: Provides the check of the loopback addresses.
+- json: Provides the encoding of the requests and replies.
+- os: Provides the token from the environment.
+- signal: Provides the stop of the service on SIGTERM.
+- sys: Provides the exit on SIGTERM.
+- categories.customer: Provides the Customer class.
+- categories.hotel: Provides the Hotel class.
+- categories.reservation: Provides the Reservation class.
+
+Classes:
+- HotelService: The HTTP server of the operations of a data file.
+
+Functions:
+- main: Runs the service from the command line.
+"""
+import argparse
+import concurrent.futures
+import hmac
+import http.server
+import ipaddress
+import json
+import os
+import signal
+import sys
+from categories.customer import Customer
+from categories.hotel import Hotel
+from categories.reservation import Reservation
+
+# Address the service listens on by default
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# Number of worker threads by default
+DEFAULT_WORKERS = 8
+# Environment variable holding the shared token
+TOKEN_VARIABLE = 'HOTELS_SERVICE_TOKEN'
+# Classes served, by the name used in the request paths
+CLASSES = {'Hotel': Hotel, 'Customer': Customer, 'Reservation': Reservation}
+# Methods served for each class. The storage methods inherited from
+# JSONDataHandler are left out: load_data and save_data would read or
+# replace the whole file, transactions cannot span requests and run_batch
+# takes a bound method
+OPERATIONS = {
+    'Hotel': ('create_hotel', 'get_customer_id', 'delete_hotel',
+              'display_hotel_info', 'modify_hotel_info', 'reserve_room',
+              'cancel_reservation', 'room_availability',
+              'search_availability'),
+    'Customer': ('create_customer', 'delete_customer',
+                 'display_customer_info', 'modify_customer_info',
+                 'create_customers'),
+    'Reservation': ('create_reservation', 'cancel_reservation',
+                    'get_reservation', 'cancel_reservation_by_id',
+                    'create_reservations', 'cancel_reservations')}
+
+
+def _is_loopback(host: str):
+    """
+    Tells whether a host only accepts connections from the same machine.
+
+    Parameters:
+    - host: The host name or address.
+
+    Returns:
+    True for 'localhost' and the loopback addresses.
+    """
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class _RequestHandler(http.server.BaseHTTPRequestHandler):
+    """
+    A class to answer the requests of the service.
+    """
+    def do_POST(self):  # pylint: disable=invalid-name
+        """
+        Calls the operation named by the path and writes its reply.
+        """
+        if not self.server.authorized(self.headers.get('Authorization')):
+            self._reply(403, json.dumps({'error': 'PermissionError',
+                                         'message': 'Invalid service token'}))
+            return
+        try:
+            _, name, method = self.path.split('/')
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+            # Encode the reply here, so a result JSON cannot encode gets an
+            # error reply
+            body = json.dumps({'result': self.server.call(
+                name, method, request.get('args', []),
+                request.get('kwargs', {}))})
+            status = 200
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            body = json.dumps({'error': type(error).__name__,
+                               'message': str(error)})
+            status = 500
+        self._reply(status, body)
+
+    def _reply(self, status: int, body: str):
+        """
+        Writes a reply.
+
+        Parameters:
+        - status: The HTTP status of the reply.
+        - body: The reply, encoded as JSON.
+        """
+        body = body.encode('UTF-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """
+        Logs a request only if the service is verbose.
+        """
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class HotelService(http.server.HTTPServer):
+    """
+    A class to serve the operations of a data file over HTTP.
+
+    Attributes:
+    - handlers (dict): The Hotel, Customer and Reservation objects serving
+    the calls, by class name.
+    - store (DataStore): The store of the data file, kept loaded.
+    - executor (ThreadPoolExecutor): The pool handling the requests.
+    - verbose (bool): Whether the requests are logged.
+    - token (str): The token the requests must send, None if they are not
+    authenticated.
+
+    Methods:
+    - authorized: Tells whether a request sent the token.
+    - call: Calls an operation on the data file.
+    - process_request: Hands a request to the pool.
+    - server_close: Closes the socket and stops the pool.
+    """
+    # pylint: disable=too-many-arguments
+    def __init__(self, filename: str = 'hotels.json', address: tuple = None,
+                 backend: str = None, serializer: str = None, *,
+                 workers: int = DEFAULT_WORKERS, verbose: bool = False,
+                 token: str = None):
+        """
+        Initializes the service, binds its socket and loads the data file.
+
+        Parameters:
+        - filename: The filename of the hotel data. Defaults to
+        'hotels.json'.
+        - address: The (host, port) tuple to listen on, port 0 picking a free
+        port. Defaults to port 8765 of the loopback interface.
+        - backend: The name of the storage backend.
+        - serializer: The name of the serializer of the data file.
+        - workers: The number of worker threads.
+        - verbose: Log every request.
+        - token: The token the requests must send. Defaults to the
+        HOTELS_SERVICE_TOKEN environment variable, and is required unless
+        the service listens on the loopback interface.
+
+        Raises:
+        ValueError: If the service listens on another interface without a
+        token.
+        """
+        address = address or (DEFAULT_HOST, DEFAULT_PORT)
+        self.token = token or os.environ.get(TOKEN_VARIABLE) or None
+        if self.token is None and not _is_loopback(address[0]):
+            raise ValueError(f'A token is required to listen on {address[0]}')
+        super().__init__(address, _RequestHandler)
+        self.handlers = {name: cls(filename, backend, serializer)
+                         for name, cls in CLASSES.items()}
+        self.store = self.handlers['Hotel'].store
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='hotels-service')
+        self.verbose = verbose
+        # Keep the data hot from the first request on
+        self.store.load(missing_ok=True)
+
+    def authorized(self, header: str):
+        """
+        Tells whether a request sent the token of the service.
+
+        Parameters:
+        - header: The Authorization header of the request, None if missing.
+
+        Returns:
+        True if the service has no token or the header holds it.
+        """
+        if self.token is None:
+            return True
+        return hmac.compare_digest((header or '').encode('UTF-8'),
+                                   f'Bearer {self.token}'.encode('UTF-8'))
+
+    def call(self, name: str, method: str, args: list, kwargs: dict):
+        """
+        Calls an operation on the data file.
+
+        Parameters:
+        - name: The name of the class, 'Hotel', 'Customer' or 'Reservation'.
+        - method: The name of the method.
+        - args: The positional arguments of the call.
+        - kwargs: The keyword arguments of the call.
+
+        Returns:
+        The result of the method.
+
+        Raises:
+        AttributeError: If the operation is not served.
+        """
+        if method not in OPERATIONS.get(name, ()):
+            raise AttributeError(f'Unknown operation {name}.{method}')
+        return getattr(self.handlers[name], method)(*args, **kwargs)
+
+    def process_request(self, request, client_address):
+        """
+        Hands a request to the pool of worker threads.
+
+        Parameters:
+        - request: The socket of the request.
+        - client_address: The address of the client.
+        """
+        self.executor.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        """
+        Handles a request in a worker thread.
+
+        Parameters:
+        - request: The socket of the request.
+        - client_address: The address of the client.
+        """
+        try:
+            self.finish_request(request, client_address)
+        except Exception:  # pylint: disable=broad-exception-caught
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        """
+        Closes the socket and waits for the requests being handled.
+        """
+        super().server_close()
+        self.executor.shutdown()
+
+
+def _stop(*_):
+    """
+    Stops the service on SIGTERM.
+    """
+    sys.exit(0)
+
+
+def main(arguments: list = None):
+    """
+    Runs the service from the command line until it is interrupted.
+
+    Parameters:
+    - arguments: The command line arguments, defaults to sys.argv.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('filename', nargs='?', default='hotels.json')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--backend')
+    parser.add_argument('--serializer')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--verbose', action='store_true',
+                        help='log every request')
+    parser.add_argument('--token', help='token the requests must send, '
+                        f'defaults to the {TOKEN_VARIABLE} variable')
+    options = parser.parse_args(arguments)
+    try:
+        service = HotelService(options.filename,
+                               (options.host, options.port),
+                               options.backend, options.serializer,
+                               workers=options.workers,
+                               verbose=options.verbose, token=options.token)
+    except ValueError as error:
+        parser.error(str(error))
+    signal.signal(signal.SIGTERM, _stop)
+    print(f'Serving {service.store.filename} on '
+          f'http://{options.host}:{service.server_address[1]}')
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+""""
+This module contains the tests for the counters kept up to date on every
+write.
+"""
+import unittest
+from unittest import mock
+from categories.customer import Customer
+from categories.hotel import Hotel
+from categories.reports import Reports
+from utilities.aggregates import Aggregates
+from utilities.storage_backends import create_backend
+from tests.helpers import remove_data_files
+
+
+class TestAggregates(unittest.TestCase):
+    """
+    A class to test the counters against counts of the data.
+    """
+    filename = 'aggregates.json'
+
+    def setUp(self):
+        """
+        Sets up the test environment by creating two hotels with customers
+        and reservations in a new file.
+        """
+        self.hotel = Hotel(self.filename)
+        self.hotel.store.use_aggregates()
+        self.customer = Customer(self.filename)
+        self.reports = Reports(self.filename)
+        self.hotel.create_hotel('Marriot', 'Houston Texas',
+                                {'single': 5, 'double': 2})
+        self.hotel.create_hotel('Hilton', 'Austin Texas', {'double': 5})
+        self.customer.create_customer('Marriot', 'John Doe')
+        self.hotel.reserve_room('Marriot', 'Jane Doe', '2024-02-15')
+        self.hotel.reserve_room('Marriot', 'Bob Smith', '2024-02-15',
+                                check_out='2024-02-17')
+        self.hotel.reserve_room('Hilton', 'Jane Doe', '2024-02-16',
+                                'double', '2024-02-18')
+
+    def tearDown(self):
+        """
+        Cleans up the test environment by deleting the data file and its
+        sidecars.
+        """
+        self.hotel.store.invalidate()
+        remove_data_files(self.filename)
+
+    def check_counters(self):
+        """
+        Checks every counter against the counters computed from the data.
+        """
+        expected = Aggregates.compute(self.hotel.store.load())
+        for key, value in expected.items():
+            fields = (field or None for field in key[1:])
+            self.assertEqual(self.reports.count(key[0], *fields), value)
+
+    def test_counters(self):
+        """
+        Tests the counters after reservations, customers and hotels were
+        created.
+        """
+        self.assertEqual(self.reports.count('hotels'), 2)
+        self.assertEqual(self.reports.count('customers', 'Marriot'), 3)
+        self.assertEqual(self.reports.count('free_rooms', 'Marriot',
+                                            'single'), 4)
+        self.assertEqual(self.reports.count('free_rooms', room_type='double'),
+                         7)
+        self.assertEqual(self.reports.count('reservations',
+                                            date='2024-02-15'), 2)
+        self.assertEqual(self.reports.count('reservations', 'Ritz'), 0)
+        self.check_counters()
+
+    def test_updates(self):
+        """
+        Tests the counters after cancellations, deletions and a renamed
+        hotel.
+        """
+        self.hotel.cancel_reservation('Marriot', 'Jane Doe')
+        self.customer.delete_customer('Marriot', 'John Doe')
+        self.hotel.modify_hotel_info('Marriot', 'Ritz')
+        self.hotel.delete_hotel('Hilton')
+        self.assertEqual(self.reports.count('hotels'), 1)
+        self.assertEqual(self.reports.count('customers', 'Marriot'), 0)
+        self.assertEqual(self.reports.count('reservations', 'Ritz'), 1)
+        self.assertEqual(self.reports.count('free_rooms', 'Ritz', 'single'),
+                         5)
+        self.check_counters()
+
+    def test_reads_without_loading(self):
+        """
+        Tests that a counter is read without reading the data file.
+        """
+        store = self.hotel.store
+        store.invalidate()
+        with mock.patch.object(store.backend, 'read',
+                               side_effect=AssertionError):
+            self.assertEqual(self.reports.count('reservations', 'Marriot'),
+                             2)
+
+    def test_rebuilds_after_external_write(self):
+        """
+        Tests that the counters are rebuilt after the file was written by a
+        process not keeping them.
+        """
+        # A backend of its own, as another process would have
+        backend = create_backend(self.filename)
+        data, _ = backend.read()
+        data[0]['reservations'] = []
+        with self.hotel.store.lock.hold():
+            backend.write(data)
+        self.assertEqual(self.reports.count('reservations'), 1)
+        self.check_counters()
+
+    def test_pending_changes(self):
+        """
+        Tests that a transaction reads the counters with its own changes.
+        """
+        with self.hotel.transaction() as store:
+            self.hotel.reserve_room('Hilton', 'John Doe', '2024-03-01',
+                                    'double')
+            self.assertEqual(store.aggregate('reservations', 'Hilton'), 2)
+            self.assertEqual(store.aggregate('free_rooms', 'Hilton'), 4)
+        self.check_counters()
+
+    def test_invalid_counters(self):
+        """
+        Tests that unknown counters and fields raise ValueError and that a
+        store without aggregates raises RuntimeError.
+        """
+        with self.assertRaises(ValueError):
+            self.reports.count('rooms')
+        with self.assertRaises(ValueError):
+            self.reports.count('hotels', 'Marriot')
+        with self.assertRaises(RuntimeError):
+            Hotel('other.json').store.aggregate('hotels')
+
+
+class TestSQLiteAggregates(TestAggregates):
+    """
+    A class to test the counters of an SQLite database.
+    """
+    filename = 'aggregates.db'
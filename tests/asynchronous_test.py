@@ -0,0 +1,102 @@
+""""
+This module contains the tests for the asyncio API of the categories.
+"""
+import unittest
+import asyncio
+import concurrent.futures
+import inspect
+from unittest import mock
+from categories.asynchronous import (AsyncCustomer, AsyncHotel,
+                                     AsyncReservation, default_executor)
+from categories.customer import Customer
+from categories.hotel import Hotel
+from categories.reservation import Reservation
+from tests.helpers import remove_data_files
+
+
+class TestAsyncAPI(unittest.TestCase):
+    """
+    A class to test the coroutine versions of the operations.
+    """
+    def setUp(self):
+        """
+        Sets up the test environment by creating async objects on a new file
+        with a one worker pool.
+        """
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.hotel = AsyncHotel('async.json', 'json', executor=self.executor)
+        self.customer = AsyncCustomer('async.json', executor=self.executor)
+        self.reservation = AsyncReservation('async.json',
+                                            executor=self.executor)
+
+    def tearDown(self):
+        """
+        Cleans up the test environment by stopping the pool and deleting the
+        JSON file and its sidecars.
+        """
+        self.executor.shutdown()
+        self.hotel.store.invalidate()
+        remove_data_files('async.json')
+
+    def test_every_method_has_a_coroutine(self):
+        """
+        Tests that every public method of the synchronous classes has a
+        coroutine version with the same signature.
+        """
+        for async_class, sync_class in ((AsyncHotel, Hotel),
+                                        (AsyncCustomer, Customer),
+                                        (AsyncReservation, Reservation)):
+            for name, method in inspect.getmembers(sync_class,
+                                                   inspect.isfunction):
+                if name.startswith('_') or name == 'transaction':
+                    continue
+                coroutine = getattr(async_class, name)
+                self.assertTrue(inspect.iscoroutinefunction(coroutine), name)
+                self.assertEqual(inspect.signature(coroutine),
+                                 inspect.signature(method))
+
+    def test_operations(self):
+        """
+        Tests that the coroutines return the results of the synchronous
+        methods.
+        """
+        async def book():
+            await self.hotel.create_hotel('Marriot', 'Houston Texas',
+                                          {'single': 2})
+            await self.customer.create_customer('Marriot', 'John Doe')
+            created = await self.reservation.create_reservation(
+                'Marriot', 'John Doe', '2024-02-15')
+            rooms = await self.hotel.room_availability(
+                'Marriot', '2024-02-15', '2024-02-16')
+            return created, rooms
+        created, rooms = asyncio.run(book())
+        self.assertEqual(created, 'Reservation for John Doe created at '
+                                  'Marriot')
+        self.assertEqual(rooms, 1)
+
+    def test_concurrent_reads_share_a_load(self):
+        """
+        Tests that reads awaited together on a cold store parse the file
+        once.
+        """
+        Hotel('async.json').create_hotel('Marriot', 'Houston Texas',
+                                         {'single': 2})
+        self.hotel.store.invalidate()
+        backend = self.hotel.store.backend
+
+        async def read():
+            return await asyncio.gather(*(
+                self.hotel.display_hotel_info('Marriot') for _ in range(10)))
+        with mock.patch.object(backend, 'read', wraps=backend.read) as load:
+            hotels = asyncio.run(read())
+        self.assertEqual(load.call_count, 1)
+        self.assertEqual({hotel['name'] for hotel in hotels}, {'Marriot'})
+
+    def test_default_executor_is_bounded(self):
+        """
+        Tests that the async objects share one bounded pool by default.
+        """
+        hotel = AsyncHotel('async.json')
+        self.assertIs(hotel.executor, default_executor())
+        self.assertIsInstance(hotel.executor,
+                              concurrent.futures.ThreadPoolExecutor)
@@ -0,0 +1,81 @@
+""""
+This module contains the tests for the cross-hotel availability search.
+"""
+import unittest
+from unittest import mock
+from categories.hotel import Hotel
+from utilities import availability_search
+from tests.helpers import remove_data_files
+
+
+class TestAvailabilitySearch(unittest.TestCase):
+    """
+    A class to test searching availability across hotels.
+    """
+    def setUp(self):
+        """
+        Sets up the test environment by creating three hotels with stays in
+        a new file.
+        """
+        self.hotel = Hotel('search.json')
+        self.hotel.create_hotel('Marriot', 'Houston Texas',
+                                {'single': 1, 'double': 1})
+        self.hotel.create_hotel('Hilton', 'Austin Texas', {'double': 2})
+        self.hotel.create_hotel('Hyatt', 'Dallas Texas', {'single': 3})
+        self.hotel.reserve_room('Marriot', 'John Doe', '2024-02-03',
+                                'double', '2024-02-05')
+        self.hotel.reserve_room('Hilton', 'Jane Doe', '2024-02-06',
+                                'double', '2024-02-08')
+
+    def tearDown(self):
+        """
+        Cleans up the test environment by deleting the JSON file and its
+        sidecars.
+        """
+        remove_data_files('search.json')
+
+    def check_search(self):
+        """
+        Checks range queries, then their results after bookings,
+        cancellations and new hotels.
+        """
+        self.assertEqual(self.hotel.search_availability(
+            '2024-02-03', '2024-02-07', 'double'), ['Hilton'])
+        self.assertEqual(self.hotel.search_availability(
+            '2024-02-05', '2024-02-07', 'double'), ['Marriot', 'Hilton'])
+        self.assertEqual(self.hotel.search_availability(
+            '2024-02-06', '2024-02-07', 'double', rooms=2), [])
+        self.assertEqual(self.hotel.search_availability(
+            '2024-01-01', '2024-01-02', 'suite'), [])
+        self.hotel.cancel_reservation('Marriot', 'John Doe')
+        self.hotel.reserve_room('Hyatt', 'Bob Smith', '2024-02-03',
+                                'single', '2024-03-01')
+        self.hotel.reserve_room('Hyatt', 'Bob Smith', '2024-02-04')
+        self.assertEqual(self.hotel.search_availability(
+            '2024-02-03', '2024-02-07', 'double'), ['Marriot', 'Hilton'])
+        self.assertEqual(self.hotel.search_availability(
+            '2024-02-10', '2024-02-11', 'single', rooms=2), [])
+        self.hotel.create_hotel('Westin', 'Austin Texas', {'single': 5})
+        self.assertEqual(self.hotel.search_availability(
+            '2024-02-10', '2024-02-11', 'single', rooms=2), ['Westin'])
+        self.assertEqual(self.hotel.search_availability(
+            '2024-02-10', '2024-02-09'), 'Invalid reservation dates')
+
+    def test_search(self):
+        """
+        Tests the search with the default matrix.
+        """
+        self.check_search()
+
+    def test_search_without_numpy(self):
+        """
+        Tests the search with the pure-Python fallback.
+        """
+        with mock.patch.object(availability_search, 'np', None):
+            self.hotel.store.invalidate()
+            self.check_search()
+        self.hotel.store.invalidate()
+
+
+if __name__ == '__main__':
+    unittest.main()
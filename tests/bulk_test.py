@@ -0,0 +1,221 @@
+""""
+This module contains the tests for the streaming bulk import and export.
+"""
+import unittest
+import io
+import os
+from unittest import mock
+from benchmarks.data_generator import generate_hotels
+from categories.bulk import Bulk, main
+from tests.helpers import remove_data_files
+
+KINDS = ('hotels', 'customers', 'reservations')
+
+
+def without_ids(data: list):
+    """
+    Returns the hotel data without the IDs allocated by the store.
+
+    Parameters:
+    - data: The hotel data.
+
+    Returns:
+    The list of hotels, with customers and reservations without IDs.
+    """
+    return [dict(hotel, customers=[
+        {'customer_name': customer['customer_name']}
+        for customer in hotel['customers']], reservations=[
+            {key: value for key, value in reservation.items()
+             if key not in ('id', 'customer_id')}
+            for reservation in hotel['reservations']])
+            for hotel in data]
+
+
+class TestBulk(unittest.TestCase):
+    """
+    A class to test exporting a data file and importing it into another.
+    """
+    target = 'bulk_target.json'
+
+    def setUp(self):
+        """
+        Sets up the test environment by writing generated hotel data to a
+        new file.
+        """
+        self.data = generate_hotels(hotels=3, customers=4, reservations=20)
+        self.source = Bulk('bulk_source.json')
+        self.source.save_data(self.data)
+        self.bulk = Bulk(self.target)
+        self.files = []
+
+    def tearDown(self):
+        """
+        Cleans up the test environment by deleting the data files, their
+        sidecars and the exported files.
+        """
+        self.source.store.invalidate()
+        self.bulk.store.invalidate()
+        remove_data_files('bulk_source.json', self.target)
+        for filename in ['bulk.csv'] + self.files:
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def round_trip(self, extension: str, chunk_size: int = 7):
+        """
+        Exports every kind of row of the source and imports them into the
+        target.
+
+        Parameters:
+        - extension: The format of the files, '.csv' or '.jsonl'.
+        - chunk_size: The number of rows imported at a time.
+        """
+        for kind in KINDS:
+            filename = 'bulk_' + kind + extension
+            self.files.append(filename)
+            self.assertEqual(self.source.export_file(kind, filename),
+                             3 if kind == 'hotels' else 3 * (
+                                 4 if kind == 'customers' else 20))
+            self.assertEqual(self.bulk.import_file(kind, filename,
+                                                   chunk_size),
+                             {'imported': 3 if kind == 'hotels' else 3 * (
+                                 4 if kind == 'customers' else 20),
+                              'rejected': 0, 'errors': []})
+        imported = self.bulk.load_data()
+        self.assertEqual(without_ids(imported), without_ids(self.data))
+        for hotel in imported:
+            customers = {customer['customer_name']: customer['customer_id']
+                         for customer in hotel['customers']}
+            for reservation in hotel['reservations']:
+                self.assertEqual(reservation['customer_id'],
+                                 customers[reservation['customer_name']])
+
+    def test_csv(self):
+        """
+        Tests exporting and importing CSV files.
+        """
+        self.round_trip('.csv')
+
+    def test_json_lines(self):
+        """
+        Tests exporting and importing JSON Lines files.
+        """
+        self.round_trip('.jsonl')
+
+    def test_one_write_without_incremental_backend(self):
+        """
+        Tests that the data file is written once per import.
+        """
+        with mock.patch.object(self.bulk.store.backend, 'write',
+                               wraps=self.bulk.store.backend.write) as write:
+            self.round_trip('.jsonl', chunk_size=5)
+        self.assertEqual(write.call_count, 3)
+
+    def test_one_write_per_chunk(self):
+        """
+        Tests that a journal receives one write per chunk.
+        """
+        # The store of a file is shared, keep journal mode to this test
+        self.target = 'bulk_journal.json'
+        self.bulk = Bulk(self.target)
+        self.bulk.store.use_journal()
+        with mock.patch.object(self.bulk.store.backend, 'append',
+                               wraps=self.bulk.store.backend.append) \
+                as append:
+            self.round_trip('.csv', chunk_size=25)
+        # The hotels create the file, then one chunk of customers and three
+        # of reservations are appended
+        self.assertEqual(append.call_count, 4)
+
+    def test_invalid_rows(self):
+        """
+        Tests that invalid rows are rejected with their line numbers and
+        the valid ones imported.
+        """
+        with open('bulk.csv', 'w', encoding='UTF-8') as file:
+            file.write('hotel_id,name,location,rooms\n'
+                       '1,Marriot,Houston Texas,"{""single"": 5}"\n'
+                       ',Hilton,,"{""single"": 5}"\n'
+                       'x,Hyatt,Austin Texas,"{""single"": 5}"\n'
+                       ',Ritz,Dallas Texas,"{""single"": -1}"\n'
+                       ',Marriot,Houston Texas,{}\n')
+        self.assertEqual(self.bulk.import_file('hotels', 'bulk.csv'), {
+            'imported': 1, 'rejected': 4, 'errors': [
+                (3, 'Missing location'), (4, 'Invalid hotel_id'),
+                (5, 'Invalid rooms'), (6, 'Hotel Marriot already exists')]})
+        self.files.append('bulk.jsonl')
+        with open('bulk.jsonl', 'w', encoding='UTF-8') as file:
+            file.write('{"hotel": "Marriot", "customer_name": "John Doe",'
+                       ' "room_type": "single", "date": "2024-02-15"}\n'
+                       '\n'
+                       '{"hotel": "Hilton", "customer_name": "Jane Doe",'
+                       ' "room_type": "single", "date": "2024-02-15"}\n'
+                       '{"hotel": "Marriot", "customer_name": "Jane Doe",'
+                       ' "room_type": "double", "date": "2024-02-15"}\n'
+                       '{"hotel": "Marriot", "customer_name": "Jane Doe",'
+                       ' "room_type": "single", "date": "2024-02-15",'
+                       ' "check_out": "2024-02-15"}\n'
+                       '{"hotel": "Marriot", "customer_name": "Jane Doe",'
+                       ' "room_type": "single", "date": "2024-02-30"}\n'
+                       '[]\n'
+                       '{"hotel": "Marriot"\n')
+        self.assertEqual(self.bulk.import_file('reservations', 'bulk.jsonl'),
+                         {'imported': 1, 'rejected': 6, 'errors': [
+                             (3, 'Hotel Hilton not found'),
+                             (4, 'double room type not found'),
+                             (5, 'Invalid reservation dates'),
+                             (6, 'Invalid date'), (7, 'Invalid row'),
+                             (8, 'Invalid row')]})
+        hotel = self.bulk.load_data()[0]
+        self.assertEqual([customer['customer_name'] for customer
+                          in hotel['customers']], ['John Doe'])
+        self.assertEqual(hotel['reservations'][0]['customer_id'],
+                         hotel['customers'][0]['customer_id'])
+
+    def test_unknown_requests(self):
+        """
+        Tests unknown kinds and extensions, and importing customers without
+        a data file.
+        """
+        with self.assertRaises(ValueError):
+            self.bulk.import_file('rooms', 'bulk.csv')
+        with self.assertRaises(ValueError):
+            self.source.export_file('hotels', 'bulk.txt')
+        self.source.export_file('customers', 'bulk.csv')
+        self.assertEqual(self.bulk.import_file('customers', 'bulk.csv'),
+                         'Hotel information not found, please verify')
+        self.assertFalse(os.path.exists(self.target))
+
+    def test_command_line(self):
+        """
+        Tests exporting and importing from the command line.
+        """
+        self.files.append('bulk_hotels.jsonl')
+        with mock.patch('sys.stdout', new_callable=io.StringIO) as output:
+            main(['export', 'hotels', 'bulk_hotels.jsonl',
+                  'bulk_source.json'])
+            main(['import', 'hotels', 'bulk_hotels.jsonl', self.target])
+        self.assertEqual(output.getvalue().splitlines(), [
+            '3 hotels exported', '3 hotels imported, 0 rejected'])
+
+
+class TestSQLiteBulk(TestBulk):
+    """
+    A class to test importing into an SQLite database.
+    """
+    target = 'bulk_target.db'
+
+    def test_one_write_without_incremental_backend(self):
+        """
+        Tests that the database is written once per chunk instead.
+        """
+        with mock.patch.object(self.bulk.store.backend, 'append',
+                               wraps=self.bulk.store.backend.append) \
+                as append:
+            self.round_trip('.jsonl', chunk_size=25)
+        self.assertEqual(append.call_count, 4)
+
+    def test_one_write_per_chunk(self):
+        """
+        Tests that the journal is not used by the database.
+        """
+        self.assertTrue(self.bulk.store.backend.incremental)
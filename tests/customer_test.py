@@ -2,9 +2,11 @@
 This module contains the tests for the Customer class.
 """
 import unittest
-import os
+import json
+from unittest import mock
 from categories.hotel import Hotel
 from categories.customer import Customer
+from tests.helpers import remove_data_files
 
 
 class TestCustomer(unittest.TestCase):
@@ -32,10 +34,10 @@ class TestCustomer(unittest.TestCase):
     @classmethod
     def tearDownClass(cls):
         """
-        Cleans up the test environment by deleting the JSON file if it exists.
+        Cleans up the test environment by deleting the JSON file and its
+        sidecars if they exist.
         """
-        if os.path.exists('hotels.json'):
-            os.remove('hotels.json')
+        remove_data_files('hotels.json')
 
     def setUp(self):
         """
@@ -113,3 +115,106 @@ class TestCustomer(unittest.TestCase):
         self.assertEqual(self.customer.modify_customer_info(
             'Best Western', 'Juan Perez', 'John Smith'),
             'Customer Juan Perez not found in Best Western')
+
+
+class TestCustomerBatch(unittest.TestCase):
+    """
+    A class to test creating customers in batches.
+    """
+    def setUp(self):
+        """
+        Sets up the test environment by creating a hotel in a new file.
+        """
+        Hotel('batch.json', 'json').create_hotel(
+            'Best Western',
+            'Houston, Texas',
+            {'single': 2, 'double': 1,
+             'suite': 3})
+        self.customer = Customer('batch.json')
+
+    def tearDown(self):
+        """
+        Cleans up the test environment by deleting the JSON file and its
+        sidecars.
+        """
+        remove_data_files('batch.json')
+
+    def test_create_customers(self):
+        """
+        Tests creating a batch of customers with one write.
+        """
+        backend = self.customer.store.backend
+        with mock.patch.object(backend, 'write',
+                               wraps=backend.write) as write:
+            results = self.customer.create_customers([
+                ('Best Western', 'John Doe'),
+                {'hotel_name': 'Best Western', 'customer_name': 'Jane Doe'},
+                ('Hilton', 'Alice Smith')])
+        self.assertEqual(write.call_count, 1)
+        self.assertEqual(results, [
+            'Customer John Doe created for Best Western',
+            'Customer Jane Doe created for Best Western',
+            'Customer Alice Smith not created. Hotel Hilton not found'])
+        self.assertEqual(self.customer.display_customer_info(
+            'Best Western', 'Jane Doe')['customer_id'], 2)
+
+
+class TestCustomerDuplicateHotels(unittest.TestCase):
+    """
+    A class to test customers of hotels sharing a name.
+    """
+    def setUp(self):
+        """
+        Sets up the test environment by writing two hotels with the same
+        name, the customer belonging to the second one.
+        """
+        with open('duplicates.json', 'w', encoding='UTF-8') as file:
+            json.dump([
+                {'hotel_id': 1, 'name': 'Best Western',
+                 'location': 'Houston, Texas', 'rooms': {'single': 2},
+                 'reservations': [], 'customers': []},
+                {'hotel_id': 2, 'name': 'Best Western',
+                 'location': 'Austin, Texas', 'rooms': {'single': 2},
+                 'reservations': [],
+                 'customers': [{'customer_id': 1,
+                                'customer_name': 'John Doe'}]}], file)
+        self.customer = Customer('duplicates.json')
+        self.customer.store.invalidate()
+
+    def tearDown(self):
+        """
+        Cleans up the test environment by deleting the JSON file and its
+        sidecars.
+        """
+        remove_data_files('duplicates.json')
+
+    def test_display_searches_every_hotel(self):
+        """
+        Tests displaying a customer of the second hotel with the name, read
+        alone and from the cache.
+        """
+        self.assertEqual(self.customer.display_customer_info(
+            'Best Western', 'John Doe')['customer_id'], 1)
+        self.assertEqual(self.customer.display_customer_info(
+            'Best Western', 'John Doe')['customer_id'], 1)
+
+    def test_modify_searches_every_hotel(self):
+        """
+        Tests renaming a customer of the second hotel with the name.
+        """
+        self.assertEqual(self.customer.modify_customer_info(
+            'Best Western', 'John Doe', 'John Smith'),
+            'Customer name updated from John Doe to John Smith')
+        with open('duplicates.json', 'r', encoding='UTF-8') as file:
+            hotels = json.load(file)
+        self.assertEqual(hotels[1]['customers'][0]['customer_name'],
+                         'John Smith')
+
+    def test_delete_searches_every_hotel(self):
+        """
+        Tests deleting a customer of the second hotel with the name.
+        """
+        self.assertEqual(self.customer.delete_customer(
+            'Best Western', 'John Doe'), 'Customer John Doe deleted')
+        with open('duplicates.json', 'r', encoding='UTF-8') as file:
+            self.assertEqual(json.load(file)[1]['customers'], [])
@@ -0,0 +1,307 @@
+""""
+This module contains the tests for the DataStore class.
+"""
+import unittest
+import json
+import multiprocessing
+import os
+from unittest import mock
+from categories.hotel import Hotel
+from categories.customer import Customer
+from categories.reservation import Reservation
+from utilities.data_store import DataStore
+from tests.helpers import create_customers, remove_data_files
+
+
+class TestDataStore(unittest.TestCase):
+    """
+    A class to test the shared, mtime-validated data store of a JSON file.
+    """
+    def setUp(self):
+        """
+        Sets up the test environment by creating a hotel in a new file.
+        """
+        self.hotel = Hotel('store.json', 'json')
+        self.hotel.create_hotel('Marriot', 'Houston Texas',
+                                {'single': 4, 'double': 5, 'suite': 2})
+
+    def tearDown(self):
+        """
+        Cleans up the test environment by deleting the JSON file and its
+        sidecars.
+        """
+        remove_data_files('store.json')
+
+    def test_store_is_shared(self):
+        """
+        Tests that objects using the same file share one store.
+        """
+        self.assertIs(Customer('store.json').hotel.store, self.hotel.store)
+        self.assertIs(DataStore.for_file('store.json'), self.hotel.store)
+
+    def test_load_is_cached(self):
+        """
+        Tests that loading an unchanged file returns the cached data.
+        """
+        self.assertIs(self.hotel.store.load(), self.hotel.store.load())
+
+    def test_reads_return_copies(self):
+        """
+        Tests that changing the data returned by the public reads does not
+        change the cached data.
+        """
+        self.hotel.reserve_room('Marriot', 'John Doe', '2024-02-15')
+        expected = json.loads(json.dumps(self.hotel.store.load()))
+        hotel = self.hotel.display_hotel_info('Marriot')
+        hotel['rooms']['single'] = 0
+        hotel['reservations'].clear()
+        Customer('store.json').display_customer_info(
+            'Marriot', 'John Doe')['customer_name'] = 'Jane Doe'
+        Reservation('store.json').get_reservation(1)['room_type'] = 'suite'
+        self.hotel.load_data()[0]['name'] = 'Hilton'
+        self.assertEqual(self.hotel.store.load(), expected)
+
+    def test_rejected_data_is_not_cached(self):
+        """
+        Tests that saving data the index rejects keeps the cached data.
+        """
+        with self.assertRaises(KeyError):
+            self.hotel.save_data([{'name': 'Hilton'}])
+        self.assertEqual(self.hotel.store.load()[0]['name'], 'Marriot')
+        self.assertEqual(self.hotel.reserve_room('Marriot', 'John Doe',
+                                                 '2024-02-15'),
+                         'single room reserved for John Doe')
+
+    def test_reload_on_external_change(self):
+        """
+        Tests that the store parses the file again when it is changed by
+        another writer.
+        """
+        self.hotel.store.load()
+        with open('store.json', 'w', encoding='UTF-8') as file:
+            json.dump([], file)
+        self.assertEqual(self.hotel.display_hotel_info('Marriot'),
+                         'Hotel not found')
+
+    def test_missing_file(self):
+        """
+        Tests that a removed file is no longer served from the cache.
+        """
+        self.hotel.store.load()
+        os.remove('store.json')
+        self.assertIsNone(self.hotel.store.load(missing_ok=True))
+        self.assertEqual(self.hotel.display_hotel_info('Marriot'),
+                         'Hotel information file not found, please verify')
+
+
+class TestDataStoreJournal(unittest.TestCase):
+    """
+    A class to test the append-only journal mode of the data store.
+    """
+    def setUp(self):
+        """
+        Sets up the test environment by creating a hotel in a new file and
+        switching its store to journal mode.
+        """
+        self.hotel = Hotel('journal.json', 'json')
+        self.hotel.create_hotel('Marriot', 'Houston Texas',
+                                {'single': 4, 'double': 5, 'suite': 2})
+        self.hotel.store.use_journal(threshold=1024 * 1024)
+
+    def tearDown(self):
+        """
+        Cleans up the test environment by deleting the data file and its
+        sidecars, and switching the store back to full rewrites.
+        """
+        self.hotel.store.backend.journal_threshold = None
+        remove_data_files('journal.json')
+
+    def test_changes_are_appended(self):
+        """
+        Tests that changes go to the journal and survive a reload.
+        """
+        size = os.path.getsize('journal.json')
+        self.hotel.reserve_room('Marriot', 'John Doe', '2024-02-15')
+        Customer('journal.json').modify_customer_info(
+            'Marriot', 'John Doe', 'John Smith')
+        self.assertEqual(os.path.getsize('journal.json'), size)
+        self.assertTrue(os.path.exists('journal.json.journal'))
+        expected = json.loads(json.dumps(self.hotel.store.data))
+        self.hotel.store.invalidate()
+        self.assertEqual(self.hotel.store.load(), expected)
+        self.assertEqual(
+            Customer('journal.json').display_customer_info(
+                'Marriot', 'John Smith')['customer_id'], 1)
+
+    def test_compaction(self):
+        """
+        Tests that the journal is folded into the data file once it passes
+        the threshold.
+        """
+        self.hotel.store.use_journal(threshold=1)
+        self.hotel.reserve_room('Marriot', 'John Doe', '2024-02-15')
+        self.assertFalse(os.path.exists('journal.json.journal'))
+        with open('journal.json', 'r', encoding='UTF-8') as file:
+            self.assertEqual(json.load(file)[0]['rooms']['single'], 3)
+
+    def test_torn_write_is_ignored(self):
+        """
+        Tests that a partially written last line of the journal is ignored.
+        """
+        self.hotel.delete_hotel('Marriot')
+        with open('journal.json.journal', 'a', encoding='UTF-8') as file:
+            file.write('{"op": "add_hot')
+        self.hotel.store.invalidate()
+        self.assertEqual(self.hotel.store.load(), [])
+        self.hotel.create_hotel('Hilton', 'Austin Texas', {'single': 1})
+        self.hotel.store.invalidate()
+        self.assertEqual(self.hotel.store.load()[0]['name'], 'Hilton')
+
+    def test_reads_do_not_repair(self):
+        """
+        Tests that loads, holding the shared lock, leave a torn or stale
+        journal as it is, and that the next append repairs it.
+        """
+        self.hotel.delete_hotel('Marriot')
+        with open('journal.json.journal', 'a', encoding='UTF-8') as file:
+            file.write('{"op": "add_hot')
+        size = os.path.getsize('journal.json.journal')
+        self.hotel.store.invalidate()
+        self.assertEqual(self.hotel.store.load(), [])
+        self.assertEqual(os.path.getsize('journal.json.journal'), size)
+        # A journal of another snapshot is ignored, then replaced
+        with open('journal.json.journal', 'w', encoding='UTF-8') as file:
+            file.write('{"op": "base", "size": 0, "mtime_ns": 0}\n'
+                       '{"op": "remove_hotel", "h": 0}\n')
+        self.hotel.store.invalidate()
+        self.assertEqual(self.hotel.store.load()[0]['name'], 'Marriot')
+        self.assertTrue(os.path.exists('journal.json.journal'))
+        self.hotel.create_hotel('Hilton', 'Austin Texas', {'single': 1})
+        self.hotel.store.invalidate()
+        self.assertEqual([hotel['name'] for hotel in self.hotel.store.load()],
+                         ['Marriot', 'Hilton'])
+
+    def test_corrupt_header_is_stale(self):
+        """
+        Tests that a journal whose complete header is not valid JSON is
+        ignored by loads and replaced by the next append.
+        """
+        with open('journal.json.journal', 'w', encoding='UTF-8') as file:
+            file.write('not json\n{"op": "remove_hotel", "h": 0}\n')
+        self.hotel.store.invalidate()
+        self.assertEqual(self.hotel.store.load()[0]['name'], 'Marriot')
+        self.hotel.create_hotel('Hilton', 'Austin Texas', {'single': 1})
+        self.hotel.store.invalidate()
+        self.assertEqual([hotel['name'] for hotel in self.hotel.store.load()],
+                         ['Marriot', 'Hilton'])
+
+
+class TestDataStoreTransaction(unittest.TestCase):
+    """
+    A class to test the unit of work of the data store.
+    """
+    def setUp(self):
+        """
+        Sets up the test environment by creating a hotel with a customer in a
+        new file.
+        """
+        self.hotel = Hotel('transaction.json', 'json')
+        self.hotel.create_hotel('Marriot', 'Houston Texas',
+                                {'single': 4, 'double': 5, 'suite': 2})
+        Customer('transaction.json').create_customer('Marriot', 'John Doe')
+
+    def tearDown(self):
+        """
+        Cleans up the test environment by deleting the JSON file and its
+        sidecars.
+        """
+        remove_data_files('transaction.json')
+
+    def test_reserve_room_keeps_new_customer(self):
+        """
+        Tests that reserving a room for a new customer writes the file once
+        and keeps both the customer and the reservation.
+        """
+        backend = self.hotel.store.backend
+        with mock.patch.object(backend, 'write',
+                               wraps=backend.write) as write:
+            self.hotel.reserve_room('Marriot', 'Jane Doe', '2024-02-15')
+        self.assertEqual(write.call_count, 1)
+        with open('transaction.json', 'r', encoding='UTF-8') as file:
+            hotel = json.load(file)[0]
+        self.assertEqual([customer['customer_name']
+                          for customer in hotel['customers']],
+                         ['John Doe', 'Jane Doe'])
+        self.assertEqual(len(hotel['reservations']), 1)
+
+    def test_create_reservation_reads_once(self):
+        """
+        Tests that creating a reservation checks the file once and writes it
+        once.
+        """
+        backend = self.hotel.store.backend
+        with mock.patch.object(backend, 'signature',
+                               wraps=backend.signature) as stat, \
+                mock.patch.object(backend, 'write',
+                                  wraps=backend.write) as write:
+            Reservation('transaction.json').create_reservation(
+                'Marriot', 'John Doe', '2024-02-15')
+        # One validation when the transaction starts, one after the write
+        self.assertEqual(stat.call_count, 2)
+        self.assertEqual(write.call_count, 1)
+
+    def test_rollback_on_error(self):
+        """
+        Tests that changes are discarded when the transaction fails.
+        """
+        with self.assertRaises(RuntimeError):
+            with self.hotel.store.transaction():
+                self.hotel.create_hotel('Hilton', 'Austin Texas',
+                                        {'single': 1})
+                raise RuntimeError('failed')
+        self.assertEqual(self.hotel.display_hotel_info('Hilton'),
+                         'Hotel not found')
+
+
+@unittest.skipUnless('fork' in multiprocessing.get_all_start_methods(),
+                     'requires the fork start method')
+class TestDataStoreProcesses(unittest.TestCase):
+    """
+    A class to test concurrent writers in several processes.
+    """
+    def setUp(self):
+        """
+        Sets up the test environment by creating a hotel in a new file.
+        """
+        Hotel('processes.json', 'json').create_hotel(
+            'Marriot',
+            'Houston Texas',
+            {'single': 4, 'double': 5,
+             'suite': 2})
+
+    def tearDown(self):
+        """
+        Cleans up the test environment by deleting the JSON file and its
+        sidecars.
+        """
+        remove_data_files('processes.json')
+
+    def test_concurrent_writers_keep_every_update(self):
+        """
+        Tests that writers in several processes do not lose updates or leave
+        a partially written file.
+        """
+        context = multiprocessing.get_context('fork')
+        workers = [context.Process(target=create_customers,
+                                   args=('processes.json', f'Guest {worker}',
+                                         10))
+                   for worker in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        with open('processes.json', 'r', encoding='UTF-8') as file:
+            hotel = json.load(file)[0]
+        self.assertEqual(len(hotel['customers']), 40)
+        self.assertEqual([name for name in os.listdir('.')
+                          if name.endswith('.tmp')], [])
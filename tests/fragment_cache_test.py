@@ -0,0 +1,111 @@
+""""
+This module contains the tests for the encoded hotels kept between rewrites.
+"""
+import unittest
+import json
+from unittest import mock
+from benchmarks.data_generator import generate_hotels
+from categories.hotel import Hotel
+from utilities.fragment_cache import FragmentCache
+from utilities.serializers import get_serializer
+from tests.helpers import remove_data_files
+
+
+class TestFragmentCache(unittest.TestCase):
+    """
+    A class to test stitching the encoded hotels.
+    """
+    def setUp(self):
+        """
+        Sets up the test environment by generating hotel data.
+        """
+        self.data = generate_hotels(hotels=3, customers=2, reservations=2)
+        self.serializer = get_serializer('json')
+        self.dumps = mock.Mock(side_effect=self.serializer.dumps)
+
+    def test_stitched_list_matches_the_serializer(self):
+        """
+        Tests that the stitched fragments are the encoding of the whole list.
+        """
+        cache = FragmentCache()
+        self.assertEqual(b''.join(cache.encode(self.data, None, self.dumps)),
+                         self.serializer.dumps(self.data))
+        self.assertEqual(b''.join(cache.encode([], None, self.dumps)), b'[]')
+
+    def test_only_changed_hotels_are_encoded(self):
+        """
+        Tests that the hotels not changed since the last call are not
+        encoded again, and that added hotels are.
+        """
+        cache = FragmentCache()
+        cache.encode(self.data, None, self.dumps)
+        self.data[1]['location'] = 'Austin Texas'
+        self.data.append({'hotel_id': 4, 'name': 'Hilton', 'location': '',
+                          'rooms': {}, 'customers': [], 'reservations': []})
+        self.dumps.reset_mock()
+        contents = b''.join(cache.encode(self.data, {id(self.data[1])},
+                                         self.dumps))
+        self.assertEqual(self.dumps.call_count, 2)
+        self.assertEqual(json.loads(contents), self.data)
+
+
+class TestIncrementalSaves(unittest.TestCase):
+    """
+    A class to test rewriting a data file through the fragment cache.
+    """
+    def setUp(self):
+        """
+        Sets up the test environment by creating hotels in a new file.
+        """
+        self.hotel = Hotel('fragments.json', 'json')
+        for name in ('Marriot', 'Hilton', 'Hyatt'):
+            self.hotel.create_hotel(name, 'Houston Texas', {'single': 10})
+        self.serializer = self.hotel.store.backend.serializer
+
+    def tearDown(self):
+        """
+        Cleans up the test environment by deleting the JSON file and its
+        sidecars.
+        """
+        self.hotel.store.invalidate()
+        remove_data_files('fragments.json')
+
+    def read(self):
+        """
+        Reads the data file with the standard library.
+
+        Returns:
+        The hotel data.
+        """
+        with open('fragments.json', 'r', encoding='UTF-8') as file:
+            return json.load(file)
+
+    def test_saves_encode_the_changed_hotels(self):
+        """
+        Tests that a reservation only encodes its hotel again and that the
+        file is the plain JSON encoding of the data.
+        """
+        with mock.patch.object(self.serializer, 'dumps',
+                               side_effect=self.serializer.dumps) as dumps:
+            self.hotel.reserve_room('Hilton', 'John Doe', '2024-02-15')
+        self.assertEqual(dumps.call_count, 1)
+        self.assertEqual(dumps.call_args.args[0]['name'], 'Hilton')
+        hotels = self.read()
+        self.assertEqual(hotels, self.hotel.store.data)
+        self.assertEqual(hotels[1]['rooms'], {'single': 9})
+        with open('fragments.json', 'rb') as file:
+            self.assertEqual(file.read(),
+                             self.serializer.dumps(self.hotel.store.data))
+
+    def test_save_data_encodes_every_hotel(self):
+        """
+        Tests that data changed without the mutation methods and saved with
+        save_data is written whole.
+        """
+        hotels_data = self.hotel.load_data()
+        hotels_data[2]['location'] = 'Austin Texas'
+        with mock.patch.object(self.serializer, 'dumps',
+                               side_effect=self.serializer.dumps) as dumps:
+            self.hotel.save_data(hotels_data)
+        self.assertEqual(dumps.call_count, 3)
+        self.assertEqual(self.read()[2]['location'], 'Austin Texas')
@@ -0,0 +1,35 @@
+""""
+This module contains the helpers shared by the tests.
+"""
+import os
+from categories.customer import Customer
+
+# Suffixes of the files kept next to a data file
+SIDECARS = ('.lock', '.journal', '-wal', '-shm', '.ids', '.stats')
+
+
+def remove_data_files(*filenames):
+    """
+    Deletes data files and their sidecars if they exist.
+
+    Parameters:
+    - filenames: The filenames of the data files.
+    """
+    for filename in filenames:
+        for suffix in ('',) + SIDECARS:
+            if os.path.exists(filename + suffix):
+                os.remove(filename + suffix)
+
+
+def create_customers(filename, prefix, count):
+    """
+    Creates customers from a worker process.
+
+    Parameters:
+    - filename: The filename of the hotel data.
+    - prefix: The prefix of the customer names.
+    - count: The number of customers to create.
+    """
+    customer = Customer(filename)
+    for number in range(count):
+        customer.create_customer('Marriot', f'{prefix} {number}')
@@ -0,0 +1,70 @@
+""""
+This module contains the tests for the HotelIndex class.
+"""
+import unittest
+from utilities.hotel_index import HotelIndex
+
+
+class TestHotelIndex(unittest.TestCase):
+    """
+    A class to test the hotel, customer and reservation indexes.
+    """
+    def setUp(self):
+        """
+        Sets up the test environment by indexing two hotels with the same
+        name.
+        """
+        self.customers = [{'customer_id': 1, 'customer_name': 'John Doe'},
+                          {'customer_id': 2, 'customer_name': 'Jane Doe'}]
+        self.reservations = [{'id': 1, 'customer_id': 1,
+                              'customer_name': 'John Doe',
+                              'room_type': 'single', 'date': '2024-02-15'}]
+        self.hotels = [
+            {'hotel_id': 1, 'name': 'Marriot', 'location': 'Houston Texas',
+             'rooms': {'single': 1}, 'customers': self.customers,
+             'reservations': self.reservations},
+            {'hotel_id': 2, 'name': 'Marriot', 'location': 'Austin Texas',
+             'rooms': {'single': 1}, 'customers': [], 'reservations': []}]
+        self.index = HotelIndex(self.hotels)
+
+    def test_find_hotel_returns_first_match(self):
+        """
+        Tests that duplicate names resolve to the first hotel in the list.
+        """
+        self.assertIs(self.index.find_hotel('Marriot'), self.hotels[0])
+        self.assertIs(self.index.find_hotel_by_id(2), self.hotels[1])
+        self.assertIsNone(self.index.find_hotel('Best Western'))
+
+    def test_rename_hotel_keeps_file_order(self):
+        """
+        Tests that renaming a hotel moves it without changing the order of
+        duplicates.
+        """
+        self.hotels[0]['name'] = 'Hilton'
+        self.index.rename_hotel(self.hotels[0], 'Marriot', self.hotels)
+        self.assertIs(self.index.find_hotel('Marriot'), self.hotels[1])
+        self.hotels[0]['name'] = 'Marriot'
+        self.index.rename_hotel(self.hotels[0], 'Hilton', self.hotels)
+        self.assertIs(self.index.find_hotel('Marriot'), self.hotels[0])
+
+    def test_customer_and_reservation_lookup(self):
+        """
+        Tests that customers and reservations are keyed by their hotel.
+        """
+        hotel = self.hotels[0]
+        self.assertIs(self.index.find_customer(hotel, 'Jane Doe'),
+                      self.customers[1])
+        self.assertIsNone(self.index.find_customer(self.hotels[1],
+                                                   'Jane Doe'))
+        self.assertEqual(self.index.find_reservations(hotel, 'John Doe'),
+                         self.reservations)
+
+    def test_remove_hotel(self):
+        """
+        Tests that removing a hotel drops its customers and reservations.
+        """
+        hotel = self.hotels[0]
+        self.index.remove_hotel(hotel)
+        self.assertIs(self.index.find_hotel('Marriot'), self.hotels[1])
+        self.assertIsNone(self.index.find_customer(hotel, 'John Doe'))
+        self.assertEqual(self.index.find_reservations(hotel, 'John Doe'), [])
@@ -2,8 +2,8 @@
 This module contains the tests for the Hotel class.
 """
 import unittest
-import os
 from categories.hotel import Hotel
+from tests.helpers import remove_data_files
 
 
 class TestHotelCreation(unittest.TestCase):
@@ -20,10 +20,11 @@ class TestHotelCreation(unittest.TestCase):
 
     def tearDown(self):
         """
-        Cleans up the test environment by deleting the JSON file if it exists.
+        Cleans up the test environment by deleting the JSON file and its
+        sidecars if they exist.
         """
-        if self.teardown_called and os.path.exists('hotels.json'):
-            os.remove('hotels.json')
+        if self.teardown_called:
+            remove_data_files('hotels.json')
 
     def test_json_creation(self):
         """
@@ -62,10 +63,11 @@ class TestHotelDeletion(unittest.TestCase):
 
     def tearDown(self):
         """
-        Cleans up the test environment by deleting the JSON file if it exists.
+        Cleans up the test environment by deleting the JSON file and its
+        sidecars if they exist.
         """
-        if self.teardown_called and os.path.exists('hotel.json'):
-            os.remove('hotel.json')
+        if self.teardown_called:
+            remove_data_files('hotel.json')
 
     def test_delete_hotel(self):
         """
@@ -102,10 +104,11 @@ class TestHotelInfo(unittest.TestCase):
 
     def tearDown(self):
         """
-        Cleans up the test environment by deleting the JSON file if it exists.
+        Cleans up the test environment by deleting the JSON file and its
+        sidecars if they exist.
         """
-        if self.teardown_called and os.path.exists('texas.json'):
-            os.remove('texas.json')
+        if self.teardown_called:
+            remove_data_files('texas.json')
 
     def test_hotel_info(self):
         """
@@ -145,10 +148,11 @@ class TestHotelModification(unittest.TestCase):
 
     def tearDown(self):
         """
-        Cleans up the test environment by deleting the JSON file if it exists.
+        Cleans up the test environment by deleting the JSON file and its
+        sidecars if they exist.
         """
-        if self.teardown_called and os.path.exists('hotels.json'):
-            os.remove('hotels.json')
+        if self.teardown_called:
+            remove_data_files('hotels.json')
 
     def test_modify_hotel(self):
         """
@@ -200,10 +204,10 @@ class TestHotelReservation(unittest.TestCase):
     @classmethod
     def tearDownClass(cls):
         """
-        Cleans up the test environment by deleting the JSON file if it exists.
+        Cleans up the test environment by deleting the JSON file and its
+        sidecars if they exist.
         """
-        if os.path.exists('hotels.json'):
-            os.remove('hotels.json')
+        remove_data_files('hotels.json')
 
     def setUp(self):
         """
@@ -282,10 +286,10 @@ class TestHotelCancelReservation(unittest.TestCase):
     @classmethod
     def tearDownClass(cls):
         """
-        Cleans up the test environment by deleting the JSON file if it exists.
+        Cleans up the test environment by deleting the JSON file and its
+        sidecars if they exist.
         """
-        if os.path.exists('hotels.json'):
-            os.remove('hotels.json')
+        remove_data_files('hotels.json')
 
     def setUp(self):
         """
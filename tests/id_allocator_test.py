@@ -0,0 +1,150 @@
+""""
+This module contains the tests for the IdAllocator class.
+"""
+import unittest
+import json
+import multiprocessing
+import os
+from categories.customer import Customer
+from categories.hotel import Hotel
+from categories.reservation import Reservation
+from utilities.id_allocator import IdAllocator
+from tests.helpers import create_customers, remove_data_files
+
+
+class TestIdAllocator(unittest.TestCase):
+    """
+    A class to test reserving and allocating blocks of IDs.
+    """
+    def tearDown(self):
+        """
+        Cleans up the test environment by deleting the sidecar.
+        """
+        if os.path.exists('allocator.json.ids'):
+            os.remove('allocator.json.ids')
+
+    def test_blocks_do_not_overlap(self):
+        """
+        Tests that allocators sharing a sidecar get distinct blocks, and that
+        a new allocator continues after them.
+        """
+        first = IdAllocator('allocator.json', block_size=10)
+        second = IdAllocator('allocator.json', block_size=10)
+        self.assertEqual([first.allocate('customer', lambda: 0)
+                          for _ in range(3)], [1, 2, 3])
+        self.assertEqual(second.allocate('customer', lambda: 0), 11)
+        self.assertEqual([first.allocate('customer', lambda: 0)
+                          for _ in range(8)][-1], 21)
+        restarted = IdAllocator('allocator.json', block_size=10)
+        self.assertEqual(restarted.allocate('customer', lambda: 0), 31)
+
+    def test_seed(self):
+        """
+        Tests that a new sequence starts above its seed, and that dropping
+        the blocks moves on to a new block.
+        """
+        allocator = IdAllocator('allocator.json')
+        self.assertEqual(allocator.allocate('reservation', lambda: 41), 42)
+        self.assertEqual(allocator.allocate('customer', lambda: 0), 1)
+        with open('allocator.json.ids', 'r', encoding='UTF-8') as file:
+            self.assertEqual(json.load(file), {'reservation': 141,
+                                               'customer': 100})
+        allocator.reset_blocks()
+        self.assertEqual(allocator.allocate('reservation', lambda: 0), 142)
+
+
+class TestAllocatedIds(unittest.TestCase):
+    """
+    A class to test the IDs of the customers and reservations created.
+    """
+    def setUp(self):
+        """
+        Sets up the test environment by creating a hotel in a new file.
+        """
+        self.hotel = Hotel('ids.json', 'json')
+        self.hotel.create_hotel('Marriot', 'Houston Texas', {'single': 10})
+        self.customer = Customer('ids.json')
+
+    def tearDown(self):
+        """
+        Cleans up the test environment by deleting the JSON file and its
+        sidecars.
+        """
+        self.hotel.store.invalidate()
+        remove_data_files('ids.json')
+
+    def test_ids_are_not_reused(self):
+        """
+        Tests that the ID of a deleted customer is not handed out again.
+        """
+        self.customer.create_customer('Marriot', 'John Doe')
+        self.customer.delete_customer('Marriot', 'John Doe')
+        self.customer.create_customer('Marriot', 'Jane Doe')
+        self.assertEqual(self.customer.display_customer_info(
+            'Marriot', 'Jane Doe')['customer_id'], 2)
+
+    def test_reservation_ids_survive_restarts(self):
+        """
+        Tests that the reservations made through Hotel and Reservation share
+        one sequence that continues after the cache is dropped.
+        """
+        self.customer.create_customer('Marriot', 'John Doe')
+        self.hotel.reserve_room('Marriot', 'Jane Doe', '2024-02-15')
+        Reservation('ids.json').create_reservation('Marriot', 'John Doe',
+                                                   '2024-02-16')
+        # A new process reserves a new block
+        self.hotel.store.invalidate()
+        self.hotel.store.ids.reset_blocks()
+        self.hotel.reserve_room('Marriot', 'Jane Doe', '2024-02-17')
+        with open('ids.json', 'r', encoding='UTF-8') as file:
+            hotel = json.load(file)[0]
+        self.assertEqual([reservation['id']
+                          for reservation in hotel['reservations']],
+                         [1, 2, 101])
+        self.assertNotIn('reservation_counter', hotel)
+
+    def test_ids_start_above_existing_data(self):
+        """
+        Tests that the sequences of a file written without a sidecar start
+        above its IDs.
+        """
+        self.customer.create_customer('Marriot', 'John Doe')
+        os.remove('ids.json.ids')
+        self.hotel.store.ids.reset_blocks()
+        self.customer.create_customer('Marriot', 'Jane Doe')
+        self.assertEqual(self.customer.display_customer_info(
+            'Marriot', 'Jane Doe')['customer_id'], 2)
+
+    def test_recreated_file_keeps_sequences(self):
+        """
+        Tests that a data file created anew does not hand out again the IDs
+        of blocks other processes may still hold.
+        """
+        self.customer.create_customer('Marriot', 'John Doe')
+        os.remove('ids.json')
+        self.hotel.create_hotel('Marriot', 'Houston Texas', {'single': 10})
+        self.assertTrue(os.path.exists('ids.json.ids'))
+        # A new process reserves the block after the one of this process
+        self.assertEqual(IdAllocator('ids.json').allocate('customer',
+                                                          lambda: 0), 101)
+
+    @unittest.skipUnless('fork' in multiprocessing.get_all_start_methods(),
+                         'requires the fork start method')
+    def test_ids_are_unique_across_processes(self):
+        """
+        Tests that customers created in several processes get distinct IDs.
+        """
+        # The parent holds a block its children must not share
+        self.customer.create_customer('Marriot', 'John Doe')
+        context = multiprocessing.get_context('fork')
+        workers = [context.Process(target=create_customers,
+                                   args=('ids.json', f'Guest {worker}', 5))
+                   for worker in range(4)]
+        for worker in workers:
+            worker.start()
+        while workers:
+            workers.pop().join()
+        with open('ids.json', 'r', encoding='UTF-8') as file:
+            customers = json.load(file)[0]['customers']
+        self.assertEqual(len({customer['customer_id']
+                              for customer in customers}), 21)
@@ -0,0 +1,104 @@
+""""
+This module contains the tests for the opt-in instrumentation.
+"""
+import unittest
+import os
+from categories.customer import Customer
+from categories.hotel import Hotel
+from categories.reservation import Reservation
+from utilities import instrumentation
+from tests.helpers import remove_data_files
+
+
+class TestInstrumentation(unittest.TestCase):
+    """
+    A class to test recording the calls of the instrumented classes.
+    """
+    def setUp(self):
+        """
+        Sets up the test environment by creating a hotel in a new file and
+        clearing the metrics.
+        """
+        self.hotel = Hotel('metrics.json', 'json')
+        self.hotel.create_hotel('Marriot', 'Houston Texas', {'single': 4})
+        instrumentation.reset()
+
+    def tearDown(self):
+        """
+        Cleans up the test environment by disabling the instrumentation and
+        deleting the data files.
+        """
+        instrumentation.disable()
+        instrumentation.reset()
+        self.hotel.store.invalidate()
+        remove_data_files('metrics.json')
+        for filename in ('metrics.prom', 'missing.json.lock'):
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def test_disabled_records_nothing(self):
+        """
+        Tests that nothing is recorded while instrumentation is disabled.
+        """
+        self.hotel.reserve_room('Marriot', 'John Doe', '2024-02-15')
+        self.assertEqual(instrumentation.snapshot(),
+                         {'operations': {}, 'bytes_read': 0,
+                          'bytes_written': 0, 'records_scanned': 0})
+
+    def test_calls_and_phases(self):
+        """
+        Tests that calls, latencies, phases and byte counts are recorded.
+        """
+        instrumentation.enable()
+        self.hotel.store.invalidate()
+        self.hotel.reserve_room('Marriot', 'John Doe', '2024-02-15')
+        metrics = instrumentation.snapshot()
+        operation = metrics['operations']['Hotel.reserve_room']
+        self.assertEqual(operation['calls'], 1)
+        self.assertEqual(operation['errors'], 0)
+        self.assertEqual(operation['buckets'][float('inf')], 1)
+        self.assertGreater(operation['phases']['load'], 0)
+        self.assertGreater(operation['phases']['serialize'], 0)
+        self.assertGreater(operation['phases']['write'], 0)
+        self.assertAlmostEqual(sum(operation['phases'].values()),
+                               operation['seconds'])
+        self.assertGreater(metrics['bytes_read'], 0)
+        # The data file and the ID sidecar, written once per sequence
+        self.assertGreaterEqual(metrics['bytes_written'],
+                                os.path.getsize('metrics.json')
+                                + os.path.getsize('metrics.json.ids'))
+        self.assertGreater(metrics['records_scanned'], 0)
+
+    def test_nested_calls(self):
+        """
+        Tests that nested calls are counted and their phases charged to the
+        outermost call.
+        """
+        Customer('metrics.json').create_customer('Marriot', 'John Doe')
+        instrumentation.enable()
+        Reservation('metrics.json').create_reservation(
+            'Marriot', 'John Doe', '2024-02-15')
+        operations = instrumentation.snapshot()['operations']
+        self.assertEqual(operations['Customer.display_customer_info']
+                         ['calls'], 1)
+        self.assertEqual(sum(operations['Customer.display_customer_info']
+                             ['phases'].values()), 0)
+        self.assertGreater(operations['Reservation.create_reservation']
+                           ['phases']['write'], 0)
+
+    def test_errors_and_prometheus_dump(self):
+        """
+        Tests that failed calls are counted and exported as Prometheus text.
+        """
+        instrumentation.enable()
+        with self.assertRaises(FileNotFoundError):
+            Customer('missing.json').display_customer_info('Marriot',
+                                                           'John Doe')
+        instrumentation.write_prometheus('metrics.prom')
+        with open('metrics.prom', 'r', encoding='UTF-8') as file:
+            text = file.read()
+        self.assertIn('hotels_operation_errors_total{operation='
+                      '"Customer.display_customer_info"} 1', text)
+        self.assertIn('hotels_operation_seconds_bucket{operation='
+                      '"Customer.display_customer_info",le="+Inf"} 1', text)
+        self.assertIn('# TYPE hotels_bytes_read_total counter', text)
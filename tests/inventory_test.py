@@ -0,0 +1,128 @@
+""""
+This module contains the tests for the per-night room inventory.
+"""
+import unittest
+from categories.hotel import Hotel
+from categories.reservation import Reservation
+from utilities.inventory import RoomCalendar, stay_nights
+from tests.helpers import remove_data_files
+
+
+class TestRoomCalendar(unittest.TestCase):
+    """
+    A class to test the booked room counts of a calendar.
+    """
+    def test_stay_nights(self):
+        """
+        Tests converting a stay to night ordinals.
+        """
+        first, last = stay_nights('2024-02-28', '2024-03-01')
+        self.assertEqual(last - first, 2)
+        with self.assertRaises(ValueError):
+            stay_nights('2024-02-15', '2024-02-15')
+        with self.assertRaises(ValueError):
+            stay_nights('2024-02-30', '2024-03-01')
+
+    def test_book_and_release(self):
+        """
+        Tests booking overlapping stays and releasing one of them.
+        """
+        calendar = RoomCalendar()
+        calendar.book('single', 10, 13)
+        calendar.book('single', 5, 11)
+        calendar.book('single', 12, 20)
+        self.assertEqual(calendar.booked('single', 4, 14),
+                         [0, 1, 1, 1, 1, 1, 2, 1, 2, 1])
+        self.assertEqual(calendar.available('single', 2, 10, 13), 0)
+        calendar.book('single', 10, 13, -1)
+        self.assertEqual(calendar.available('single', 2, 10, 13), 1)
+        self.assertEqual(calendar.available('double', 2, 10, 13), 2)
+
+
+class TestDatedReservations(unittest.TestCase):
+    """
+    A class to test reservations with check-in and check-out dates.
+    """
+    def setUp(self):
+        """
+        Sets up the test environment by creating a hotel with one single
+        room in a new file.
+        """
+        self.hotel = Hotel('inventory.json')
+        self.hotel.create_hotel('Marriot', 'Houston Texas',
+                                {'single': 1, 'double': 2})
+
+    def tearDown(self):
+        """
+        Cleans up the test environment by deleting the JSON file and its
+        sidecars.
+        """
+        remove_data_files('inventory.json')
+
+    def test_stays_share_a_room(self):
+        """
+        Tests that stays on different nights can book the same room while
+        overlapping stays cannot.
+        """
+        self.assertEqual(self.hotel.reserve_room(
+            'Marriot', 'John Doe', '2024-02-15', check_out='2024-02-17'),
+            'single room reserved for John Doe')
+        self.assertEqual(self.hotel.reserve_room(
+            'Marriot', 'Jane Doe', '2024-02-17', check_out='2024-02-18'),
+            'single room reserved for Jane Doe')
+        self.assertEqual(self.hotel.reserve_room(
+            'Marriot', 'Bob Smith', '2024-02-16', check_out='2024-02-19'),
+            'No single rooms available')
+        self.assertEqual(self.hotel.room_availability(
+            'Marriot', '2024-02-18', '2024-02-20'), 1)
+        self.assertEqual(
+            self.hotel.display_hotel_info('Marriot')['rooms']['single'], 1)
+
+    def test_cancel_releases_nights(self):
+        """
+        Tests that cancelling a stay frees its nights.
+        """
+        reservation = Reservation('inventory.json')
+        self.hotel.get_customer_id('Marriot', 'John Doe')
+        self.assertEqual(reservation.create_reservation(
+            'Marriot', 'John Doe', '2024-02-15', 'double', '2024-02-20'),
+            'Reservation for John Doe created at Marriot')
+        self.assertEqual(self.hotel.room_availability(
+            'Marriot', '2024-02-19', '2024-02-21', 'double'), 1)
+        reservation.cancel_reservation('Marriot', 'John Doe')
+        self.assertEqual(self.hotel.room_availability(
+            'Marriot', '2024-02-19', '2024-02-21', 'double'), 2)
+
+    def test_undated_reservation_holds_every_night(self):
+        """
+        Tests that a reservation without check-out date takes the room for
+        every night.
+        """
+        self.hotel.reserve_room('Marriot', 'John Doe', '2024-02-15')
+        self.assertEqual(self.hotel.room_availability(
+            'Marriot', '2025-01-01', '2025-01-02'), 0)
+
+    def test_invalid_dates(self):
+        """
+        Tests that stays without nights are refused.
+        """
+        self.assertEqual(self.hotel.reserve_room(
+            'Marriot', 'John Doe', '2024-02-15', check_out='2024-02-14'),
+            'Invalid reservation dates')
+        self.assertEqual(self.hotel.room_availability(
+            'Marriot', '2024-02-15', 'tomorrow'),
+            'Invalid reservation dates')
+
+    def test_calendar_survives_reload(self):
+        """
+        Tests that the calendar is rebuilt from the stored reservations.
+        """
+        self.hotel.reserve_room('Marriot', 'John Doe', '2024-02-15',
+                                check_out='2024-02-17')
+        self.hotel.store.invalidate()
+        self.assertEqual(self.hotel.room_availability(
+            'Marriot', '2024-02-16', '2024-02-17'), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
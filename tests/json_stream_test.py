@@ -0,0 +1,138 @@
+""""
+This module contains the tests for the streaming reads of single hotels.
+"""
+import unittest
+import io
+import json
+import os
+from unittest import mock
+from categories.customer import Customer
+from categories.hotel import Hotel
+from utilities import json_stream
+from tests.helpers import remove_data_files
+
+
+class TestIterElements(unittest.TestCase):
+    """
+    A class to test scanning the elements of a JSON array.
+    """
+    def test_elements_across_chunks(self):
+        """
+        Tests that elements holding brackets and escaped quotes in strings
+        are split correctly when they span several chunks.
+        """
+        elements = [{'name': 'A [x] {y}', 'list': [1, [2, 3]]},
+                    {'name': 'B \\"quoted\\" é'}, [{'nested': '}'}]]
+        contents = json.dumps(elements, indent=2).encode('UTF-8')
+        for chunk_size in (1, 3, 7, 1024):
+            scanned = list(json_stream.iter_elements(io.BytesIO(contents),
+                                                     chunk_size))
+            self.assertEqual([json.loads(element)
+                              for _, element in scanned], elements)
+            for offset, element in scanned:
+                self.assertEqual(
+                    contents[offset:offset + len(element)], element)
+
+    def test_not_an_array(self):
+        """
+        Tests that contents other than a JSON array are rejected.
+        """
+        with self.assertRaises(ValueError):
+            list(json_stream.iter_elements(io.BytesIO(b'{"a": 1}')))
+        with self.assertRaises(ValueError):
+            list(json_stream.iter_elements(io.BytesIO(b'[{"a": 1}')))
+
+    def test_find_stops_at_match(self):
+        """
+        Tests that the lookup decodes only the matching element and stops
+        reading after it, whichever encoding of non-ASCII names was used.
+        """
+        hotels = [{'name': 'Marriot'}, {'name': 'Hôtel'},
+                  {'name': 'Hilton', 'customers': [{'name': 'Hôtel'}]}]
+        for ensure_ascii in (True, False):
+            contents = json.dumps(hotels, ensure_ascii=ensure_ascii)
+            file = io.BytesIO(contents.encode('UTF-8') + b' not read')
+            with mock.patch.object(json_stream.json, 'loads',
+                                   wraps=json.loads) as loads:
+                self.assertEqual(
+                    json_stream.find_element(file, 'name', 'Hôtel', 8),
+                    {'name': 'Hôtel'})
+            self.assertEqual(loads.call_count, 1)
+        self.assertIsNone(json_stream.find_element(
+            io.BytesIO(json.dumps(hotels).encode('UTF-8')), 'name', 'Ritz'))
+
+
+class TestStreamedDisplay(unittest.TestCase):
+    """
+    A class to test that displays read a single hotel while nothing is
+    cached.
+    """
+    def setUp(self):
+        """
+        Sets up the test environment by creating hotels in a new file.
+        """
+        self.hotel = Hotel('stream.json', 'json')
+        self.hotel.create_hotel('Marriot', 'Houston Texas', {'single': 4})
+        self.hotel.create_hotel('Hilton', 'Austin Texas', {'single': 2})
+        Customer('stream.json').create_customer('Hilton', 'John Doe')
+        self.hotel.store.invalidate()
+
+    def tearDown(self):
+        """
+        Cleans up the test environment by deleting the data files.
+        """
+        self.hotel.store.invalidate()
+        remove_data_files('stream.json')
+
+    def test_display_streams_hotel(self):
+        """
+        Tests that displaying a hotel or customer leaves the cache empty,
+        and that a customer missing from the first hotel with the name
+        loads the data to search the others.
+        """
+        self.assertEqual(self.hotel.display_hotel_info('Hilton')['location'],
+                         'Austin Texas')
+        self.assertEqual(self.hotel.display_hotel_info('Ritz'),
+                         'Hotel not found')
+        self.assertEqual(Customer('stream.json').display_customer_info(
+            'Hilton', 'John Doe')['customer_name'], 'John Doe')
+        self.assertIsNone(self.hotel.store.data)
+        self.assertEqual(Customer('stream.json').display_customer_info(
+            'Hilton', 'Jane Doe'), 'Customer Jane Doe not found in Hilton')
+        self.assertIsNotNone(self.hotel.store.data)
+
+    def test_display_uses_cache(self):
+        """
+        Tests that a loaded cache serves displays, and is validated first.
+        """
+        hotels_data = self.hotel.store.load()
+        with mock.patch('builtins.open', side_effect=AssertionError):
+            self.assertEqual(self.hotel.display_hotel_info('Marriot'),
+                             hotels_data[0])
+        with open('stream.json', 'w', encoding='UTF-8') as file:
+            json.dump([], file)
+        self.assertEqual(self.hotel.display_hotel_info('Marriot'),
+                         'Hotel not found')
+
+    def test_journal_falls_back_to_load(self):
+        """
+        Tests that a pending journal is replayed before a display.
+        """
+        self.hotel.store.use_journal()
+        self.hotel.modify_hotel_info('Hilton', new_location='Dallas Texas')
+        self.hotel.store.invalidate()
+        self.assertEqual(self.hotel.display_hotel_info('Hilton')['location'],
+                         'Dallas Texas')
+        self.assertIsNotNone(self.hotel.store.data)
+        self.hotel.store.backend.journal_threshold = None
+
+    def test_missing_file(self):
+        """
+        Tests the messages of displays on a missing file.
+        """
+        os.remove('stream.json')
+        self.assertEqual(self.hotel.display_hotel_info('Marriot'),
+                         'Hotel information file not found, please verify')
+        with self.assertRaises(FileNotFoundError):
+            Customer('stream.json').display_customer_info('Hilton',
+                                                          'John Doe')
@@ -0,0 +1,78 @@
+""""
+This module contains the tests for the byte-offset sidecar index.
+"""
+import unittest
+import os
+from unittest import mock
+from categories.customer import Customer
+from categories.hotel import Hotel
+from utilities.storage_backends import offset_index
+from utilities.storage_backends.offset_index import OffsetIndex
+from tests.helpers import remove_data_files
+
+
+class TestOffsetIndex(unittest.TestCase):
+    """
+    A class to test reading single hotels through the offset index.
+    """
+    def setUp(self):
+        """
+        Sets up the test environment by creating hotels in a new file and
+        switching on its offset index.
+        """
+        self.hotel = Hotel('offsets.json', 'json')
+        for number in range(5):
+            self.hotel.create_hotel(f'Hotel {number}', 'Houston Texas',
+                                    {'single': number + 1})
+        Customer('offsets.json').create_customer('Hotel 4', 'John Doe')
+        self.hotel.store.use_offset_index()
+        self.hotel.store.invalidate()
+
+    def tearDown(self):
+        """
+        Cleans up the test environment by deleting the data files.
+        """
+        self.hotel.store.invalidate()
+        self.hotel.store.backend.offset_index = None
+        remove_data_files('offsets.json')
+        for filename in ('offsets.json.offsets',):
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def test_read_by_name_and_id(self):
+        """
+        Tests that hotels are read by name and ID without filling the cache.
+        """
+        hotel = self.hotel.display_hotel_info('Hotel 4')
+        self.assertEqual(hotel['rooms'], {'single': 5})
+        self.assertEqual(hotel['customers'][0]['customer_name'], 'John Doe')
+        self.assertEqual(self.hotel.store.read_hotel_by_id(
+            hotel['hotel_id']), hotel)
+        self.assertEqual(self.hotel.display_hotel_info('Ritz'),
+                         'Hotel not found')
+        self.assertIsNone(self.hotel.store.data)
+        self.assertTrue(os.path.exists('offsets.json.offsets'))
+
+    def test_sidecar_is_reused(self):
+        """
+        Tests that a valid sidecar spares the scan of the data file.
+        """
+        self.hotel.display_hotel_info('Hotel 0')
+        with open('offsets.json', 'rb') as file, mock.patch.object(
+                offset_index, 'iter_elements') as scan:
+            hotel = OffsetIndex(os.path.abspath('offsets.json')).read_hotel(
+                file, 'name', 'Hotel 3')
+        self.assertEqual(hotel['rooms'], {'single': 4})
+        scan.assert_not_called()
+
+    def test_rebuilt_after_change(self):
+        """
+        Tests that the sidecar is rebuilt once the data file changes.
+        """
+        self.hotel.display_hotel_info('Hotel 4')
+        self.hotel.delete_hotel('Hotel 0')
+        self.hotel.store.invalidate()
+        self.assertEqual(self.hotel.display_hotel_info('Hotel 0'),
+                         'Hotel not found')
+        self.assertEqual(self.hotel.display_hotel_info('Hotel 4')['rooms'],
+                         {'single': 5})
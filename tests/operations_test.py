@@ -0,0 +1,74 @@
+""""
+This module contains the tests for the benchmark of the public operations.
+"""
+import unittest
+import io
+import json
+import os
+import tempfile
+from contextlib import redirect_stdout
+from benchmarks import operations
+from benchmarks.data_generator import generate_hotels
+
+
+class TestOperationsBenchmark(unittest.TestCase):
+    """
+    A class to test timing the scenarios and comparing reports.
+    """
+    def test_every_scenario_runs(self):
+        """
+        Tests that every scenario runs with a cold and a warm cache.
+        """
+        data = generate_hotels(hotels=3, customers=3, reservations=3)
+        results = operations.run(data, calls=2)
+        self.assertEqual(len(results), 2 * len(operations.SCENARIOS))
+        self.assertEqual({result['cache'] for result in results},
+                         {'cold', 'warm'})
+        self.assertTrue(all(result['max_us'] >= result['p50_us'] > 0
+                            for result in results))
+
+    def test_calls_are_seeded(self):
+        """
+        Tests that workloads with the same seed draw the same arguments.
+        """
+        data = generate_hotels(hotels=3, customers=3, reservations=3)
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'hotels.json')
+            first = operations.Workload(filename, 'json', data, 7)
+            second = operations.Workload(filename, 'json', data, 7)
+            self.assertEqual([first.stay(), first.pop_reservation()],
+                             [second.stay(), second.pop_reservation()])
+            first.hotel.store.invalidate()
+
+    def test_compare(self):
+        """
+        Tests that only the scenarios slower than the tolerance are flagged.
+        """
+        baseline = [{'scenario': 'a', 'cache': 'cold', 'mean_us': 100.0},
+                    {'scenario': 'b', 'cache': 'cold', 'mean_us': 100.0}]
+        results = [{'scenario': 'a', 'cache': 'cold', 'mean_us': 120.0},
+                   {'scenario': 'b', 'cache': 'cold', 'mean_us': 150.0},
+                   {'scenario': 'c', 'cache': 'cold', 'mean_us': 900.0}]
+        self.assertEqual(operations.compare(results, baseline, 0.25),
+                         [{'scenario': 'b', 'cache': 'cold',
+                           'baseline_us': 100.0, 'mean_us': 150.0,
+                           'ratio': 1.5}])
+
+    def test_main_writes_report(self):
+        """
+        Tests that the command line writes a JSON report and exits with 0
+        against its own report.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            report = os.path.join(directory, 'report.json')
+            arguments = ['--hotels', '2', '--customers', '2',
+                         '--reservations', '2', '--calls', '1', '--cache',
+                         'warm', '--scenario', 'hotel.display_hotel_info',
+                         '--output', report]
+            with redirect_stdout(io.StringIO()):
+                self.assertEqual(operations.main(arguments), 0)
+                with open(report, 'r', encoding='UTF-8') as file:
+                    self.assertEqual(len(json.load(file)['results']), 1)
+                self.assertEqual(operations.main(
+                    arguments + ['--baseline', report, '--tolerance',
+                                 '1000']), 0)
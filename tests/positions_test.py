@@ -0,0 +1,35 @@
+""""
+This module contains the tests for the PositionIndex class.
+"""
+import unittest
+from utilities.positions import PositionIndex
+
+
+class TestPositionIndex(unittest.TestCase):
+    """
+    A class to test tracking the positions of the items of a list.
+    """
+    def test_positions_follow_removals(self):
+        """
+        Tests that the positions match the list as items are appended and
+        removed anywhere, across compactions.
+        """
+        items = [{'id': number} for number in range(100)]
+        positions = PositionIndex(items)
+        for number in range(100, 150):
+            items.append({'id': number})
+            positions.append(items[-1])
+        for position in (0, 10, 97, 5, 5, 40) * 10:
+            position %= len(items)
+            positions.remove(items.pop(position))
+            self.assertEqual([positions.position(item) for item in items],
+                             list(range(len(items))))
+
+    def test_unknown_item(self):
+        """
+        Tests that an item not in the list raises ValueError.
+        """
+        items = [{'id': 1}]
+        positions = PositionIndex(items)
+        with self.assertRaises(ValueError):
+            positions.position({'id': 1})
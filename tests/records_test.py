@@ -0,0 +1,148 @@
+""""
+This module contains the tests for the slotted records of the hotel data.
+"""
+import unittest
+import json
+import pickle
+from benchmarks.data_generator import generate_hotels
+from categories.customer import Customer
+from categories.hotel import Hotel
+from categories.reservation import Reservation
+from utilities.records import (CustomerRecord, HotelRecord,
+                               ReservationRecord, as_dict, decode_hotels)
+from utilities.serializers import get_serializer
+from tests.helpers import remove_data_files
+
+
+class TestRecords(unittest.TestCase):
+    """
+    A class to test the mapping interface of the records.
+    """
+    def setUp(self):
+        """
+        Sets up the test environment by generating hotel data.
+        """
+        self.data = generate_hotels(hotels=2, customers=2, reservations=3)
+
+    def test_records_behave_as_dictionaries(self):
+        """
+        Tests reading, writing and deleting the fields of a record.
+        """
+        reservation = ReservationRecord({'id': 1, 'room_type': 'single',
+                                         'date': '2024-02-15'})
+        self.assertEqual(reservation['room_type'], 'single')
+        self.assertIsNone(reservation.get('check_out'))
+        self.assertNotIn('check_out', reservation)
+        reservation['check_out'] = '2024-02-17'
+        reservation['note'] = 'late arrival'
+        self.assertEqual(list(reservation), ['id', 'room_type', 'date',
+                                             'check_out', 'note'])
+        del reservation['note']
+        with self.assertRaises(KeyError):
+            _ = reservation['customer_id']
+        with self.assertRaises(KeyError):
+            del reservation['note']
+        self.assertFalse(hasattr(reservation, '__dict__'))
+
+    def test_decoded_records_equal_the_dictionaries(self):
+        """
+        Tests that decoded hotels compare equal to the dictionaries they
+        were decoded from, and that their views are plain dictionaries.
+        """
+        expected = json.loads(json.dumps(self.data))
+        decode_hotels(self.data)
+        self.assertIsInstance(self.data[0], HotelRecord)
+        self.assertIsInstance(self.data[0]['customers'][0], CustomerRecord)
+        self.assertEqual(self.data, expected)
+        view = as_dict(self.data[0])
+        self.assertIs(type(view), dict)
+        self.assertIs(type(view['reservations'][0]), dict)
+        self.assertEqual(view, expected[0])
+
+    def test_repeated_strings_are_shared(self):
+        """
+        Tests that the room types and dates of the decoded reservations are
+        interned.
+        """
+        first, second = (ReservationRecord.from_dict(json.loads(
+            '{"room_type": "single", "date": "2024-02-15"}'))
+            for _ in range(2))
+        self.assertIs(first['room_type'], second['room_type'])
+        self.assertIs(first['date'], second['date'])
+
+    def test_serializers_encode_records(self):
+        """
+        Tests that records are encoded like the dictionaries they hold.
+        """
+        expected = [serializer.dumps(self.data) for serializer in
+                    (get_serializer('json'), get_serializer('json-stdlib'))]
+        decode_hotels(self.data)
+        self.assertEqual([get_serializer(name).dumps(self.data)
+                          for name in ('json', 'json-stdlib')], expected)
+        self.assertEqual(pickle.loads(pickle.dumps(self.data)), self.data)
+
+
+class TestSlottedStore(unittest.TestCase):
+    """
+    A class to test the operations on a store holding records.
+    """
+    def setUp(self):
+        """
+        Sets up the test environment by switching a new store to records and
+        creating a hotel.
+        """
+        self.hotel = Hotel('records.json', 'json')
+        self.hotel.store.use_records()
+        self.hotel.create_hotel('Marriot', 'Houston Texas', {'single': 10})
+        self.customer = Customer('records.json')
+        self.reservation = Reservation('records.json')
+
+    def tearDown(self):
+        """
+        Cleans up the test environment by deleting the JSON file and its
+        sidecars, and switching the store back to dictionaries.
+        """
+        self.hotel.store.slotted = False
+        self.hotel.store.invalidate()
+        self.hotel.store.backend.journal_threshold = None
+        remove_data_files('records.json')
+
+    def test_operations_keep_records(self):
+        """
+        Tests that the added customers and reservations are records, that
+        the display methods return dictionaries and that the file is plain
+        JSON.
+        """
+        self.customer.create_customer('Marriot', 'John Doe')
+        self.reservation.create_reservation('Marriot', 'John Doe',
+                                            '2024-02-15')
+        hotel = self.hotel.store.find_hotel('Marriot')
+        self.assertIsInstance(hotel, HotelRecord)
+        self.assertIsInstance(hotel['reservations'][0], ReservationRecord)
+        info = self.hotel.display_hotel_info('Marriot')
+        self.assertIs(type(info), dict)
+        self.assertEqual(info['rooms'], {'single': 9})
+        self.assertIs(type(self.customer.display_customer_info(
+            'Marriot', 'John Doe')), dict)
+        with open('records.json', 'r', encoding='UTF-8') as file:
+            self.assertEqual(json.load(file), [info])
+
+    def test_journal_replays_into_records(self):
+        """
+        Tests that the operations replayed from the journal add records.
+        """
+        self.hotel.store.use_journal()
+        self.hotel.reserve_room('Marriot', 'John Doe', '2024-02-15')
+        self.hotel.store.invalidate()
+        reservation = self.reservation.get_reservation(1)
+        self.assertEqual(reservation['customer_name'], 'John Doe')
+        self.assertIsInstance(self.hotel.store.find_reservation_by_id(1)[1],
+                              ReservationRecord)
+
+    def test_use_records_inside_a_transaction(self):
+        """
+        Tests that records cannot be switched on inside a transaction.
+        """
+        with self.hotel.transaction():
+            with self.assertRaises(RuntimeError):
+                self.hotel.store.use_records()
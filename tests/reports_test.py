@@ -0,0 +1,213 @@
+""""
+This module contains the tests for the occupancy and booking pace reports.
+"""
+import unittest
+import csv
+import datetime
+import io
+import json
+import os
+from unittest import mock
+from benchmarks.data_generator import generate_hotels
+from categories import reports
+from categories.hotel import Hotel
+from categories.reports import Reports, export, main
+from utilities import reservation_table
+from tests.helpers import remove_data_files
+
+FIRST = datetime.date(2024, 1, 10)
+LAST = datetime.date(2024, 2, 20)
+
+
+class TestReports(unittest.TestCase):
+    """
+    A class to test the reports against scans of the reservations.
+    """
+    def setUp(self):
+        """
+        Sets up the test environment by writing generated hotel data to a
+        new file.
+        """
+        self.data = generate_hotels(hotels=3, customers=4, reservations=40)
+        self.reports = Reports('reports.json')
+        self.reports.save_data(self.data)
+
+    def tearDown(self):
+        """
+        Cleans up the test environment by deleting the data files, their
+        sidecars and the export files.
+        """
+        self.reports.store.invalidate()
+        remove_data_files('reports.json', 'report.json', 'missing.json')
+        if os.path.exists('report.csv'):
+            os.remove('report.csv')
+
+    def expected_occupancy(self):
+        """
+        Returns the occupancy per hotel and room type, found by checking
+        every reservation on every night.
+
+        Returns:
+        The list of rows.
+        """
+        rows = []
+        nights = (LAST - FIRST).days
+        for hotel in self.data:
+            for room_type, rooms in hotel['rooms'].items():
+                reservations = [reservation for reservation
+                                in hotel['reservations']
+                                if reservation['room_type'] == room_type]
+                undated = sum(1 for reservation in reservations
+                              if 'check_out' not in reservation)
+                occupied = undated * nights + sum(
+                    1 for reservation in reservations
+                    if 'check_out' in reservation
+                    for night in range(nights)
+                    if reservation['date']
+                    <= (FIRST + datetime.timedelta(days=night)).isoformat()
+                    < reservation['check_out'])
+                capacity = (rooms + undated) * nights
+                rows.append({'hotel': hotel['name'], 'room_type': room_type,
+                             'capacity': capacity, 'occupied': occupied,
+                             'occupancy': round(occupied / capacity, 4)})
+        return rows
+
+    def expected_pickup(self):
+        """
+        Returns the reservations checking in between the dates of the tests
+        per booking date, found by scanning the data.
+
+        Returns:
+        A dictionary from the booking date to the number of reservations.
+        """
+        counts = {}
+        for hotel in self.data:
+            for reservation in hotel['reservations']:
+                if FIRST.isoformat() <= reservation['date'] \
+                        < LAST.isoformat():
+                    counts[reservation['booked']] = counts.get(
+                        reservation['booked'], 0) + 1
+        return counts
+
+    def check_reports(self):
+        """
+        Checks the occupancy, pickup and room type mix against scans of the
+        data.
+        """
+        first, last = FIRST.isoformat(), LAST.isoformat()
+        self.assertEqual(self.reports.occupancy(first, last),
+                         self.expected_occupancy())
+        nightly = self.reports.occupancy(first, last, by=('date',))
+        self.assertEqual(len(nightly), (LAST - FIRST).days)
+        self.assertEqual(sum(row['occupied'] for row in nightly), sum(
+            row['occupied'] for row in self.expected_occupancy()))
+        pickup = self.reports.pickup(first, last)
+        self.assertEqual({row['booked']: row['reservations']
+                          for row in pickup}, self.expected_pickup())
+        self.assertEqual(pickup[-1]['cumulative'],
+                         sum(self.expected_pickup().values()))
+        mix = self.reports.room_type_mix()
+        self.assertEqual(sum(row['reservations'] for row in mix), 120)
+        self.assertAlmostEqual(sum(row['share'] for row in mix), 1)
+
+    def test_reports(self):
+        """
+        Tests the reports with NumPy.
+        """
+        self.check_reports()
+
+    def test_reports_without_numpy(self):
+        """
+        Tests the reports with the pure-Python fallback.
+        """
+        with mock.patch.object(reports, 'np', None), \
+                mock.patch.object(reservation_table, 'np', None):
+            self.check_reports()
+
+    def test_grouped_reports(self):
+        """
+        Tests that the rows of finer groups add up to the rows of coarser
+        ones.
+        """
+        first, last = FIRST.isoformat(), LAST.isoformat()
+        total = self.reports.occupancy(first, last, by=())
+        self.assertEqual(len(total), 1)
+        detailed = self.reports.occupancy(
+            first, last, by=('hotel', 'room_type', 'date'))
+        self.assertEqual(sum(row['occupied'] for row in detailed),
+                         total[0]['occupied'])
+        self.assertEqual(
+            sum(row['reservations'] for row in self.reports.pickup(
+                first, last, by=('hotel', 'room_type'))),
+            sum(self.expected_pickup().values()))
+        self.assertEqual(len(self.reports.room_type_mix(by_hotel=True)), 9)
+
+    def test_invalid_requests(self):
+        """
+        Tests the messages for invalid dates and a missing file, and that
+        grouping by an unknown field raises ValueError.
+        """
+        self.assertEqual(self.reports.occupancy('2024-02-01', '2024-01-01'),
+                         'Invalid report dates')
+        self.assertEqual(self.reports.pickup('2024-13-01'),
+                         'Invalid report dates')
+        with self.assertRaises(ValueError):
+            self.reports.occupancy('2024-01-01', '2024-02-01',
+                                   by=('customer_name',))
+        self.assertEqual(Reports('missing.json').room_type_mix(),
+                         'Hotel information not found, please verify')
+
+    def test_export(self):
+        """
+        Tests exporting the rows to CSV and JSON files.
+        """
+        rows = self.reports.room_type_mix()
+        export(rows, 'report.json')
+        with open('report.json', 'r', encoding='UTF-8') as file:
+            self.assertEqual(json.load(file), rows)
+        export(rows, 'report.csv')
+        with open('report.csv', 'r', encoding='UTF-8', newline='') as file:
+            self.assertEqual([row['room_type'] for row in
+                              csv.DictReader(file)],
+                             [row['room_type'] for row in rows])
+        with self.assertRaises(ValueError):
+            export(rows, 'report.txt')
+
+    def test_command_line(self):
+        """
+        Tests printing a report as CSV from the command line.
+        """
+        with mock.patch('sys.stdout', new_callable=io.StringIO) as output:
+            main(['room_type_mix', 'reports.json', '--by', 'hotel'])
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[0], 'hotel,room_type,reservations,share')
+        self.assertEqual(len(lines), 10)
+
+
+class TestBookingDate(unittest.TestCase):
+    """
+    A class to test the booking date of the new reservations.
+    """
+    def tearDown(self):
+        """
+        Cleans up the test environment by deleting the JSON file and its
+        sidecars.
+        """
+        remove_data_files('booked.json')
+
+    def test_reservations_record_the_booking_date(self):
+        """
+        Tests that a reservation records the day it was made and that the
+        pickup report counts it on that day.
+        """
+        hotel = Hotel('booked.json', 'json')
+        hotel.create_hotel('Marriot', 'Houston Texas', {'single': 5})
+        hotel.reserve_room('Marriot', 'John Doe', '2024-02-15',
+                           check_out='2024-02-17')
+        today = datetime.date.today().isoformat()
+        self.assertEqual(hotel.display_hotel_info('Marriot')[
+            'reservations'][0]['booked'], today)
+        self.assertEqual(Reports('booked.json').pickup(), [
+            {'booked': today, 'reservations': 1, 'room_nights': 2,
+             'cumulative': 1}])
+        hotel.store.invalidate()
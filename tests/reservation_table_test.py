@@ -0,0 +1,153 @@
+""""
+This module contains the tests for the columnar table of the reservations.
+"""
+import unittest
+import datetime
+from unittest import mock
+from benchmarks.data_generator import generate_hotels
+from categories.hotel import Hotel
+from categories.reservation import Reservation
+from utilities import reservation_table
+from utilities.reservation_table import ReservationTable
+from tests.helpers import remove_data_files
+
+
+class TestReservationTable(unittest.TestCase):
+    """
+    A class to test filtering and grouping the reservations.
+    """
+    def setUp(self):
+        """
+        Sets up the test environment by generating hotel data and building
+        its table.
+        """
+        self.data = generate_hotels(hotels=4, customers=5, reservations=30)
+        self.table = ReservationTable()
+        self.table.build(self.data)
+        self.first = datetime.date(2024, 1, 5).toordinal()
+        self.last = datetime.date(2024, 2, 1).toordinal()
+
+    def expected(self, hotel=None, room_type=None):
+        """
+        Returns the reservations matching the filters and the check-in span
+        of the tests, found by scanning the data.
+
+        Parameters:
+        - hotel: The hotel to match, None for every hotel.
+        - room_type: The room type to match, None for every room type.
+
+        Returns:
+        The list of matching reservations.
+        """
+        return [reservation for candidate in self.data
+                for reservation in candidate['reservations']
+                if (hotel is None or candidate is hotel)
+                and room_type in (None, reservation['room_type'])
+                and self.first <= datetime.date.fromisoformat(
+                    reservation['date']).toordinal() < self.last]
+
+    def check_queries(self):
+        """
+        Checks the counts, groups and IDs against scans of the data.
+        """
+        hotel = self.data[1]
+        matching = self.expected(hotel, 'single')
+        self.assertEqual(self.table.count(hotel, 'single', self.first,
+                                          self.last), len(matching))
+        self.assertEqual(self.table.reservation_ids(
+            hotel, 'single', self.first, self.last),
+            sorted(reservation['id'] for reservation in matching))
+        groups = {}
+        for reservation in self.expected():
+            groups[reservation['room_type']] = groups.get(
+                reservation['room_type'], 0) + 1
+        self.assertEqual(self.table.group_count(
+            'room_type', first=self.first, last=self.last), groups)
+        self.assertEqual(self.table.group_count('hotel'), {
+            candidate['name']: len(candidate['reservations'])
+            for candidate in self.data})
+        self.assertEqual(self.table.count(room_type='penthouse'), 0)
+        self.assertEqual(self.table.group_count('date', hotel={}), {})
+
+    def test_queries(self):
+        """
+        Tests the queries with NumPy.
+        """
+        self.check_queries()
+
+    def test_queries_without_numpy(self):
+        """
+        Tests the queries with the pure-Python fallback.
+        """
+        with mock.patch.object(reservation_table, 'np', None):
+            self.check_queries()
+
+    def test_removals(self):
+        """
+        Tests that removed reservations and hotels leave the table.
+        """
+        hotel = self.data[0]
+        for position in (0, 5, 9, 20):
+            del hotel['reservations'][position]
+            self.table.remove(hotel, position)
+        self.table.remove_hotel(self.data[2])
+        del self.data[2]
+        self.assertEqual(len(self.table), sum(
+            len(candidate['reservations']) for candidate in self.data))
+        self.check_queries()
+
+    def test_unknown_group(self):
+        """
+        Tests that grouping by a field without a column raises ValueError.
+        """
+        with self.assertRaises(ValueError):
+            self.table.group_count('customer_id')
+
+
+class TestTableSync(unittest.TestCase):
+    """
+    A class to test keeping the table of a store in sync with the
+    operations.
+    """
+    def setUp(self):
+        """
+        Sets up the test environment by creating two hotels with
+        reservations in a new file.
+        """
+        self.hotel = Hotel('table.json', 'json')
+        self.hotel.create_hotel('Marriot', 'Houston Texas', {'single': 5})
+        self.hotel.create_hotel('Hilton', 'Austin Texas', {'double': 5})
+        self.reservation = Reservation('table.json')
+        self.hotel.reserve_room('Marriot', 'John Doe', '2024-02-15')
+        self.hotel.reserve_room('Hilton', 'Jane Doe', '2024-02-15',
+                                'double', '2024-02-18')
+
+    def tearDown(self):
+        """
+        Cleans up the test environment by deleting the JSON file and its
+        sidecars.
+        """
+        self.hotel.store.invalidate()
+        remove_data_files('table.json')
+
+    def test_operations_update_the_table(self):
+        """
+        Tests that creations, cancellations and hotel deletions are applied
+        to a built table.
+        """
+        with self.hotel.transaction(shared=True) as store:
+            self.assertEqual(store.reservation_table().group_count('hotel'),
+                             {'Marriot': 1, 'Hilton': 1})
+        self.hotel.reserve_room('Marriot', 'Jane Doe', '2024-02-16')
+        self.reservation.cancel_reservation_by_id(1)
+        self.hotel.reserve_room('Marriot', 'Bob Smith', '2024-02-17')
+        self.hotel.delete_hotel('Hilton')
+        with self.hotel.transaction(shared=True) as store:
+            table = store.reservation_table()
+            self.assertIs(table, store.table)
+            self.assertEqual(table.group_count('customer_name'),
+                             {'Jane Doe': 1, 'Bob Smith': 1})
+            rebuilt = ReservationTable()
+            rebuilt.build(store.data)
+            self.assertEqual(table.reservation_ids(),
+                             rebuilt.reservation_ids())
@@ -2,10 +2,11 @@
 This module contains the tests for the Reservation class.
 """
 import unittest
-import os
+from unittest import mock
 from categories.customer import Customer
 from categories.reservation import Reservation
 from categories.hotel import Hotel
+from tests.helpers import remove_data_files
 
 
 class TestReservation(unittest.TestCase):
@@ -36,10 +37,10 @@ class TestReservation(unittest.TestCase):
     @classmethod
     def tearDownClass(cls):
         """
-        Cleans up the test environment by deleting the JSON file if it exists.
+        Cleans up the test environment by deleting the JSON file and its
+        sidecars if they exist.
         """
-        if os.path.exists('hotels.json'):
-            os.remove('hotels.json')
+        remove_data_files('hotels.json')
 
     def setUp(self):
         """
@@ -105,3 +106,131 @@ class TestReservation(unittest.TestCase):
         self.assertEqual(self.reservation.cancel_reservation(
             'St. Adams Hotel', 'John Doe'),
             'Hotel St. Adams Hotel not found')
+
+
+class TestReservationBatch(unittest.TestCase):
+    """
+    A class to test creating and cancelling reservations in batches.
+    """
+    def setUp(self):
+        """
+        Sets up the test environment by creating a hotel with customers in a
+        new file.
+        """
+        Hotel('batch.json', 'json').create_hotel(
+            'Best Western',
+            'Houston, Texas',
+            {'single': 1, 'double': 1,
+             'suite': 3})
+        Customer('batch.json').create_customers([
+            ('Best Western', 'John Doe'), ('Best Western', 'Alice Smith')])
+        self.reservation = Reservation('batch.json')
+
+    def tearDown(self):
+        """
+        Cleans up the test environment by deleting the JSON file and its
+        sidecars.
+        """
+        remove_data_files('batch.json')
+
+    def test_create_reservations(self):
+        """
+        Tests creating a batch of reservations with one write.
+        """
+        backend = self.reservation.store.backend
+        with mock.patch.object(backend, 'write',
+                               wraps=backend.write) as write:
+            results = self.reservation.create_reservations([
+                ('Best Western', 'John Doe', '2024-02-15'),
+                ('Best Western', 'Alice Smith', '2024-02-15'),
+                {'hotel_name': 'Best Western', 'customer_name': 'Alice Smith',
+                 'reservation_date': '2024-02-16', 'room_type': 'suite'}])
+        self.assertEqual(write.call_count, 1)
+        self.assertEqual(results, [
+            'Reservation for John Doe created at Best Western',
+            'No single rooms available',
+            'Reservation for Alice Smith created at Best Western'])
+
+    def test_cancel_reservations(self):
+        """
+        Tests cancelling a batch of reservations with one write.
+        """
+        self.reservation.create_reservations([
+            ('Best Western', 'John Doe', '2024-02-15'),
+            ('Best Western', 'Alice Smith', '2024-02-16', 'suite')])
+        backend = self.reservation.store.backend
+        with mock.patch.object(backend, 'write',
+                               wraps=backend.write) as write:
+            results = self.reservation.cancel_reservations([
+                ('Best Western', 'John Doe'),
+                ('Best Western', 'John Doe'),
+                ('Best Western', 'Alice Smith')])
+        self.assertEqual(write.call_count, 1)
+        self.assertEqual(results, [
+            'Reservation for John Doe cancelled at Best Western',
+            'No reservation found for John Doe in Best Western',
+            'Reservation for Alice Smith cancelled at Best Western'])
+        self.assertEqual(Hotel('batch.json').display_hotel_info(
+            'Best Western')['rooms'], {'single': 1, 'double': 1, 'suite': 3})
+
+
+class TestReservationById(unittest.TestCase):
+    """
+    A class to test looking up and cancelling reservations by ID.
+    """
+    def setUp(self):
+        """
+        Sets up the test environment by creating two hotels in a new file,
+        with two reservations of the same guest in one of them.
+        """
+        hotel = Hotel('byid.json', 'json')
+        hotel.create_hotel('Marriot', 'Houston Texas', {'single': 4})
+        hotel.create_hotel('Hilton', 'Austin Texas', {'single': 4})
+        hotel.reserve_room('Marriot', 'John Doe', '2024-02-15')
+        hotel.reserve_room('Hilton', 'John Doe', '2024-02-15', 'single',
+                           '2024-02-17')
+        hotel.reserve_room('Hilton', 'John Doe', '2024-03-01')
+        self.reservation = Reservation('byid.json')
+
+    def tearDown(self):
+        """
+        Cleans up the test environment by deleting the JSON file and its
+        sidecars.
+        """
+        self.reservation.store.invalidate()
+        remove_data_files('byid.json')
+
+    def test_get_reservation(self):
+        """
+        Tests looking a reservation up by ID.
+        """
+        self.assertEqual(self.reservation.get_reservation(3)['date'],
+                         '2024-03-01')
+        self.assertIsNone(self.reservation.get_reservation(99))
+
+    def test_cancel_reservation_by_id(self):
+        """
+        Tests that cancelling by ID removes that reservation only and gives
+        its room back.
+        """
+        self.assertEqual(self.reservation.cancel_reservation_by_id(3),
+                         'Reservation 3 cancelled at Hilton')
+        self.assertEqual(self.reservation.cancel_reservation_by_id(3),
+                         'Reservation 3 not found')
+        hotel = Hotel('byid.json').display_hotel_info('Hilton')
+        self.assertEqual([reservation['id']
+                          for reservation in hotel['reservations']], [2])
+        self.assertEqual(hotel['rooms'], {'single': 4})
+        self.assertEqual(self.reservation.get_reservation(1)['customer_name'],
+                         'John Doe')
+
+    def test_cancel_reservation_by_id_in_journal(self):
+        """
+        Tests that a cancellation by ID is replayed from the journal.
+        """
+        self.reservation.store.use_journal()
+        self.reservation.cancel_reservation_by_id(2)
+        self.reservation.store.invalidate()
+        self.assertIsNone(self.reservation.get_reservation(2))
+        self.assertEqual(self.reservation.get_reservation(3)['date'],
+                         '2024-03-01')
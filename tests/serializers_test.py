@@ -0,0 +1,138 @@
+""""
+This module contains the tests for the serializers of the data files.
+"""
+import unittest
+import json
+import os
+import pickle
+from unittest import mock
+from benchmarks import serializers as benchmark
+from benchmarks.data_generator import generate_hotels
+from categories.hotel import Hotel
+from utilities import serializers
+from utilities.storage_backends import convert
+from tests.helpers import remove_data_files
+
+
+class TestSerializers(unittest.TestCase):
+    """
+    A class to test encoding and decoding hotel data.
+    """
+    def setUp(self):
+        """
+        Sets up the test environment by generating hotel data.
+        """
+        self.data = generate_hotels(hotels=3, customers=2, reservations=2)
+
+    def test_round_trip(self):
+        """
+        Tests that every available serializer decodes what it encodes.
+        """
+        for name in ('json', 'json-stdlib', 'json-indent', 'pickle'):
+            serializer = serializers.get_serializer(name)
+            self.assertEqual(serializer.loads(serializer.dumps(self.data)),
+                             self.data)
+
+    def test_minified_json(self):
+        """
+        Tests that JSON is minified unless indentation is asked for, with
+        or without orjson.
+        """
+        with mock.patch.object(serializers, 'orjson', None):
+            compact = serializers.get_serializer('json').dumps(self.data)
+        self.assertNotIn(b'\n', compact)
+        self.assertNotIn(b': ', compact)
+        self.assertEqual(json.loads(compact), self.data)
+        self.assertLess(len(compact), len(serializers.get_serializer(
+            'json-indent').dumps(self.data)))
+
+    def test_serializer_for(self):
+        """
+        Tests picking the serializer from the file extension or by name.
+        """
+        self.assertEqual(serializers.serializer_for('hotels.pkl').name,
+                         'pickle')
+        self.assertEqual(serializers.serializer_for('hotels.json').name,
+                         'json')
+        self.assertEqual(serializers.serializer_for(
+            'hotels.json', 'json-indent').name, 'json-indent')
+        with self.assertRaises(ValueError):
+            serializers.get_serializer('yaml')
+
+    def test_pickle_is_not_detected(self):
+        """
+        Tests that pickled contents are only decoded when pickle is
+        configured.
+        """
+        contents = pickle.dumps(self.data, protocol=5)
+        json_serializer = serializers.get_serializer('json')
+        self.assertIs(serializers.detect_serializer(contents,
+                                                    json_serializer),
+                      json_serializer)
+        self.assertEqual(serializers.detect_serializer(
+            b'[]', serializers.get_serializer('pickle')).name, 'json')
+
+    def test_benchmark(self):
+        """
+        Tests that the benchmark measures every available serializer.
+        """
+        results = benchmark.run(self.data, repeat=1)
+        self.assertEqual([result['serializer'] for result in results][:3],
+                         ['json', 'json-stdlib', 'json-indent'])
+        self.assertTrue(all(result['bytes'] > 0 for result in results))
+
+
+class TestSerializerFiles(unittest.TestCase):
+    """
+    A class to test data files written with other serializers.
+    """
+    def tearDown(self):
+        """
+        Cleans up the test environment by deleting the data files and their
+        sidecars.
+        """
+        remove_data_files('serial.json', 'serial.pkl')
+
+    def test_pickle_file(self):
+        """
+        Tests that the file extension picks the pickle serializer.
+        """
+        hotel = Hotel('serial.pkl')
+        hotel.create_hotel('Marriot', 'Houston Texas', {'single': 1})
+        self.assertEqual(hotel.serializer, 'pickle')
+        with open('serial.pkl', 'rb') as file:
+            self.assertEqual(pickle.load(file)[0]['name'], 'Marriot')
+        hotel.store.invalidate()
+        self.assertEqual(hotel.reserve_room('Marriot', 'John Doe',
+                                            '2024-02-15'),
+                         'single room reserved for John Doe')
+
+    def test_transparent_conversion(self):
+        """
+        Tests that a file written as indented JSON is read by the minified
+        serializer and rewritten minified.
+        """
+        with open('serial.json', 'w', encoding='UTF-8') as file:
+            json.dump(generate_hotels(hotels=1), file, indent=4)
+        hotel = Hotel('serial.json', 'json')
+        hotel.modify_hotel_info('Hotel 1', new_location='Austin Texas')
+        with open('serial.json', 'rb') as file:
+            contents = file.read()
+        self.assertNotIn(b'\n', contents)
+        self.assertEqual(json.loads(contents)[0]['location'], 'Austin Texas')
+
+    def test_convert(self):
+        """
+        Tests converting a JSON file to pickle and back.
+        """
+        Hotel('serial.json', 'json').create_hotel(
+            'Marriot', 'Houston Texas', {'single': 1})
+        convert('serial.json', 'serial.pkl')
+        os.remove('serial.json')
+        convert('serial.pkl', 'serial.json', target_serializer='json-indent')
+        with open('serial.json', 'r', encoding='UTF-8') as file:
+            self.assertEqual(json.load(file)[0]['name'], 'Marriot')
+
+
+if __name__ == '__main__':
+    unittest.main()
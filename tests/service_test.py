@@ -0,0 +1,146 @@
+""""
+This module contains the tests for the reservation service and its client.
+"""
+import unittest
+import concurrent.futures
+import inspect
+import json
+import os
+import threading
+from unittest import mock
+from categories.remote import RemoteCustomer, RemoteHotel, RemoteReservation
+from categories.service import OPERATIONS, HotelService
+from tests.helpers import remove_data_files
+
+
+class TestHotelService(unittest.TestCase):
+    """
+    A class to test calling the operations through the service.
+    """
+    def setUp(self):
+        """
+        Sets up the test environment by starting a service on a free port
+        and creating clients of it.
+        """
+        self.start()
+        port = self.service.server_address[1]
+        self.hotel = RemoteHotel(port=port)
+        self.customer = RemoteCustomer(port=port)
+        self.reservation = RemoteReservation(port=port)
+
+    def start(self, token: str = None):
+        """
+        Starts a service on a free port of the loopback interface.
+
+        Parameters:
+        - token: The token the requests must send.
+        """
+        self.service = HotelService('service.json', ('127.0.0.1', 0), 'json',
+                                    token=token)
+        self.thread = threading.Thread(target=self.service.serve_forever,
+                                       args=(0.05,))
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stops the service.
+        """
+        self.service.shutdown()
+        self.thread.join()
+        self.service.server_close()
+
+    def tearDown(self):
+        """
+        Cleans up the test environment by stopping the service and deleting
+        the JSON file and its sidecars.
+        """
+        self.stop()
+        self.service.store.invalidate()
+        remove_data_files('service.json')
+
+    def test_clients_cover_the_operations(self):
+        """
+        Tests that the clients have a method for every operation served.
+        """
+        for client in (RemoteHotel, RemoteCustomer, RemoteReservation):
+            methods = {name for name, _ in inspect.getmembers(
+                client, inspect.isfunction) if not name.startswith('_')}
+            self.assertEqual(methods - {'call'},
+                             set(OPERATIONS[client.service]))
+
+    def test_operations_are_persisted(self):
+        """
+        Tests that the clients return the results of the operations and that
+        the changes are written to the file.
+        """
+        self.assertEqual(self.hotel.create_hotel('Marriot', 'Houston Texas',
+                                                 {'single': 2}),
+                         'Hotel created')
+        self.customer.create_customer('Marriot', 'John Doe')
+        self.assertEqual(self.reservation.create_reservation(
+            'Marriot', 'John Doe', '2024-02-15'),
+            'Reservation for John Doe created at Marriot')
+        self.assertEqual(self.customer.display_customer_info(
+            'Marriot', 'John Doe')['customer_name'], 'John Doe')
+        with open('service.json', 'r', encoding='UTF-8') as file:
+            hotel = json.load(file)[0]
+        self.assertEqual(len(hotel['reservations']), 1)
+        self.assertEqual(hotel['rooms'], {'single': 1})
+
+    def test_concurrent_calls(self):
+        """
+        Tests that concurrent reservations are all applied.
+        """
+        self.hotel.create_hotel('Marriot', 'Houston Texas', {'single': 8})
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(
+                lambda number: self.hotel.reserve_room(
+                    'Marriot', f'Guest {number}', '2024-02-15'), range(8)))
+        self.assertEqual(len(set(results)), 8)
+        self.assertEqual(self.hotel.room_availability(
+            'Marriot', '2024-02-15', '2024-02-16'), 0)
+
+    def test_errors_are_raised_again(self):
+        """
+        Tests that the client raises the exceptions of the service.
+        """
+        with self.assertRaises(AttributeError):
+            self.hotel.call('transaction')
+        with self.assertRaises(TypeError):
+            self.hotel.display_hotel_info()
+        with mock.patch.object(self.service, 'call', return_value={1, 2}):
+            with self.assertRaises(TypeError):
+                self.hotel.display_hotel_info('Marriot')
+
+    def test_storage_methods_are_not_served(self):
+        """
+        Tests that the raw loads and saves of the data file are refused.
+        """
+        self.hotel.create_hotel('Marriot', 'Houston Texas', {'single': 2})
+        for method in ('load_data', 'save_data', 'run_batch'):
+            with self.assertRaises(AttributeError):
+                self.hotel.call(method, [])
+        self.assertEqual(self.hotel.display_hotel_info('Marriot')['name'],
+                         'Marriot')
+
+    def test_token(self):
+        """
+        Tests that a service with a token refuses the requests without it,
+        and that another interface cannot be served without a token.
+        """
+        self.stop()
+        self.start(token='secret')
+        port = self.service.server_address[1]
+        with self.assertRaises(PermissionError):
+            RemoteHotel(port=port).display_hotel_info('Marriot')
+        with self.assertRaises(PermissionError):
+            RemoteHotel(port=port, token='guess').display_hotel_info(
+                'Marriot')
+        self.assertEqual(RemoteHotel(port=port, token='secret')
+                         .display_hotel_info('Marriot'),
+                         'Hotel information file not found, please verify')
+        with mock.patch.dict(os.environ, {'HOTELS_SERVICE_TOKEN': 'secret'}):
+            self.assertEqual(RemoteHotel(port=port).delete_hotel('Marriot'),
+                             'Hotel information not found')
+        with self.assertRaises(ValueError):
+            HotelService('service.json', ('0.0.0.0', 0))
@@ -0,0 +1,325 @@
+""""
+This module contains the tests for the storage backends.
+"""
+import unittest
+import json
+import os
+import shutil
+import sqlite3
+from unittest import mock
+from categories.hotel import Hotel
+from categories.customer import Customer
+from categories.reservation import Reservation
+from utilities.data_store import DataStore
+from utilities.storage_backends import create_backend
+from tests.helpers import remove_data_files
+
+
+class TestCreateBackend(unittest.TestCase):
+    """
+    A class to test the selection of the storage backend.
+    """
+    def test_backend_by_extension(self):
+        """
+        Tests that the backend is picked from the file extension.
+        """
+        self.assertEqual(create_backend('hotels.json', 'json').name, 'json')
+        self.assertEqual(create_backend('hotels.db').name, 'sqlite')
+        self.assertEqual(create_backend('hotels.shards').name, 'sharded')
+
+    def test_unknown_backend(self):
+        """
+        Tests that an unknown backend name is refused.
+        """
+        with self.assertRaises(ValueError):
+            create_backend('hotels.json', 'xml')
+
+
+class TestSQLiteBackend(unittest.TestCase):
+    """
+    A class to test the Hotel, Customer and Reservation classes against an
+    SQLite database.
+    """
+    def setUp(self):
+        """
+        Sets up the test environment by creating a hotel in a new database.
+        """
+        self.hotel = Hotel('backend.db')
+        self.hotel.create_hotel('Marriot', 'Houston Texas',
+                                {'single': 4, 'double': 5, 'suite': 2})
+
+    def tearDown(self):
+        """
+        Cleans up the test environment by deleting the database files.
+        """
+        self.hotel.store.invalidate()
+        remove_data_files('backend.db')
+
+    def test_backend_is_sqlite(self):
+        """
+        Tests that the database uses the SQLite backend in WAL mode.
+        """
+        self.assertEqual(self.hotel.backend, 'sqlite')
+        with sqlite3.connect('backend.db') as connection:
+            mode = connection.execute('PRAGMA journal_mode').fetchone()[0]
+        self.assertEqual(mode, 'wal')
+
+    def test_changes_survive_reload(self):
+        """
+        Tests that reservations and customer changes are read back from the
+        database.
+        """
+        self.hotel.reserve_room('Marriot', 'John Doe', '2024-02-15')
+        Customer('backend.db').modify_customer_info(
+            'Marriot', 'John Doe', 'John Smith')
+        Reservation('backend.db').create_reservation(
+            'Marriot', 'John Smith', '2024-02-16')
+        expected = self.hotel.store.data
+        self.hotel.store.invalidate()
+        self.assertEqual(self.hotel.store.load(), expected)
+        hotel = self.hotel.display_hotel_info('Marriot')
+        self.assertEqual(hotel['rooms']['single'], 2)
+        self.assertEqual(len(hotel['reservations']), 2)
+
+    def test_cancel_and_delete(self):
+        """
+        Tests that removals update the tables.
+        """
+        self.hotel.reserve_room('Marriot', 'John Doe', '2024-02-15')
+        self.hotel.cancel_reservation('Marriot', 'John Doe')
+        self.hotel.delete_hotel('Marriot')
+        with sqlite3.connect('backend.db') as connection:
+            for table in ('hotels', 'rooms', 'customers', 'reservations'):
+                count = connection.execute(
+                    f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                self.assertEqual(count, 0)
+
+    def test_read_hotel_alone(self):
+        """
+        Tests that a display on a cold store reads the rows of one hotel
+        without filling the cache.
+        """
+        self.hotel.create_hotel('Hilton', 'Austin Texas', {'single': 1})
+        self.hotel.reserve_room('Marriot', 'John Doe', '2024-02-15')
+        expected = self.hotel.store.find_hotel('Marriot')
+        self.hotel.store.invalidate()
+        self.assertEqual(self.hotel.display_hotel_info('Marriot'), expected)
+        self.assertEqual(self.hotel.display_hotel_info('Ritz'),
+                         'Hotel not found')
+        self.assertIsNone(self.hotel.store.data)
+
+    def test_reload_on_external_change(self):
+        """
+        Tests that the store reads the database again when it is changed by
+        another connection.
+        """
+        self.hotel.store.load()
+        with sqlite3.connect('backend.db') as connection:
+            connection.execute("UPDATE hotels SET location = 'Dallas Texas'")
+        self.assertEqual(
+            self.hotel.display_hotel_info('Marriot')['location'],
+            'Dallas Texas')
+
+
+class TestShardedBackend(unittest.TestCase):
+    """
+    A class to test the Hotel, Customer and Reservation classes against a
+    directory with one file per hotel.
+    """
+    def setUp(self):
+        """
+        Sets up the test environment by creating two hotels in a new
+        directory.
+        """
+        self.hotel = Hotel('backend.shards')
+        self.hotel.create_hotel('Marriot', 'Houston Texas',
+                                {'single': 4, 'double': 5, 'suite': 2})
+        self.hotel.create_hotel('Hilton', 'Austin Texas', {'single': 1})
+
+    def tearDown(self):
+        """
+        Cleans up the test environment by deleting the directory and its
+        sidecars.
+        """
+        self.hotel.store.invalidate()
+        shutil.rmtree('backend.shards', ignore_errors=True)
+        remove_data_files('backend.shards')
+
+    def shard_stat(self, hotel_name):
+        """
+        Returns the modification time and inode of the file of a hotel.
+
+        Parameters:
+        - hotel_name: The name of the hotel.
+
+        Returns:
+        A (mtime, inode) tuple.
+        """
+        with open(os.path.join('backend.shards', 'manifest.json'), 'r',
+                  encoding='UTF-8') as file:
+            manifest = json.load(file)
+        for entry in manifest['shards']:
+            if entry['name'] == hotel_name:
+                stat = os.stat(os.path.join('backend.shards', entry['file']))
+                return stat.st_mtime_ns, stat.st_ino
+        return None
+
+    def test_one_file_per_hotel(self):
+        """
+        Tests that every hotel is stored in a file of its own.
+        """
+        self.assertEqual(sorted(os.listdir('backend.shards')),
+                         ['hotel-1.json', 'hotel-2.json', 'manifest.json'])
+        with open(os.path.join('backend.shards', 'hotel-2.json'), 'r',
+                  encoding='UTF-8') as file:
+            self.assertEqual(json.load(file)['name'], 'Hilton')
+
+    def test_only_changed_hotel_is_written(self):
+        """
+        Tests that a reservation rewrites the file of its hotel only.
+        """
+        hilton = self.shard_stat('Hilton')
+        marriot = self.shard_stat('Marriot')
+        self.hotel.reserve_room('Marriot', 'John Doe', '2024-02-15')
+        Reservation('backend.shards').create_reservation(
+            'Marriot', 'John Doe', '2024-02-16')
+        self.assertEqual(self.shard_stat('Hilton'), hilton)
+        self.assertNotEqual(self.shard_stat('Marriot'), marriot)
+        expected = self.hotel.store.data
+        self.hotel.store.invalidate()
+        self.assertEqual(self.hotel.store.load(), expected)
+        self.assertEqual(
+            len(self.hotel.display_hotel_info('Marriot')['reservations']), 2)
+
+    def test_changes_are_journaled(self):
+        """
+        Tests that a reservation leaves the manifest as it is and records
+        the hotel file written in its journal, which another reader picks
+        up, and that a rename rewrites the manifest.
+        """
+        manifest = os.path.join('backend.shards', 'manifest.json')
+        stat = os.stat(manifest)
+        self.hotel.reserve_room('Marriot', 'John Doe', '2024-02-15')
+        self.assertEqual(os.stat(manifest).st_mtime_ns, stat.st_mtime_ns)
+        self.assertTrue(os.path.exists(manifest + '.journal'))
+        # A backend of its own, as another process would have
+        data, _ = create_backend('backend.shards').read()
+        self.assertEqual(data[0]['rooms']['single'], 3)
+        self.hotel.modify_hotel_info('Hilton', new_name='Hilton Austin')
+        self.assertNotEqual(os.stat(manifest).st_ino, stat.st_ino)
+        self.assertFalse(os.path.exists(manifest + '.journal'))
+        self.assertIsNotNone(self.shard_stat('Hilton Austin'))
+
+    def test_journal_is_folded(self):
+        """
+        Tests that the manifest is rewritten once its journal grows past
+        it, with the generations the journal recorded.
+        """
+        manifest = os.path.join('backend.shards', 'manifest.json')
+        inode = os.stat(manifest).st_ino
+        for day in range(1, 20):
+            self.hotel.reserve_room('Marriot', f'Guest {day}',
+                                    f'2024-02-{day:02}')
+            if os.stat(manifest).st_ino != inode:
+                break
+        self.assertNotEqual(os.stat(manifest).st_ino, inode)
+        self.assertFalse(os.path.exists(manifest + '.journal'))
+        expected = self.hotel.store.data
+        self.hotel.store.invalidate()
+        self.assertEqual(self.hotel.store.load(), expected)
+
+    def test_rename_and_delete(self):
+        """
+        Tests that renaming and deleting hotels update the manifest.
+        """
+        self.hotel.modify_hotel_info('Hilton', new_name='Hilton Austin')
+        self.hotel.delete_hotel('Marriot')
+        self.assertEqual(sorted(os.listdir('backend.shards')),
+                         ['hotel-2.json', 'manifest.json'])
+        self.assertIsNotNone(self.shard_stat('Hilton Austin'))
+        self.hotel.store.invalidate()
+        self.assertEqual(Customer('backend.shards').create_customer(
+            'Hilton Austin', 'John Doe'),
+            'Customer John Doe created for Hilton Austin')
+
+    def test_read_hotel_alone(self):
+        """
+        Tests that a display on a cold store parses the file of one hotel
+        only.
+        """
+        os.remove(os.path.join('backend.shards', 'hotel-1.json'))
+        self.hotel.store.invalidate()
+        self.assertEqual(
+            self.hotel.display_hotel_info('Hilton')['location'],
+            'Austin Texas')
+        self.assertIsNone(self.hotel.store.data)
+
+    def test_reload_parses_changed_hotels(self):
+        """
+        Tests that another writer's change to one hotel is picked up without
+        parsing the other hotels again.
+        """
+        hilton = self.hotel.store.load()[1]
+        # A backend of its own, as another process would have
+        backend = create_backend('backend.shards')
+        data, _ = backend.read()
+        data[0]['location'] = 'Dallas Texas'
+        with self.hotel.store.lock.hold():
+            backend.append([json.dumps({
+                'op': 'modify_hotel', 'h': 0, 'name': '',
+                'location': 'Dallas Texas'})], data)
+        self.assertEqual(
+            self.hotel.display_hotel_info('Marriot')['location'],
+            'Dallas Texas')
+        self.assertIs(self.hotel.store.data[1], hilton)
+
+    def test_signature_reads_manifest_only(self):
+        """
+        Tests that validating a loaded directory does not check the hotel
+        files.
+        """
+        self.hotel.store.load()
+        with mock.patch('os.stat', wraps=os.stat) as stat, \
+                mock.patch('os.scandir', side_effect=AssertionError):
+            self.assertEqual(
+                self.hotel.display_hotel_info('Hilton')['location'],
+                'Austin Texas')
+        self.assertFalse([call for call in stat.call_args_list
+                          if 'hotel-' in str(call.args[0])])
+
+
+class TestShardedSerializer(unittest.TestCase):
+    """
+    A class to test hotel files written by another serializer.
+    """
+    def tearDown(self):
+        """
+        Cleans up the test environment by deleting the directory and its
+        sidecars.
+        """
+        DataStore.for_file('serial.shards').invalidate()
+        shutil.rmtree('serial.shards', ignore_errors=True)
+        remove_data_files('serial.shards')
+
+    def test_hotel_files_follow_the_serializer(self):
+        """
+        Tests that changed hotels are rewritten with the configured
+        serializer and still read back by their extension.
+        """
+        hotel = Hotel('serial.shards')
+        hotel.create_hotel('Marriot', 'Houston Texas', {'single': 1})
+        hotel.create_hotel('Hilton', 'Austin Texas', {'single': 1})
+        hotel.store.backend = create_backend(hotel.store.filename,
+                                             serializer='pickle')
+        hotel.store.invalidate()
+        hotel.reserve_room('Marriot', 'John Doe', '2024-02-15')
+        self.assertEqual(sorted(os.listdir('serial.shards')),
+                         ['hotel-2.json', 'hotel-3.pickle', 'manifest.json'])
+        hotel.store.backend = create_backend(hotel.store.filename)
+        hotel.store.invalidate()
+        self.assertEqual(
+            hotel.display_hotel_info('Marriot')['rooms']['single'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
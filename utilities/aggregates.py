@@ -0,0 +1,337 @@
+"""
+Module for the counters of a data file kept up to date on every write.
+
+Aggregates keeps the number of hotels, the customers per hotel, the room
+counts per hotel and room type (the rooms free of reservations without a
+check-out date) and the reservations per hotel, room type and check-in date
+in an SQLite sidecar next to the data file. Every counter is also kept
+summed over each of its fields, an empty string standing for every value,
+so any count is read with a single primary key lookup, without loading a
+hotel.
+
+The DataStore records the change every operation makes to the counters
+before applying it, and writes the changes of a commit right after the data
+as upserts of the counters they touched. The sidecar records the stamp of
+the data it was written for: if the data was written without it, by a
+process that does not keep the counters or that died between the two
+writes, the stamps differ and the counters are rebuilt from the data.
+
+Libraries:
+- collections: Provides the Counter of the reservations of a hotel.
+- contextlib: Provides the decorator turning _transaction into a context
+manager.
+- itertools: Provides the combinations of the summed fields.
+- json: Provides the encoding of the stamps.
+- os: Provides the process ID and the inode of the sidecar.
+- sqlite3: Provides the database of the sidecar.
+
+Classes:
+- Aggregates: The counters of a data file.
+"""
+import collections
+import contextlib
+import itertools
+import json
+import os
+import sqlite3
+
+
+def _add(counts: dict, fields: tuple, delta: int):
+    """
+    Adds a change to a counter and to its sums over each field.
+
+    Parameters:
+    - counts: The counters, keyed by (name, hotel, room_type, date).
+    - fields: The name of the counter followed by the values of its
+    fields: the name of the hotel, the room type and the check-in date.
+    - delta: The change.
+    """
+    if not delta:
+        return
+    name, *values = fields + ('',) * (4 - len(fields))
+    for key in itertools.product((name,), *({value or '', ''}
+                                            for value in values)):
+        counts[key] = counts.get(key, 0) + delta
+
+
+def _add_hotel(counts: dict, hotel: dict, sign: int, name: str = None):
+    """
+    Adds the counts of a hotel, or removes them.
+
+    Parameters:
+    - counts: The counters, keyed by (name, hotel, room_type, date).
+    - hotel: The hotel.
+    - sign: 1 to add the counts, -1 to remove them.
+    - name: The name to count the hotel under, defaults to its name.
+    """
+    name = hotel['name'] if name is None else name
+    _add(counts, ('hotels',), sign)
+    _add(counts, ('customers', name), sign * len(hotel['customers']))
+    for room_type, count in hotel['rooms'].items():
+        _add(counts, ('free_rooms', name, room_type), sign * count)
+    reservations = collections.Counter(
+        (reservation.get('room_type'), reservation.get('date'))
+        for reservation in hotel['reservations'])
+    for (room_type, date), count in reservations.items():
+        _add(counts, ('reservations', name, room_type, date),
+             sign * count)
+
+
+class Aggregates:
+    """
+    A class to keep the counters of a data file in an SQLite sidecar.
+
+    Attributes:
+    - filename (str): The filename of the sidecar.
+    - pending (dict): The changes to the counters made by the operations
+    applied since the data was last read or written, None if unknown.
+    - base: The stamp of the stored data the pending changes apply to, None
+    if unknown.
+
+    Methods:
+    - compute: Returns the counters of a hotel list.
+    - apply: Records the changes an operation makes to the counters.
+    - reset: Drops the pending changes, once the data matches a stamp.
+    - forget: Marks the pending changes as unknown.
+    - commit: Writes the pending changes after the data was written.
+    - read: Returns a counter of the stored data.
+    """
+    # Fields of each counter
+    FIELDS = {'hotels': (), 'customers': ('hotel',),
+              'free_rooms': ('hotel', 'room_type'),
+              'reservations': ('hotel', 'room_type', 'date')}
+    _SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS counts (
+            name TEXT NOT NULL, hotel TEXT NOT NULL, room_type TEXT NOT NULL,
+            date TEXT NOT NULL, value INTEGER NOT NULL,
+            PRIMARY KEY (name, hotel, room_type, date)) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS stamp (
+            row_id INTEGER PRIMARY KEY CHECK (row_id = 0),
+            value TEXT NOT NULL);
+    '''
+
+    def __init__(self, filename: str):
+        """
+        Initializes an Aggregates object for the specified data file, with
+        no pending changes.
+
+        Parameters:
+        - filename: The filename of the data file.
+        """
+        self.filename = filename + '.stats'
+        self.pending = {}
+        self.base = None
+        self._connection = None
+        # Process and inode the connection was opened for
+        self._owner = None
+
+    @staticmethod
+    def compute(data: list):
+        """
+        Returns the counters of a hotel list.
+
+        Parameters:
+        - data: The hotel data.
+
+        Returns:
+        A dictionary from the (name, hotel, room_type, date) key of every
+        counter to its value.
+        """
+        counts = {}
+        for hotel in data:
+            _add_hotel(counts, hotel, 1)
+        return counts
+
+    def key(self, name: str, hotel: str = None, room_type: str = None,
+            date: str = None):
+        """
+        Returns the key of a counter.
+
+        Parameters:
+        - name: The name of the counter, one of FIELDS.
+        - hotel: The name of the hotel, None for every hotel.
+        - room_type: The room type, None for every room type.
+        - date: The check-in date (YYYY-MM-DD), None for every date.
+
+        Returns:
+        The (name, hotel, room_type, date) key.
+
+        Raises:
+        ValueError: If the counter is unknown or has no such field.
+        """
+        if name not in self.FIELDS:
+            raise ValueError(f'Unknown counter {name}')
+        values = {'hotel': hotel, 'room_type': room_type, 'date': date}
+        for field, value in values.items():
+            if value is not None and field not in self.FIELDS[name]:
+                raise ValueError(f'The {name} counter has no {field}')
+        return (name,) + tuple(value or '' for value in values.values())
+
+    def apply(self, operation: dict, hotel: dict):
+        """
+        Records the changes an operation makes to the counters, before it is
+        applied.
+
+        Parameters:
+        - operation: The operation of the DataStore.
+        - hotel: The hotel it addresses, None for an added hotel.
+        """
+        pending = self.pending
+        if pending is None:
+            return
+        kind = operation['op']
+        if kind == 'add_hotel':
+            _add_hotel(pending, operation['hotel'], 1)
+        elif kind == 'remove_hotel' or (
+                kind == 'modify_hotel' and operation['name']):
+            # Count the hotel again as it will be
+            _add_hotel(pending, hotel, -1)
+            if kind == 'modify_hotel':
+                _add_hotel(pending, hotel, 1, operation['name'])
+        elif kind == 'adjust_rooms':
+            _add(pending, ('free_rooms', hotel['name'],
+                           operation['room_type']), operation['delta'])
+        elif kind in ('add_customer', 'remove_customer'):
+            _add(pending, ('customers', hotel['name']),
+                 1 if kind == 'add_customer' else -1)
+        elif kind in ('add_reservation', 'remove_reservation'):
+            if kind == 'add_reservation':
+                reservation, delta = operation['reservation'], 1
+            else:
+                reservation, delta = hotel['reservations'][operation['r']], -1
+            _add(pending, ('reservations', hotel['name'],
+                           reservation.get('room_type'),
+                           reservation.get('date')), delta)
+
+    def reset(self, stamp):
+        """
+        Drops the pending changes, once the data matches the stored data.
+
+        Parameters:
+        - stamp: The stamp of the stored data, None if unknown.
+        """
+        self.pending = {}
+        self.base = stamp
+
+    def forget(self):
+        """
+        Marks the pending changes as unknown, after the data was changed
+        without operations, so the next commit rebuilds the counters.
+        """
+        self.pending = None
+
+    def _connect(self):
+        """
+        Returns the connection to the sidecar, opening it if needed.
+
+        The connection is reopened after a fork or when the sidecar was
+        replaced.
+
+        Returns:
+        The sqlite3 connection.
+        """
+        try:
+            inode = os.stat(self.filename).st_ino
+        except FileNotFoundError:
+            inode = None
+        owner = (os.getpid(), inode)
+        if self._connection is not None and self._owner != owner:
+            # The connection of a parent process must not be closed
+            if self._owner[0] == os.getpid():
+                self._connection.close()
+            self._connection = None
+        if self._connection is None:
+            connection = sqlite3.connect(self.filename, isolation_level=None,
+                                         check_same_thread=False)
+            connection.executescript(self._SCHEMA)
+            self._connection = connection
+            self._owner = (os.getpid(), os.stat(self.filename).st_ino)
+        return self._connection
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """
+        Runs a write transaction on the sidecar, rolling it back if it
+        fails.
+
+        Returns:
+        A context manager yielding the connection.
+        """
+        connection = self._connect()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    @staticmethod
+    def _stored_stamp(connection):
+        """
+        Returns the stamp of the data the sidecar was written for.
+
+        Parameters:
+        - connection: The connection to the sidecar.
+
+        Returns:
+        The encoded stamp, None if the sidecar was never written.
+        """
+        row = connection.execute('SELECT value FROM stamp').fetchone()
+        return row[0] if row else None
+
+    def commit(self, data: list, stamp):
+        """
+        Writes the pending changes after the data was written, or rebuilds
+        every counter from the data if the sidecar does not match the data
+        the changes apply to.
+
+        The caller holds the exclusive lock of the data file.
+
+        Parameters:
+        - data: The hotel data, as written.
+        - stamp: The stamp of the data once written.
+        """
+        pending, base = self.pending, self.base
+        # If the write fails, the stamps differ and the next one rebuilds
+        self.reset(stamp)
+        with self._transaction() as connection:
+            if (pending is None or base is None
+                    or self._stored_stamp(connection) != json.dumps(base)):
+                connection.execute('DELETE FROM counts')
+                pending = self.compute(data)
+            connection.executemany(
+                'INSERT INTO counts VALUES (?, ?, ?, ?, ?) ON CONFLICT DO '
+                'UPDATE SET value = value + excluded.value',
+                [key + (delta,) for key, delta in pending.items()])
+            connection.executemany(
+                'DELETE FROM counts WHERE name = ? AND hotel = ? AND '
+                'room_type = ? AND date = ? AND value = 0', list(pending))
+            connection.execute('INSERT OR REPLACE INTO stamp VALUES (0, ?)',
+                               (json.dumps(stamp),))
+
+    def read(self, key: tuple, stamp):
+        """
+        Returns a counter of the stored data, with the pending changes.
+
+        The caller holds a lock of the data file.
+
+        Parameters:
+        - key: The key of the counter, returned by key.
+        - stamp: The stamp of the stored data.
+
+        Returns:
+        The value of the counter, or None if the sidecar does not match the
+        stored data.
+        """
+        connection = self._connect()
+        if self._stored_stamp(connection) != json.dumps(stamp):
+            return None
+        row = connection.execute(
+            'SELECT value FROM counts WHERE name = ? AND hotel = ? AND '
+            'room_type = ? AND date = ?', key).fetchone()
+        value = row[0] if row else 0
+        # The changes applied in memory and not written yet
+        if self.pending is not None and self.base == stamp:
+            value += self.pending.get(key, 0)
+        return value
@@ -0,0 +1,208 @@
+"""
+Module for searching room availability across every hotel of a data file.
+
+An AvailabilityMatrix counts the booked rooms of every hotel, room type and
+night in one (hotel x room_type x day) array, next to the room count of every
+hotel and room type. A range query subtracts the booked rooms of its nights
+from the room counts and takes the minimum over the nights for every hotel at
+once. NumPy is used when it is installed; otherwise the matrix is a list of
+per-night arrays and the reduction runs in pure Python.
+
+The DataStore keeps the matrix in sync with room and reservation changes and
+rebuilds it when hotels or room types are added or removed.
+
+Libraries:
+- array: Provides the per-night arrays of the pure-Python fallback.
+- numpy: Optional, provides the vectorized matrix.
+- utilities.instrumentation: Provides the count of the records scanned.
+- utilities.inventory: Provides the conversion of stays to night ordinals.
+
+Classes:
+- AvailabilityMatrix: The booked rooms of a hotel list per room type and
+night.
+"""
+import array
+from utilities.instrumentation import add_records
+from utilities.inventory import stay_nights
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class AvailabilityMatrix:
+    """
+    A class to count the booked rooms of every hotel of a list per room type
+    and night.
+
+    Rows follow the positions of the hotels in the list. The nights covered
+    by the matrix span the dated reservations and the queries seen so far;
+    a query outside of them triggers a rebuild over a wider span.
+
+    Attributes:
+    - stale (bool): Whether the matrix must be rebuilt before its next use.
+
+    Methods:
+    - build: Fills the matrix from a list of hotels.
+    - covers: Tells whether a query can be answered without a rebuild.
+    - search: Returns the positions of the hotels with rooms free for a stay.
+    - adjust_rooms: Changes the room count of a hotel and room type.
+    - book: Books or releases the nights of a dated reservation.
+    """
+    def __init__(self):
+        """
+        Initializes an AvailabilityMatrix object that is built on first use.
+        """
+        self.stale = True
+        # Positions of the room types in the matrix
+        self._types = {}
+        # Ordinal of the first night and number of nights covered
+        self._base = 0
+        self._days = 0
+        # Room counts per hotel and room type, -1 if the hotel does not
+        # have the room type
+        self._rooms = None
+        # Booked rooms per hotel, room type and night
+        self._booked = None
+
+    def _row(self, position: int, type_index: int):
+        """
+        Returns the booked rooms of a hotel and room type in the fallback
+        layout.
+
+        Parameters:
+        - position: The position of the hotel.
+        - type_index: The position of the room type.
+
+        Returns:
+        The array of booked rooms per night.
+        """
+        return self._booked[position * len(self._types) + type_index]
+
+    def build(self, hotels_data: list, first: int = None, last: int = None):
+        """
+        Fills the matrix from a list of hotels.
+
+        Parameters:
+        - hotels_data: The list of hotels.
+        - first: The ordinal of a night the matrix must cover (optional).
+        - last: The ordinal of the day after the last night it must cover.
+        """
+        stays = []
+        types = {}
+        for hotel in hotels_data:
+            for room_type in hotel['rooms']:
+                types.setdefault(room_type, len(types))
+            for reservation in hotel['reservations']:
+                if reservation.get('check_out') is not None:
+                    stays.append(reservation)
+        # Cover every booked night and the requested span
+        add_records(len(hotels_data) + sum(len(hotel['reservations'])
+                                           for hotel in hotels_data))
+        nights = [stay_nights(reservation['date'], reservation['check_out'])
+                  for reservation in stays]
+        if first is not None:
+            nights.append((first, last))
+        self._base = min((night[0] for night in nights), default=0)
+        self._days = max((night[1] for night in nights),
+                         default=self._base) - self._base
+        self._types = types
+        shape = (len(hotels_data), len(types))
+        if np is not None:
+            self._rooms = np.full(shape, -1, dtype=np.int32)
+            self._booked = np.zeros(shape + (self._days,), dtype=np.int32)
+        else:
+            self._rooms = [[-1] * shape[1] for _ in range(shape[0])]
+            self._booked = [array.array('i', bytes(4 * self._days))
+                            for _ in range(shape[0] * shape[1])]
+        for position, hotel in enumerate(hotels_data):
+            for room_type, count in hotel['rooms'].items():
+                self._rooms[position][types[room_type]] = count
+            for reservation in hotel['reservations']:
+                self.book(position, reservation, 1)
+        self.stale = False
+
+    def covers(self, first: int, last: int):
+        """
+        Tells whether a query can be answered without a rebuild.
+
+        Parameters:
+        - first: The ordinal of the first night.
+        - last: The ordinal of the check-out day.
+
+        Returns:
+        True if the matrix is up to date and covers the nights of the stay.
+        """
+        return (not self.stale and self._base <= first
+                and last <= self._base + self._days)
+
+    def search(self, room_type: str, first: int, last: int, rooms: int = 1):
+        """
+        Returns the positions of the hotels with rooms of a type free for
+        every night of a stay.
+
+        Parameters:
+        - room_type: The type of room.
+        - first: The ordinal of the first night.
+        - last: The ordinal of the check-out day.
+        - rooms: The number of rooms needed (default is 1).
+
+        Returns:
+        The list of hotel positions, in list order.
+        """
+        type_index = self._types.get(room_type)
+        if type_index is None:
+            return []
+        start = first - self._base
+        end = last - self._base
+        if np is not None:
+            capacity = self._rooms[:, type_index]
+            # One min-reduction over the nights for every hotel
+            free = capacity - self._booked[:, type_index,
+                                           start:end].max(axis=1)
+            return np.flatnonzero((capacity >= 0) & (free >= rooms)).tolist()
+        return [position for position, counts in enumerate(self._rooms)
+                if counts[type_index] >= 0
+                and counts[type_index] - max(self._row(
+                    position, type_index)[start:end]) >= rooms]
+
+    def adjust_rooms(self, position: int, room_type: str, delta: int):
+        """
+        Changes the room count of a hotel and room type.
+
+        Parameters:
+        - position: The position of the hotel.
+        - room_type: The type of room.
+        - delta: The number of rooms to add, negative to take rooms.
+        """
+        self._rooms[position][self._types[room_type]] += delta
+
+    def book(self, position: int, reservation: dict, count: int):
+        """
+        Books or releases the nights of a dated reservation.
+
+        Parameters:
+        - position: The position of the hotel of the reservation.
+        - reservation: The reservation.
+        - count: 1 to book the nights, -1 to release them.
+        """
+        # Undated reservations hold their room through the room count
+        if reservation.get('check_out') is None:
+            return
+        first, last = stay_nights(reservation['date'],
+                                  reservation['check_out'])
+        type_index = self._types.get(reservation['room_type'])
+        # Rebuild over a wider span if the stay falls outside of the matrix
+        if (type_index is None or first < self._base
+                or last > self._base + self._days):
+            self.stale = True
+            return
+        start = first - self._base
+        end = last - self._base
+        if np is not None:
+            self._booked[position, type_index, start:end] += count
+        else:
+            row = self._row(position, type_index)
+            for night in range(start, end):
+                row[night] += count
@@ -0,0 +1,1044 @@
+"""
+Module for sharing parsed hotel data between Hotel, Customer and Reservation
+objects.
+
+Every data file is backed by a single DataStore per process. The store keeps
+the parsed hotel list in memory and only parses the file again when its
+modification time, size or inode changes, so repeated reads are served from
+memory. Lookups go through a HotelIndex, per-night availability through an
+Inventory of room calendars, cross-hotel searches through an
+AvailabilityMatrix and reservation analytics through a columnar
+ReservationTable, that the mutation methods of the store keep in sync with
+the data.
+
+Every mutation is expressed as an operation dictionary. The data is
+persisted by a storage backend: incremental backends write the recorded
+operations (the JSON backend in journal mode appends them to a journal that
+is folded into a fresh snapshot once it grows past a size threshold, the
+SQLite backend turns them into row updates, the sharded backend rewrites the
+files of the hotels they touched), the others rewrite the file. The store
+tracks the hotels changed since the file was last rewritten, so the JSON
+backend only encodes those hotels again. A store switched to records keeps
+the hotels, customers and reservations in slotted records instead of
+dictionaries. A store switched to aggregates keeps counters of the data in
+a sidecar, updated on every write and read without loading the data.
+
+Compound operations run inside a transaction: the file is validated once when
+the outermost transaction starts, every load inside it returns the same
+snapshot, and the saves made inside it are committed with a single write.
+
+Several processes can share a data file: readers hold a shared FileLock and
+writers an exclusive one for the whole unit of work, and the JSON backend
+rewrites the file through a fsynced temporary file moved into place with
+os.replace, so readers never see a partially written file.
+
+Libraries:
+- contextlib: Provides the decorator turning transaction into a context
+manager.
+- functools: Provides the wraps decorator used by transactional.
+- json: Provides functions for encoding operations.
+- os: Provides functions for interacting with the operating system.
+- threading: Provides the locks guarding the store registry and the cache,
+and the thread running background compactions.
+- utilities.aggregates: Provides the Aggregates class keeping the counters
+of the data.
+- utilities.availability_search: Provides the AvailabilityMatrix class for
+cross-hotel searches.
+- utilities.file_lock: Provides the FileLock class for inter-process
+locking.
+- utilities.hotel_index: Provides the HotelIndex class for O(1) lookups.
+- utilities.id_allocator: Provides the IdAllocator class handing out the
+IDs of customers and reservations.
+- utilities.instrumentation: Provides the timing of the load and write
+phases.
+- utilities.inventory: Provides the Inventory class counting booked rooms
+per night.
+- utilities.records: Provides the slotted records of the hotels, customers
+and reservations.
+- utilities.reservation_table: Provides the ReservationTable class holding
+the reservations in typed columns.
+- utilities.storage_backends: Provides the backends persisting the data.
+
+Classes:
+- DataStore: A process-wide, mtime-validated cache of a hotel data file.
+
+Functions:
+- transactional: Decorator running a method inside a store transaction.
+"""
+# pylint: disable=too-many-lines
+import contextlib
+import functools
+import json
+import os
+import threading
+from utilities.aggregates import Aggregates
+from utilities.availability_search import AvailabilityMatrix
+from utilities.file_lock import FileLock
+from utilities.hotel_index import HotelIndex
+from utilities.id_allocator import IdAllocator
+from utilities.instrumentation import phase
+from utilities.inventory import Inventory
+from utilities.records import (CustomerRecord, HotelRecord,
+                               ReservationRecord, decode_hotels,
+                               encode_record)
+from utilities.reservation_table import ReservationTable
+from utilities.storage_backends import StorageBackend, create_backend
+
+
+class DataStore:
+    # pylint: disable=too-many-instance-attributes,too-many-public-methods
+    """
+    A class to share the parsed contents of a hotel data file within a
+    process.
+
+    Attributes:
+    - filename (str): The absolute path of the data file.
+    - data (list): The cached hotel data, None while nothing is cached.
+    - index (HotelIndex): The lookup dictionaries of the cached data.
+    - inventory (Inventory): The room calendars of the cached data.
+    - availability (AvailabilityMatrix): The booked rooms of every hotel of
+    the cached data per room type and night.
+    - table (ReservationTable): The reservations of the cached data in
+    typed columns.
+    - backend (StorageBackend): The backend persisting the data.
+    - lock (FileLock): The advisory lock shared with other processes.
+    - ids (IdAllocator): The sequences of the customer and reservation IDs.
+    - slotted (bool): Whether the hotels, customers and reservations are
+    cached as slotted records instead of dictionaries.
+    - aggregates (Aggregates): The counters kept in a sidecar, None until
+    use_aggregates is called.
+
+    Methods:
+    - for_file: Returns the shared store for a data file.
+    - use_journal: Switches the store to append-only journal writes.
+    - use_offset_index: Switches on the byte-offset index of a JSON file.
+    - use_records: Switches the cache to slotted records.
+    - use_aggregates: Switches on the counters kept in a sidecar.
+    - transaction: Context manager grouping loads and saves into one unit
+    of work.
+    - load: Returns the hotel data, parsing the file only if it changed.
+    - read_hotel / read_hotel_by_id / read_customer: Return one hotel or
+    customer, read alone while nothing is cached.
+    - save: Writes the pending changes and keeps the data cached.
+    - allocate_id: Returns a new customer or reservation ID.
+    - aggregate: Returns a counter without loading the data.
+    - compact: Folds the journal of the backend into a fresh snapshot.
+    - invalidate: Drops the cached data so the next load parses the file.
+    - find_hotel / find_hotel_by_id / find_customer / find_hotel_customer /
+    find_reservation / find_reservation_by_id: Index lookups on the loaded
+    data.
+    - available_rooms: Returns the rooms free for every night of a stay.
+    - search_availability: Returns the hotels with rooms free for a stay.
+    - reservation_table: Returns the up to date columnar table of the
+    reservations.
+    - add_hotel / remove_hotel / modify_hotel / adjust_rooms: Hotel
+    mutations.
+    - add_customer / remove_customer / rename_customer: Customer mutations.
+    - add_reservation / remove_reservation: Reservation mutations.
+    """
+    # Registry of the stores created in this process, keyed by absolute path
+    _registry = {}
+    # Lock guarding the registry
+    _registry_lock = threading.Lock()
+    # List and ID key of the records of each ID sequence
+    _ID_FIELDS = {'customer': ('customers', 'customer_id'),
+                  'reservation': ('reservations', 'id')}
+    # Key and record class of the record added by each adding operation
+    _ADDED_RECORDS = {'add_hotel': ('hotel', HotelRecord),
+                      'add_customer': ('customer', CustomerRecord),
+                      'add_reservation': ('reservation', ReservationRecord)}
+
+    def __init__(self, backend: StorageBackend):
+        """
+        Initializes a DataStore object persisted by the specified backend.
+
+        Parameters:
+        - backend: The backend persisting the hotel data.
+        """
+        self.backend = backend
+        self.filename = backend.filename
+        self.lock = backend.lock
+        self.ids = IdAllocator(self.filename)
+        self.slotted = False
+        self.aggregates = None
+        self.data = None
+        self.index = None
+        self.inventory = None
+        self.availability = None
+        self.table = None
+        # Signature of the stored data when the cache was filled
+        self._signature = None
+        # Encoded operations applied in memory but not written yet
+        self._pending = []
+        # Hotels changed since the data file was last rewritten, keyed by
+        # identity, None if unknown
+        self._changed = None
+        # Nesting depth of the running transaction, 0 outside of one
+        self._depth = 0
+        # Whether a save was requested inside the running transaction
+        self._dirty = False
+        # Background compaction thread, if one is running
+        self._compactor = None
+        # Lock guarding the cached data
+        self._lock = threading.RLock()
+
+    @classmethod
+    def for_file(cls, filename: str, backend: str = None,
+                 serializer: str = None):
+        """
+        Returns the store shared by every object using the specified file.
+
+        Parameters:
+        - filename: The filename for storing hotel data.
+        - backend: The name of the storage backend, 'json', 'sqlite' or
+        'sharded'. Defaults to the backend picked by create_backend.
+        - serializer: The name of the serializer of the data file. Defaults
+        to the one matching the file extension.
+
+        Returns:
+        The DataStore object for the file.
+        """
+        # Use the absolute path so relative names share the same store
+        key = os.path.abspath(filename)
+        with cls._registry_lock:
+            store = cls._registry.get(key)
+            # Create the store the first time the file is used
+            if store is None:
+                store = cls(create_backend(key, backend, serializer))
+                cls._registry[key] = store
+            # A file can only be stored by one backend and serializer
+            elif backend is not None and store.backend.name != backend:
+                raise ValueError(
+                    f'{filename} is already stored by the '
+                    f'{store.backend.name} backend')
+            elif (serializer is not None
+                  and getattr(store.backend, 'serializer', None) is not None
+                  and store.backend.serializer.name != serializer):
+                raise ValueError(
+                    f'{filename} is already stored by the '
+                    f'{store.backend.serializer.name} serializer')
+            return store
+
+    def use_journal(self, threshold: int = 1024 * 1024,
+                    background: bool = False):
+        """
+        Switches a JSON store to append-only journal writes.
+
+        Parameters:
+        - threshold: The journal size in bytes that triggers a compaction.
+        Defaults to 1 MiB.
+        - background: Run compactions in a background thread instead of in
+        the call that crossed the threshold.
+        """
+        self.backend.use_journal(threshold, background)
+
+    def use_offset_index(self):
+        """
+        Switches on the sidecar index of the byte offsets of the hotels of a
+        JSON store, so read_hotel seeks to a hotel instead of scanning the
+        file up to it. The sidecar is rebuilt whenever the file changes.
+        """
+        self.backend.use_offset_index()
+
+    def use_records(self):
+        """
+        Switches the store to keep the hotels, customers and reservations in
+        slotted records instead of dictionaries, which take less memory but
+        are slower to read. The cached data is dropped, so the next load
+        decodes the file into records.
+
+        Raises:
+        RuntimeError: If a transaction is running.
+        """
+        with self._lock:
+            if self._depth:
+                raise RuntimeError(
+                    'Records cannot be switched on inside a transaction')
+            if not self.slotted:
+                self.slotted = True
+                self.invalidate()
+
+    def use_aggregates(self):
+        """
+        Switches on the counters of the data kept in a sidecar and updated
+        on every write. Every process writing the file should switch them
+        on, or the counters are rebuilt after each of its writes.
+
+        Raises:
+        RuntimeError: If a transaction is running.
+        """
+        with self._lock:
+            if self._depth:
+                raise RuntimeError(
+                    'Aggregates cannot be switched on inside a transaction')
+            # Without the stamp of the cached data, the next write rebuilds
+            # the counters unless the file is read first
+            if self.aggregates is None:
+                self.aggregates = Aggregates(self.filename)
+
+    def load(self, missing_ok: bool = False, create: bool = False):
+        """
+        Returns the hotel data, parsing the file only if it changed since it
+        was last read or written.
+
+        Parameters:
+        - missing_ok: Return None instead of raising if the file does not
+        exist.
+        - create: Return a new, empty hotel list if the file does not exist.
+
+        Returns:
+        The cached hotel data.
+        """
+        with self._lock:
+            # Inside a transaction, keep serving the snapshot it started with
+            if self._depth and self.data is not None:
+                return self.data
+            with self.lock.hold(FileLock.SHARED):
+                return self._load(missing_ok, create)
+
+    def _load(self, missing_ok: bool, create: bool):
+        """
+        Validates the cache against the file while the lock is held.
+
+        Parameters:
+        - missing_ok: Return None instead of raising if the file does not
+        exist.
+        - create: Return a new, empty hotel list if the file does not exist.
+
+        Returns:
+        The cached hotel data.
+        """
+        signature = self.backend.signature()
+        # If the file does not exist, drop the cache
+        if signature is None:
+            self.invalidate()
+            if create:
+                # Reserve new blocks, from the high-water marks the sidecar
+                # keeps for IDs other processes may hold, or from the new
+                # data if the sidecar was removed with the old file
+                self.ids.reset_blocks()
+                self._cache([], None)
+                return self.data
+            if missing_ok:
+                return None
+            raise FileNotFoundError(self.filename)
+        # Parse the file only if it changed since it was cached
+        if self.data is None or signature != self._signature:
+            self._read()
+        return self.data
+
+    def read_hotel(self, hotel_name: str):
+        """
+        Returns the first hotel with the specified name.
+
+        While nothing is cached, the backend reads the hotel alone when it
+        can (the JSON backend streams the file up to the hotel), and the
+        cache stays empty; otherwise the lookup goes through the cache.
+
+        Parameters:
+        - hotel_name: The name of the hotel.
+
+        Returns:
+        The hotel if found, otherwise None. A hotel read alone is not part
+        of the cache and must not be changed.
+
+        Raises:
+        FileNotFoundError: If the data file does not exist.
+        """
+        return self._read_hotel('name', hotel_name)[0]
+
+    def read_hotel_by_id(self, hotel_id: int):
+        """
+        Returns the first hotel with the specified ID, read like read_hotel
+        reads hotels by name.
+
+        Parameters:
+        - hotel_id: The ID of the hotel.
+
+        Returns:
+        The hotel if found, otherwise None.
+
+        Raises:
+        FileNotFoundError: If the data file does not exist.
+        """
+        return self._read_hotel('hotel_id', hotel_id)[0]
+
+    def read_customer(self, hotel_name: str, customer_name: str):
+        """
+        Returns the first customer with the specified name in the hotels
+        with a name. The first hotel is read like read_hotel reads it, and
+        the data is only loaded to search other hotels with the same name
+        when that hotel does not hold the customer.
+
+        Parameters:
+        - hotel_name: The name of the hotel.
+        - customer_name: The name of the customer.
+
+        Returns:
+        The customer if found, otherwise None.
+
+        Raises:
+        FileNotFoundError: If the data file does not exist.
+        """
+        hotel, cached = self._read_hotel('name', hotel_name)
+        if hotel is None:
+            return None
+        if not cached:
+            customer = next((customer for customer in hotel['customers']
+                             if customer['customer_name'] == customer_name),
+                            None)
+            if customer is not None:
+                return customer
+            # Another hotel with the same name may hold the customer
+            with self._lock, self.lock.hold(FileLock.SHARED):
+                self._load(False, False)
+                return self.find_hotel_customer(hotel_name,
+                                                customer_name)[1]
+        return self.find_hotel_customer(hotel_name, customer_name)[1]
+
+    def _read_hotel(self, key: str, value):
+        """
+        Looks a hotel up in the cache, or reads it alone through the backend
+        while nothing is cached.
+
+        Parameters:
+        - key: The key to match, 'hotel_id' or 'name'.
+        - value: The value the key must hold.
+
+        Returns:
+        A (hotel, cached) tuple, cached telling whether the hotel is part of
+        the cache.
+        """
+        find = self.find_hotel if key == 'name' else self.find_hotel_by_id
+        with self._lock:
+            if self._depth and self.data is not None:
+                return find(value), True
+            with self.lock.hold(FileLock.SHARED):
+                if self.data is None:
+                    if self.backend.signature() is None:
+                        raise FileNotFoundError(self.filename)
+                    try:
+                        with phase('load'):
+                            return self.backend.read_hotel(key, value), False
+                    except NotImplementedError:
+                        pass
+                self._load(False, False)
+                return find(value), True
+
+    def _read(self):
+        """
+        Reads the stored data and replays its journal into the cache.
+        """
+        with phase('load'):
+            data, operations = self.backend.read()
+            self._cache(data, None)
+            # Replay the changes appended since the snapshot was written
+            for operation in operations:
+                self._apply(operation)
+            self._signature = self.backend.signature()
+            # The counters already hold the replayed operations
+            if self.aggregates is not None:
+                self.aggregates.reset(self.backend.stamp())
+
+    @contextlib.contextmanager
+    def transaction(self, shared: bool = False):
+        """
+        Groups loads and saves into one unit of work.
+
+        The outermost transaction validates the cache once; loads inside it
+        return that snapshot without touching the file, and saves are
+        deferred until it ends, when they are committed with a single write.
+        A shared transaction started while nothing is cached leaves the cache
+        empty until its first load, so read_hotel can read a single hotel.
+        If an exception leaves the outermost transaction, the changes are
+        discarded and the next load parses the file again. The file lock is
+        held for the whole transaction.
+
+        Parameters:
+        - shared: Hold a shared lock for a read-only unit of work instead of
+        an exclusive one. Saving inside it raises RuntimeError.
+
+        Returns:
+        A context manager yielding the store.
+        """
+        mode = FileLock.SHARED if shared else FileLock.EXCLUSIVE
+        with self._lock, self.lock.hold(mode):
+            outer = self._depth == 0
+            # Validate the cache once for the whole unit of work
+            if outer and (not shared or self.data is not None):
+                self.load(missing_ok=True)
+            self._depth += 1
+            try:
+                yield self
+            except BaseException:
+                # Roll back by dropping the changed cache
+                if outer:
+                    self.invalidate()
+                raise
+            finally:
+                self._depth -= 1
+            # Write every change of the unit of work at once
+            if outer and self._dirty:
+                self._commit()
+
+    def save(self, data, tracked: bool = True):
+        """
+        Writes the pending changes and keeps the data cached.
+
+        With an incremental backend the changes made through the mutation
+        methods are written as operations; otherwise, or if another list is
+        saved, the whole data file is rewritten. Inside a transaction the
+        write is deferred until the transaction ends.
+
+        Parameters:
+        - data: The hotel data to be saved.
+        - tracked: Whether every change was made through the mutation
+        methods. Otherwise every hotel is encoded again when the file is
+        rewritten.
+        """
+        with self._lock, self.lock.hold(FileLock.EXCLUSIVE):
+            # Cache another list, forcing the whole file to be rewritten
+            if data is not self.data:
+                self._cache(data, None)
+            elif not tracked:
+                self._changed = None
+            # Changes made without operations are not counted
+            if (data is not self.data or not tracked) \
+                    and self.aggregates is not None:
+                self.aggregates.forget()
+            self._dirty = True
+            # Outside of a transaction, write right away
+            if not self._depth:
+                self._commit()
+
+    def aggregate(self, name: str, hotel_name: str = None,
+                  room_type: str = None, date: str = None):
+        """
+        Returns a counter of the stored data, with the changes applied in
+        memory and not written yet, read from the sidecar without loading
+        the data. If the sidecar does not match the data, the counters are
+        rebuilt, or counted in the snapshot of the running transaction.
+
+        Parameters:
+        - name, hotel_name, room_type, date: The counter and the values of
+        its fields, None for every value, as taken by Aggregates.key.
+
+        Returns:
+        The value of the counter.
+
+        Raises:
+        RuntimeError: If the aggregates are not switched on.
+        ValueError: If the counter is unknown or has no such field.
+        FileNotFoundError: If the data file does not exist.
+        """
+        if self.aggregates is None:
+            raise RuntimeError('The aggregates are not switched on')
+        key = self.aggregates.key(name, hotel_name, room_type, date)
+        with self._lock:
+            with self.lock.hold(FileLock.SHARED):
+                stamp = self.backend.stamp()
+                if stamp is None:
+                    raise FileNotFoundError(self.filename)
+                value = self.aggregates.read(key, stamp)
+                if value is not None:
+                    return value
+                # Count in the snapshot of the running transaction
+                if self._depth:
+                    return self.aggregates.compute(self.load()).get(key, 0)
+            # Rebuild the counters of the stored data
+            with self.transaction():
+                self.aggregates.commit(self.data, self.backend.stamp())
+                return self.aggregates.read(key, self.backend.stamp())
+
+    def allocate_id(self, sequence: str):
+        """
+        Returns a new ID, unique across processes and never handed out
+        before, from a persistent sequence.
+
+        Parameters:
+        - sequence: The sequence, 'customer' or 'reservation'.
+
+        Returns:
+        The ID.
+        """
+        with self._lock, self.lock.hold(FileLock.EXCLUSIVE):
+            return self.ids.allocate(sequence,
+                                     lambda: self._highest_id(sequence))
+
+    def _highest_id(self, sequence: str):
+        """
+        Returns the highest ID of a sequence used in the cached data,
+        including the per-hotel reservation counters of older files.
+
+        Parameters:
+        - sequence: The sequence, 'customer' or 'reservation'.
+
+        Returns:
+        The highest ID, 0 if none is used.
+        """
+        records, key = self._ID_FIELDS[sequence]
+        highest = 0
+        for hotel in self.data or ():
+            if sequence == 'reservation':
+                highest = max(highest, hotel.get('reservation_counter', 0))
+            for record in hotel[records]:
+                if isinstance(record.get(key), int):
+                    highest = max(highest, record[key])
+        return highest
+
+    def _commit(self):
+        """
+        Writes the changes saved since the last commit.
+        """
+        with self._lock:
+            self._dirty = False
+            try:
+                with phase('write'):
+                    # Write the operations if the stored data matches the
+                    # cache
+                    if (self.backend.incremental
+                            and self._signature is not None):
+                        if self._pending:
+                            self.backend.append(self._pending, self.data)
+                    # Otherwise rewrite the whole file
+                    else:
+                        self.backend.write(self.data, self._changed)
+                        self._changed = {}
+            except BaseException:
+                # The cache no longer matches the stored data
+                self.invalidate()
+                raise
+            self._pending = []
+            self._signature = self.backend.signature()
+            if self.aggregates is not None:
+                self.aggregates.commit(self.data, self.backend.stamp())
+            # Fold the journal once it grows past the threshold
+            if self.backend.needs_compaction():
+                self._schedule_compaction()
+
+    def _schedule_compaction(self):
+        """
+        Compacts the journal now, or in a background thread if background
+        compaction is enabled.
+        """
+        if not getattr(self.backend, 'background_compaction', False):
+            self.compact()
+            return
+        # Start a compactor unless one is already running
+        if self._compactor is None or not self._compactor.is_alive():
+            self._compactor = threading.Thread(target=self.compact,
+                                               daemon=True)
+            self._compactor.start()
+
+    def compact(self):
+        """
+        Folds the journal into a fresh snapshot of the data file.
+        """
+        with self._lock, self.lock.hold(FileLock.EXCLUSIVE):
+            # Bring the cache up to date with the file and its journal
+            if self.load(missing_ok=True) is None:
+                return
+            # Nothing to fold if the journal is empty
+            if not self.backend.journal_size():
+                return
+            with phase('write'):
+                self.backend.write(self.data, self._changed)
+            self._changed = {}
+            self._signature = self.backend.signature()
+            # Record the stamp of the new snapshot
+            if self.aggregates is not None:
+                self.aggregates.commit(self.data, self.backend.stamp())
+
+    def invalidate(self):
+        """
+        Drops the cached data so the next load parses the file.
+        """
+        with self._lock:
+            self.data = None
+            self.index = None
+            self.inventory = None
+            self.availability = None
+            self.table = None
+            self._signature = None
+            self._pending = []
+            self._changed = None
+            self._dirty = False
+            self.backend.invalidate()
+            if self.aggregates is not None:
+                self.aggregates.reset(None)
+
+    def _cache(self, data: list, signature):
+        """
+        Caches hotel data and builds its index. The index is built first, so
+        data it rejects leaves the cache as it was.
+
+        Parameters:
+        - data: The hotel data to cache, turned into records in place if the
+        store uses them.
+        - signature: The signature of the file the data matches.
+        """
+        if self.slotted:
+            decode_hotels(data)
+        index = HotelIndex(data)
+        self.data = data
+        self.index = index
+        self.inventory = Inventory()
+        self.availability = AvailabilityMatrix()
+        self.table = ReservationTable()
+        self._signature = signature
+        self._pending = []
+        self._changed = None
+
+    def _record(self, operation: dict):
+        """
+        Applies an operation to the cached data and queues it for saving.
+
+        With an incremental backend the operation is encoded before it is
+        applied, so later changes to the objects it carries do not leak into
+        the stored operation.
+
+        Parameters:
+        - operation: The operation to apply.
+        """
+        if self.backend.incremental:
+            self._pending.append(json.dumps(operation, separators=(',', ':'),
+                                            default=encode_record))
+        self._apply(operation)
+
+    def _apply(self, operation: dict):
+        # pylint: disable=too-many-branches,too-many-statements
+        """
+        Applies an operation to the cached data and its index.
+
+        Hotels, customers and reservations are addressed by their position
+        in the list holding them, so journal replays are deterministic.
+
+        Parameters:
+        - operation: The operation to apply.
+        """
+        kind = operation['op']
+        # Keep the records added in records too
+        if self.slotted and kind in self._ADDED_RECORDS:
+            key, record = self._ADDED_RECORDS[kind]
+            operation[key] = record.from_dict(operation[key])
+        if self.aggregates is not None:
+            self.aggregates.apply(operation, self.data[operation['h']]
+                                  if 'h' in operation else None)
+        # Adding a hotel is the only operation not addressing a hotel
+        if kind == 'add_hotel':
+            self.data.append(operation['hotel'])
+            self.index.add_hotel(operation['hotel'])
+            self.availability.stale = True
+            self.table.add_hotel(operation['hotel'])
+            return
+        hotel = self.data[operation['h']]
+        # The hotel must be encoded again by the next rewrite
+        if self._changed is not None:
+            self._changed[id(hotel)] = hotel
+        # The matrix is only kept in sync while it is up to date
+        matrix = None if self.availability.stale else self.availability
+        if kind == 'remove_hotel':
+            del self.data[operation['h']]
+            self.index.remove_hotel(hotel)
+            self.inventory.remove_hotel(hotel)
+            self.availability.stale = True
+            self.table.remove_hotel(hotel)
+        elif kind == 'modify_hotel':
+            if operation['name']:
+                old_name = hotel['name']
+                hotel['name'] = operation['name']
+                self.index.rename_hotel(hotel, old_name, self.data)
+            if operation['location']:
+                hotel['location'] = operation['location']
+        elif kind == 'adjust_rooms':
+            hotel['rooms'][operation['room_type']] += operation['delta']
+            if matrix is not None:
+                matrix.adjust_rooms(operation['h'], operation['room_type'],
+                                    operation['delta'])
+        elif kind == 'add_customer':
+            hotel['customers'].append(operation['customer'])
+            self.index.add_customer(hotel, operation['customer'])
+        elif kind == 'remove_customer':
+            customer = hotel['customers'].pop(operation['c'])
+            self.index.remove_customer(hotel, customer)
+        elif kind == 'rename_customer':
+            customer = hotel['customers'][operation['c']]
+            old_name = customer['customer_name']
+            customer['customer_name'] = operation['name']
+            self.index.rename_customer(hotel, customer, old_name)
+        elif kind == 'add_reservation':
+            hotel['reservations'].append(operation['reservation'])
+            self.index.add_reservation(hotel, operation['reservation'])
+            self.inventory.add_reservation(hotel, operation['reservation'])
+            self.table.add(hotel, operation['reservation'])
+            if matrix is not None:
+                matrix.book(operation['h'], operation['reservation'], 1)
+        elif kind == 'remove_reservation':
+            reservation = hotel['reservations'].pop(operation['r'])
+            self.index.remove_reservation(hotel, reservation)
+            self.inventory.remove_reservation(hotel, reservation)
+            self.table.remove(hotel, operation['r'])
+            if matrix is not None:
+                matrix.book(operation['h'], reservation, -1)
+        else:
+            raise ValueError(f'Unknown operation {kind}')
+
+    def find_hotel(self, hotel_name: str):
+        """
+        Returns the first loaded hotel with the specified name.
+
+        Parameters:
+        - hotel_name: The name of the hotel.
+
+        Returns:
+        The hotel if found, otherwise None.
+        """
+        return self.index.find_hotel(hotel_name)
+
+    def find_hotel_by_id(self, hotel_id: int):
+        """
+        Returns the first loaded hotel with the specified ID.
+
+        Parameters:
+        - hotel_id: The ID of the hotel.
+
+        Returns:
+        The hotel if found, otherwise None.
+        """
+        return self.index.find_hotel_by_id(hotel_id)
+
+    def find_customer(self, hotel: dict, customer_name: str):
+        """
+        Returns the first customer of a hotel with the specified name.
+
+        Parameters:
+        - hotel: The hotel the customer belongs to.
+        - customer_name: The name of the customer.
+
+        Returns:
+        The customer if found, otherwise None.
+        """
+        return self.index.find_customer(hotel, customer_name)
+
+    def find_hotel_customer(self, hotel_name: str, customer_name: str):
+        """
+        Returns the first loaded customer with the specified name in the
+        hotels with a name, and the hotel holding it.
+
+        Parameters:
+        - hotel_name: The name of the hotel.
+        - customer_name: The name of the customer.
+
+        Returns:
+        A (hotel, customer) tuple, with None in place of the customer if it
+        was not found, and of the hotel if no hotel has the name.
+        """
+        return self.index.find_hotel_customer(hotel_name, customer_name)
+
+    def find_reservation(self, hotel: dict, customer_name: str):
+        """
+        Returns the first reservation of a customer in a hotel.
+
+        Parameters:
+        - hotel: The hotel the reservation belongs to.
+        - customer_name: The name of the customer.
+
+        Returns:
+        The reservation if found, otherwise None.
+        """
+        reservations = self.index.find_reservations(hotel, customer_name)
+        return reservations[0] if reservations else None
+
+    def find_reservation_by_id(self, reservation_id: int):
+        """
+        Returns the first loaded reservation with the specified ID.
+
+        Parameters:
+        - reservation_id: The ID of the reservation.
+
+        Returns:
+        A (hotel, reservation) tuple if found, otherwise (None, None).
+        """
+        return self.index.find_reservation_by_id(reservation_id)
+
+    def available_rooms(self, hotel: dict, room_type: str, first: int,
+                        last: int):
+        """
+        Returns the number of rooms of a type free for every night of a stay.
+
+        Parameters:
+        - hotel: The hotel.
+        - room_type: The type of room.
+        - first: The ordinal of the first night.
+        - last: The ordinal of the check-out day.
+
+        Returns:
+        The smallest number of free rooms over the nights of the stay.
+        """
+        return self.inventory.calendar(hotel).available(
+            room_type, hotel['rooms'][room_type], first, last)
+
+    def search_availability(self, room_type: str, first: int, last: int,
+                            rooms: int = 1):
+        """
+        Returns the loaded hotels with rooms of a type free for every night
+        of a stay.
+
+        Parameters:
+        - room_type: The type of room.
+        - first: The ordinal of the first night.
+        - last: The ordinal of the check-out day.
+        - rooms: The number of rooms needed (default is 1).
+
+        Returns:
+        The list of matching hotels, in file order.
+        """
+        # Rebuild the matrix if it is out of date or too narrow
+        if not self.availability.covers(first, last):
+            self.availability.build(self.data, first, last)
+        return [self.data[position] for position in
+                self.availability.search(room_type, first, last, rooms)]
+
+    def reservation_table(self):
+        """
+        Returns the columnar table of the loaded reservations, rebuilding it
+        if it is out of date.
+
+        Returns:
+        The ReservationTable.
+        """
+        if self.table.stale:
+            self.table.build(self.data)
+        return self.table
+
+    def add_hotel(self, hotel: dict):
+        """
+        Appends a hotel to the loaded data.
+
+        Parameters:
+        - hotel: The hotel to add.
+        """
+        self._record({'op': 'add_hotel', 'hotel': hotel})
+
+    def remove_hotel(self, hotel: dict):
+        """
+        Removes a hotel from the loaded data.
+
+        Parameters:
+        - hotel: The hotel to remove.
+        """
+        self._record({'op': 'remove_hotel',
+                      'h': self.index.hotel_position(hotel)})
+
+    def modify_hotel(self, hotel: dict, new_name: str = '',
+                     new_location: str = ''):
+        """
+        Modifies the name and location of a loaded hotel.
+
+        Parameters:
+        - hotel: The hotel to modify.
+        - new_name: The new name for the hotel (optional).
+        - new_location: The new location for the hotel (optional).
+        """
+        self._record({'op': 'modify_hotel',
+                      'h': self.index.hotel_position(hotel),
+                      'name': new_name, 'location': new_location})
+
+    def adjust_rooms(self, hotel: dict, room_type: str, delta: int):
+        """
+        Changes the number of available rooms of a type in a loaded hotel.
+
+        Parameters:
+        - hotel: The hotel to modify.
+        - room_type: The type of room.
+        - delta: The number of rooms to add, negative to take rooms.
+        """
+        self._record({'op': 'adjust_rooms',
+                      'h': self.index.hotel_position(hotel),
+                      'room_type': room_type, 'delta': delta})
+
+    def add_customer(self, hotel: dict, customer: dict):
+        """
+        Appends a customer to a loaded hotel.
+
+        Parameters:
+        - hotel: The hotel the customer belongs to.
+        - customer: The customer to add.
+        """
+        self._record({'op': 'add_customer',
+                      'h': self.index.hotel_position(hotel),
+                      'customer': customer})
+
+    def remove_customer(self, hotel: dict, customer: dict):
+        """
+        Removes a customer from a loaded hotel.
+
+        Parameters:
+        - hotel: The hotel the customer belongs to.
+        - customer: The customer to remove.
+        """
+        self._record({'op': 'remove_customer',
+                      'h': self.index.hotel_position(hotel),
+                      'c': self.index.customer_position(hotel, customer)})
+
+    def rename_customer(self, hotel: dict, customer: dict, new_name: str):
+        """
+        Renames a customer of a loaded hotel.
+
+        Parameters:
+        - hotel: The hotel the customer belongs to.
+        - customer: The customer to rename.
+        - new_name: The new name for the customer.
+        """
+        self._record({'op': 'rename_customer',
+                      'h': self.index.hotel_position(hotel),
+                      'c': self.index.customer_position(hotel, customer),
+                      'name': new_name})
+
+    def add_reservation(self, hotel: dict, reservation: dict):
+        """
+        Appends a reservation to a loaded hotel.
+
+        Parameters:
+        - hotel: The hotel the reservation belongs to.
+        - reservation: The reservation to add.
+        """
+        self._record({'op': 'add_reservation',
+                      'h': self.index.hotel_position(hotel),
+                      'reservation': reservation})
+
+    def remove_reservation(self, hotel: dict, reservation: dict):
+        """
+        Removes a reservation from a loaded hotel.
+
+        Parameters:
+        - hotel: The hotel the reservation belongs to.
+        - reservation: The reservation to remove.
+        """
+        self._record({'op': 'remove_reservation',
+                      'h': self.index.hotel_position(hotel),
+                      'r': self.index.reservation_position(
+                          hotel, reservation)})
+
+
+def transactional(method=None, *, shared: bool = False):
+    """
+    Decorator running a method inside a transaction of the store of its
+    object, so the loads and saves it makes share one snapshot and one write.
+
+    Parameters:
+    - method: The method to wrap. Its object must have a store attribute.
+    - shared: Run read-only methods under a shared lock.
+
+    Returns:
+    The wrapped method, or a decorator if only shared was given.
+    """
+    # Support both @transactional and @transactional(shared=True)
+    if method is None:
+        return functools.partial(transactional, shared=shared)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.store.transaction(shared=shared):
+            return method(self, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,120 @@
+"""
+Module for advisory file locks shared between processes.
+
+Readers take a shared lock and writers an exclusive lock on a lock file next
+to the data file. The data file itself cannot be locked because writers
+replace it atomically with a new file.
+
+Libraries:
+- contextlib: Provides the decorator turning hold into a context manager.
+- os: Provides functions for interacting with the operating system.
+- fcntl: Provides flock on POSIX systems.
+- msvcrt: Provides locking on Windows, where every lock is exclusive.
+
+Classes:
+- FileLock: A re-entrant advisory lock on a lock file.
+"""
+import contextlib
+import os
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+
+class FileLock:  # pylint: disable=too-few-public-methods
+    """
+    A class to hold a shared or exclusive advisory lock on a lock file.
+
+    The lock is re-entrant: nested holds only count, and a nested exclusive
+    hold inside a shared one is refused because upgrading would let another
+    writer in between.
+
+    Attributes:
+    - filename (str): The filename of the lock file.
+
+    Methods:
+    - hold: Context manager holding the lock in shared or exclusive mode.
+    """
+    # Lock modes
+    SHARED = 'shared'
+    EXCLUSIVE = 'exclusive'
+
+    def __init__(self, filename: str):
+        """
+        Initializes a FileLock object with the specified lock filename.
+
+        Parameters:
+        - filename: The filename of the lock file.
+        """
+        self.filename = filename
+        # File descriptor of the open lock file while the lock is held
+        self._fd = None
+        # Mode and nesting depth of the current hold
+        self._mode = None
+        self._depth = 0
+
+    @contextlib.contextmanager
+    def hold(self, mode: str = EXCLUSIVE):
+        """
+        Holds the lock in the specified mode.
+
+        Parameters:
+        - mode: FileLock.SHARED for readers, FileLock.EXCLUSIVE for writers.
+
+        Returns:
+        A context manager holding the lock.
+        """
+        # Nested holds only count
+        if self._depth:
+            if mode == self.EXCLUSIVE and self._mode == self.SHARED:
+                raise RuntimeError(
+                    'Cannot write while holding a shared lock')
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+            return
+        self._acquire(mode)
+        self._depth = 1
+        try:
+            yield
+        finally:
+            self._depth = 0
+            self._release()
+
+    def _acquire(self, mode: str):
+        """
+        Opens the lock file and locks it.
+
+        Parameters:
+        - mode: The mode to lock the file in.
+        """
+        self._fd = os.open(self.filename, os.O_RDWR | os.O_CREAT, 0o644)
+        self._mode = mode
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_SH if mode == self.SHARED
+                        else fcntl.LOCK_EX)
+        elif msvcrt is not None:  # pragma: no cover - Windows
+            msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+
+    def _release(self):
+        """
+        Unlocks and closes the lock file.
+        """
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            elif msvcrt is not None:  # pragma: no cover - Windows
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+            self._mode = None
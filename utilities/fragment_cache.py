@@ -0,0 +1,69 @@
+"""
+Module for caching the encoded hotels of a data file between rewrites.
+
+Minified JSON encodes a list as the encodings of its items joined by commas
+between brackets. A FragmentCache keeps the encoding of every hotel written,
+so rewriting the data file only encodes the hotels changed since the last
+write and stitches the cached fragments of the others around them. The file
+written is the same plain JSON document the serializer writes in one call.
+
+A fragment is kept with the hotel it encodes, so the identity it is keyed by
+cannot be reused by another hotel while the fragment is cached.
+
+Classes:
+- FragmentCache: The encoded hotels of a data file.
+"""
+
+
+class FragmentCache:
+    """
+    A class to keep the encoding of every hotel of a data file.
+
+    Methods:
+    - encode: Returns the chunks of the encoded hotel list.
+    - clear: Drops every fragment.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty FragmentCache object.
+        """
+        # Hotel and its encoding, keyed by the identity of the hotel
+        self._fragments = {}
+
+    def encode(self, data: list, changed, dumps):
+        """
+        Encodes a hotel list, reusing the cached fragments of the hotels not
+        changed since the last call, and keeps the fragments of its hotels.
+
+        Parameters:
+        - data: The hotel data to encode.
+        - changed: A collection of the identities of the hotels changed since
+        the last call, None to encode every hotel.
+        - dumps: The function encoding one hotel to bytes.
+
+        Returns:
+        A list of byte strings whose concatenation is the encoded list.
+        """
+        fragments = {}
+        chunks = [b'[']
+        for hotel in data:
+            key = id(hotel)
+            entry = self._fragments.get(key)
+            if (changed is None or key in changed or entry is None
+                    or entry[0] is not hotel):
+                entry = (hotel, dumps(hotel))
+            fragments[key] = entry
+            if len(chunks) > 1:
+                chunks.append(b',')
+            chunks.append(entry[1])
+        chunks.append(b']')
+        # Drop the fragments of the hotels no longer in the list
+        self._fragments = fragments
+        return chunks
+
+    def clear(self):
+        """
+        Drops every fragment, so the next call encodes every hotel.
+        """
+        self._fragments = {}
@@ -0,0 +1,454 @@
+"""
+Module for indexing hotel data in memory.
+
+Keeps dictionaries from hotel name and hotel ID to hotels, from hotel and
+customer name to customers, and from hotel and customer name to reservations,
+so lookups do not scan the hotel, customer or reservation lists. The
+dictionary from reservation ID to reservations and the positions of the
+hotels, customers and reservations in their lists, which the operations
+addressing them by position need, are built on first use, so loading a file
+does not pay for them.
+
+Libraries:
+- utilities.instrumentation: Provides the count of the records indexed.
+- utilities.positions: Provides the PositionIndex class tracking the
+positions of the records.
+
+Classes:
+- HotelIndex: A class maintaining the lookup dictionaries of a hotel list.
+"""
+from utilities.instrumentation import METRICS, add_records
+from utilities.positions import PositionIndex
+
+
+class HotelIndex:
+    # pylint: disable=too-many-instance-attributes,too-many-public-methods
+    """
+    A class to index a list of hotels by name and ID, and the customers and
+    reservations of each hotel by customer name, and the reservations of
+    every hotel by ID.
+
+    Every key maps to a list of matches kept in file order, so the first
+    match is the one a linear scan of the data would have found.
+
+    Methods:
+    - rebuild: Rebuilds every dictionary from a list of hotels.
+    - find_hotel: Returns the first hotel with the specified name.
+    - find_hotel_by_id: Returns the first hotel with the specified ID.
+    - find_customer: Returns the first customer of a hotel with the
+    specified name.
+    - find_hotel_customer: Returns the first customer with the specified
+    name among the hotels with a name, and its hotel.
+    - find_reservations: Returns the reservations of a customer in a hotel.
+    - find_reservation_by_id: Returns the first reservation with the
+    specified ID and its hotel.
+    - hotel_position / customer_position / reservation_position: Return
+    the position of a record in the list holding it.
+    - add_hotel: Indexes a new hotel.
+    - remove_hotel: Removes a hotel from the index.
+    - rename_hotel: Moves a hotel to its new name.
+    - add_customer: Indexes a new customer of a hotel.
+    - remove_customer: Removes a customer of a hotel from the index.
+    - rename_customer: Moves a customer to its new name.
+    - add_reservation: Indexes a new reservation of a hotel.
+    - remove_reservation: Removes a reservation of a hotel from the index.
+    """
+    def __init__(self, hotels_data: list):
+        """
+        Initializes a HotelIndex object for the specified hotels.
+
+        Parameters:
+        - hotels_data: The list of hotels to index.
+        """
+        self._hotels = hotels_data
+        self._by_name = {}
+        self._by_id = {}
+        self._customers = {}
+        self._reservations = {}
+        self._reservations_by_id = None
+        self._reservation_hotels = None
+        self._hotel_positions = None
+        self._customer_positions = {}
+        self._reservation_positions = {}
+        self.rebuild(hotels_data)
+
+    def rebuild(self, hotels_data: list):
+        """
+        Rebuilds every dictionary from a list of hotels.
+
+        Parameters:
+        - hotels_data: The list of hotels to index.
+        """
+        self._hotels = hotels_data
+        self._by_name = {}
+        self._by_id = {}
+        self._customers = {}
+        self._reservations = {}
+        # Reservations by ID, and the hotel of every reservation keyed by
+        # the identity of the reservation, None until first used
+        self._reservations_by_id = None
+        self._reservation_hotels = None
+        # Positions of the hotels, None until first used, and of the
+        # customers and reservations of the hotels they were used for, keyed
+        # by the identity of the hotel
+        self._hotel_positions = None
+        self._customer_positions = {}
+        self._reservation_positions = {}
+        # Index every hotel in file order
+        for hotel in hotels_data:
+            self.add_hotel(hotel)
+        if METRICS.enabled:
+            add_records(len(hotels_data) + sum(
+                len(hotel['customers']) + len(hotel['reservations'])
+                for hotel in hotels_data))
+
+    @staticmethod
+    def _append(mapping: dict, key, item):
+        """
+        Appends an item to the list stored under a key.
+
+        Parameters:
+        - mapping: The dictionary to update.
+        - key: The key of the list.
+        - item: The item to append.
+        """
+        mapping.setdefault(key, []).append(item)
+
+    @staticmethod
+    def _discard(mapping: dict, key, item):
+        """
+        Removes an item from the list stored under a key, dropping the key
+        once its list is empty.
+
+        Parameters:
+        - mapping: The dictionary to update.
+        - key: The key of the list.
+        - item: The item to remove.
+        """
+        bucket = mapping.get(key)
+        # Nothing to do if the key is not indexed
+        if bucket is None:
+            return
+        # Compare by identity, equal records may belong to other entries
+        for position, candidate in enumerate(bucket):
+            if candidate is item:
+                del bucket[position]
+                break
+        # Drop empty lists so the dictionary does not grow
+        if not bucket:
+            del mapping[key]
+
+    @staticmethod
+    def _insert_ordered(mapping: dict, key, item, sequence: list, match):
+        """
+        Inserts an item under a key keeping the list in the order of the
+        sequence the items belong to.
+
+        Parameters:
+        - mapping: The dictionary to update.
+        - key: The key of the list.
+        - item: The item to insert.
+        - sequence: The list holding the item and the other matches.
+        - match: A function telling whether an item belongs under the key.
+        """
+        # Without other matches the order is trivially kept
+        if key not in mapping:
+            mapping[key] = [item]
+            return
+        # With duplicates, collect the matches again in sequence order
+        mapping[key] = [candidate for candidate in sequence
+                        if match(candidate)]
+
+    def find_hotel(self, hotel_name: str):
+        """
+        Returns the first hotel with the specified name.
+
+        Parameters:
+        - hotel_name: The name of the hotel.
+
+        Returns:
+        The hotel if found, otherwise None.
+        """
+        bucket = self._by_name.get(hotel_name)
+        return bucket[0] if bucket else None
+
+    def find_hotel_by_id(self, hotel_id: int):
+        """
+        Returns the first hotel with the specified ID.
+
+        Parameters:
+        - hotel_id: The ID of the hotel.
+
+        Returns:
+        The hotel if found, otherwise None.
+        """
+        bucket = self._by_id.get(hotel_id)
+        return bucket[0] if bucket else None
+
+    def find_customer(self, hotel: dict, customer_name: str):
+        """
+        Returns the first customer of a hotel with the specified name.
+
+        Parameters:
+        - hotel: The hotel the customer belongs to.
+        - customer_name: The name of the customer.
+
+        Returns:
+        The customer if found, otherwise None.
+        """
+        bucket = self._customers.get((id(hotel), customer_name))
+        return bucket[0] if bucket else None
+
+    def find_hotel_customer(self, hotel_name: str, customer_name: str):
+        """
+        Returns the first customer with the specified name in the hotels
+        with a name, searched in file order, and the hotel holding it.
+
+        Parameters:
+        - hotel_name: The name of the hotel.
+        - customer_name: The name of the customer.
+
+        Returns:
+        A (hotel, customer) tuple. Without a match the hotel is the first
+        one with the name, or None, and the customer is None.
+        """
+        bucket = self._by_name.get(hotel_name)
+        if not bucket:
+            return None, None
+        for hotel in bucket:
+            customer = self.find_customer(hotel, customer_name)
+            if customer is not None:
+                return hotel, customer
+        return bucket[0], None
+
+    def find_reservations(self, hotel: dict, customer_name: str):
+        """
+        Returns the reservations of a customer in a hotel.
+
+        Parameters:
+        - hotel: The hotel the reservations belong to.
+        - customer_name: The name of the customer.
+
+        Returns:
+        A list of reservations in file order, empty if there are none.
+        """
+        return list(self._reservations.get((id(hotel), customer_name), ()))
+
+    def find_reservation_by_id(self, reservation_id: int):
+        """
+        Returns the first reservation with the specified ID.
+
+        Parameters:
+        - reservation_id: The ID of the reservation.
+
+        Returns:
+        A (hotel, reservation) tuple if found, otherwise (None, None).
+        """
+        if self._reservations_by_id is None:
+            self._reservations_by_id = {}
+            self._reservation_hotels = {}
+            for hotel in self._hotels:
+                for reservation in hotel['reservations']:
+                    self._index_reservation_id(hotel, reservation)
+        bucket = self._reservations_by_id.get(reservation_id)
+        if not bucket:
+            return None, None
+        return self._reservation_hotels[id(bucket[0])], bucket[0]
+
+    def _index_reservation_id(self, hotel: dict, reservation: dict):
+        """
+        Indexes a reservation by ID.
+
+        Parameters:
+        - hotel: The hotel the reservation belongs to.
+        - reservation: The reservation to index.
+        """
+        self._append(self._reservations_by_id, reservation.get('id'),
+                     reservation)
+        self._reservation_hotels[id(reservation)] = hotel
+
+    def hotel_position(self, hotel: dict):
+        """
+        Returns the position of a hotel in the hotel list.
+
+        Parameters:
+        - hotel: The hotel.
+
+        Returns:
+        The position of the hotel.
+
+        Raises:
+        ValueError: If the hotel is not in the list.
+        """
+        if self._hotel_positions is None:
+            self._hotel_positions = PositionIndex(self._hotels)
+        return self._hotel_positions.position(hotel)
+
+    def customer_position(self, hotel: dict, customer: dict):
+        """
+        Returns the position of a customer in the customer list of a hotel.
+
+        Parameters:
+        - hotel: The hotel the customer belongs to.
+        - customer: The customer.
+
+        Returns:
+        The position of the customer.
+
+        Raises:
+        ValueError: If the customer is not in the list.
+        """
+        positions = self._customer_positions.get(id(hotel))
+        if positions is None:
+            positions = self._customer_positions[id(hotel)] = PositionIndex(
+                hotel['customers'])
+        return positions.position(customer)
+
+    def reservation_position(self, hotel: dict, reservation: dict):
+        """
+        Returns the position of a reservation in the reservation list of a
+        hotel.
+
+        Parameters:
+        - hotel: The hotel the reservation belongs to.
+        - reservation: The reservation.
+
+        Returns:
+        The position of the reservation.
+
+        Raises:
+        ValueError: If the reservation is not in the list.
+        """
+        positions = self._reservation_positions.get(id(hotel))
+        if positions is None:
+            positions = self._reservation_positions[id(hotel)] = (
+                PositionIndex(hotel['reservations']))
+        return positions.position(reservation)
+
+    def add_hotel(self, hotel: dict):
+        """
+        Indexes a new hotel together with its customers and reservations.
+
+        Parameters:
+        - hotel: The hotel to index.
+        """
+        self._append(self._by_name, hotel['name'], hotel)
+        self._append(self._by_id, hotel['hotel_id'], hotel)
+        if self._hotel_positions is not None:
+            self._hotel_positions.append(hotel)
+        # Index the customers and reservations the hotel already has
+        for customer in hotel['customers']:
+            self.add_customer(hotel, customer)
+        for reservation in hotel['reservations']:
+            self.add_reservation(hotel, reservation)
+
+    def remove_hotel(self, hotel: dict):
+        """
+        Removes a hotel together with its customers and reservations.
+
+        Parameters:
+        - hotel: The hotel to remove.
+        """
+        self._discard(self._by_name, hotel['name'], hotel)
+        self._discard(self._by_id, hotel['hotel_id'], hotel)
+        if self._hotel_positions is not None:
+            self._hotel_positions.remove(hotel)
+        # Drop the entries keyed by the hotel
+        for customer in hotel['customers']:
+            self.remove_customer(hotel, customer)
+        for reservation in hotel['reservations']:
+            self.remove_reservation(hotel, reservation)
+        self._customer_positions.pop(id(hotel), None)
+        self._reservation_positions.pop(id(hotel), None)
+
+    def rename_hotel(self, hotel: dict, old_name: str, hotels_data: list):
+        """
+        Moves a hotel that was renamed to its new name.
+
+        Parameters:
+        - hotel: The hotel, already carrying its new name.
+        - old_name: The previous name of the hotel.
+        - hotels_data: The list of hotels the hotel belongs to.
+        """
+        self._discard(self._by_name, old_name, hotel)
+        new_name = hotel['name']
+        self._insert_ordered(self._by_name, new_name, hotel, hotels_data,
+                             lambda candidate: candidate['name'] == new_name)
+
+    def add_customer(self, hotel: dict, customer: dict):
+        """
+        Indexes a new customer of a hotel.
+
+        Parameters:
+        - hotel: The hotel the customer belongs to.
+        - customer: The customer to index.
+        """
+        self._append(self._customers,
+                     (id(hotel), customer['customer_name']), customer)
+        positions = self._customer_positions.get(id(hotel))
+        if positions is not None:
+            positions.append(customer)
+
+    def remove_customer(self, hotel: dict, customer: dict):
+        """
+        Removes a customer of a hotel from the index.
+
+        Parameters:
+        - hotel: The hotel the customer belongs to.
+        - customer: The customer to remove.
+        """
+        self._discard(self._customers,
+                      (id(hotel), customer['customer_name']), customer)
+        positions = self._customer_positions.get(id(hotel))
+        if positions is not None:
+            positions.remove(customer)
+
+    def rename_customer(self, hotel: dict, customer: dict, old_name: str):
+        """
+        Moves a customer that was renamed to its new name.
+
+        Parameters:
+        - hotel: The hotel the customer belongs to.
+        - customer: The customer, already carrying its new name.
+        - old_name: The previous name of the customer.
+        """
+        self._discard(self._customers, (id(hotel), old_name), customer)
+        new_name = customer['customer_name']
+        self._insert_ordered(
+            self._customers, (id(hotel), new_name), customer,
+            hotel['customers'],
+            lambda candidate: candidate['customer_name'] == new_name)
+
+    def add_reservation(self, hotel: dict, reservation: dict):
+        """
+        Indexes a new reservation of a hotel.
+
+        Parameters:
+        - hotel: The hotel the reservation belongs to.
+        - reservation: The reservation to index.
+        """
+        self._append(self._reservations,
+                     (id(hotel), reservation['customer_name']), reservation)
+        if self._reservations_by_id is not None:
+            self._index_reservation_id(hotel, reservation)
+        positions = self._reservation_positions.get(id(hotel))
+        if positions is not None:
+            positions.append(reservation)
+
+    def remove_reservation(self, hotel: dict, reservation: dict):
+        """
+        Removes a reservation of a hotel from the index.
+
+        Parameters:
+        - hotel: The hotel the reservation belongs to.
+        - reservation: The reservation to remove.
+        """
+        self._discard(self._reservations,
+                      (id(hotel), reservation['customer_name']), reservation)
+        if self._reservations_by_id is not None:
+            self._discard(self._reservations_by_id, reservation.get('id'),
+                          reservation)
+            self._reservation_hotels.pop(id(reservation), None)
+        positions = self._reservation_positions.get(id(hotel))
+        if positions is not None:
+            positions.remove(reservation)
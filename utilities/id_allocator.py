@@ -0,0 +1,118 @@
+"""
+Module for allocating the IDs of customers and reservations.
+
+IDs are handed out hi/lo style: a process reserves a block of consecutive
+IDs by moving the high-water mark of a sequence, kept in a sidecar file next
+to the data file, and then allocates the IDs of the block with a local
+increment, without touching the file until the block runs out. Blocks never
+overlap, so the IDs are unique across processes and restarts, and an ID is
+never handed out twice, even after the record holding it was deleted. The
+IDs left in the block of a process that exits are skipped, and a forked
+child reserves blocks of its own instead of sharing those of its parent.
+
+The sidecar is only read and written while the exclusive lock of the data
+file is held, so two processes never reserve the same block. It outlives
+the data file: a data file created anew continues the sequences, as other
+processes may still hold blocks reserved before.
+
+Libraries:
+- contextlib: Provides suppress for a sidecar that does not exist yet.
+- json: Provides the encoding of the sidecar.
+- os: Provides the process ID.
+- utilities.storage_backends.base: Provides atomic file replacement.
+
+Classes:
+- IdAllocator: The ID sequences of a data file.
+"""
+import contextlib
+import json
+import os
+from utilities.storage_backends.base import replace_file
+
+
+class IdAllocator:
+    """
+    A class to allocate IDs from the persistent sequences of a data file.
+
+    Attributes:
+    - filename (str): The filename of the sidecar.
+    - block_size (int): The number of IDs reserved at a time.
+
+    Methods:
+    - allocate: Returns the next ID of a sequence.
+    - reset_blocks: Drops the blocks reserved by the process.
+    """
+    # Number of IDs reserved at a time by default
+    BLOCK_SIZE = 100
+
+    def __init__(self, filename: str, block_size: int = BLOCK_SIZE):
+        """
+        Initializes an IdAllocator object for the specified data file.
+
+        Parameters:
+        - filename: The filename of the data file.
+        - block_size: The number of IDs reserved at a time.
+        """
+        self.filename = filename + '.ids'
+        self.block_size = block_size
+        # Next ID and end of the reserved block of each sequence
+        self._blocks = {}
+        # Process the blocks were reserved by
+        self._pid = os.getpid()
+
+    def allocate(self, sequence: str, seed):
+        """
+        Returns the next ID of a sequence, reserving a new block first if the
+        block of the process ran out.
+
+        The caller holds the exclusive lock of the data file.
+
+        Parameters:
+        - sequence: The name of the sequence.
+        - seed: A callable returning the highest ID already used in the data,
+        called only if the sidecar does not hold the sequence yet.
+
+        Returns:
+        The ID.
+        """
+        # A forked child must not hand out the IDs of its parent
+        if self._pid != os.getpid():
+            self.reset_blocks()
+        block = self._blocks.get(sequence)
+        if block is None or block[0] > block[1]:
+            block = self._blocks[sequence] = self._reserve(sequence, seed)
+        identifier = block[0]
+        block[0] += 1
+        return identifier
+
+    def _reserve(self, sequence: str, seed):
+        """
+        Moves the high-water mark of a sequence past a new block.
+
+        Parameters:
+        - sequence: The name of the sequence.
+        - seed: A callable returning the highest ID already used in the data.
+
+        Returns:
+        A [first, last] list of the IDs of the block.
+        """
+        marks = {}
+        with contextlib.suppress(FileNotFoundError, ValueError):
+            with open(self.filename, 'r', encoding='UTF-8') as file:
+                marks = json.load(file)
+        if sequence not in marks:
+            # Start above the IDs of data written before the sidecar
+            marks[sequence] = seed()
+        first = marks[sequence] + 1
+        marks[sequence] += self.block_size
+        replace_file(self.filename, json.dumps(
+            marks, separators=(',', ':')).encode('UTF-8'))
+        return [first, marks[sequence]]
+
+    def reset_blocks(self):
+        """
+        Drops the blocks of the process, so the next IDs come from new
+        blocks.
+        """
+        self._blocks = {}
+        self._pid = os.getpid()
@@ -0,0 +1,455 @@
+"""
+Module for the opt-in instrumentation of the hotel reservation system.
+
+While instrumentation is enabled, every public method of the classes
+decorated with instrument records its calls, failures and latency histogram,
+and the time of the outermost call is split across the phases of its unit
+of work:
+
+- load: reading and parsing the stored data;
+- serialize: encoding the data to write;
+- write: writing the encoded data and operations;
+- search: everything else, the lookups and in-memory changes.
+
+Bytes read and written by the file backends and the records scanned by
+index, calendar and matrix builds and by streaming lookups are counted too.
+The metrics are exposed by snapshot, as a dictionary, and by
+prometheus_text, in the Prometheus text exposition format. Setting the
+HOTELS_METRICS_FILE environment variable enables instrumentation when the
+module is imported and writes the Prometheus text to that file when the
+process exits.
+
+While instrumentation is disabled, an instrumented method costs one flag
+check and the recording helpers return right away.
+
+Libraries:
+- atexit: Provides the dump of the metrics when the process exits.
+- bisect: Provides the lookup of the histogram bucket of a latency.
+- contextlib: Provides the no-op context of disabled phases.
+- functools: Provides the wraps decorator of the instrumented methods.
+- inspect: Provides the test for the methods to instrument.
+- os: Provides the environment and the atomic replacement of the dump.
+- threading: Provides the lock of the metrics and the per-thread call
+stacks.
+- time: Provides the clock timing the calls.
+
+Classes:
+- Metrics: The metrics recorded in a process.
+
+Functions:
+- enable / disable / reset: Switch the recording on or off, or clear it.
+- instrument: Class decorator recording the calls of public methods.
+- phase: Context manager timing a phase of the running call.
+- add_bytes_read / add_bytes_written / add_records: Count I/O and scans.
+- snapshot / prometheus_text / write_prometheus: Export the metrics.
+"""
+import atexit
+import bisect
+import contextlib
+import functools
+import inspect
+import os
+import threading
+import time
+
+# Environment variable naming the file the metrics are dumped to at exit
+METRICS_VARIABLE = 'HOTELS_METRICS_FILE'
+# Phases of a unit of work, search being the time left by the others
+PHASES = ('load', 'search', 'serialize', 'write')
+# Upper bounds in seconds of the latency histogram buckets
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Counters of the bytes and records handled
+COUNTERS = ('bytes_read', 'bytes_written', 'records_scanned')
+
+
+class Metrics:
+    """
+    A class to record the metrics of the instrumented calls of a process.
+
+    Attributes:
+    - enabled (bool): Whether calls are recorded.
+
+    Methods:
+    - reset: Clears the recorded metrics.
+    - call: Runs and records an instrumented call.
+    - start_phase / end_phase: Time a phase of the running call.
+    - add: Increments a counter.
+    - snapshot: Returns a copy of the recorded metrics.
+    """
+    def __init__(self):
+        """
+        Initializes a disabled Metrics object.
+        """
+        self.enabled = False
+        self._lock = threading.Lock()
+        # Stacks of the running calls and phases of each thread
+        self._local = threading.local()
+        self._operations = {}
+        self._counters = {}
+        self.reset()
+
+    def reset(self):
+        """
+        Clears the recorded metrics.
+        """
+        with self._lock:
+            self._operations = {}
+            self._counters = dict.fromkeys(COUNTERS, 0)
+
+    def _stack(self):
+        """
+        Returns the stack of the calls and phases running in this thread.
+
+        Returns:
+        A list of [name, start, child_seconds, phases] entries, phases
+        being None for phase entries and a dictionary of seconds per phase
+        for call entries.
+        """
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def call(self, name: str, method, args: tuple, kwargs: dict):
+        """
+        Runs an instrumented call and records its latency and phases.
+
+        Parameters:
+        - name: The name of the operation.
+        - method: The method to call.
+        - args: The positional arguments of the call.
+        - kwargs: The keyword arguments of the call.
+
+        Returns:
+        The result of the call.
+        """
+        stack = self._stack()
+        outer = not stack
+        entry = [name, time.perf_counter(), 0.0,
+                 dict.fromkeys(PHASES, 0.0) if outer else None]
+        stack.append(entry)
+        failed = True
+        try:
+            result = method(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            stack.pop()
+            seconds = time.perf_counter() - entry[1]
+            if stack:
+                stack[-1][2] += seconds
+            phases = entry[3]
+            if phases is not None:
+                # The time no other phase accounts for goes to search
+                phases['search'] = max(0.0, seconds - sum(phases.values()))
+            self._record(name, seconds, failed, phases)
+
+    def _record(self, name: str, seconds: float, failed: bool,
+                phases: dict):
+        """
+        Adds a call to the metrics of its operation.
+
+        Parameters:
+        - name: The name of the operation.
+        - seconds: The latency of the call.
+        - failed: Whether the call raised an exception.
+        - phases: The seconds spent in each phase, None for nested calls.
+        """
+        with self._lock:
+            operation = self._operations.get(name)
+            if operation is None:
+                operation = self._operations[name] = {
+                    'calls': 0, 'errors': 0, 'seconds': 0.0,
+                    'buckets': [0] * (len(BUCKETS) + 1),
+                    'phases': dict.fromkeys(PHASES, 0.0)}
+            operation['calls'] += 1
+            operation['errors'] += failed
+            operation['seconds'] += seconds
+            operation['buckets'][bisect.bisect_left(BUCKETS, seconds)] += 1
+            if phases is not None:
+                for phase_name, phase_seconds in phases.items():
+                    operation['phases'][phase_name] += phase_seconds
+
+    def start_phase(self, name: str):
+        """
+        Starts timing a phase of the running call.
+
+        Parameters:
+        - name: The name of the phase, one of PHASES.
+        """
+        self._stack().append([name, time.perf_counter(), 0.0, None])
+
+    def end_phase(self):
+        """
+        Stops timing the current phase and charges its time, less the time
+        of the phases nested in it, to the outermost running call.
+        """
+        stack = self._stack()
+        name, start, child, _ = stack.pop()
+        seconds = time.perf_counter() - start
+        if stack:
+            stack[-1][2] += seconds
+            # Phases outside of instrumented calls are not charged
+            if stack[0][3] is not None:
+                stack[0][3][name] += seconds - child
+
+    def add(self, counter: str, amount: int):
+        """
+        Increments a counter.
+
+        Parameters:
+        - counter: The name of the counter, one of COUNTERS.
+        - amount: The amount to add.
+        """
+        with self._lock:
+            self._counters[counter] += amount
+
+    def snapshot(self):
+        """
+        Returns a copy of the recorded metrics.
+
+        Returns:
+        A dictionary with the counters and, under 'operations', the calls,
+        errors, total seconds, cumulative histogram buckets keyed by upper
+        bound and seconds per phase of every operation.
+        """
+        with self._lock:
+            operations = {}
+            for name, operation in sorted(self._operations.items()):
+                cumulative = 0
+                buckets = {}
+                for bound, count in zip(BUCKETS + (float('inf'),),
+                                        operation['buckets']):
+                    cumulative += count
+                    buckets[bound] = cumulative
+                operations[name] = {'calls': operation['calls'],
+                                    'errors': operation['errors'],
+                                    'seconds': operation['seconds'],
+                                    'buckets': buckets,
+                                    'phases': dict(operation['phases'])}
+            return {'operations': operations, **self._counters}
+
+
+# Metrics of the process
+METRICS = Metrics()
+
+
+class _Phase:
+    """
+    A context manager timing a phase of the running call.
+    """
+    def __init__(self, name: str):
+        """
+        Initializes a _Phase object.
+
+        Parameters:
+        - name: The name of the phase, one of PHASES.
+        """
+        self.name = name
+
+    def __enter__(self):
+        """
+        Starts timing the phase.
+        """
+        METRICS.start_phase(self.name)
+
+    def __exit__(self, *exc_info):
+        """
+        Stops timing the phase.
+        """
+        METRICS.end_phase()
+
+
+# Context of the phases run while instrumentation is disabled
+_NO_PHASE = contextlib.nullcontext()
+
+
+def enable(dump_file: str = None):
+    """
+    Starts recording the instrumented calls.
+
+    Parameters:
+    - dump_file: A file the Prometheus text is written to when the process
+    exits (optional).
+    """
+    METRICS.enabled = True
+    if dump_file is not None:
+        atexit.register(write_prometheus, dump_file)
+
+
+def disable():
+    """
+    Stops recording the instrumented calls; the metrics recorded so far are
+    kept.
+    """
+    METRICS.enabled = False
+
+
+def reset():
+    """
+    Clears the recorded metrics.
+    """
+    METRICS.reset()
+
+
+def _instrumented(name: str, method):
+    """
+    Wraps a method so its calls are recorded while instrumentation is
+    enabled.
+
+    Parameters:
+    - name: The name of the operation.
+    - method: The method to wrap.
+
+    Returns:
+    The wrapped method.
+    """
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        if not METRICS.enabled:
+            return method(*args, **kwargs)
+        return METRICS.call(name, method, args, kwargs)
+    return wrapper
+
+
+def instrument(cls):
+    """
+    Class decorator recording the calls of the public methods a class
+    defines, under the name Class.method.
+
+    Parameters:
+    - cls: The class to instrument.
+
+    Returns:
+    The class.
+    """
+    for name, member in list(vars(cls).items()):
+        if not name.startswith('_') and inspect.isfunction(member):
+            setattr(cls, name, _instrumented(f'{cls.__name__}.{name}',
+                                             member))
+    return cls
+
+
+def phase(name: str):
+    """
+    Returns a context manager timing a phase of the running call.
+
+    Parameters:
+    - name: The name of the phase, 'load', 'serialize' or 'write'.
+
+    Returns:
+    The context manager, a no-op one while instrumentation is disabled.
+    """
+    if not METRICS.enabled:
+        return _NO_PHASE
+    return _Phase(name)
+
+
+def add_bytes_read(amount: int):
+    """
+    Counts bytes read from the data files.
+
+    Parameters:
+    - amount: The number of bytes.
+    """
+    if METRICS.enabled:
+        METRICS.add('bytes_read', amount)
+
+
+def add_bytes_written(amount: int):
+    """
+    Counts bytes written to the data files.
+
+    Parameters:
+    - amount: The number of bytes.
+    """
+    if METRICS.enabled:
+        METRICS.add('bytes_written', amount)
+
+
+def add_records(amount: int):
+    """
+    Counts hotels, customers or reservations scanned.
+
+    Parameters:
+    - amount: The number of records.
+    """
+    if METRICS.enabled:
+        METRICS.add('records_scanned', amount)
+
+
+def snapshot():
+    """
+    Returns a copy of the recorded metrics.
+
+    Returns:
+    The dictionary described by Metrics.snapshot.
+    """
+    return METRICS.snapshot()
+
+
+def prometheus_text():
+    """
+    Returns the recorded metrics in the Prometheus text exposition format.
+
+    Returns:
+    The text of the metrics.
+    """
+    metrics = snapshot()
+    operations = metrics['operations']
+    lines = []
+
+    def family(name: str, kind: str, help_text: str):
+        lines.append(f'# HELP hotels_{name} {help_text}')
+        lines.append(f'# TYPE hotels_{name} {kind}')
+
+    family('operation_calls_total', 'counter', 'Calls of each operation.')
+    for name, operation in operations.items():
+        lines.append(f'hotels_operation_calls_total{{operation="{name}"}} '
+                     f'{operation["calls"]}')
+    family('operation_errors_total', 'counter',
+           'Calls of each operation that raised an exception.')
+    for name, operation in operations.items():
+        lines.append(f'hotels_operation_errors_total{{operation="{name}"}} '
+                     f'{operation["errors"]}')
+    family('operation_seconds', 'histogram', 'Latency of each operation.')
+    for name, operation in operations.items():
+        for bound, count in operation['buckets'].items():
+            bound = '+Inf' if bound == float('inf') else repr(bound)
+            lines.append(f'hotels_operation_seconds_bucket{{operation='
+                         f'"{name}",le="{bound}"}} {count}')
+        lines.append(f'hotels_operation_seconds_sum{{operation="{name}"}} '
+                     f'{operation["seconds"]!r}')
+        lines.append(f'hotels_operation_seconds_count{{operation="{name}"}} '
+                     f'{operation["calls"]}')
+    family('phase_seconds_total', 'counter',
+           'Time of the outermost calls of each operation per phase.')
+    for name, operation in operations.items():
+        for phase_name, seconds in operation['phases'].items():
+            lines.append(f'hotels_phase_seconds_total{{operation="{name}",'
+                         f'phase="{phase_name}"}} {seconds!r}')
+    for counter in COUNTERS:
+        family(f'{counter}_total', 'counter',
+               f'Total {counter.replace("_", " ")}.')
+        lines.append(f'hotels_{counter}_total {metrics[counter]}')
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus(filename: str):
+    """
+    Atomically writes the recorded metrics in the Prometheus text format,
+    for a node exporter textfile collector for instance.
+
+    Parameters:
+    - filename: The filename of the dump.
+    """
+    temp_name = f'{filename}.{os.getpid()}.tmp'
+    with open(temp_name, 'w', encoding='UTF-8') as file:
+        file.write(prometheus_text())
+    os.replace(temp_name, filename)
+
+
+# Enable the instrumentation of the process from its environment
+if os.environ.get(METRICS_VARIABLE):
+    enable(os.environ[METRICS_VARIABLE])
@@ -0,0 +1,246 @@
+"""
+Module for tracking room inventory night by night.
+
+Reservations with a check-out date hold a room for every night from check-in
+up to the night before check-out. For each hotel and room type a
+RoomCalendar keeps an array of booked rooms indexed by day ordinal, so
+checking or booking a stay of N nights costs O(N) array work instead of a
+scan of every reservation. Reservations without a check-out date keep
+holding their room for every night through the room count of the hotel.
+
+Libraries:
+- array: Provides the compact integer arrays of booked rooms.
+- datetime: Provides the conversion of ISO dates to day ordinals.
+- utilities.instrumentation: Provides the count of the reservations
+scanned.
+
+Classes:
+- RoomCalendar: The booked rooms of one hotel, per room type and night.
+- Inventory: The calendars of the hotels of a data file.
+
+Functions:
+- stay_nights: Converts check-in and check-out dates to day ordinals.
+"""
+import array
+import datetime
+from utilities.instrumentation import add_records
+
+
+def stay_nights(check_in: str, check_out: str):
+    """
+    Converts the check-in and check-out dates of a stay to day ordinals.
+
+    Parameters:
+    - check_in: The check-in date, in ISO format (YYYY-MM-DD).
+    - check_out: The check-out date, in ISO format (YYYY-MM-DD).
+
+    Returns:
+    A (first, last) tuple with the ordinal of the first night and the
+    ordinal of the check-out day, which is not a night of the stay.
+
+    Raises:
+    ValueError: If a date is not valid or the stay has no nights.
+    """
+    first = datetime.date.fromisoformat(check_in).toordinal()
+    last = datetime.date.fromisoformat(check_out).toordinal()
+    if last <= first:
+        raise ValueError('The check-out date must follow the check-in date')
+    return first, last
+
+
+class RoomCalendar:
+    """
+    A class to count the booked rooms of a hotel per room type and night.
+
+    Each room type has an array of booked rooms covering the nights between
+    its earliest and latest booked night; the array grows when a stay falls
+    outside of it.
+
+    Methods:
+    - book: Adds or removes a room for every night of a stay.
+    - booked: Returns the booked rooms of every night of a stay.
+    - available: Returns the rooms free for every night of a stay.
+    """
+    def __init__(self):
+        """
+        Initializes an empty RoomCalendar object.
+        """
+        # Booked rooms per room type, indexed by night ordinal minus base
+        self._nights = {}
+        # Ordinal of the first night of each array
+        self._base = {}
+
+    def _cover(self, room_type: str, first: int, last: int):
+        """
+        Grows the array of a room type to cover the nights of a stay.
+
+        Parameters:
+        - room_type: The type of room.
+        - first: The ordinal of the first night.
+        - last: The ordinal of the check-out day.
+
+        Returns:
+        The array of booked rooms and its base ordinal.
+        """
+        nights = self._nights.get(room_type)
+        if nights is None:
+            nights = array.array('i', bytes(4 * (last - first)))
+            self._nights[room_type] = nights
+            self._base[room_type] = first
+            return nights, first
+        base = self._base[room_type]
+        # Prepend the nights before the array
+        if first < base:
+            nights[0:0] = array.array('i', bytes(4 * (base - first)))
+            self._base[room_type] = base = first
+        # Append the nights after the array
+        if last - base > len(nights):
+            nights.extend(array.array('i', bytes(4 * (last - base
+                                                      - len(nights)))))
+        return nights, base
+
+    def book(self, room_type: str, first: int, last: int, count: int = 1):
+        """
+        Adds rooms to, or removes them from, every night of a stay.
+
+        Parameters:
+        - room_type: The type of room.
+        - first: The ordinal of the first night.
+        - last: The ordinal of the check-out day.
+        - count: The number of rooms to book, negative to release them.
+        """
+        nights, base = self._cover(room_type, first, last)
+        for night in range(first - base, last - base):
+            nights[night] += count
+
+    def booked(self, room_type: str, first: int, last: int):
+        """
+        Returns the booked rooms of every night of a stay.
+
+        Parameters:
+        - room_type: The type of room.
+        - first: The ordinal of the first night.
+        - last: The ordinal of the check-out day.
+
+        Returns:
+        A list with the number of booked rooms of each night.
+        """
+        nights = self._nights.get(room_type)
+        if nights is None:
+            return [0] * (last - first)
+        base = self._base[room_type]
+        # Nights outside of the array have no bookings
+        start = max(first, base)
+        end = min(last, base + len(nights))
+        if start >= end:
+            return [0] * (last - first)
+        return ([0] * (start - first)
+                + nights[start - base:end - base].tolist()
+                + [0] * (last - end))
+
+    def available(self, room_type: str, rooms: int, first: int, last: int):
+        """
+        Returns the number of rooms free for every night of a stay.
+
+        Parameters:
+        - room_type: The type of room.
+        - rooms: The rooms of the type not held by undated reservations.
+        - first: The ordinal of the first night.
+        - last: The ordinal of the check-out day.
+
+        Returns:
+        The smallest number of free rooms over the nights of the stay.
+        """
+        return rooms - max(self.booked(room_type, first, last))
+
+
+class Inventory:
+    """
+    A class to keep the room calendars of the hotels of a data file.
+
+    The calendar of a hotel is built from its reservations the first time
+    it is needed, then kept in sync by the DataStore as reservations are
+    added and removed.
+
+    Methods:
+    - calendar: Returns the calendar of a hotel.
+    - add_reservation: Books the nights of a new reservation.
+    - remove_reservation: Releases the nights of a removed reservation.
+    - remove_hotel: Drops the calendar of a removed hotel.
+    """
+    def __init__(self):
+        """
+        Initializes an Inventory object with no calendars built.
+        """
+        # Calendars keyed by the identity of their hotel
+        self._calendars = {}
+
+    @staticmethod
+    def _book(calendar: RoomCalendar, reservation: dict, count: int):
+        """
+        Books or releases the nights of a dated reservation.
+
+        Parameters:
+        - calendar: The calendar of the hotel of the reservation.
+        - reservation: The reservation.
+        - count: 1 to book the nights, -1 to release them.
+        """
+        # Undated reservations hold their room through the room count
+        if reservation.get('check_out') is None:
+            return
+        first, last = stay_nights(reservation['date'],
+                                  reservation['check_out'])
+        calendar.book(reservation['room_type'], first, last, count)
+
+    def calendar(self, hotel: dict):
+        """
+        Returns the calendar of a hotel, building it on first use.
+
+        Parameters:
+        - hotel: The hotel.
+
+        Returns:
+        The RoomCalendar of the hotel.
+        """
+        calendar = self._calendars.get(id(hotel))
+        if calendar is None:
+            calendar = RoomCalendar()
+            for reservation in hotel['reservations']:
+                self._book(calendar, reservation, 1)
+            add_records(len(hotel['reservations']))
+            self._calendars[id(hotel)] = calendar
+        return calendar
+
+    def add_reservation(self, hotel: dict, reservation: dict):
+        """
+        Books the nights of a reservation added to a hotel.
+
+        Parameters:
+        - hotel: The hotel the reservation belongs to.
+        - reservation: The new reservation.
+        """
+        # Calendars not built yet will include it when they are
+        calendar = self._calendars.get(id(hotel))
+        if calendar is not None:
+            self._book(calendar, reservation, 1)
+
+    def remove_reservation(self, hotel: dict, reservation: dict):
+        """
+        Releases the nights of a reservation removed from a hotel.
+
+        Parameters:
+        - hotel: The hotel the reservation belonged to.
+        - reservation: The removed reservation.
+        """
+        calendar = self._calendars.get(id(hotel))
+        if calendar is not None:
+            self._book(calendar, reservation, -1)
+
+    def remove_hotel(self, hotel: dict):
+        """
+        Drops the calendar of a removed hotel.
+
+        Parameters:
+        - hotel: The removed hotel.
+        """
+        self._calendars.pop(id(hotel), None)
@@ -0,0 +1,205 @@
+"""
+Module for the append-only operation journal of a hotel data file.
+
+Each change to the hotel data is appended to the journal as one JSON line,
+so writing a change costs the size of the change instead of the size of the
+data file. The first line of the journal records the size and modification
+time of the snapshot it applies to; once the snapshot is rewritten the
+journal no longer matches it and is ignored.
+
+Libraries:
+- json: Provides functions for reading and writing JSON data.
+- os: Provides functions for interacting with the operating system.
+- utilities.instrumentation: Provides the count of the bytes read and
+written.
+
+Classes:
+- Journal: A class to append and read the operations of a data file.
+"""
+import json
+import os
+from utilities.instrumentation import add_bytes_read, add_bytes_written
+
+
+class Journal:
+    """
+    A class to append operations to, and read them back from, the journal of
+    a hotel data file.
+
+    Attributes:
+    - filename (str): The filename of the journal.
+
+    Methods:
+    - signature: Returns the (mtime, size, inode) signature of the journal.
+    - size: Returns the size of the journal in bytes.
+    - read: Returns the operations recorded for a snapshot.
+    - append: Appends encoded operations recorded for a snapshot.
+    - remove: Deletes the journal.
+    """
+    def __init__(self, filename: str):
+        """
+        Initializes a Journal object with the specified filename.
+
+        Parameters:
+        - filename: The filename of the journal.
+        """
+        self.filename = filename
+
+    @staticmethod
+    def _base(snapshot_stat):
+        """
+        Returns the header identifying the snapshot a journal applies to.
+
+        Parameters:
+        - snapshot_stat: The os.stat result of the snapshot.
+
+        Returns:
+        The header dictionary.
+        """
+        return {'op': 'base', 'size': snapshot_stat.st_size,
+                'mtime_ns': snapshot_stat.st_mtime_ns}
+
+    def signature(self):
+        """
+        Returns the (mtime, size, inode) signature of the journal.
+
+        Returns:
+        The signature tuple, or None if the journal does not exist.
+        """
+        try:
+            stat = os.stat(self.filename)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def size(self):
+        """
+        Returns the size of the journal in bytes.
+
+        Returns:
+        The size of the journal, 0 if it does not exist.
+        """
+        try:
+            return os.path.getsize(self.filename)
+        except FileNotFoundError:
+            return 0
+
+    def _matches(self, header: str, snapshot_stat):
+        """
+        Returns whether a header line identifies the specified snapshot.
+
+        Parameters:
+        - header: The first line of the journal.
+        - snapshot_stat: The os.stat result of the snapshot.
+
+        Returns:
+        True if the header is complete, valid and matches the snapshot.
+        """
+        if not header.endswith('\n'):
+            return False
+        try:
+            return json.loads(header) == self._base(snapshot_stat)
+        except ValueError:
+            # A corrupt header makes the whole journal stale
+            return False
+
+    def read(self, snapshot_stat):
+        """
+        Returns the operations recorded for the specified snapshot.
+
+        The journal is only read, as readers hold the shared lock: a last
+        line without a newline is a torn write and is skipped, and a journal
+        left behind by an older snapshot is ignored. The next append, which
+        holds the exclusive lock, repairs both.
+
+        Parameters:
+        - snapshot_stat: The os.stat result of the snapshot.
+
+        Returns:
+        A list of operations, empty if the journal does not exist or belongs
+        to an older snapshot.
+        """
+        try:
+            with open(self.filename, 'r', encoding='UTF-8') as file:
+                lines = file.readlines()
+        except FileNotFoundError:
+            return []
+        add_bytes_read(sum(len(line) for line in lines))
+        # Ignore a journal written for another snapshot
+        if not lines or not self._matches(lines[0], snapshot_stat):
+            return []
+        # Skip a torn last line
+        if not lines[-1].endswith('\n'):
+            lines.pop()
+        # Decode every operation after the header
+        return [json.loads(line) for line in lines[1:]]
+
+    def _repair(self, snapshot_stat):
+        """
+        Deletes a journal written for another snapshot and cuts off a torn
+        last line, so appends start on a new line. The exclusive lock must
+        be held.
+
+        Parameters:
+        - snapshot_stat: The os.stat result of the snapshot.
+
+        Returns:
+        True if a journal for the snapshot is left to append to.
+        """
+        try:
+            with open(self.filename, 'r+b') as file:
+                header = file.readline()
+                add_bytes_read(len(header))
+                if not self._matches(header.decode('UTF-8', 'replace'),
+                                     snapshot_stat):
+                    stale = True
+                else:
+                    stale = False
+                    # Find the end of the last complete line from the end
+                    size = end = file.seek(0, os.SEEK_END)
+                    while end > len(header):
+                        start = max(len(header), end - 4096)
+                        file.seek(start)
+                        block = file.read(end - start)
+                        add_bytes_read(len(block))
+                        if b'\n' in block:
+                            end = start + block.rindex(b'\n') + 1
+                            break
+                        end = start
+                    if end < size:
+                        file.truncate(end)
+        except FileNotFoundError:
+            return False
+        if stale:
+            self.remove()
+        return not stale
+
+    def append(self, lines: list, snapshot_stat):
+        """
+        Appends encoded operations to the journal of the specified snapshot,
+        repairing the journal first. The exclusive lock must be held.
+
+        Parameters:
+        - lines: The operations to append, each encoded as a JSON string.
+        - snapshot_stat: The os.stat result of the snapshot.
+        """
+        # Start the journal with its header if there is none to append to
+        if not self._repair(snapshot_stat):
+            lines = [json.dumps(self._base(snapshot_stat))] + lines
+        # Write every operation of the change with a single append
+        text = ''.join(line + '\n' for line in lines)
+        with open(self.filename, 'a', encoding='UTF-8') as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+        # The operations are ASCII, escaped by json.dumps
+        add_bytes_written(len(text))
+
+    def remove(self):
+        """
+        Deletes the journal if it exists.
+        """
+        try:
+            os.remove(self.filename)
+        except FileNotFoundError:
+            pass
@@ -1,12 +1,24 @@
 """
 Module for handling JSON data.
 
+JSONDataHandler is the storage interface of the Hotel, Customer and
+Reservation classes. The data is read and written through the DataStore
+shared by every object using the same file, so repeated loads are served from
+memory, and persisted by a pluggable storage backend (a data file encoded
+by a pluggable serializer, an SQLite database or a directory with one file
+per hotel).
+
 Libraries:
-- json: Provides functions for reading and writing JSON data.
+- utilities.data_store: Provides the DataStore class caching the parsed data.
+- utilities.instrumentation: Provides the opt-in recording of the calls.
+- utilities.records: Provides the dictionary copies of the cached hotels.
 """
-import json
+from utilities.data_store import DataStore
+from utilities.instrumentation import instrument
+from utilities.records import as_dict
 
 
+@instrument
 class JSONDataHandler:
     """
     A class for handling JSON data.
@@ -14,37 +26,90 @@ class JSONDataHandler:
     Attributes:
     - filename (str): The filename for storing JSON data. Defaults to
     'hotels.json'.
+    - backend (str): The name of the storage backend, 'json', 'sqlite' or
+    'sharded'.
+    - serializer (str): The name of the serializer of the data file, None
+    for the sqlite backend.
+    - store (DataStore): The store shared by every object using the file.
 
     Methods:
     - load_data: Loads JSON data from the specified file.
     - save_data: Saves JSON data to the specified file.
+    - transaction: Groups loads and saves into one unit of work.
+    - run_batch: Calls a method for every item of a batch in one unit of
+    work.
     """
-    def __init__(self, filename='hotels.json'):
+    def __init__(self, filename='hotels.json', backend=None,
+                 serializer=None):
         """
         Initializes a JSONDataHandler object with the specified filename.
 
         Parameters:
         - filename (str, optional): The filename for storing JSON data.
         Defaults to 'hotels.json'.
+        - backend (str, optional): The name of the storage backend, 'json',
+        'sqlite' or 'sharded'. Defaults to the backend matching the file
+        extension, then to the HOTELS_STORAGE_BACKEND environment variable,
+        then to 'json'.
+        - serializer (str, optional): The name of the serializer, 'json'
+        (minified), 'json-stdlib', 'json-indent', 'msgpack' or 'pickle'.
+        Defaults to the serializer matching the file extension, then to
+        'json'.
         """
         self.filename = filename
+        self.store = DataStore.for_file(filename, backend, serializer)
+        self.backend = self.store.backend.name
+        self.serializer = getattr(getattr(self.store.backend, 'serializer',
+                                          None), 'name', None)
 
     def load_data(self):
         """
         Loads JSON data from the specified file.
 
         Returns:
-        The loaded JSON data.
+        The loaded JSON data, copied so that changing it does not change the
+        cached data until it is saved.
         """
-        with open(self.filename, 'r', encoding='UTF-8') as file:
-            return json.load(file)
+        return [as_dict(hotel) for hotel in self.store.load()]
 
     def save_data(self, data):
         """
         Saves JSON data to the specified file.
 
+        The data may have been changed without the mutation methods of the
+        store, so every hotel is encoded again.
+
         Parameters:
         - data: The JSON data to be saved.
         """
-        with open(self.filename, 'w', encoding='UTF-8') as file:
-            json.dump(data, file, indent=4)
+        self.store.save(data, tracked=False)
+
+    def transaction(self, shared: bool = False):
+        """
+        Groups loads and saves into one unit of work, committed with a
+        single write when the outermost transaction ends.
+
+        Parameters:
+        - shared: Hold a shared lock for a read-only unit of work.
+
+        Returns:
+        A context manager yielding the data store.
+        """
+        return self.store.transaction(shared=shared)
+
+    def run_batch(self, method, items):
+        """
+        Calls a method for every item of a batch inside one transaction, so
+        the whole batch is applied with one load and one save.
+
+        Parameters:
+        - method: The bound method to call for each item.
+        - items: An iterable of argument tuples, or of keyword argument
+        dictionaries.
+
+        Returns:
+        A list with the result of the method for each item, in order.
+        """
+        with self.store.transaction():
+            return [method(**item) if isinstance(item, dict)
+                    else method(*item) for item in items]
@@ -0,0 +1,146 @@
+"""
+Module for streaming the elements of a top-level JSON array.
+
+iter_elements reads a JSON file in fixed-size chunks and yields the raw bytes
+of each element of its top-level array as soon as the element is complete,
+in the spirit of ijson. The scanner skips strings, scalars and flat records
+with regular expression matches and only tracks the nesting depth of the
+other brackets, so the elements are never decoded: find_element decodes an
+element only if its bytes contain the value looked for, and stops reading the
+file at the first match. Memory stays bounded by the size of one element plus
+one chunk.
+
+Libraries:
+- json: Provides the decoding of the matching element.
+- re: Provides the scanning of the brackets.
+- utilities.instrumentation: Provides the count of the bytes read and the
+elements scanned.
+
+Functions:
+- iter_elements: Yields the raw elements of a top-level JSON array.
+- find_element: Returns the first object of a JSON array with a key value.
+"""
+import json
+import re
+from utilities.instrumentation import add_bytes_read, add_records
+
+# Possessive repetition, which spares the regular expression engine its
+# backtracking state, on Python 3.11 and later
+try:
+    re.compile(rb'a*+')
+    _REPEAT = rb'*+'
+except re.error:
+    _REPEAT = rb'*'
+# Bytes other than strings and brackets
+_OTHER = rb'[^"\[\]{}]' + _REPEAT
+# A whole string, escapes included
+_STRING = (rb'"[^"\\]' + _REPEAT + rb'(?:\\.[^"\\]' + _REPEAT + rb')'
+           + _REPEAT + rb'"')
+# A whole object or array holding no other object or array
+_FLAT = (rb'[\[{]' + _OTHER + rb'(?:' + _STRING + _OTHER + rb')' + _REPEAT
+         + rb'[\]}]')
+# Run of bytes up to the next bracket, whole strings included
+_SKIP = re.compile(_OTHER + rb'(?:' + _STRING + _OTHER + rb')' + _REPEAT,
+                   re.DOTALL)
+# Run of bytes up to the next bracket of a nested structure, whole strings
+# and flat records included, so the scanner stops a few times per hotel
+# instead of at every customer and reservation
+_SKIP_FLAT = re.compile(_OTHER + rb'(?:(?:' + _STRING + rb'|' + _FLAT
+                        + rb')' + _OTHER + rb')' + _REPEAT, re.DOTALL)
+# Whitespace allowed before the top-level array
+_WHITESPACE = re.compile(rb'[ \t\r\n]*')
+
+
+def iter_elements(file, chunk_size: int = 64 * 1024):
+    """
+    Yields the raw bytes of the elements of the top-level array of a JSON
+    file, one element at a time.
+
+    Only object and array elements are yielded; hotel files hold nothing
+    else.
+
+    Parameters:
+    - file: The file, opened in binary mode.
+    - chunk_size: The number of bytes read at a time (default is 64 KiB).
+
+    Returns:
+    A generator of (offset, element) tuples, with the offset of the element
+    in the file and its bytes.
+
+    Raises:
+    ValueError: If the file does not hold a JSON array.
+    """
+    buffer = file.read(chunk_size)
+    add_bytes_read(len(buffer))
+    # Offset in the file of the first byte of the buffer
+    base = 0
+    position = _WHITESPACE.match(buffer).end()
+    if buffer[position:position + 1] != b'[':
+        raise ValueError('The file does not hold a JSON array')
+    position += 1
+    depth = 1
+    # Position of the element being scanned, None between elements
+    start = None
+    while True:
+        # Stops at a bracket, or at the end of the buffer or before a string
+        # it cuts; flat records are only skipped inside an element
+        skip = _SKIP if depth == 1 else _SKIP_FLAT
+        position = skip.match(buffer, position).end()
+        bracket = buffer[position:position + 1]
+        if bracket in (b'[', b'{'):
+            if depth == 1:
+                start = position
+            depth += 1
+            position += 1
+        elif bracket in (b']', b'}'):
+            depth -= 1
+            position += 1
+            if depth == 1:
+                add_records(1)
+                yield base + start, buffer[start:position]
+                start = None
+            elif depth == 0:
+                return
+        else:
+            # Keep the unfinished element and read the next chunk
+            chunk = file.read(chunk_size)
+            if not chunk:
+                raise ValueError('The JSON array is not terminated')
+            add_bytes_read(len(chunk))
+            keep = position if start is None else start
+            buffer = buffer[keep:] + chunk
+            base += keep
+            position -= keep
+            if start is not None:
+                start = 0
+
+
+def find_element(file, key: str, value: str, chunk_size: int = 64 * 1024):
+    """
+    Returns the first object of the top-level array of a JSON file whose key
+    holds the specified value, without decoding the elements before it.
+
+    Elements are only decoded if their bytes contain the value encoded with
+    escaped or raw non-ASCII characters, the two encodings the serializers
+    write.
+
+    Parameters:
+    - file: The file, opened in binary mode.
+    - key: The key to match.
+    - value: The value the key must hold.
+    - chunk_size: The number of bytes read at a time (default is 64 KiB).
+
+    Returns:
+    The decoded object if found, otherwise None.
+
+    Raises:
+    ValueError: If the file does not hold a JSON array.
+    """
+    needles = {json.dumps(value).encode('UTF-8'),
+               json.dumps(value, ensure_ascii=False).encode('UTF-8')}
+    for _, element in iter_elements(file, chunk_size):
+        if any(needle in element for needle in needles):
+            candidate = json.loads(element)
+            if isinstance(candidate, dict) and candidate.get(key) == value:
+                return candidate
+    return None
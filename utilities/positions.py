@@ -0,0 +1,101 @@
+"""
+Module for tracking the positions of the items of a list.
+
+The operations of the DataStore address hotels, customers and reservations
+by their position in the list holding them. A PositionIndex gives that
+position without scanning the list: every item keeps the slot it was
+appended at, removing an item leaves a tombstone on its slot instead of
+shifting the later slots, and the position of an item is its slot less the
+tombstones before it. The slots are renumbered once the tombstones outnumber
+the items, so the tombstone list stays short.
+
+Libraries:
+- bisect: Provides the sorted list of tombstones.
+
+Classes:
+- PositionIndex: The positions of the items of a list, by identity.
+"""
+import bisect
+
+
+class PositionIndex:
+    """
+    A class to look up the position of an item of a list that only grows
+    at its end, by identity.
+
+    Methods:
+    - append: Tracks an item appended to the list.
+    - position: Returns the position of an item in the list.
+    - remove: Stops tracking an item removed from the list.
+    """
+    # Number of tombstones always tolerated before renumbering
+    MIN_TOMBSTONES = 32
+
+    def __init__(self, items: list = ()):
+        """
+        Initializes a PositionIndex object for the items of a list.
+
+        Parameters:
+        - items: The items of the list, in order.
+        """
+        # Slot of every item, keyed by its identity
+        self._slots = {id(item): slot for slot, item in enumerate(items)}
+        # Number of slots handed out
+        self._size = len(items)
+        # Sorted slots of the removed items
+        self._tombstones = []
+
+    def append(self, item):
+        """
+        Tracks an item appended to the end of the list.
+
+        Parameters:
+        - item: The item appended.
+        """
+        self._slots[id(item)] = self._size
+        self._size += 1
+
+    def position(self, item):
+        """
+        Returns the position of an item in the list.
+
+        Parameters:
+        - item: The item to look for.
+
+        Returns:
+        The position of the item.
+
+        Raises:
+        ValueError: If the item is not in the list.
+        """
+        slot = self._slots.get(id(item))
+        if slot is None:
+            raise ValueError('item not found')
+        return slot - bisect.bisect_left(self._tombstones, slot)
+
+    def remove(self, item):
+        """
+        Stops tracking an item removed from the list, leaving a tombstone on
+        its slot.
+
+        Parameters:
+        - item: The item removed.
+        """
+        slot = self._slots.pop(id(item), None)
+        if slot is None:
+            return
+        bisect.insort(self._tombstones, slot)
+        if len(self._tombstones) > max(self.MIN_TOMBSTONES,
+                                       len(self._slots)):
+            self._compact()
+
+    def _compact(self):
+        """
+        Renumbers the slots to the positions of the items and drops the
+        tombstones.
+        """
+        tombstones = self._tombstones
+        self._slots = {key: slot - bisect.bisect_left(tombstones, slot)
+                       for key, slot in self._slots.items()}
+        self._size = len(self._slots)
+        self._tombstones = []
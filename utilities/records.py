@@ -0,0 +1,267 @@
+"""
+Module for the slotted records holding hotels, customers and reservations.
+
+A DataStore switched to records with use_records keeps every hotel,
+customer and reservation in an object with a slot per field instead of a
+dictionary with a hash table of its own, which takes a fraction of the
+memory once millions of reservations are loaded. The strings repeated
+across records (hotel names and locations, room types, customer names and
+dates) are interned, so records share one copy of each.
+
+Records are mutable mappings: the code written for dictionaries reads and
+writes their fields with the same subscripts and get calls, and a record
+compares equal to the dictionary holding the same fields. A missing field
+is an empty slot, and fields without a slot are kept in a dictionary of the
+record created for them, so every document is preserved. The serializers
+encode records through encode_record, so the files they write are the same.
+
+Libraries:
+- collections.abc: Provides the mapping interface of the records.
+- copy: Provides the deep copies of the dictionaries returned.
+- sys: Provides the interning of strings.
+
+Classes:
+- Record: The base class of the records.
+- CustomerRecord: A customer of a hotel.
+- ReservationRecord: A reservation of a hotel.
+- HotelRecord: A hotel, with its customers and reservations.
+
+Functions:
+- decode_hotels: Turns decoded hotel dictionaries into records.
+- encode_record: Returns a record as a dictionary for the serializers.
+- as_dict: Returns a copy of a record or dictionary for display.
+"""
+import collections.abc
+import copy
+import sys
+
+
+class Record(collections.abc.MutableMapping):
+    """
+    A class to hold the fields of a hotel, customer or reservation in slots.
+
+    Class attributes:
+    - FIELDS (tuple): The fields kept in slots, in document order.
+    - INTERNED (frozenset): The fields whose strings are interned.
+
+    Methods:
+    - from_dict: Returns a record holding the fields of a mapping.
+    - to_dict: Returns a dictionary holding the fields of the record.
+    """
+    __slots__ = ('_extra',)
+    FIELDS = ()
+    INTERNED = frozenset()
+
+    def __init__(self, values=()):
+        """
+        Initializes a record holding the specified fields.
+
+        Parameters:
+        - values: A mapping or an iterable of (field, value) pairs.
+        """
+        # Fields without a slot, None while there are none
+        self._extra = None
+        self.update(values)
+
+    @classmethod
+    def from_dict(cls, values):
+        """
+        Returns a record holding the fields of a mapping.
+
+        Parameters:
+        - values: The mapping, usually a decoded dictionary.
+
+        Returns:
+        The record.
+        """
+        # Set the slots directly, this runs for every record loaded
+        record = cls.__new__(cls)
+        extra = None
+        for key, value in values.items():
+            if key in cls.FIELDS:
+                if key in cls.INTERNED and isinstance(value, str):
+                    value = sys.intern(value)
+                setattr(record, key, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        record._extra = extra  # pylint: disable=protected-access
+        return record
+
+    def to_dict(self):
+        """
+        Returns a dictionary holding the fields of the record.
+
+        Returns:
+        The dictionary, independent of the record.
+        """
+        return dict(self)
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key, value):
+        if key in self.FIELDS:
+            if key in self.INTERNED and isinstance(value, str):
+                value = sys.intern(value)
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self.FIELDS:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self._extra is None:
+            raise KeyError(key)
+        else:
+            del self._extra[key]
+
+    def __iter__(self):
+        for key in self.FIELDS:
+            if hasattr(self, key):
+                yield key
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({dict(self)!r})'
+
+
+class CustomerRecord(Record):
+    """
+    A class to hold a customer of a hotel.
+    """
+    __slots__ = ('customer_id', 'customer_name')
+    FIELDS = __slots__
+    INTERNED = frozenset(('customer_name',))
+
+
+class ReservationRecord(Record):
+    """
+    A class to hold a reservation of a hotel.
+    """
+    __slots__ = ('id', 'customer_id', 'customer_name', 'room_type', 'date',
+                 'booked', 'check_out')
+    FIELDS = __slots__
+    INTERNED = frozenset(('customer_name', 'room_type', 'date', 'booked',
+                          'check_out'))
+
+
+class HotelRecord(Record):
+    """
+    A class to hold a hotel, with its customers and reservations held in
+    records too.
+    """
+    __slots__ = ('hotel_id', 'name', 'location', 'rooms', 'reservations',
+                 'customers')
+    FIELDS = __slots__
+    INTERNED = frozenset(('name', 'location'))
+
+    @classmethod
+    def from_dict(cls, values):
+        """
+        Returns a hotel record holding the fields of a mapping, with its
+        customers and reservations turned into records and its room types
+        interned.
+
+        Parameters:
+        - values: The mapping, usually a decoded dictionary.
+
+        Returns:
+        The hotel record.
+        """
+        hotel = super().from_dict(values)
+        if 'rooms' in hotel:
+            hotel['rooms'] = {sys.intern(room_type): count
+                              for room_type, count in hotel['rooms'].items()}
+        if 'customers' in hotel:
+            hotel['customers'] = [CustomerRecord.from_dict(customer)
+                                  for customer in hotel['customers']]
+        if 'reservations' in hotel:
+            hotel['reservations'] = [
+                ReservationRecord.from_dict(reservation)
+                for reservation in hotel['reservations']]
+        return hotel
+
+    def to_dict(self):
+        """
+        Returns a dictionary holding the fields of the hotel, with its
+        rooms, customers and reservations copied into dictionaries too.
+
+        Returns:
+        The dictionary, independent of the record.
+        """
+        hotel = dict(self)
+        if 'rooms' in hotel:
+            hotel['rooms'] = dict(hotel['rooms'])
+        for key in ('customers', 'reservations'):
+            if key in hotel:
+                hotel[key] = [as_dict(record) for record in hotel[key]]
+        return hotel
+
+
+def decode_hotels(data: list):
+    """
+    Turns decoded hotel dictionaries into records, in place.
+
+    Parameters:
+    - data: The hotel data.
+
+    Returns:
+    The same list, holding hotel records.
+    """
+    data[:] = [HotelRecord.from_dict(hotel) for hotel in data]
+    return data
+
+
+def encode_record(value):
+    """
+    Returns a record as a dictionary, for the default hook of the encoders.
+    The records it holds are left to the encoder, which calls the hook
+    again for each of them.
+
+    Parameters:
+    - value: The value the encoder cannot encode.
+
+    Returns:
+    The fields of the record in a dictionary.
+
+    Raises:
+    TypeError: If the value is not a record.
+    """
+    if isinstance(value, Record):
+        return dict(value)
+    raise TypeError(f'{type(value).__name__} is not serializable')
+
+
+def as_dict(value):
+    """
+    Returns a dictionary copy of a hotel, customer or reservation, for the
+    callers expecting dictionaries. The copy is independent of the cached
+    data, so changing it does not change the store.
+
+    Parameters:
+    - value: A record, or a dictionary copied deeply.
+
+    Returns:
+    The dictionary.
+    """
+    if isinstance(value, Record):
+        return value.to_dict()
+    return copy.deepcopy(value)
@@ -0,0 +1,523 @@
+"""
+Module for the columnar table of the reservations of a data file.
+
+A ReservationTable keeps, for every hotel, one typed array per field of its
+reservations: the reservation ID, the customer ID, the codes of the room
+type and customer name, the ordinal of the check-in date, the number of
+nights and the ordinal of the booking date. Strings are stored once in a
+StringDictionary and referenced by their code, so a reservation takes 36
+bytes instead of a dictionary.
+Filters and group-bys run over the arrays as vectorized NumPy operations on
+zero-copy views of the arrays when NumPy is installed, and as plain loops
+otherwise.
+
+The rows of a hotel follow the order of its reservation list, so the
+DataStore removes the row of a cancelled reservation by the position it
+already knows, with no map from reservations to rows. The store keeps the
+table in sync with the reservations added and removed, and rebuilds it when
+it turns stale.
+
+Libraries:
+- array: Provides the typed columns.
+- numpy: Optional, provides the vectorized filters and group-bys.
+- datetime: Provides the conversion of dates to day ordinals.
+- utilities.instrumentation: Provides the count of the records scanned.
+
+Classes:
+- StringDictionary: The codes of the distinct strings of a column.
+- ReservationTable: The reservations of a hotel list in typed columns.
+"""
+import array
+import datetime
+from utilities.instrumentation import add_records
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class StringDictionary:
+    """
+    A class to give every distinct string of a column a small integer code.
+
+    Attributes:
+    - values (list): The strings, indexed by code.
+
+    Methods:
+    - code: Returns the code of a string, adding it if it is new.
+    - find: Returns the code of a string, None if it is not known.
+    """
+    def __init__(self):
+        """
+        Initializes an empty StringDictionary object.
+        """
+        self.values = []
+        # Code of every string
+        self._codes = {}
+
+    def code(self, value):
+        """
+        Returns the code of a string, adding it if it is new.
+
+        Parameters:
+        - value: The string.
+
+        Returns:
+        The code of the string.
+        """
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def find(self, value):
+        """
+        Returns the code of a string without adding it.
+
+        Parameters:
+        - value: The string.
+
+        Returns:
+        The code of the string, None if it is not known.
+        """
+        return self._codes.get(value)
+
+
+class ReservationTable:
+    """
+    A class to keep the reservations of a hotel list in typed columns, one
+    set of columns per hotel.
+
+    Attributes:
+    - stale (bool): Whether the table must be rebuilt before its next use.
+    - room_types (StringDictionary): The codes of the room types.
+    - customer_names (StringDictionary): The codes of the customer names.
+
+    Methods:
+    - build: Fills the table from a list of hotels.
+    - add: Adds a row for a reservation.
+    - remove: Removes the row of a reservation.
+    - add_hotel / remove_hotel: Add or remove the rows of a hotel.
+    - count: Returns the number of reservations matching the filters.
+    - group_count: Returns the number of matching reservations per value of
+    a field.
+    - reservation_ids: Returns the IDs of the matching reservations.
+    - hotel_columns: Yields the columns of every hotel.
+    """
+    # Columns and their type codes, in the order of the rows
+    _COLUMNS = (('id', 'q'), ('customer_id', 'q'), ('room_type', 'i'),
+                ('customer_name', 'i'), ('date', 'i'), ('nights', 'i'),
+                ('booked', 'i'))
+    # Fields group_count can group by
+    GROUPS = ('hotel', 'room_type', 'customer_name', 'date')
+
+    def __init__(self):
+        """
+        Initializes an empty ReservationTable object that is built on first
+        use.
+        """
+        self.stale = True
+        self.room_types = None
+        self.customer_names = None
+        # Hotel and columns of every hotel, keyed by the identity of the
+        # hotel, in list order
+        self._hotels = {}
+        # Day ordinal of every date seen
+        self._ordinals = {}
+        self._clear()
+
+    def _clear(self):
+        """
+        Empties every column and string dictionary.
+        """
+        self.room_types = StringDictionary()
+        self.customer_names = StringDictionary()
+        self._hotels = {}
+        self._ordinals = {}
+
+    def __len__(self):
+        return sum(len(columns['id'])
+                   for _, columns in self._hotels.values())
+
+    def build(self, hotels_data: list):
+        """
+        Fills the table from a list of hotels.
+
+        Parameters:
+        - hotels_data: The list of hotels.
+        """
+        self._clear()
+        self.stale = False
+        for hotel in hotels_data:
+            self.add_hotel(hotel)
+        add_records(len(hotels_data) + len(self))
+
+    def add_hotel(self, hotel: dict):
+        """
+        Adds the columns of a hotel, with a row for each of its
+        reservations.
+
+        Parameters:
+        - hotel: The hotel.
+        """
+        if self.stale:
+            return
+        rows = [self._row(reservation)
+                for reservation in hotel['reservations']]
+        values = list(zip(*rows)) or [()] * len(self._COLUMNS)
+        self._hotels[id(hotel)] = (hotel, {
+            name: array.array(typecode, column)
+            for (name, typecode), column in zip(self._COLUMNS, values)})
+
+    def remove_hotel(self, hotel: dict):
+        """
+        Removes the columns of a hotel.
+
+        Parameters:
+        - hotel: The hotel.
+        """
+        self._hotels.pop(id(hotel), None)
+
+    def add(self, hotel: dict, reservation: dict):
+        """
+        Adds a row for a reservation appended to the list of its hotel.
+
+        Parameters:
+        - hotel: The hotel of the reservation.
+        - reservation: The reservation.
+        """
+        if self.stale:
+            return
+        if id(hotel) not in self._hotels:
+            self.stale = True
+            return
+        columns = self._hotels[id(hotel)][1]
+        for (name, _), value in zip(self._COLUMNS, self._row(reservation)):
+            columns[name].append(value)
+
+    def remove(self, hotel: dict, position: int):
+        """
+        Removes the row of a reservation removed from the list of its
+        hotel.
+
+        Parameters:
+        - hotel: The hotel of the reservation.
+        - position: The position the reservation had in the list.
+        """
+        if self.stale:
+            return
+        if id(hotel) not in self._hotels:
+            self.stale = True
+            return
+        for column in self._hotels[id(hotel)][1].values():
+            del column[position]
+
+    def _row(self, reservation: dict):
+        """
+        Returns the values stored for a reservation.
+
+        Parameters:
+        - reservation: The reservation.
+
+        Returns:
+        A tuple with a value per column. IDs that are not integers are
+        stored as -1, dates that are missing or not valid as 0, and the
+        nights of a reservation without a check-out date as 0.
+        """
+        reservation_id = reservation.get('id')
+        customer_id = reservation.get('customer_id')
+        date = self._ordinal(reservation.get('date'))
+        check_out = reservation.get('check_out')
+        nights = 0
+        if check_out is not None and date:
+            nights = max(self._ordinal(check_out) - date, 0)
+        return (reservation_id if isinstance(reservation_id, int) else -1,
+                customer_id if isinstance(customer_id, int) else -1,
+                self.room_types.code(reservation.get('room_type')),
+                self.customer_names.code(reservation.get('customer_name')),
+                date, nights, self._ordinal(reservation.get('booked')))
+
+    def _ordinal(self, date):
+        """
+        Returns the day ordinal of an ISO date, converting each distinct
+        date once.
+
+        Parameters:
+        - date: The date, in ISO format (YYYY-MM-DD).
+
+        Returns:
+        The day ordinal, 0 if the date is not valid.
+        """
+        ordinal = self._ordinals.get(date)
+        if ordinal is None:
+            try:
+                ordinal = datetime.date.fromisoformat(date).toordinal()
+            except (TypeError, ValueError):
+                ordinal = 0
+            self._ordinals[date] = ordinal
+        return ordinal
+
+    def _selection(self, hotel, room_type):
+        """
+        Returns the columns of the hotels and the room type code matching
+        the filters.
+
+        Parameters:
+        - hotel: The hotel to match, None for every hotel.
+        - room_type: The room type to match, None for every room type.
+
+        Returns:
+        A (hotels, room_type) tuple: the list of (hotel, columns) tuples to
+        scan and the room type code, None if the filter is not set.
+        """
+        if hotel is None:
+            hotels = list(self._hotels.values())
+        else:
+            entry = self._hotels.get(id(hotel))
+            hotels = [entry] if entry is not None else []
+        room_type_code = None
+        if room_type is not None:
+            room_type_code = self.room_types.find(room_type)
+            if room_type_code is None:
+                hotels = []
+        return hotels, room_type_code
+
+    @staticmethod
+    def _view(columns: dict, name: str):
+        """
+        Returns a NumPy view of a column, sharing its memory.
+
+        Parameters:
+        - columns: The columns of a hotel.
+        - name: The name of the column.
+
+        Returns:
+        The NumPy array.
+        """
+        column = columns[name]
+        return np.frombuffer(column, dtype=np.dtype(column.typecode))
+
+    def _mask(self, columns: dict, room_type_code, first, last):
+        """
+        Returns the boolean mask of the rows of a hotel matching the
+        filters.
+
+        Parameters:
+        - columns: The columns of the hotel.
+        - room_type_code: The room type code to match, None for every room
+        type.
+        - first: The ordinal of the first check-in date to match, None for
+        no lower bound.
+        - last: The ordinal of the day after the last check-in date to
+        match, None for no upper bound.
+
+        Returns:
+        The NumPy boolean array.
+        """
+        mask = np.ones(len(columns['id']), dtype=bool)
+        if room_type_code is not None:
+            mask &= self._view(columns, 'room_type') == room_type_code
+        if first is not None:
+            mask &= self._view(columns, 'date') >= first
+        if last is not None:
+            mask &= self._view(columns, 'date') < last
+        return mask
+
+    @staticmethod
+    def _matching_rows(columns: dict, room_type_code, first, last):
+        """
+        Returns the rows of a hotel matching the filters, without NumPy.
+
+        Parameters:
+        - columns: The columns of the hotel.
+        - room_type_code: The room type code to match, None for every room
+        type.
+        - first: The ordinal of the first check-in date to match, None for
+        no lower bound.
+        - last: The ordinal of the day after the last check-in date to
+        match, None for no upper bound.
+
+        Returns:
+        The list of the matching row numbers.
+        """
+        rows = range(len(columns['id']))
+        if room_type_code is not None:
+            room_types = columns['room_type']
+            rows = [row for row in rows
+                    if room_types[row] == room_type_code]
+        dates = columns['date']
+        if first is not None:
+            rows = [row for row in rows if dates[row] >= first]
+        if last is not None:
+            rows = [row for row in rows if dates[row] < last]
+        return rows
+
+    def _matching(self, columns: dict, name: str, room_type_code, first,
+                  last):
+        # pylint: disable=too-many-arguments
+        """
+        Returns the values of a column in the rows of a hotel matching the
+        filters.
+
+        Parameters:
+        - columns: The columns of the hotel.
+        - name: The name of the column.
+        - room_type_code: The room type code to match, None for every room
+        type.
+        - first: The ordinal of the first check-in date to match, None for
+        no lower bound.
+        - last: The ordinal of the day after the last check-in date to
+        match, None for no upper bound.
+
+        Returns:
+        A NumPy array, or a list without NumPy.
+        """
+        if np is not None:
+            return self._view(columns, name)[self._mask(
+                columns, room_type_code, first, last)]
+        column = columns[name]
+        return [column[row] for row in self._matching_rows(
+            columns, room_type_code, first, last)]
+
+    def count(self, hotel: dict = None, room_type: str = None,
+              first: int = None, last: int = None):
+        """
+        Returns the number of reservations matching the filters.
+
+        Parameters:
+        - hotel: The hotel of the reservations, None for every hotel.
+        - room_type: The room type, None for every room type.
+        - first: The ordinal of the first check-in date, None for no lower
+        bound.
+        - last: The ordinal of the day after the last check-in date, None
+        for no upper bound.
+
+        Returns:
+        The number of reservations.
+        """
+        hotels, room_type_code = self._selection(hotel, room_type)
+        return sum(len(self._matching(columns, 'id', room_type_code, first,
+                                      last))
+                   for _, columns in hotels)
+
+    def group_count(self, by: str, hotel: dict = None, room_type: str = None,
+                    first: int = None, last: int = None):
+        # pylint: disable=too-many-arguments
+        """
+        Returns the number of reservations matching the filters per value of
+        a field.
+
+        Parameters:
+        - by: The field to group by, one of GROUPS.
+        - hotel: The hotel of the reservations, None for every hotel.
+        - room_type: The room type, None for every room type.
+        - first: The ordinal of the first check-in date, None for no lower
+        bound.
+        - last: The ordinal of the day after the last check-in date, None
+        for no upper bound.
+
+        Returns:
+        A dictionary from the value of the field to the number of
+        reservations holding it. Hotels are keyed by name, dates by their
+        ISO format.
+
+        Raises:
+        ValueError: If the field cannot be grouped by.
+        """
+        if by not in self.GROUPS:
+            raise ValueError(f'Cannot group reservations by {by}')
+        hotels, room_type_code = self._selection(hotel, room_type)
+        groups = {}
+        for candidate, columns in hotels:
+            if by == 'hotel':
+                counts = [(candidate['name'], len(self._matching(
+                    columns, 'id', room_type_code, first, last)))]
+            else:
+                counts = [(self._label(by, value), count)
+                          for value, count in self._stored_counts(
+                              self._matching(columns, by, room_type_code,
+                                             first, last))]
+            for label, count in counts:
+                if count:
+                    groups[label] = groups.get(label, 0) + count
+        return groups
+
+    @staticmethod
+    def _stored_counts(values):
+        """
+        Counts the rows holding each stored value.
+
+        Parameters:
+        - values: The stored values of the matching rows.
+
+        Returns:
+        A list of (value, count) tuples sorted by value.
+        """
+        if np is not None:
+            stored, counts = np.unique(values, return_counts=True)
+            return list(zip(stored.tolist(), counts.tolist()))
+        counts = {}
+        for value in values:
+            counts[value] = counts.get(value, 0) + 1
+        return sorted(counts.items())
+
+    def _label(self, by: str, value: int):
+        """
+        Returns the value of a field from its stored code.
+
+        Parameters:
+        - by: The field, 'room_type', 'customer_name' or 'date'.
+        - value: The stored code or ordinal.
+
+        Returns:
+        The room type, customer name or ISO date.
+        """
+        if by == 'room_type':
+            return self.room_types.values[value]
+        if by == 'customer_name':
+            return self.customer_names.values[value]
+        return datetime.date.fromordinal(value).isoformat() if value else None
+
+    def reservation_ids(self, hotel: dict = None, room_type: str = None,
+                        first: int = None, last: int = None):
+        """
+        Returns the IDs of the reservations matching the filters.
+
+        Parameters:
+        - hotel: The hotel of the reservations, None for every hotel.
+        - room_type: The room type, None for every room type.
+        - first: The ordinal of the first check-in date, None for no lower
+        bound.
+        - last: The ordinal of the day after the last check-in date, None
+        for no upper bound.
+
+        Returns:
+        The sorted list of IDs.
+        """
+        hotels, room_type_code = self._selection(hotel, room_type)
+        ids = []
+        for _, columns in hotels:
+            values = self._matching(columns, 'id', room_type_code, first,
+                                    last)
+            ids.extend(values.tolist() if np is not None else values)
+        return sorted(ids)
+
+    def hotel_columns(self):
+        """
+        Yields the columns of every hotel, for the reports aggregating them.
+        The NumPy views share the memory of the columns, which cannot grow
+        or shrink while a view exists, so they must be dropped before the
+        table changes.
+
+        Returns:
+        A generator of (hotel, columns) tuples in list order, the columns
+        being a dictionary from the name of each column to a NumPy view of
+        it, or to the array itself without NumPy.
+        """
+        for hotel, columns in list(self._hotels.values()):
+            if np is not None:
+                columns = {name: self._view(columns, name)
+                           for name in columns}
+            yield hotel, columns
@@ -0,0 +1,356 @@
+"""
+Module for the serializers encoding hotel data files.
+
+The file backends store hotel data as minified JSON by default, encoded with
+orjson when it is installed and with the standard library otherwise. The
+indented JSON written by earlier versions, MessagePack (when msgpack is
+installed) and pickle protocol 5 are also available. The serializer is
+picked from the file extension or by name.
+
+Stored files are decoded with the serializer that wrote them, whatever the
+configured one is, so switching serializers converts a file the next time it
+is rewritten, or right away with storage_backends.convert. Pickle files are
+only read when pickle is configured or asked for explicitly, since
+unpickling runs code from the file.
+
+Libraries:
+- json: Provides the standard library JSON encoder and decoder.
+- pickle: Provides the pickle protocol 5 format.
+- utilities.records: Provides the encoding of the slotted records.
+- orjson: Optional, provides a faster JSON encoder and decoder.
+- msgpack: Optional, provides the MessagePack format.
+
+Classes:
+- Serializer: The interface every serializer implements.
+- JSONSerializer: Encodes hotel data as JSON.
+- MessagePackSerializer: Encodes hotel data as MessagePack.
+- PickleSerializer: Encodes hotel data with pickle protocol 5.
+
+Functions:
+- get_serializer: Returns a serializer by name.
+- serializer_for: Returns the serializer of a data file.
+- detect_serializer: Returns the serializer that wrote stored contents.
+"""
+import json
+import os
+import pickle
+from utilities.records import encode_record
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class Serializer:
+    """
+    A class defining the interface of the serializers.
+
+    Attributes:
+    - name (str): The name of the serializer.
+    - extensions (tuple): The file extensions picking the serializer.
+    - fragments (bool): Whether a list is encoded as the encodings of its
+    items joined by commas between brackets, so the items can be encoded
+    one at a time.
+
+    Methods:
+    - dumps: Encodes hotel data to bytes.
+    - loads: Decodes hotel data from bytes.
+    - matches: Tells whether stored contents were written by the serializer.
+    """
+    name = None
+    extensions = ()
+    fragments = False
+
+    def dumps(self, data):
+        """
+        Encodes hotel data to bytes.
+
+        Parameters:
+        - data: The hotel data to encode.
+
+        Returns:
+        The encoded bytes.
+        """
+        raise NotImplementedError
+
+    def loads(self, contents: bytes):
+        """
+        Decodes hotel data from bytes.
+
+        Parameters:
+        - contents: The encoded bytes.
+
+        Returns:
+        The decoded hotel data.
+        """
+        raise NotImplementedError
+
+    def matches(self, contents: bytes):
+        """
+        Tells whether stored contents were written by the serializer.
+
+        Parameters:
+        - contents: The stored bytes.
+
+        Returns:
+        True if the serializer can decode the contents.
+        """
+        raise NotImplementedError
+
+
+class JSONSerializer(Serializer):
+    """
+    A class to encode hotel data as JSON.
+
+    Attributes:
+    - indent (int): The indentation of the output, None to minify it.
+    - fast (bool): Whether orjson is used when it is installed.
+    """
+    extensions = ('.json',)
+
+    def __init__(self, name: str = 'json', indent: int = None,
+                 fast: bool = True):
+        """
+        Initializes a JSONSerializer object.
+
+        Parameters:
+        - name: The name of the serializer.
+        - indent: The indentation of the output, None to minify it.
+        - fast: Use orjson for minified output when it is installed.
+        """
+        self.name = name
+        self.indent = indent
+        self.fast = fast and orjson is not None and indent is None
+        self.fragments = indent is None
+
+    def dumps(self, data):
+        """
+        Encodes hotel data as JSON.
+
+        Parameters:
+        - data: The hotel data to encode.
+
+        Returns:
+        The UTF-8 encoded JSON.
+        """
+        if self.fast:
+            return orjson.dumps(  # pylint: disable=no-member
+                data, default=encode_record)
+        if self.indent is None:
+            return json.dumps(data, separators=(',', ':'),
+                              default=encode_record).encode('UTF-8')
+        return json.dumps(data, indent=self.indent,
+                          default=encode_record).encode('UTF-8')
+
+    def loads(self, contents: bytes):
+        """
+        Decodes hotel data from JSON.
+
+        Parameters:
+        - contents: The UTF-8 encoded JSON.
+
+        Returns:
+        The decoded hotel data.
+        """
+        if self.fast:
+            return orjson.loads(contents)  # pylint: disable=no-member
+        return json.loads(contents)
+
+    def matches(self, contents: bytes):
+        """
+        Tells whether stored contents are JSON.
+
+        Parameters:
+        - contents: The stored bytes.
+
+        Returns:
+        True if the contents start like a JSON document.
+        """
+        return contents.lstrip()[:1] in (b'[', b'{')
+
+
+class MessagePackSerializer(Serializer):
+    """
+    A class to encode hotel data as MessagePack.
+    """
+    name = 'msgpack'
+    extensions = ('.msgpack', '.mpk')
+
+    def __init__(self):
+        """
+        Initializes a MessagePackSerializer object.
+
+        Raises:
+        ValueError: If msgpack is not installed.
+        """
+        if msgpack is None:
+            raise ValueError('The msgpack serializer requires msgpack')
+
+    def dumps(self, data):
+        """
+        Encodes hotel data as MessagePack.
+
+        Parameters:
+        - data: The hotel data to encode.
+
+        Returns:
+        The encoded bytes.
+        """
+        return msgpack.packb(data, default=encode_record)
+
+    def loads(self, contents: bytes):
+        """
+        Decodes hotel data from MessagePack.
+
+        Parameters:
+        - contents: The encoded bytes.
+
+        Returns:
+        The decoded hotel data.
+        """
+        return msgpack.unpackb(contents)
+
+    def matches(self, contents: bytes):
+        """
+        Tells whether stored contents are a MessagePack array or map.
+
+        Parameters:
+        - contents: The stored bytes.
+
+        Returns:
+        True if the contents start with an array or map header.
+        """
+        return bool(contents) and (0x80 <= contents[0] <= 0x9f
+                                   or contents[0] in (0xdc, 0xdd, 0xde, 0xdf))
+
+
+class PickleSerializer(Serializer):
+    """
+    A class to encode hotel data with pickle protocol 5.
+
+    Unpickling runs code from the file, so pickle files must only come from
+    trusted writers.
+    """
+    name = 'pickle'
+    extensions = ('.pickle', '.pkl')
+
+    def dumps(self, data):
+        """
+        Encodes hotel data with pickle protocol 5.
+
+        Parameters:
+        - data: The hotel data to encode.
+
+        Returns:
+        The pickled bytes.
+        """
+        return pickle.dumps(data, protocol=5)
+
+    def loads(self, contents: bytes):
+        """
+        Decodes hotel data from pickle.
+
+        Parameters:
+        - contents: The pickled bytes.
+
+        Returns:
+        The decoded hotel data.
+        """
+        return pickle.loads(contents)
+
+    def matches(self, contents: bytes):
+        """
+        Tells whether stored contents are a pickle of protocol 2 or later.
+
+        Parameters:
+        - contents: The stored bytes.
+
+        Returns:
+        True if the contents start with the pickle PROTO opcode.
+        """
+        return contents[:1] == b'\x80'
+
+
+# Factories of the serializers, by name
+SERIALIZERS = {
+    'json': JSONSerializer,
+    'json-stdlib': lambda: JSONSerializer('json-stdlib', fast=False),
+    'json-indent': lambda: JSONSerializer('json-indent', indent=4,
+                                          fast=False),
+    'msgpack': MessagePackSerializer,
+    'pickle': PickleSerializer,
+}
+# File extensions picking a serializer other than JSON
+SERIALIZER_EXTENSIONS = (MessagePackSerializer.extensions
+                         + PickleSerializer.extensions)
+
+
+def get_serializer(name: str):
+    """
+    Returns a serializer by name.
+
+    Parameters:
+    - name: The name of the serializer, one of SERIALIZERS.
+
+    Returns:
+    The Serializer object.
+
+    Raises:
+    ValueError: If the serializer is unknown or its library is missing.
+    """
+    if name not in SERIALIZERS:
+        raise ValueError(f'Unknown serializer {name}')
+    return SERIALIZERS[name]()
+
+
+def serializer_for(filename: str, name: str = None):
+    """
+    Returns the serializer of a data file.
+
+    Parameters:
+    - filename: The filename of the data file.
+    - name: The name of the serializer. Defaults to the serializer matching
+    the file extension, then to 'json'.
+
+    Returns:
+    The Serializer object.
+    """
+    if name is None:
+        extension = os.path.splitext(filename)[1]
+        for serializer in (MessagePackSerializer, PickleSerializer):
+            if extension in serializer.extensions:
+                name = serializer.name
+                break
+        else:
+            name = 'json'
+    return get_serializer(name)
+
+
+def detect_serializer(contents: bytes, configured: Serializer):
+    """
+    Returns the serializer that wrote stored contents.
+
+    Pickle is only detected when it is the configured serializer.
+
+    Parameters:
+    - contents: The stored bytes.
+    - configured: The serializer configured for the file.
+
+    Returns:
+    The Serializer object decoding the contents, the configured one if no
+    other serializer matches.
+    """
+    if configured.matches(contents):
+        return configured
+    candidates = [JSONSerializer()]
+    if msgpack is not None:
+        candidates.append(MessagePackSerializer())
+    for serializer in candidates:
+        if serializer.matches(contents):
+            return serializer
+    return configured
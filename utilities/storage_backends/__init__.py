@@ -0,0 +1,109 @@
+"""
+Package of the storage backends persisting hotel data.
+
+A backend reads the whole hotel list, rewrites it, or writes a batch of
+operations recorded by the DataStore. The JSON backend keeps a document
+encoded by a serializer (minified JSON by default, or MessagePack or pickle)
+and an optional append-only journal; the SQLite backend keeps indexed tables
+for hotels, rooms, customers and reservations and turns every operation into
+single-row statements; the sharded backend keeps a directory with one file
+per hotel and a manifest, and only rewrites the hotels an operation
+touched.
+
+The backend is picked from the file extension, then from the
+HOTELS_STORAGE_BACKEND environment variable, and defaults to JSON.
+
+Modules:
+- base: The StorageBackend interface, the recognized extensions and
+replace_file.
+- json_file: The JSONFileBackend class.
+- sqlite: The SQLiteBackend class.
+- sharded: The ShardedBackend class.
+
+Libraries:
+- os: Provides functions for interacting with the operating system.
+- utilities.serializers: Provides the serializers encoding the data files.
+
+Classes:
+- StorageBackend: The interface every backend implements.
+- JSONFileBackend: Stores hotel data in a data file and journal.
+- SQLiteBackend: Stores hotel data in an SQLite database.
+- ShardedBackend: Stores each hotel in a file of its own.
+
+Functions:
+- replace_file: Atomically replaces a file with new contents.
+- create_backend: Returns the backend for a filename.
+- convert: Rewrites a data file with another serializer.
+"""
+import os
+from utilities.serializers import (SERIALIZER_EXTENSIONS, detect_serializer,
+                                   serializer_for)
+from utilities.storage_backends.base import (
+    BACKEND_VARIABLE, SHARDED_EXTENSIONS, SQLITE_EXTENSIONS,
+    STORAGE_EXTENSIONS, StorageBackend, replace_file)
+from utilities.storage_backends.json_file import JSONFileBackend
+from utilities.storage_backends.sharded import ShardedBackend
+from utilities.storage_backends.sqlite import SQLiteBackend
+
+__all__ = ['BACKEND_VARIABLE', 'SHARDED_EXTENSIONS', 'SQLITE_EXTENSIONS',
+           'STORAGE_EXTENSIONS', 'StorageBackend', 'JSONFileBackend',
+           'SQLiteBackend', 'ShardedBackend', 'replace_file',
+           'create_backend', 'convert']
+
+
+def create_backend(filename: str, name: str = None, serializer: str = None):
+    """
+    Returns the storage backend for a data file.
+
+    Parameters:
+    - filename: The filename for storing hotel data.
+    - name: The name of the backend, 'json', 'sqlite' or 'sharded'.
+    Defaults to the backend matching the file extension, then to the
+    HOTELS_STORAGE_BACKEND environment variable, then to 'json'.
+    - serializer: The name of the serializer of a 'json' or 'sharded'
+    backend. Defaults to the one matching the file extension.
+
+    Returns:
+    The StorageBackend object.
+    """
+    if name is None:
+        if filename.endswith(SQLITE_EXTENSIONS):
+            name = SQLiteBackend.name
+        elif filename.endswith(SHARDED_EXTENSIONS):
+            name = ShardedBackend.name
+        elif filename.endswith(SERIALIZER_EXTENSIONS):
+            name = JSONFileBackend.name
+        else:
+            name = os.environ.get(BACKEND_VARIABLE, JSONFileBackend.name)
+    if name == SQLiteBackend.name:
+        if serializer is not None:
+            raise ValueError('The sqlite backend does not use a serializer')
+        return SQLiteBackend(filename)
+    for backend in (JSONFileBackend, ShardedBackend):
+        if backend.name == name:
+            return backend(filename, serializer)
+    raise ValueError(f'Unknown storage backend {name}')
+
+
+def convert(source: str, target: str, source_serializer: str = None,
+            target_serializer: str = None):
+    """
+    Rewrites a data file with another serializer.
+
+    Parameters:
+    - source: The filename of the data file to read.
+    - target: The filename of the data file to write, may be the source.
+    - source_serializer: The name of the serializer of the source. Defaults
+    to the one matching its contents and extension; pickle files are only
+    read if pickle is named or matches the extension.
+    - target_serializer: The name of the serializer of the target. Defaults
+    to the one matching its extension.
+    """
+    reader = serializer_for(source, source_serializer)
+    with open(source, 'rb') as file:
+        contents = file.read()
+    if source_serializer is None:
+        reader = detect_serializer(contents, reader)
+    replace_file(os.path.abspath(target),
+                 serializer_for(target, target_serializer).dumps(
+                     reader.loads(contents)))
@@ -0,0 +1,229 @@
+"""
+Module for the interface of the storage backends and the helpers they share.
+
+Libraries:
+- contextlib: Provides suppress for removing files that may not exist.
+- os: Provides functions for interacting with the operating system.
+- tempfile: Provides the temporary files used for atomic rewrites.
+- utilities.instrumentation: Provides the count of the bytes written.
+- utilities.file_lock: Provides the FileLock class for inter-process
+locking.
+- utilities.serializers: Provides the extensions of the serializers.
+
+Classes:
+- StorageBackend: The interface every backend implements.
+
+Functions:
+- replace_file: Atomically replaces a file with new contents.
+"""
+import contextlib
+import os
+import tempfile
+from utilities.file_lock import FileLock
+from utilities.instrumentation import add_bytes_written
+from utilities.serializers import SERIALIZER_EXTENSIONS
+
+# Environment variable selecting the backend of files without a known
+# database extension
+BACKEND_VARIABLE = 'HOTELS_STORAGE_BACKEND'
+# File extensions stored in SQLite databases
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+# Directory extensions stored as one file per hotel
+SHARDED_EXTENSIONS = ('.shards',)
+# File extensions recognized as hotel data files
+STORAGE_EXTENSIONS = (('.json',) + SERIALIZER_EXTENSIONS + SQLITE_EXTENSIONS
+                      + SHARDED_EXTENSIONS)
+
+
+def replace_file(filename: str, contents):
+    """
+    Atomically replaces a file with new contents.
+
+    The contents are written to a temporary file in the same directory,
+    which is fsynced and then moved over the file, so readers never see a
+    partially written file.
+
+    Parameters:
+    - filename: The absolute path of the file to replace.
+    - contents: The new contents of the file, as bytes or as a list of
+    byte strings written one after the other without joining them first.
+    """
+    if isinstance(contents, bytes):
+        contents = [contents]
+    # Keep the permissions of the file being replaced
+    try:
+        mode = os.stat(filename).st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o644
+    descriptor, temp_name = tempfile.mkstemp(
+        dir=os.path.dirname(filename),
+        prefix='.' + os.path.basename(filename) + '.',
+        suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            file.writelines(contents)
+            file.flush()
+            os.fsync(file.fileno())
+        os.chmod(temp_name, mode)
+        os.replace(temp_name, filename)
+        add_bytes_written(sum(len(chunk) for chunk in contents))
+    except BaseException:
+        # Do not leave the temporary file behind
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temp_name)
+        raise
+
+
+class StorageBackend:
+    """
+    A class defining the interface of the storage backends.
+
+    Attributes:
+    - name (str): The name of the backend.
+    - filename (str): The absolute path of the data file.
+    - lock (FileLock): The advisory lock shared with other processes.
+    - incremental (bool): Whether saves go through append instead of write.
+
+    Methods:
+    - signature: Returns a value that changes whenever the data changes.
+    - stamp: Returns a signature of the data every process computes alike.
+    - read: Returns the stored hotels and the operations to replay on them.
+    - read_hotel: Returns one stored hotel without reading the others.
+    - write: Replaces the stored hotels.
+    - append: Writes a batch of encoded operations.
+    - invalidate: Drops what the backend cached about the stored data.
+    - journal_size: Returns the size of the operations not yet compacted.
+    - needs_compaction: Tells whether the journal should be compacted.
+    - use_journal: Switches the backend to append-only journal writes.
+    - use_offset_index: Switches on the byte-offset index of the hotels.
+    """
+    name = None
+
+    def __init__(self, filename: str):
+        """
+        Initializes a backend for the specified data file.
+
+        Parameters:
+        - filename: The filename for storing hotel data.
+        """
+        self.filename = os.path.abspath(filename)
+        self.lock = FileLock(self.filename + '.lock')
+
+    @property
+    def incremental(self):
+        """
+        Tells whether saves go through append instead of write.
+
+        Returns:
+        True if the backend writes operations, False if it rewrites the data.
+        """
+        return False
+
+    def signature(self):
+        """
+        Returns a value that changes whenever the stored data changes.
+
+        Returns:
+        A hashable signature, or None if the data file does not exist.
+        """
+        raise NotImplementedError
+
+    def stamp(self):
+        """
+        Returns a value that changes whenever the stored data changes and
+        that every process computes alike, so a sidecar can record the data
+        it was written for.
+
+        Returns:
+        A value encodable as JSON, or None if the data file does not exist.
+        """
+        return self.signature()
+
+    def read(self):
+        """
+        Returns the stored hotels and the operations to replay on them.
+
+        Returns:
+        A (hotels, operations) tuple.
+        """
+        raise NotImplementedError
+
+    def read_hotel(self, key: str, value):
+        """
+        Returns the first stored hotel whose key holds a value without
+        reading the other hotels.
+
+        Parameters:
+        - key: The key to match, 'hotel_id' or 'name'.
+        - value: The value the key must hold.
+
+        Returns:
+        The hotel if found, otherwise None.
+
+        Raises:
+        NotImplementedError: If the backend can only read every hotel.
+        """
+        raise NotImplementedError
+
+    def write(self, data: list, changed=None):
+        """
+        Replaces the stored hotels.
+
+        Parameters:
+        - data: The hotel data to be written.
+        - changed: A collection of the identities of the hotels changed
+        since the last write, None if unknown. Backends may use it to only
+        encode those hotels again.
+        """
+        raise NotImplementedError
+
+    def append(self, lines: list, data: list):
+        """
+        Writes a batch of operations.
+
+        Parameters:
+        - lines: The operations to write, each encoded as a JSON string.
+        - data: The hotel data after the operations were applied.
+        """
+        raise NotImplementedError
+
+    def invalidate(self):
+        """
+        Drops what the backend cached about the stored data, after the
+        DataStore discarded changes it had applied in memory.
+        """
+
+    def journal_size(self):
+        """
+        Returns the size of the operations written but not compacted.
+
+        Returns:
+        The size in bytes, 0 if there is nothing to compact.
+        """
+        return 0
+
+    def needs_compaction(self):
+        """
+        Tells whether the journal grew past its compaction threshold.
+
+        Returns:
+        True if the journal should be folded into the data file.
+        """
+        return False
+
+    def use_journal(self, threshold: int, background: bool):
+        """
+        Switches the backend to append-only journal writes.
+
+        Parameters:
+        - threshold: The journal size in bytes that triggers a compaction.
+        - background: Run compactions in a background thread.
+        """
+        raise ValueError(f'The {self.name} backend does not use a journal')
+
+    def use_offset_index(self):
+        """
+        Switches on the sidecar index of the byte offsets of the hotels.
+        """
+        raise ValueError(
+            f'The {self.name} backend does not use an offset index')
@@ -0,0 +1,210 @@
+"""
+Module for the backend storing hotel data in a single data file.
+
+Libraries:
+- os: Provides functions for interacting with the operating system.
+- utilities.fragment_cache: Provides the FragmentCache class keeping the
+encoded hotels between rewrites.
+- utilities.instrumentation: Provides the timing of the serialize phase and
+the count of the bytes read.
+- utilities.journal: Provides the Journal class for append-only writes.
+- utilities.json_stream: Provides the streaming lookup of one hotel.
+- utilities.serializers: Provides the serializers encoding the data file.
+- utilities.storage_backends.base: Provides the backend interface and
+atomic file replacement.
+- utilities.storage_backends.offset_index: Provides the byte-offset index
+of the hotels.
+
+Classes:
+- JSONFileBackend: Stores hotel data in a data file and journal.
+"""
+import os
+from utilities.fragment_cache import FragmentCache
+from utilities.instrumentation import add_bytes_read, phase
+from utilities.journal import Journal
+from utilities.json_stream import find_element
+from utilities.serializers import detect_serializer, serializer_for
+from utilities.storage_backends.base import StorageBackend, replace_file
+from utilities.storage_backends.offset_index import OffsetIndex
+
+
+class JSONFileBackend(StorageBackend):
+    """
+    A class to store hotel data in a file encoded by a serializer, with an
+    optional journal of the operations applied since the file was written.
+
+    Attributes:
+    - serializer (Serializer): The serializer encoding the data file.
+    - journal (Journal): The operation journal of the data file.
+    - journal_threshold (int): The journal size in bytes that triggers a
+    compaction, None while every save rewrites the whole file.
+    - background_compaction (bool): Whether compactions run in a background
+    thread.
+    - offset_index (OffsetIndex): The byte offsets of the hotels, None while
+    single hotels are found by streaming the file.
+    - fragments (FragmentCache): The encoded hotels of the last rewrite,
+    used when the serializer encodes the hotels one at a time.
+    """
+    name = 'json'
+
+    def __init__(self, filename: str, serializer: str = None):
+        """
+        Initializes a JSONFileBackend object for the specified data file.
+
+        Parameters:
+        - filename: The filename for storing hotel data.
+        - serializer: The name of the serializer. Defaults to the one
+        matching the file extension, then to minified JSON.
+        """
+        super().__init__(filename)
+        self.serializer = serializer_for(self.filename, serializer)
+        self.journal = Journal(self.filename + '.journal')
+        self.journal_threshold = None
+        self.background_compaction = False
+        self.offset_index = None
+        self.fragments = FragmentCache()
+
+    @property
+    def incremental(self):
+        """
+        Tells whether saves are appended to the journal.
+
+        Returns:
+        True in journal mode, otherwise False.
+        """
+        return self.journal_threshold is not None
+
+    def use_journal(self, threshold: int, background: bool):
+        """
+        Switches the backend to append-only journal writes.
+
+        Parameters:
+        - threshold: The journal size in bytes that triggers a compaction.
+        - background: Run compactions in a background thread.
+        """
+        self.journal_threshold = threshold
+        self.background_compaction = background
+
+    def use_offset_index(self):
+        """
+        Switches on the sidecar index of the byte offsets of the hotels, so
+        single hotels are read with one seek instead of a scan.
+        """
+        if self.offset_index is None:
+            self.offset_index = OffsetIndex(self.filename)
+
+    def signature(self):
+        """
+        Returns the signatures of the data file and its journal.
+
+        Returns:
+        A tuple of the (mtime, size, inode) signatures of the data file and
+        the journal, or None if the data file does not exist.
+        """
+        try:
+            stat = os.stat(self.filename)
+        except FileNotFoundError:
+            return None
+        return ((stat.st_mtime_ns, stat.st_size, stat.st_ino),
+                self.journal.signature())
+
+    def read(self):
+        """
+        Parses the data file and reads the journal written for it.
+
+        The file is decoded by the serializer that wrote it, so files written
+        with another serializer are converted by the next rewrite.
+
+        Returns:
+        A (hotels, operations) tuple.
+        """
+        with open(self.filename, 'rb') as file:
+            contents = file.read()
+            operations = self.journal.read(os.fstat(file.fileno()))
+        add_bytes_read(len(contents))
+        data = detect_serializer(contents, self.serializer).loads(contents)
+        return data, operations
+
+    def read_hotel(self, key: str, value):
+        """
+        Reads the first hotel whose key holds a value, through the offset
+        index if it is switched on, otherwise by streaming the data file up
+        to the hotel without decoding the hotels before it.
+
+        Parameters:
+        - key: The key to match, 'hotel_id' or 'name'.
+        - value: The value the key must hold.
+
+        Returns:
+        The hotel if found, otherwise None.
+
+        Raises:
+        NotImplementedError: If the file is not JSON or has a journal to
+        replay, which may change any hotel.
+        """
+        if self.journal.size():
+            raise NotImplementedError('The journal must be replayed')
+        with open(self.filename, 'rb') as file:
+            try:
+                if self.offset_index is not None:
+                    return self.offset_index.read_hotel(file, key, value)
+                return find_element(file, key, value)
+            except ValueError as error:
+                raise NotImplementedError('The file is not JSON') from error
+
+    def write(self, data: list, changed=None):
+        """
+        Atomically rewrites the data file and drops the journal it replaces.
+
+        With minified JSON only the hotels changed since the last rewrite
+        are encoded again, and the cached encodings of the others are
+        written around them.
+
+        Parameters:
+        - data: The hotel data to be written.
+        - changed: A collection of the identities of the hotels changed
+        since the last write, None to encode every hotel.
+        """
+        with phase('serialize'):
+            if self.serializer.fragments:
+                contents = self.fragments.encode(data, changed,
+                                                 self.serializer.dumps)
+            else:
+                contents = self.serializer.dumps(data)
+        replace_file(self.filename, contents)
+        self.journal.remove()
+
+    def invalidate(self):
+        """
+        Drops the encoded hotels, which may hold discarded changes.
+        """
+        self.fragments.clear()
+
+    def append(self, lines: list, data: list):
+        """
+        Appends a batch of operations to the journal.
+
+        Parameters:
+        - lines: The operations to write, each encoded as a JSON string.
+        - data: The hotel data after the operations were applied.
+        """
+        self.journal.append(lines, os.stat(self.filename))
+
+    def journal_size(self):
+        """
+        Returns the size of the journal.
+
+        Returns:
+        The size of the journal in bytes.
+        """
+        return self.journal.size()
+
+    def needs_compaction(self):
+        """
+        Tells whether the journal grew past its compaction threshold.
+
+        Returns:
+        True if the journal should be folded into the data file.
+        """
+        return (self.journal_threshold is not None
+                and self.journal.size() > self.journal_threshold)
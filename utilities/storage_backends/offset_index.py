@@ -0,0 +1,111 @@
+"""
+Module for the byte-offset sidecar index of a JSON hotel data file.
+
+The sidecar maps the hotel_id and name of every hotel to the offset and
+length of its object in the data file, so a lookup seeks straight to one
+hotel and decodes it alone instead of scanning the hotels before it. The
+sidecar records the (mtime, size, inode) signature of the data file it was
+built for and is rebuilt, with one streaming pass over the data file, the
+first time it is used after the data file changed.
+
+Libraries:
+- contextlib: Provides suppress for files that may not exist.
+- json: Provides the encoding of the sidecar and the decoding of hotels.
+- os: Provides functions for interacting with the operating system.
+- utilities.instrumentation: Provides the count of the bytes read.
+- utilities.json_stream: Provides the scan of the hotel objects.
+- utilities.storage_backends.base: Provides atomic file replacement.
+
+Classes:
+- OffsetIndex: The byte offsets of the hotels of a data file.
+"""
+import contextlib
+import json
+import os
+from utilities.instrumentation import add_bytes_read
+from utilities.json_stream import iter_elements
+from utilities.storage_backends.base import replace_file
+
+
+class OffsetIndex:  # pylint: disable=too-few-public-methods
+    """
+    A class to look hotels up by byte offset in a JSON data file.
+
+    Attributes:
+    - filename (str): The filename of the sidecar.
+
+    Methods:
+    - read_hotel: Returns the first hotel whose key holds a value.
+    """
+    # Hotel fields the sidecar maps to offsets
+    KEYS = ('hotel_id', 'name')
+
+    def __init__(self, filename: str):
+        """
+        Initializes an OffsetIndex object for the specified data file.
+
+        Parameters:
+        - filename: The filename of the data file.
+        """
+        self.filename = filename + '.offsets'
+        # Signature of the data file the offsets were built for
+        self._signature = None
+        # (offset, length) of the first hotel per key and value
+        self._offsets = {}
+
+    def _load(self, file, signature: list):
+        """
+        Loads the sidecar, or rebuilds it if it was built for another
+        version of the data file.
+
+        Parameters:
+        - file: The data file, opened in binary mode.
+        - signature: The signature of the data file.
+        """
+        entries = None
+        with contextlib.suppress(FileNotFoundError, ValueError):
+            with open(self.filename, 'r', encoding='UTF-8') as sidecar:
+                stored = json.load(sidecar)
+            if stored['signature'] == signature:
+                entries = stored['hotels']
+        if entries is None:
+            entries = []
+            for offset, element in iter_elements(file):
+                hotel = json.loads(element)
+                entries.append([hotel.get('hotel_id'), hotel.get('name'),
+                                offset, len(element)])
+            replace_file(self.filename, json.dumps(
+                {'signature': signature, 'hotels': entries},
+                separators=(',', ':')).encode('UTF-8'))
+        self._offsets = {key: {} for key in self.KEYS}
+        for *values, offset, length in entries:
+            for key, value in zip(self.KEYS, values):
+                self._offsets[key].setdefault(value, (offset, length))
+        self._signature = signature
+
+    def read_hotel(self, file, key: str, value):
+        """
+        Returns the first hotel of a data file whose key holds a value,
+        decoding only that hotel.
+
+        Parameters:
+        - file: The data file, opened in binary mode at its start.
+        - key: The key to match, 'hotel_id' or 'name'.
+        - value: The value the key must hold.
+
+        Returns:
+        The hotel if found, otherwise None.
+
+        Raises:
+        ValueError: If the data file does not hold a JSON array.
+        """
+        stat = os.fstat(file.fileno())
+        signature = [stat.st_mtime_ns, stat.st_size, stat.st_ino]
+        if signature != self._signature:
+            self._load(file, signature)
+        span = self._offsets[key].get(value)
+        if span is None:
+            return None
+        file.seek(span[0])
+        add_bytes_read(span[1])
+        return json.loads(file.read(span[1]))
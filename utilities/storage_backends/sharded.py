@@ -0,0 +1,334 @@
+"""
+Module for the backend storing every hotel in a file of its own.
+
+Libraries:
+- contextlib: Provides suppress for removing files that may not exist.
+- json: Provides the encoding of the manifest.
+- os: Provides functions for interacting with the operating system.
+- utilities.instrumentation: Provides the timing of the serialize phase and
+the count of the bytes read.
+- utilities.journal: Provides the log of the generations written since the
+manifest.
+- utilities.serializers: Provides the serializers encoding the hotel files.
+- utilities.storage_backends.base: Provides the backend interface and
+atomic file replacement.
+
+Classes:
+- ShardedBackend: Stores each hotel in a file of its own.
+"""
+import contextlib
+import json
+import os
+from utilities.instrumentation import add_bytes_read, phase
+from utilities.journal import Journal
+from utilities.serializers import detect_serializer, serializer_for
+from utilities.storage_backends.base import StorageBackend, replace_file
+
+
+class ShardedBackend(StorageBackend):
+    # pylint: disable=too-many-instance-attributes
+    """
+    A class to store hotel data in a directory holding one file per hotel,
+    encoded by a serializer, and a JSON manifest listing the hotel files in
+    order.
+
+    Every write bumps a generation and records it for the hotel files
+    written, and parsed hotels are kept with the generation of their file,
+    so reading the directory again only parses the files changed since.
+    Operations only rewrite the files of the hotels they touched. Unless
+    they add, remove or rename a hotel, which the manifest lists, the
+    generation and the files written are appended to a journal of the
+    manifest instead of rewriting it, so a write costs the same whatever
+    the number of hotels. The manifest is rewritten, and the journal
+    dropped, once the journal grows past the size of the manifest. The
+    manifest and its journal alone tell whether the directory changed.
+
+    Writers still take the exclusive lock of the whole directory, which
+    the ID sequences and the aggregate counters kept next to it rely on,
+    so writes to different hotels do not run in parallel.
+
+    Attributes:
+    - manifest (str): The absolute path of the manifest.
+    - journal (Journal): The journal of the generations written since the
+    manifest.
+    - serializer (Serializer): The serializer encoding the hotel files.
+    """
+    name = 'sharded'
+    # Filename of the manifest inside the directory
+    MANIFEST = 'manifest.json'
+    # Hotel fields listed in the manifest
+    _MANIFEST_FIELDS = ('hotel_id', 'name')
+
+    def __init__(self, filename: str, serializer: str = None):
+        """
+        Initializes a ShardedBackend object for the specified directory.
+
+        Parameters:
+        - filename: The directory storing the hotel files.
+        - serializer: The name of the serializer of the hotel files.
+        Defaults to minified JSON.
+        """
+        super().__init__(filename)
+        self.manifest = os.path.join(self.filename, self.MANIFEST)
+        self.journal = Journal(self.manifest + '.journal')
+        self.serializer = serializer_for('', serializer)
+        # Extension of the hotel files written by the serializer
+        self._extension = (self.serializer.extensions + ('.json',))[0]
+        # Hotel files in list order
+        self._files = []
+        # Number of the next hotel file
+        self._next_shard = 1
+        # Generation last read or written
+        self._generation = 0
+        # Parsed hotels by file, with the generation of the file
+        self._shards = {}
+
+    @property
+    def incremental(self):
+        """
+        Tells whether saves only rewrite the hotels that changed.
+
+        Returns:
+        Always True.
+        """
+        return True
+
+    def signature(self):
+        """
+        Returns the signatures of the manifest and its journal, one of which
+        every write changes, so the hotel files are not checked one by one.
+
+        Returns:
+        A tuple of the (mtime, size, inode) signatures of the manifest and
+        the journal, or None if the directory has no manifest.
+        """
+        try:
+            stat = os.stat(self.manifest)
+        except FileNotFoundError:
+            return None
+        return ((stat.st_mtime_ns, stat.st_size, stat.st_ino),
+                self.journal.signature())
+
+    def read(self):
+        """
+        Reads the manifest, its journal and the hotel files changed since
+        the last read.
+
+        Returns:
+        A (hotels, operations) tuple, with no operations to replay.
+        """
+        with open(self.manifest, 'r', encoding='UTF-8') as file:
+            manifest = json.load(file)
+            records = self.journal.read(os.fstat(file.fileno()))
+        self._generation = manifest.get('generation', 0)
+        generations = {entry['file']: entry.get('generation')
+                       for entry in manifest['shards']}
+        # Later generations of the files written since the manifest
+        for record in records:
+            self._generation = record['generation']
+            for filename in record['files']:
+                generations[filename] = record['generation']
+        hotels = []
+        shards = {}
+        for entry in manifest['shards']:
+            generation = generations[entry['file']]
+            cached = self._shards.get(entry['file'])
+            # Parse the hotel file only if it was written since it was read
+            if (cached is not None and generation is not None
+                    and cached[0] == generation):
+                hotel = cached[1]
+            else:
+                hotel = self._read_shard(entry['file'])
+            shards[entry['file']] = (generation, hotel)
+            hotels.append(hotel)
+        self._shards = shards
+        self._files = [entry['file'] for entry in manifest['shards']]
+        self._next_shard = manifest['next_shard']
+        return hotels, []
+
+    def _read_shard(self, filename: str):
+        """
+        Parses a hotel file.
+
+        Parameters:
+        - filename: The filename, relative to the directory.
+
+        Returns:
+        The hotel.
+        """
+        with open(os.path.join(self.filename, filename), 'rb') as file:
+            contents = file.read()
+        add_bytes_read(len(contents))
+        # The extension names the serializer that wrote the file
+        return detect_serializer(contents,
+                                 serializer_for(filename)).loads(contents)
+
+    def read_hotel(self, key: str, value):
+        """
+        Looks a hotel up in the manifest and parses its file alone.
+
+        Parameters:
+        - key: The key to match, 'hotel_id' or 'name'.
+        - value: The value the key must hold.
+
+        Returns:
+        The hotel if found, otherwise None.
+        """
+        with open(self.manifest, 'r', encoding='UTF-8') as file:
+            manifest = json.load(file)
+        for entry in manifest['shards']:
+            if entry[key] == value:
+                return self._read_shard(entry['file'])
+        return None
+
+    def invalidate(self):
+        """
+        Drops the parsed hotels, which may hold discarded changes.
+        """
+        self._shards = {}
+
+    def _new_shard(self):
+        """
+        Allocates the filename of a new hotel file.
+
+        Returns:
+        The filename, relative to the directory.
+        """
+        filename = f'hotel-{self._next_shard}{self._extension}'
+        self._next_shard += 1
+        return filename
+
+    def _write_shard(self, filename: str, hotel: dict):
+        """
+        Atomically writes a hotel file.
+
+        Parameters:
+        - filename: The filename, relative to the directory.
+        - hotel: The hotel to write.
+        """
+        with phase('serialize'):
+            contents = self.serializer.dumps(hotel)
+        replace_file(os.path.join(self.filename, filename), contents)
+        self._shards[filename] = (self._generation, hotel)
+
+    def _write_manifest(self, data: list):
+        """
+        Atomically writes the manifest of the hotel files, with the
+        generation they were written at.
+
+        Parameters:
+        - data: The hotel data, in the order of the hotel files.
+        """
+        manifest = {'generation': self._generation,
+                    'next_shard': self._next_shard, 'shards': [
+                        {'file': filename, 'generation': self._shards.get(
+                            filename, (self._generation,))[0],
+                         **{key: hotel.get(key)
+                            for key in self._MANIFEST_FIELDS}}
+                        for filename, hotel in zip(self._files, data)]}
+        replace_file(self.manifest, json.dumps(
+            manifest, separators=(',', ':')).encode('UTF-8'))
+
+    def _remove_shard(self, filename: str):
+        """
+        Removes a hotel file.
+
+        Parameters:
+        - filename: The filename, relative to the directory.
+        """
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(os.path.join(self.filename, filename))
+        self._shards.pop(filename, None)
+
+    def write(self, data: list, changed=None):
+        """
+        Rewrites every hotel file and the manifest.
+
+        The new files are written before the manifest pointing to them, and
+        the files it no longer lists are removed afterwards.
+
+        Parameters:
+        - data: The hotel data to be written.
+        - changed: Unused, every hotel file is written again.
+        """
+        os.makedirs(self.filename, exist_ok=True)
+        # Number the new files and the generation after the stored manifest
+        try:
+            with open(self.manifest, 'r', encoding='UTF-8') as file:
+                manifest = json.load(file)
+        except FileNotFoundError:
+            manifest = {'next_shard': 1}
+        self._next_shard = manifest['next_shard']
+        self._generation = manifest.get('generation', 0) + 1
+        self._files = []
+        self._shards = {}
+        for hotel in data:
+            filename = self._new_shard()
+            self._write_shard(filename, hotel)
+            self._files.append(filename)
+        self._write_manifest(data)
+        self.journal.remove()
+        # Remove the files of the replaced hotels
+        for entry in os.scandir(self.filename):
+            if (entry.name != self.MANIFEST
+                    and not entry.name.startswith('.')
+                    and entry.name not in self._shards):
+                self._remove_shard(entry.name)
+
+    def append(self, lines: list, data: list):
+        """
+        Rewrites the hotel files touched by a batch of operations with the
+        next generation, then records it in the journal of the manifest, or
+        rewrites the manifest if the hotel files it lists changed or the
+        journal grew past it.
+
+        The stored manifest and journal match the cache, so the generation
+        is the one last read or written.
+
+        Parameters:
+        - lines: The operations to write, each encoded as a JSON string.
+        - data: The hotel data after the operations were applied.
+        """
+        changed = set()
+        removed = []
+        written = []
+        # Whether the files or names the manifest lists change
+        listed = False
+        self._generation += 1
+        # Follow the positions of the hotels through the operations
+        for line in lines:
+            operation = json.loads(line)
+            if operation['op'] == 'add_hotel':
+                filename = self._new_shard()
+                self._files.append(filename)
+                changed.add(filename)
+                listed = True
+            elif operation['op'] == 'remove_hotel':
+                removed.append(self._files.pop(operation['h']))
+                listed = True
+            else:
+                changed.add(self._files[operation['h']])
+                if operation['op'] == 'modify_hotel' and operation['name']:
+                    listed = True
+        for position, hotel in enumerate(data):
+            filename = self._files[position]
+            if filename not in changed:
+                continue
+            # Rename the files written by another serializer
+            if not filename.endswith(self._extension):
+                removed.append(filename)
+                filename = self._files[position] = self._new_shard()
+                listed = True
+            self._write_shard(filename, hotel)
+            written.append(filename)
+        if not listed:
+            stat = os.stat(self.manifest)
+            if self.journal.size() < stat.st_size:
+                self.journal.append([json.dumps(
+                    {'generation': self._generation, 'files': written},
+                    separators=(',', ':'))], stat)
+                return
+        self._write_manifest(data)
+        self.journal.remove()
+        for filename in removed:
+            self._remove_shard(filename)
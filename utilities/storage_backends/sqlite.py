@@ -0,0 +1,478 @@
+"""
+Module for the backend storing hotel data in an SQLite database.
+
+Libraries:
+- contextlib: Provides the decorator turning _write_transaction into a
+context manager, and suppress for removing files that may not exist.
+- json: Provides the encoding of the fields without a column.
+- os: Provides functions for interacting with the operating system.
+- sqlite3: Provides the SQLite database engine.
+- utilities.storage_backends.base: Provides the backend interface.
+
+Classes:
+- SQLiteBackend: Stores hotel data in an SQLite database.
+"""
+import contextlib
+import json
+import os
+import sqlite3
+from utilities.storage_backends.base import StorageBackend
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    A class to store hotel data in an SQLite database in WAL mode.
+
+    Hotels, rooms, customers and reservations are rows of indexed tables.
+    Rows are kept in insertion order, and the backend mirrors the position
+    of every row in the hotel lists, so the position-based operations of the
+    DataStore become single-row statements. Fields without a column of
+    their own are kept as JSON in an extra column.
+    """
+    name = 'sqlite'
+    # Columns of each table holding fields of the hotel data
+    _HOTEL_COLUMNS = ('hotel_id', 'name', 'location')
+    _CUSTOMER_COLUMNS = ('customer_id', 'customer_name')
+    _RESERVATION_COLUMNS = ('id', 'customer_id', 'customer_name',
+                            'room_type', 'date')
+    # Fields of a hotel stored in tables of their own
+    _NESTED = ('rooms', 'reservations', 'customers')
+    _SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS hotels (
+            row_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            hotel_id INTEGER, name TEXT, location TEXT, extra TEXT);
+        CREATE INDEX IF NOT EXISTS hotels_name ON hotels (name);
+        CREATE INDEX IF NOT EXISTS hotels_hotel_id ON hotels (hotel_id);
+        CREATE TABLE IF NOT EXISTS rooms (
+            row_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            hotel_row INTEGER NOT NULL
+                REFERENCES hotels (row_id) ON DELETE CASCADE,
+            room_type TEXT NOT NULL, available INTEGER NOT NULL,
+            UNIQUE (hotel_row, room_type));
+        CREATE TABLE IF NOT EXISTS customers (
+            row_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            hotel_row INTEGER NOT NULL
+                REFERENCES hotels (row_id) ON DELETE CASCADE,
+            customer_id INTEGER, customer_name TEXT, extra TEXT);
+        CREATE INDEX IF NOT EXISTS customers_name
+            ON customers (hotel_row, customer_name);
+        CREATE TABLE IF NOT EXISTS reservations (
+            row_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            hotel_row INTEGER NOT NULL
+                REFERENCES hotels (row_id) ON DELETE CASCADE,
+            id INTEGER, customer_id INTEGER, customer_name TEXT,
+            room_type TEXT, date TEXT, extra TEXT);
+        CREATE INDEX IF NOT EXISTS reservations_customer
+            ON reservations (hotel_row, customer_name);
+        CREATE INDEX IF NOT EXISTS reservations_id
+            ON reservations (hotel_row, id);
+        CREATE TABLE IF NOT EXISTS generation (
+            row_id INTEGER PRIMARY KEY CHECK (row_id = 0),
+            value INTEGER NOT NULL);
+    '''
+    # Connections inherited from a parent process; closing them in a child
+    # would corrupt the locks of the parent, so they are never collected
+    _inherited = []
+
+    def __init__(self, filename: str):
+        """
+        Initializes an SQLiteBackend object for the specified database.
+
+        Parameters:
+        - filename: The filename of the SQLite database.
+        """
+        super().__init__(filename)
+        self._connection = None
+        # Process and inode the connection was opened for
+        self._owner = None
+        # Row IDs of the hotels, and of the customers and reservations of
+        # each hotel, in list order
+        self._hotel_rows = []
+        self._customer_rows = {}
+        self._reservation_rows = {}
+
+    @property
+    def incremental(self):
+        """
+        Tells whether saves are written as row updates.
+
+        Returns:
+        Always True.
+        """
+        return True
+
+    def _connect(self):
+        """
+        Returns the connection to the database, opening it if needed.
+
+        The connection is reopened after a fork or when the database file
+        was replaced, and stale WAL files are removed before a new database
+        is created.
+
+        Returns:
+        The sqlite3 connection.
+        """
+        try:
+            inode = os.stat(self.filename).st_ino
+        except FileNotFoundError:
+            inode = None
+        owner = (os.getpid(), inode)
+        if self._connection is not None and self._owner != owner:
+            self._disconnect()
+        if self._connection is None:
+            # A new database must not pick up the WAL of a deleted one
+            if inode is None:
+                for suffix in ('-wal', '-shm'):
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(self.filename + suffix)
+            connection = sqlite3.connect(self.filename, isolation_level=None,
+                                         check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute('PRAGMA foreign_keys=ON')
+            connection.executescript(self._SCHEMA)
+            self._connection = connection
+            self._owner = (os.getpid(), os.stat(self.filename).st_ino)
+        return self._connection
+
+    def _disconnect(self):
+        """
+        Closes the connection, or abandons it if it belongs to the parent of
+        a forked process.
+        """
+        if self._owner[0] == os.getpid():
+            self._connection.close()
+        else:
+            self._inherited.append(self._connection)
+        self._connection = None
+        self._owner = None
+
+    def signature(self):
+        """
+        Returns the inode of the database and its data version, which changes
+        whenever another connection commits.
+
+        Returns:
+        A (device, inode, data_version) tuple, or None if the database does
+        not exist.
+        """
+        if not os.path.exists(self.filename):
+            return None
+        connection = self._connect()
+        version = connection.execute('PRAGMA data_version').fetchone()[0]
+        stat = os.stat(self.filename)
+        return (stat.st_dev, stat.st_ino, version)
+
+    def stamp(self):
+        """
+        Returns the inode of the database and its generation, which every
+        write transaction increments. The data version of the signature
+        cannot be used, as each connection counts it apart.
+
+        Returns:
+        A (inode, generation) tuple, or None if the database does not exist.
+        """
+        if not os.path.exists(self.filename):
+            return None
+        row = self._connect().execute(
+            'SELECT value FROM generation').fetchone()
+        return (os.stat(self.filename).st_ino, row[0] if row else 0)
+
+    @staticmethod
+    def _split(record: dict, columns: tuple, nested: tuple = ()):
+        """
+        Splits a record into its column values and the JSON of its other
+        fields.
+
+        Parameters:
+        - record: The record to split.
+        - columns: The fields stored in columns.
+        - nested: The fields stored in other tables.
+
+        Returns:
+        A tuple of the column values followed by the extra JSON, or None if
+        there are no other fields.
+        """
+        extra = {key: value for key, value in record.items()
+                 if key not in columns and key not in nested}
+        return tuple(record.get(column) for column in columns) + (
+            json.dumps(extra) if extra else None,)
+
+    @staticmethod
+    def _join(columns: tuple, row: tuple):
+        """
+        Builds a record from its column values and extra JSON.
+
+        Parameters:
+        - columns: The fields stored in columns.
+        - row: The column values followed by the extra JSON.
+
+        Returns:
+        The record dictionary.
+        """
+        record = dict(zip(columns, row))
+        if row[-1]:
+            record.update(json.loads(row[-1]))
+        return record
+
+    def read(self):
+        """
+        Reads every table in one read transaction and rebuilds the hotels.
+
+        Returns:
+        A (hotels, operations) tuple, with no operations to replay.
+        """
+        connection = self._connect()
+        hotels = {}
+        self._hotel_rows = []
+        self._customer_rows = {}
+        self._reservation_rows = {}
+        connection.execute('BEGIN')
+        try:
+            for row in connection.execute(
+                    'SELECT row_id, hotel_id, name, location, extra '
+                    'FROM hotels ORDER BY row_id'):
+                hotels[row[0]] = self._hotel(row[1:])
+                self._hotel_rows.append(row[0])
+                self._customer_rows[row[0]] = []
+                self._reservation_rows[row[0]] = []
+            for hotel_row, room_type, available in connection.execute(
+                    'SELECT hotel_row, room_type, available FROM rooms '
+                    'ORDER BY row_id'):
+                hotels[hotel_row]['rooms'][room_type] = available
+            for row in connection.execute(
+                    'SELECT row_id, hotel_row, customer_id, customer_name, '
+                    'extra FROM customers ORDER BY row_id'):
+                hotels[row[1]]['customers'].append(
+                    self._join(self._CUSTOMER_COLUMNS, row[2:]))
+                self._customer_rows[row[1]].append(row[0])
+            for row in connection.execute(
+                    'SELECT row_id, hotel_row, id, customer_id, '
+                    'customer_name, room_type, date, extra '
+                    'FROM reservations ORDER BY row_id'):
+                hotels[row[1]]['reservations'].append(
+                    self._join(self._RESERVATION_COLUMNS, row[2:]))
+                self._reservation_rows[row[1]].append(row[0])
+        finally:
+            connection.execute('COMMIT')
+        return list(hotels.values()), []
+
+    def _hotel(self, values: tuple):
+        """
+        Rebuilds a hotel without its rooms, customers and reservations.
+
+        Parameters:
+        - values: The hotel_id, name, location and extra columns of the row.
+
+        Returns:
+        The hotel.
+        """
+        hotel = self._join(self._HOTEL_COLUMNS, values)
+        # Keep the field order of hotels created by Hotel
+        return {'hotel_id': hotel.pop('hotel_id'), 'name': hotel.pop('name'),
+                'location': hotel.pop('location'),
+                'rooms': {}, 'reservations': [], 'customers': [], **hotel}
+
+    def read_hotel(self, key: str, value):
+        """
+        Reads the first hotel whose key holds a value through the index of
+        the column, without reading the rows of the other hotels.
+
+        Parameters:
+        - key: The key to match, 'hotel_id' or 'name'.
+        - value: The value the key must hold.
+
+        Returns:
+        The hotel if found, otherwise None.
+        """
+        if key not in ('hotel_id', 'name'):
+            raise ValueError(f'Unknown hotel key {key}')
+        connection = self._connect()
+        connection.execute('BEGIN')
+        try:
+            row = connection.execute(
+                'SELECT row_id, hotel_id, name, location, extra FROM hotels '
+                f'WHERE {key} = ? ORDER BY row_id LIMIT 1',
+                (value,)).fetchone()
+            if row is None:
+                return None
+            hotel = self._hotel(row[1:])
+            hotel['rooms'].update(connection.execute(
+                'SELECT room_type, available FROM rooms WHERE hotel_row = ? '
+                'ORDER BY row_id', (row[0],)))
+            hotel['customers'] = [
+                self._join(self._CUSTOMER_COLUMNS, values)
+                for values in connection.execute(
+                    'SELECT customer_id, customer_name, extra FROM customers '
+                    'WHERE hotel_row = ? ORDER BY row_id', (row[0],))]
+            hotel['reservations'] = [
+                self._join(self._RESERVATION_COLUMNS, values)
+                for values in connection.execute(
+                    'SELECT id, customer_id, customer_name, room_type, date, '
+                    'extra FROM reservations WHERE hotel_row = ? '
+                    'ORDER BY row_id', (row[0],))]
+        finally:
+            connection.execute('COMMIT')
+        return hotel
+
+    def _insert_hotel(self, connection, hotel: dict):
+        """
+        Inserts a hotel with its rooms, customers and reservations.
+
+        Parameters:
+        - connection: The connection running the write transaction.
+        - hotel: The hotel to insert.
+        """
+        hotel_row = connection.execute(
+            'INSERT INTO hotels (hotel_id, name, location, extra) '
+            'VALUES (?, ?, ?, ?)',
+            self._split(hotel, self._HOTEL_COLUMNS, self._NESTED)).lastrowid
+        self._hotel_rows.append(hotel_row)
+        self._customer_rows[hotel_row] = []
+        self._reservation_rows[hotel_row] = []
+        connection.executemany(
+            'INSERT INTO rooms (hotel_row, room_type, available) '
+            'VALUES (?, ?, ?)',
+            [(hotel_row, room_type, available)
+             for room_type, available in hotel['rooms'].items()])
+        for customer in hotel['customers']:
+            self._insert_customer(connection, hotel_row, customer)
+        for reservation in hotel['reservations']:
+            self._insert_reservation(connection, hotel_row, reservation)
+
+    def _insert_customer(self, connection, hotel_row: int, customer: dict):
+        """
+        Inserts a customer of a hotel.
+
+        Parameters:
+        - connection: The connection running the write transaction.
+        - hotel_row: The row ID of the hotel.
+        - customer: The customer to insert.
+        """
+        self._customer_rows[hotel_row].append(connection.execute(
+            'INSERT INTO customers (hotel_row, customer_id, customer_name, '
+            'extra) VALUES (?, ?, ?, ?)',
+            (hotel_row,) + self._split(customer, self._CUSTOMER_COLUMNS)
+            ).lastrowid)
+
+    def _insert_reservation(self, connection, hotel_row: int,
+                            reservation: dict):
+        """
+        Inserts a reservation of a hotel.
+
+        Parameters:
+        - connection: The connection running the write transaction.
+        - hotel_row: The row ID of the hotel.
+        - reservation: The reservation to insert.
+        """
+        self._reservation_rows[hotel_row].append(connection.execute(
+            'INSERT INTO reservations (hotel_row, id, customer_id, '
+            'customer_name, room_type, date, extra) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (hotel_row,) + self._split(reservation,
+                                       self._RESERVATION_COLUMNS)
+            ).lastrowid)
+
+    @contextlib.contextmanager
+    def _write_transaction(self):
+        """
+        Runs a write transaction, rolling it back if it fails, and
+        increments the generation of the database.
+
+        Returns:
+        A context manager yielding the connection.
+        """
+        connection = self._connect()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.execute(
+                'INSERT INTO generation VALUES (0, 1) '
+                'ON CONFLICT (row_id) DO UPDATE SET value = value + 1')
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    def write(self, data: list, changed=None):
+        """
+        Replaces every row of the database in one transaction.
+
+        Parameters:
+        - data: The hotel data to be written.
+        - changed: Unused, every row is written again.
+        """
+        with self._write_transaction() as connection:
+            for table in ('reservations', 'customers', 'rooms', 'hotels'):
+                connection.execute(f'DELETE FROM {table}')
+            self._hotel_rows = []
+            self._customer_rows = {}
+            self._reservation_rows = {}
+            for hotel in data:
+                self._insert_hotel(connection, hotel)
+
+    def append(self, lines: list, data: list):
+        """
+        Applies a batch of operations as row statements in one transaction.
+
+        Parameters:
+        - lines: The operations to write, each encoded as a JSON string.
+        - data: The hotel data after the operations were applied.
+        """
+        with self._write_transaction() as connection:
+            for line in lines:
+                self._apply(connection, json.loads(line))
+
+    def _apply(self, connection, operation: dict):
+        # pylint: disable=too-many-branches
+        """
+        Applies one operation of the DataStore to the database.
+
+        Parameters:
+        - connection: The connection running the write transaction.
+        - operation: The operation to apply.
+        """
+        kind = operation['op']
+        if kind == 'add_hotel':
+            self._insert_hotel(connection, operation['hotel'])
+            return
+        hotel_row = self._hotel_rows[operation['h']]
+        if kind == 'remove_hotel':
+            # Rooms, customers and reservations are deleted by cascade
+            connection.execute('DELETE FROM hotels WHERE row_id = ?',
+                               (hotel_row,))
+            del self._hotel_rows[operation['h']]
+            del self._customer_rows[hotel_row]
+            del self._reservation_rows[hotel_row]
+        elif kind == 'modify_hotel':
+            for column in ('name', 'location'):
+                if operation[column]:
+                    connection.execute(
+                        f'UPDATE hotels SET {column} = ? WHERE row_id = ?',
+                        (operation[column], hotel_row))
+        elif kind == 'adjust_rooms':
+            connection.execute(
+                'UPDATE rooms SET available = available + ? '
+                'WHERE hotel_row = ? AND room_type = ?',
+                (operation['delta'], hotel_row, operation['room_type']))
+        elif kind == 'add_customer':
+            self._insert_customer(connection, hotel_row,
+                                  operation['customer'])
+        elif kind == 'remove_customer':
+            connection.execute(
+                'DELETE FROM customers WHERE row_id = ?',
+                (self._customer_rows[hotel_row].pop(operation['c']),))
+        elif kind == 'rename_customer':
+            connection.execute(
+                'UPDATE customers SET customer_name = ? WHERE row_id = ?',
+                (operation['name'],
+                 self._customer_rows[hotel_row][operation['c']]))
+        elif kind == 'add_reservation':
+            self._insert_reservation(connection, hotel_row,
+                                     operation['reservation'])
+        elif kind == 'remove_reservation':
+            connection.execute(
+                'DELETE FROM reservations WHERE row_id = ?',
+                (self._reservation_rows[hotel_row].pop(operation['r']),))
+        else:
+            raise ValueError(f'Unknown operation {kind}')